@@ -5,11 +5,72 @@ Main Streamlit Application
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import os
 import time
 
 from kalshi_api import KalshiAPI
 from polymarket_api import PolymarketAPI
 from market_matcher import MarketMatcher
+from matcher_session import MatcherSession
+from score_cache import ScoreCache
+from semantic_index import SemanticIndex
+from entity_extractor import EntityExtractor
+from market_search import MarketSearchIndex
+from event_matcher import EventMatcher
+from date_blocking import CloseDateBlocker
+from threshold_parser import ThresholdMatcher
+from minhash_lsh import MinHashLSH
+from market_lists import fetch_market_lists
+from arbitrage import ArbitrageEngine, YES_KALSHI
+from spread_store import SpreadStore, pair_key
+from change_feed import ChangeFeed
+from reference_cache import ReferenceCache
+from market_store import MarketStore, FTSCandidates
+
+# Persistent similarity scores survive restarts (invalidated when matcher rules change)
+SCORE_CACHE_PATH = os.environ.get("SCORE_CACHE_PATH", "score_cache.sqlite3")
+# Cached scores nobody has looked up for this many days are pruned on startup
+SCORE_MAX_AGE_DAYS = float(os.environ.get("SCORE_MAX_AGE_DAYS", "7"))
+
+# Kalshi series/event metadata (category, tags, settlement source), reloaded in the background weekly
+REFERENCE_CACHE_PATH = os.environ.get("REFERENCE_CACHE_PATH", "reference_cache.sqlite3")
+
+# Every market ever fetched, with a full-text index for search (empty = off)
+MARKET_STORE_PATH = os.environ.get("MARKET_STORE_PATH", "market_store.sqlite3")
+
+# "keyword" (default) or "semantic" (spaCy embedding neighbours, needs a model with vectors)
+MATCHING_MODE = os.environ.get("MATCHING_MODE", "keyword")
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_md")
+
+# Optional spaCy NER model for the person-name gate (empty = capitalization heuristic)
+NER_MODEL = os.environ.get("NER_MODEL", "")
+
+# "greedy" (best pair first) or "optimal" (maximum total score per connected component)
+ASSIGNMENT_METHOD = os.environ.get("ASSIGNMENT_METHOD", "greedy")
+
+# Match events to events first and score only markets inside matched event pairs
+EVENT_MATCHING = os.environ.get("EVENT_MATCHING", "0") == "1"
+
+# Only compare markets resolving within this many days of each other (empty = off)
+CLOSE_DATE_TOLERANCE_DAYS = os.environ.get("CLOSE_DATE_TOLERANCE_DAYS", "")
+
+# Only score pairs whose titles retrieve each other from the market store's full-text index
+FTS_CANDIDATES = os.environ.get("FTS_CANDIDATES", "0") == "1"
+
+# Pair strike ladders rung-to-rung by threshold; other markets come from MinHash candidates
+THRESHOLD_MATCHING = os.environ.get("THRESHOLD_MATCHING", "0") == "1"
+
+# Trading fees used for net arbitrage edges (Kalshi: rate * C * P * (1 - P); Polymarket: rate * C * min(P, 1 - P))
+KALSHI_FEE_RATE = float(os.environ.get("KALSHI_FEE_RATE", "0.07"))
+POLYMARKET_FEE_RATE = float(os.environ.get("POLYMARKET_FEE_RATE", "0.0"))
+
+# Per-pair spread history (memory-mapped ring buffers; empty = off)
+SPREAD_STORE_DIR = os.environ.get("SPREAD_STORE_DIR", "spread_history")
+SPREAD_WINDOW_SECONDS = 3600
+
+# Matches streamed in while matching is still running (first screen only, redrawn at most this often)
+PREVIEW_SIZE = 10
+PREVIEW_INTERVAL_SECONDS = 0.5
 
 
 # Page configuration
@@ -294,48 +355,106 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def init_market_store():
+    """Persisted market universe shared across reruns (None when disabled)"""
+    return MarketStore(MARKET_STORE_PATH) if MARKET_STORE_PATH else None
+
+
 @st.cache_resource
 def init_apis():
-    """Initialize API clients (cached)"""
-    return KalshiAPI(), PolymarketAPI(), MarketMatcher()
+    """Initialize API clients and the matcher session (cached)"""
+    matcher = MarketMatcher()
+    matcher.assignment_method = ASSIGNMENT_METHOD
+    if EVENT_MATCHING:
+        matcher.candidate_generators.append(EventMatcher(matcher))
+    market_store = init_market_store()
+    if FTS_CANDIDATES and market_store is not None:
+        matcher.candidate_generators.append(FTSCandidates(market_store))
+    if THRESHOLD_MATCHING:
+        matcher.candidate_generators.append(ThresholdMatcher(matcher, fallback=MinHashLSH(matcher, num_perm=128, bands=64)))
+    if CLOSE_DATE_TOLERANCE_DAYS:
+        matcher.blocking_filters.append(CloseDateBlocker(tolerance_days=float(CLOSE_DATE_TOLERANCE_DAYS)))
+    if MATCHING_MODE == "semantic":
+        matcher.enable_semantic_matching(SemanticIndex(SPACY_MODEL, cache_path="title_vectors.npz"))
+    if NER_MODEL:
+        matcher.entity_extractor = EntityExtractor(NER_MODEL, n_process=2, batch_size=512)
+    score_cache = ScoreCache(SCORE_CACHE_PATH, rules_version=matcher.rules_version)
+    pruned = score_cache.prune(SCORE_MAX_AGE_DAYS * 86400)
+    if pruned:
+        print(f"✓ Score cache: pruned {pruned} scores unused for {SCORE_MAX_AGE_DAYS:g} days")
+    kalshi_api = KalshiAPI(reference=ReferenceCache(REFERENCE_CACHE_PATH))
+    return kalshi_api, PolymarketAPI(), matcher, MatcherSession(matcher, score_cache=score_cache)
+
+
+@st.cache_resource
+def init_search_index(_matcher):
+    """Cross-venue lookup index (rebuilt on every fetch, cached across reruns)"""
+    return MarketSearchIndex(_matcher)
+
+
+@st.cache_resource
+def init_spread_store():
+    """Spread history shared across reruns (None when disabled)"""
+    return SpreadStore(SPREAD_STORE_DIR) if SPREAD_STORE_DIR else None
+
+
+@st.cache_resource
+def init_change_feed():
+    """Diffs consecutive refreshes of this app process"""
+    return ChangeFeed()
 
 
 # Temporarily removed cache to test
 # @st.cache_data(ttl=60)
-def fetch_markets(_kalshi_api, _poly_api, _matcher, search_query="", min_similarity=0.5, _version="v2"):
+def fetch_markets(_kalshi_api, _poly_api, _session, search_query="", min_similarity=0.5, _version="v2",
+                  _search_index=None, _on_match=None, _market_store=None):
     """
     Fetch and match markets from both platforms
 
     Args:
         _kalshi_api: KalshiAPI instance
         _poly_api: PolymarketAPI instance
-        _matcher: MarketMatcher instance
+        _session: MatcherSession instance (keeps scores between refreshes)
         search_query: Search filter
         min_similarity: Minimum similarity threshold
         _version: Cache version (change to invalidate cache)
+        _search_index: Optional MarketSearchIndex rebuilt from the fetched markets
+        _on_match: Optional callback given the matches confirmed so far, called as they stream in
+        _market_store: Optional MarketStore the fetched markets are saved to (and searched in)
 
     Returns:
-        List of matched markets
+        (matches, Kalshi markets, Polymarket markets, Kalshi combo markets pruned)
     """
     with st.spinner("🔄 Fetching markets from Kalshi and Polymarket..."):
-        # Fetch from both platforms (Kalshi max limit is 200)
-        kalshi_raw = _kalshi_api.get_markets(limit=200)
-        poly_raw = _poly_api.get_markets(limit=500)
-
-        # Extract market info from both platforms
-        kalshi_markets = [_kalshi_api.extract_market_info(m) for m in kalshi_raw]
-        poly_markets = [_poly_api.extract_market_info(m) for m in poly_raw]
+        # Fetch, extract, drop unpriced markets and Kalshi combos (Kalshi max limit is 200)
+        kalshi_markets, poly_markets, pruned = fetch_market_lists(_kalshi_api, _poly_api,
+                                                                  kalshi_limit=200, poly_limit=500)
 
-        # Filter out markets with no price data
-        kalshi_markets = [m for m in kalshi_markets if m.get("yes_price", 0) > 0]
-        poly_markets = [m for m in poly_markets if m.get("yes_price", 0) > 0]
+        # Lookups search everything fetched, not just the search-filtered lists
+        if _search_index is not None:
+            _search_index.build(kalshi_markets, poly_markets)
+        if _market_store is not None:
+            _market_store.upsert(kalshi_markets, poly_markets)
 
         # Note: No need to filter categorical Kalshi markets anymore
         # Algorithm uses Polymarket as source and won't match generic "Who/Which/What"
         # questions with specific Polymarket markets (proper noun mismatch)
 
-        # Filter by search query if provided
-        if search_query:
+        # Filter by search query if provided: ranked full-text search over the
+        # fetched markets when the store is on, substring match otherwise
+        if search_query and _market_store is not None:
+            kalshi_ids = {m.get("ticker", ""): m for m in kalshi_markets}
+            poly_ids = {m.get("condition_id", ""): m for m in poly_markets}
+            kalshi_markets = [
+                kalshi_ids[m["ticker"]] for m in
+                _market_store.search(search_query, "kalshi", limit=len(kalshi_ids), within=kalshi_ids)
+            ]
+            poly_markets = [
+                poly_ids[m["condition_id"]] for m in
+                _market_store.search(search_query, "polymarket", limit=len(poly_ids), within=poly_ids)
+            ]
+        elif search_query:
             search_lower = search_query.lower()
             kalshi_markets = [
                 m for m in kalshi_markets
@@ -346,13 +465,19 @@ def fetch_markets(_kalshi_api, _poly_api, _matcher, search_query="", min_similar
                 if search_lower in m.get("question", "").lower()
             ]
 
-        # Find matches
-        matches = _matcher.find_matches(kalshi_markets, poly_markets, threshold=min_similarity)
+        # Find matches (only new or retitled markets are rescored), streaming
+        # each connected component's matches as soon as they are final
+        matches = []
+        for match in _session.iter_refresh(kalshi_markets, poly_markets, threshold=min_similarity):
+            matches.append(match)
+            if _on_match is not None:
+                _on_match(matches)
+        matches = _session.matcher.sort_matches(matches)
 
-        return matches, len(kalshi_markets), len(poly_markets)
+        return matches, kalshi_markets, poly_markets, len(pruned)
 
 
-def display_market_card(market, platform, similarity, price_diff_pct, api_instance):
+def display_market_card(market, platform, similarity, price_diff_pct, api_instance, arbitrage=None):
     """
     Display a single market card in grid layout using Streamlit components
 
@@ -362,6 +487,7 @@ def display_market_card(market, platform, similarity, price_diff_pct, api_instan
         similarity: Match similarity score
         price_diff_pct: Price difference percentage
         api_instance: API instance for link generation
+        arbitrage: Executable opportunity of the pair (see arbitrage_rows), or None
     """
     is_kalshi = platform == "kalshi"
     price = market.get("yes_price", 0)
@@ -372,8 +498,8 @@ def display_market_card(market, platform, similarity, price_diff_pct, api_instan
     title = market.get('title' if is_kalshi else 'question', 'N/A')
     category = market.get('category', 'Other')
 
-    # Check arbitrage
-    is_arbitrage = price_diff_pct > 5
+    # Check arbitrage (net of fees, at executable prices)
+    is_arbitrage = arbitrage is not None
 
     # Container with colored border
     border_class = "🟡" if is_arbitrage else ""
@@ -417,7 +543,9 @@ def display_market_card(market, platform, similarity, price_diff_pct, api_instan
 
         # Arbitrage indicator
         if is_arbitrage:
-            st.warning(f"⚡ {price_diff_pct:.1f}% SPREAD")
+            side = "YES" if arbitrage["yes_kalshi"] == is_kalshi else "NO"
+            depth = f"{arbitrage['size']:,.0f}" if arbitrage["depth_known"] else "? (quotes only, depth unknown)"
+            st.warning(f"⚡ BUY {side} • {arbitrage['net_edge'] * 100:.1f}¢ net edge × {depth}")
 
         # Buttons
         btn_cols = st.columns(2)
@@ -441,7 +569,7 @@ def display_market_card(market, platform, similarity, price_diff_pct, api_instan
             st.link_button("Trade Now", link, use_container_width=True)
 
 
-def display_market_comparison(k_market, p_market, similarity, kalshi_api, poly_api):
+def display_market_comparison(k_market, p_market, similarity, kalshi_api, poly_api, arbitrage=None, history=None):
     """
     Display matched market pair as two cards side by side
 
@@ -451,6 +579,8 @@ def display_market_comparison(k_market, p_market, similarity, kalshi_api, poly_a
         similarity: Similarity score
         kalshi_api: KalshiAPI instance
         poly_api: PolymarketAPI instance
+        arbitrage: Executable opportunity of the pair (see arbitrage_rows), or None
+        history: Spread statistics of the pair over the recent window (SpreadStore.window_stats), or None
     """
     # Calculate price difference
     k_price = k_market.get("yes_price", 0)
@@ -462,17 +592,84 @@ def display_market_comparison(k_market, p_market, similarity, kalshi_api, poly_a
     col1, col2 = st.columns(2)
 
     with col1:
-        display_market_card(k_market, "kalshi", similarity, price_diff_pct, kalshi_api)
+        display_market_card(k_market, "kalshi", similarity, price_diff_pct, kalshi_api, arbitrage)
 
     with col2:
-        display_market_card(p_market, "polymarket", similarity, price_diff_pct, poly_api)
+        display_market_card(p_market, "polymarket", similarity, price_diff_pct, poly_api, arbitrage)
+
+    # Persistent spread or one-tick blip?
+    if history and history["count"] > 1:
+        st.caption(
+            f"📈 Spread last {SPREAD_WINDOW_SECONDS // 60} min: {history['mean'] * 100:+.1f}¢ avg "
+            f"± {history['std'] * 100:.1f}¢ (range {history['min'] * 100:+.1f}¢ to {history['max'] * 100:+.1f}¢, "
+            f"{history['count']} samples, {history['persistence']:.0%} at ≥ 5¢)"
+        )
+
+
+def preview_line(k_market, p_market, similarity):
+    """One markdown line of a streamed match (no widgets, so it can be redrawn freely)"""
+    k_price = k_market.get("yes_price", 0) * 100
+    p_price = p_market.get("yes_price", 0) * 100
+    return (f"**{similarity * 100:.0f}%** · 🏛️ {k_market.get('title', 'N/A')[:80]} ({k_price:.0f}%) "
+            f"↔ 🔗 {p_market.get('question', 'N/A')[:80]} ({p_price:.0f}%)")
+
+
+def fetch_orderbooks(kalshi_api, poly_api, matches):
+    """
+    Orderbooks of every matched market (two or three requests per pair)
+
+    Returns:
+        (Kalshi books keyed by ticker, Polymarket (yes_book, no_book) keyed by condition_id)
+    """
+    kalshi_books, poly_books = {}, {}
+    for k_market, p_market, _ in matches:
+        ticker = k_market.get("ticker", "")
+        if ticker and ticker not in kalshi_books:
+            book = kalshi_api.get_orderbook(ticker)
+            if book is not None:
+                kalshi_books[ticker] = book
+
+        condition_id = p_market.get("condition_id", "")
+        tokens = p_market.get("clob_token_ids") or []
+        if condition_id and tokens and condition_id not in poly_books:
+            yes_book = poly_api.get_orderbook(tokens[0])
+            no_book = poly_api.get_orderbook(tokens[1]) if len(tokens) > 1 else None
+            if yes_book is not None:
+                poly_books[condition_id] = (yes_book, no_book)
+    return kalshi_books, poly_books
+
+
+def arbitrage_rows(engine, matches, kalshi_books=None, poly_books=None):
+    """
+    Executable opportunities among the matches, keyed by (ticker, condition_id)
+
+    All pairs are evaluated in one vectorized pass; orderbooks are walked
+    where fetched, top-of-book quotes are used otherwise.
+    """
+    result = engine.evaluate_matches(matches, kalshi_books, poly_books)
+    rows = {}
+    for i in engine.opportunities(result).nonzero()[0]:
+        k_market, p_market, _ = matches[i]
+        rows[(k_market.get("ticker", ""), p_market.get("condition_id", ""))] = {
+            "yes_kalshi": bool(result.direction[i] == YES_KALSHI),
+            "size": float(result.size[i]),
+            "net_edge": float(result.net_edge[i]),
+            "net_profit": float(result.net_profit[i]),
+            "fees": float(result.fees[i]),
+            "depth_known": bool(result.depth_known[i]),
+        }
+    return rows
 
 
 def main():
     """Main application function"""
 
     # Initialize APIs
-    kalshi_api, poly_api, matcher = init_apis()
+    kalshi_api, poly_api, matcher, session = init_apis()
+    search_index = init_search_index(matcher)
+    spread_store = init_spread_store()
+    change_feed = init_change_feed()
+    market_store = init_market_store()
 
     # Hero Header
     st.markdown("""
@@ -573,9 +770,21 @@ def main():
 
     # Arbitrage filter
     arbitrage_only = st.sidebar.checkbox(
-        "Show only arbitrage opportunities (>5% diff)",
+        "Show only arbitrage opportunities (net of fees)",
         value=False
     )
+    target_size = st.sidebar.number_input(
+        "Arbitrage size (contracts)",
+        min_value=1,
+        value=100,
+        step=10,
+        help="Depth each opportunity is sized against"
+    )
+    walk_books = st.sidebar.checkbox(
+        "Walk orderbook depth (slower)",
+        value=False,
+        help="Fetch both orderbooks of every match instead of using top-of-book quotes"
+    )
 
     # Auto-refresh
     auto_refresh = st.sidebar.checkbox(
@@ -588,16 +797,36 @@ def main():
         st.cache_data.clear()
         st.rerun()
 
+    # First screen of results, shown while the rest is still being matched
+    preview = st.empty()
+    last_preview = [0.0]
+
+    def show_preview(partial):
+        now = time.time()
+        if now - last_preview[0] < PREVIEW_INTERVAL_SECONDS:
+            return
+        last_preview[0] = now
+        with preview.container():
+            st.caption(f"⏳ {len(partial)} matches so far, still matching...")
+            # Plain text only: keyed widgets here would collide with the final cards of the same pairs
+            for k_market, p_market, similarity in session.matcher.sort_matches(partial)[:PREVIEW_SIZE]:
+                st.markdown(preview_line(k_market, p_market, similarity))
+
     # Fetch markets
     try:
-        matches, kalshi_count, poly_count = fetch_markets(
+        matches, kalshi_markets, poly_markets, pruned_count = fetch_markets(
             kalshi_api,
             poly_api,
-            matcher,
+            session,
             search_query=search_query,
             min_similarity=min_similarity,
-            _version="v2"
+            _version="v2",
+            _search_index=search_index,
+            _on_match=show_preview,
+            _market_store=market_store
         )
+        preview.empty()
+        kalshi_count, poly_count = len(kalshi_markets), len(poly_markets)
 
         # Stats
         st.sidebar.markdown("---")
@@ -606,17 +835,31 @@ def main():
         st.sidebar.metric("Polymarket Markets", poly_count)
         st.sidebar.metric("Matched Markets", len(matches))
 
-        # Count arbitrage opportunities
-        arbitrage_count = sum(
-            1 for k, p, s in matches
-            if abs(k.get("yes_price", 0) - p.get("yes_price", 0)) * 100 > 5
-        )
-        st.sidebar.metric("Arbitrage Opportunities", arbitrage_count)
+        # Executable arbitrage after fees, sized against the book
+        engine = ArbitrageEngine(target_size=target_size, kalshi_fee_rate=KALSHI_FEE_RATE,
+                                 poly_fee_rate=POLYMARKET_FEE_RATE)
+        kalshi_books, poly_books = fetch_orderbooks(kalshi_api, poly_api, matches) if walk_books else ({}, {})
+        arbitrage = arbitrage_rows(engine, matches, kalshi_books, poly_books)
+        st.sidebar.metric("Arbitrage Opportunities", len(arbitrage))
+
+        # Remember this fetch's prices
+        spread_history = {}
+        if spread_store is not None:
+            spread_store.record(matches)
+            spread_history = spread_store.window_stats(SPREAD_WINDOW_SECONDS, min_abs_spread=0.05)
+
+        # What changed since the previous refresh (search-filtered lists would
+        # report every hidden market as closed, so only unfiltered refreshes count)
+        changes = {}
+        if not search_query:
+            for event in change_feed.update(kalshi_markets, poly_markets, matches):
+                changes[event.type] = changes.get(event.type, 0) + 1
 
         # Debug Info
         with st.sidebar.expander("🔍 Debug Info"):
             st.caption(f"**Markets Fetched:**")
             st.caption(f"• Kalshi: {kalshi_count} markets")
+            st.caption(f"• Kalshi combos pruned: {pruned_count}")
             st.caption(f"• Polymarket: {poly_count} markets")
             st.caption(f"")
             st.caption(f"**Matching Results:**")
@@ -624,11 +867,62 @@ def main():
             match_rate = (len(matches) / kalshi_count * 100) if kalshi_count > 0 else 0
             st.caption(f"• Match rate: {match_rate:.1f}%")
             st.caption(f"• Similarity threshold: {min_similarity*100:.0f}%")
+            st.caption(f"• Pairs rescored: {session.last_stats.get('pairs_scored', 0)}")
+            st.caption(f"• Score cache hits: {session.last_stats.get('cache_hits', 0)}")
+            if spread_store is not None:
+                st.caption(f"• Pairs with spread history: {len(spread_store.slots)}")
+            first_match = session.last_stats.get("first_match_seconds")
+            if first_match is not None:
+                st.caption(f"• First match after: {first_match:.2f}s of {session.last_stats.get('seconds', 0):.2f}s")
+            if changes:
+                st.caption(f"")
+                st.caption(f"**Changes since last refresh:**")
+                for kind, count in sorted(changes.items()):
+                    st.caption(f"• {kind.replace('_', ' ')}: {count}")
+            st.caption(f"")
+            st.caption(f"**Rejection Cascade:**")
+            for stage in matcher.stage_report():
+                st.caption(
+                    f"• {stage['stage']}: {stage['rejected']}/{stage['evaluated']} rejected, "
+                    f"{stage['us_per_pair']:.1f}µs/pair"
+                )
             st.caption(f"")
             st.caption(f"**Tip:** ถ้ามี match น้อยเกินไป ลอง:")
             st.caption(f"• ลด Similarity threshold")
             st.caption(f"• ปิด Arbitrage Only filter")
 
+        # Cross-venue lookup
+        with st.sidebar.expander("🔎 Find on Other Venue"):
+            lookup_query = st.text_input("Market title", key="lookup_query",
+                                         placeholder="e.g., Will Bitcoin reach $100k in 2025?")
+            lookup_venue = st.radio("Search", ["Polymarket", "Kalshi"], horizontal=True, key="lookup_venue")
+            if lookup_query:
+                if lookup_venue == "Polymarket":
+                    results = search_index.search_polymarket(lookup_query, k=5)
+                else:
+                    results = search_index.search_kalshi(lookup_query, k=5)
+                for market, score in results:
+                    title = market.get("question", market.get("title", ""))
+                    st.caption(f"• {score*100:.0f}% — {title}")
+                if not results:
+                    st.caption("No similar markets found")
+                st.caption(f"{search_index.last_stats.get('query_ms', 0):.1f} ms, "
+                           f"{search_index.last_stats.get('candidates', 0)} candidates scored")
+
+        # Search beyond this fetch: every market the store has ever seen
+        if market_store is not None and search_query:
+            with st.sidebar.expander("🗄️ All Stored Markets"):
+                start = time.time()
+                results = market_store.search(search_query, limit=10)
+                for market in results:
+                    venue = "Kalshi" if market["venue"] == "kalshi" else "Polymarket"
+                    title = market.get("question") or market.get("title", "")
+                    seen = datetime.fromtimestamp(market["last_seen"]).strftime("%Y-%m-%d %H:%M")
+                    st.caption(f"• {venue} — {title} (seen {seen})")
+                if not results:
+                    st.caption("No stored markets match")
+                st.caption(f"{(time.time() - start) * 1000:.1f} ms over {market_store.count()} markets")
+
         # Last updated
         st.sidebar.caption(f"Last updated: {datetime.now().strftime('%H:%M:%S')}")
 
@@ -640,7 +934,7 @@ def main():
     if arbitrage_only:
         matches = [
             (k, p, s) for k, p, s in matches
-            if abs(k.get("yes_price", 0) - p.get("yes_price", 0)) * 100 > 5
+            if (k.get("ticker", ""), p.get("condition_id", "")) in arbitrage
         ]
 
     # Display results
@@ -718,7 +1012,9 @@ def main():
 
         # Display each match
         for k_market, p_market, similarity in filtered_matches:
-            display_market_comparison(k_market, p_market, similarity, kalshi_api, poly_api)
+            ids = (k_market.get("ticker", ""), p_market.get("condition_id", ""))
+            display_market_comparison(k_market, p_market, similarity, kalshi_api, poly_api,
+                                      arbitrage.get(ids), spread_history.get(pair_key(*ids)))
 
     # Educational content in sidebar
     st.sidebar.markdown("---")
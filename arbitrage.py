@@ -0,0 +1,300 @@
+"""
+Arbitrage Module
+Executable, fee- and depth-aware cross-venue spreads for matched pairs, evaluated as NumPy arrays
+"""
+from typing import List, Dict, Tuple, Optional, NamedTuple
+
+import numpy as np
+
+from orderbook import MarketBook, KALSHI_TICKS, POLYMARKET_TICKS, YES, NO
+
+# Ask ladder of one contract side: (prices in dollars ascending, sizes in contracts)
+Ladder = Tuple[np.ndarray, np.ndarray]
+
+EMPTY_LADDER: Ladder = (np.zeros(0), np.zeros(0))
+
+# Directions: which venue the YES leg is bought on (the NO leg is bought on the other)
+YES_KALSHI = 0
+YES_POLYMARKET = 1
+
+# Why the fill stopped
+LIMIT_TARGET = 0  # target size reached
+LIMIT_DEPTH = 1   # one of the books ran out
+LIMIT_EDGE = 2    # the next level would not clear min_edge after fees
+
+
+class ArbitrageResult(NamedTuple):
+    """Best direction per pair; every field is an array with one entry per pair"""
+    direction: np.ndarray        # YES_KALSHI or YES_POLYMARKET
+    size: np.ndarray             # fillable contracts (each pays $1 on either outcome)
+    cost: np.ndarray             # dollars paid for both legs before fees
+    fees: np.ndarray             # dollars of fees on both legs
+    net_profit: np.ndarray       # size - cost - fees
+    net_edge: np.ndarray         # net_profit per contract (0 when nothing fills)
+    yes_level: np.ndarray        # deepest YES ask level used (-1 when nothing fills)
+    no_level: np.ndarray         # deepest NO ask level used
+    yes_limit_price: np.ndarray  # price of that YES level (nan when nothing fills)
+    no_limit_price: np.ndarray   # price of that NO level
+    limit: np.ndarray            # LIMIT_TARGET, LIMIT_DEPTH or LIMIT_EDGE
+    depth_known: np.ndarray      # False when a leg was priced from top-of-book quotes (size is not book depth)
+
+
+def kalshi_fee(contracts, price, rate: float = 0.07):
+    """Kalshi trading fee for one fill: rate * C * P * (1 - P), rounded up to the cent"""
+    raw = rate * np.asarray(contracts, dtype=np.float64) * price * (1 - np.asarray(price))
+    return np.ceil(np.round(raw * 100, 9)) / 100
+
+
+def polymarket_fee(contracts, price, rate: float = 0.0):
+    """Polymarket taker fee for one fill: rate * C * min(P, 1 - P) (zero on fee-free markets)"""
+    price = np.asarray(price, dtype=np.float64)
+    return rate * np.asarray(contracts, dtype=np.float64) * np.minimum(price, 1 - price)
+
+
+def kalshi_ladders(orderbook) -> Tuple[Ladder, Ladder]:
+    """
+    YES and NO ask ladders from a Kalshi orderbook
+
+    Kalshi books only hold bids; a NO bid at p is a YES ask at 1 - p and vice versa.
+
+    Args:
+        orderbook: MarketBook, or the 'orderbook' object of /markets/{ticker}/orderbook
+                   ('yes_dollars'/'no_dollars' or cent-priced 'yes'/'no' bid levels)
+
+    Returns:
+        (yes_asks, no_asks)
+    """
+    if not isinstance(orderbook, MarketBook):
+        book = MarketBook(KALSHI_TICKS)
+        book.apply_kalshi(orderbook)
+        orderbook = book
+    return orderbook.asks(YES), orderbook.asks(NO)
+
+
+def polymarket_ladders(yes_book, no_book=None) -> Tuple[Ladder, Ladder]:
+    """
+    YES and NO ask ladders from Polymarket CLOB books
+
+    Args:
+        yes_book: MarketBook or /book response for the YES token ({'bids': [...], 'asks': [...]})
+        no_book: MarketBook or /book response for the NO token; without it NO asks
+                 are derived from YES bids (a YES bid at p is a NO ask at 1 - p)
+
+    Returns:
+        (yes_asks, no_asks)
+    """
+    def as_book(book):
+        if isinstance(book, MarketBook):
+            return book
+        market_book = MarketBook(POLYMARKET_TICKS)
+        market_book.apply_polymarket(book or {})
+        return market_book
+
+    yes_book = as_book(yes_book)
+    no_asks = as_book(no_book).asks(YES) if no_book is not None else yes_book.asks(NO)
+    return yes_book.asks(YES), no_asks
+
+
+def quote_ladders(market: Dict, platform: str, size: float = np.inf) -> Tuple[Ladder, Ladder]:
+    """
+    One-level YES and NO ask ladders from the quotes carried by an extracted market
+
+    Used when no orderbook was fetched: top of book only, depth unknown
+    (size defaults to unlimited, so only the target size caps the fill;
+    evaluate_matches flags such pairs with depth_known=False). A side without
+    a real ask gets EMPTY_LADDER: mid or last prices are not tradeable.
+
+    Args:
+        market: Extracted market (KalshiAPI/PolymarketAPI.extract_market_info)
+        platform: 'kalshi' or 'polymarket'
+        size: Depth assumed at the quoted price
+
+    Returns:
+        (yes_asks, no_asks)
+    """
+    if platform == "kalshi":
+        yes_ask, no_ask = market.get("yes_ask"), market.get("no_ask")
+    else:
+        yes_ask = market.get("best_ask")
+        best_bid = market.get("best_bid")
+        no_ask = 1 - best_bid if best_bid else None
+    yes_ask = yes_ask or 0.0
+    no_ask = no_ask or 0.0
+
+    def one_level(price):
+        return (np.array([price]), np.array([size])) if 0 < price < 1 else EMPTY_LADDER
+
+    return one_level(yes_ask), one_level(no_ask)
+
+
+def _pad(ladders: List[Ladder], target: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack ladders into (n, L) price and capped cumulative-size arrays"""
+    width = max([len(prices) for prices, _ in ladders] + [1])
+    prices = np.ones((len(ladders), width))
+    sizes = np.zeros((len(ladders), width))
+    for row, (p, s) in enumerate(ladders):
+        prices[row, :len(p)] = p
+        sizes[row, :len(s)] = s
+    return prices, np.minimum(np.cumsum(sizes, axis=1), target)
+
+
+def _level_at(cum: np.ndarray, points: np.ndarray, target: float) -> np.ndarray:
+    """Per row, index of the level whose size interval (cum[i-1], cum[i]] follows each point"""
+    n, width = cum.shape
+    offset = (np.arange(n) * (target + 1.0))[:, None]
+    flat = (cum + offset).ravel()
+    return np.searchsorted(flat, points + offset, side="right") - np.arange(n)[:, None] * width
+
+
+class ArbitrageEngine:
+    """
+    Buy YES on one venue and NO on the other; the pair pays $1 whatever happens
+
+    For every pair and both directions the two ask ladders are merged into
+    segments of constant price; each segment's marginal edge is
+    1 - yes_price - no_price - per-contract fees. Segments are filled in order
+    while the edge clears min_edge, up to target_size. Everything runs on
+    padded (pairs x levels) arrays, so all pairs are evaluated in one pass.
+    """
+
+    def __init__(self, target_size: float = 100.0, min_edge: float = 0.0,
+                 kalshi_fee_rate: float = 0.07, poly_fee_rate: float = 0.0):
+        """
+        Args:
+            target_size: Contracts to fill per pair at most
+            min_edge: Smallest marginal edge per contract (dollars, after fees) worth filling
+            kalshi_fee_rate: Kalshi fee coefficient (fee = rate * C * P * (1 - P), rounded up)
+            poly_fee_rate: Polymarket taker fee coefficient (fee = rate * C * min(P, 1 - P))
+        """
+        self.target_size = float(target_size)
+        self.min_edge = min_edge
+        self.kalshi_fee_rate = kalshi_fee_rate
+        self.poly_fee_rate = poly_fee_rate
+
+    def _fee_per_contract(self, price: np.ndarray, venue: str) -> np.ndarray:
+        if venue == "kalshi":
+            return self.kalshi_fee_rate * price * (1 - price)
+        return self.poly_fee_rate * np.minimum(price, 1 - price)
+
+    def _leg_totals(self, prices: np.ndarray, cum: np.ndarray, fill: np.ndarray, venue: str):
+        """Dollars paid and fees for taking `fill` contracts off a ladder, fee charged per level"""
+        filled_cum = np.minimum(cum, fill[:, None])
+        per_level = np.diff(filled_cum, axis=1, prepend=0.0)
+        cost = (per_level * prices).sum(axis=1)
+        if venue == "kalshi":
+            fees = np.where(per_level > 0, kalshi_fee(per_level, prices, self.kalshi_fee_rate), 0.0)
+        else:
+            fees = polymarket_fee(per_level, prices, self.poly_fee_rate)
+        return cost, fees.sum(axis=1)
+
+    def _walk(self, yes_ladders: List[Ladder], yes_venue: str, no_ladders: List[Ladder], no_venue: str) -> Dict:
+        target = self.target_size
+        yes_prices, yes_cum = _pad(yes_ladders, target)
+        no_prices, no_cum = _pad(no_ladders, target)
+        n = len(yes_ladders)
+
+        # Segment boundaries are the union of both ladders' cumulative sizes
+        ends = np.sort(np.concatenate([yes_cum, no_cum], axis=1), axis=1)
+        starts = np.concatenate([np.zeros((n, 1)), ends[:, :-1]], axis=1)
+        lengths = ends - starts
+
+        yes_idx = _level_at(yes_cum, starts, target)
+        no_idx = _level_at(no_cum, starts, target)
+        in_book = (yes_idx < yes_cum.shape[1]) & (no_idx < no_cum.shape[1])
+        yes_idx = np.minimum(yes_idx, yes_cum.shape[1] - 1)
+        no_idx = np.minimum(no_idx, no_cum.shape[1] - 1)
+        yes_px = np.take_along_axis(yes_prices, yes_idx, axis=1)
+        no_px = np.take_along_axis(no_prices, no_idx, axis=1)
+
+        edge = (1 - yes_px - no_px
+                - self._fee_per_contract(yes_px, yes_venue) - self._fee_per_contract(no_px, no_venue))
+        # Asks ascend, so the edge only falls: the filled segments are a prefix
+        clears = in_book & (lengths > 0) & (edge > self.min_edge)
+        live = in_book & (lengths > 0)
+        taken = np.logical_and.accumulate(clears | ~live, axis=1) & live
+        fill = (lengths * taken).sum(axis=1)
+
+        yes_cost, yes_fees = self._leg_totals(yes_prices, yes_cum, fill, yes_venue)
+        no_cost, no_fees = self._leg_totals(no_prices, no_cum, fill, no_venue)
+        cost = yes_cost + no_cost
+        fees = yes_fees + no_fees
+        net_profit = fill - cost - fees
+
+        has_fill = fill > 0
+        last = np.where(has_fill, taken.shape[1] - 1 - np.argmax(taken[:, ::-1], axis=1), 0)
+        rows = np.arange(n)
+        depth = np.minimum(yes_cum[:, -1], no_cum[:, -1])
+
+        limit = np.full(n, LIMIT_EDGE)
+        limit[fill >= target] = LIMIT_TARGET
+        limit[(fill < target) & (fill >= depth)] = LIMIT_DEPTH
+
+        return {
+            "size": fill,
+            "cost": cost,
+            "fees": fees,
+            "net_profit": net_profit,
+            "net_edge": np.divide(net_profit, fill, out=np.zeros(n), where=has_fill),
+            "yes_level": np.where(has_fill, yes_idx[rows, last], -1),
+            "no_level": np.where(has_fill, no_idx[rows, last], -1),
+            "yes_limit_price": np.where(has_fill, yes_px[rows, last], np.nan),
+            "no_limit_price": np.where(has_fill, no_px[rows, last], np.nan),
+            "limit": limit,
+        }
+
+    def evaluate(self, kalshi_ladders: List[Tuple[Ladder, Ladder]],
+                 poly_ladders: List[Tuple[Ladder, Ladder]],
+                 depth_known: Optional[np.ndarray] = None) -> ArbitrageResult:
+        """
+        Best executable direction for every pair
+
+        Args:
+            kalshi_ladders: (yes_asks, no_asks) per pair on Kalshi
+            poly_ladders: (yes_asks, no_asks) per pair on Polymarket
+            depth_known: Per pair, whether both sides are real orderbooks (None = all are)
+
+        Returns:
+            ArbitrageResult with one entry per pair
+        """
+        yes_kalshi = self._walk([k[0] for k in kalshi_ladders], "kalshi", [p[1] for p in poly_ladders], "polymarket")
+        yes_poly = self._walk([p[0] for p in poly_ladders], "polymarket", [k[1] for k in kalshi_ladders], "kalshi")
+
+        better = yes_poly["net_profit"] > yes_kalshi["net_profit"]
+        fields = {key: np.where(better, yes_poly[key], yes_kalshi[key]) for key in yes_kalshi}
+        if depth_known is None:
+            depth_known = np.ones(len(kalshi_ladders), dtype=bool)
+        return ArbitrageResult(direction=np.where(better, YES_POLYMARKET, YES_KALSHI),
+                               depth_known=np.asarray(depth_known, dtype=bool), **fields)
+
+    def evaluate_matches(self, matches: List[Tuple[Dict, Dict, float]],
+                         kalshi_books: Optional[Dict[str, Dict]] = None,
+                         poly_books: Optional[Dict[str, Tuple[Dict, Optional[Dict]]]] = None) -> ArbitrageResult:
+        """
+        Evaluate matched pairs, walking orderbooks where fetched and top-of-book quotes otherwise
+
+        Pairs with a quote-only side have depth_known=False: their size is the
+        target size at the quoted price, not what the book can fill.
+
+        Args:
+            matches: (kalshi_market, poly_market, similarity) tuples
+            kalshi_books: Kalshi 'orderbook' objects or MarketBooks keyed by ticker
+            poly_books: (yes_book, no_book or None) keyed by condition_id, as /book responses or MarketBooks
+
+        Returns:
+            ArbitrageResult aligned with matches
+        """
+        kalshi_books = kalshi_books or {}
+        poly_books = poly_books or {}
+        kalshi_side, poly_side, depth_known = [], [], []
+        for k_market, p_market, _ in matches:
+            book = kalshi_books.get(k_market.get("ticker", ""))
+            kalshi_side.append(kalshi_ladders(book) if book is not None else quote_ladders(k_market, "kalshi"))
+            books = poly_books.get(p_market.get("condition_id", ""))
+            poly_side.append(polymarket_ladders(*books) if books is not None else quote_ladders(p_market, "polymarket"))
+            depth_known.append(book is not None and books is not None)
+        return self.evaluate(kalshi_side, poly_side, np.array(depth_known, dtype=bool))
+
+    def opportunities(self, result: ArbitrageResult) -> np.ndarray:
+        """Boolean mask of pairs with a fillable size and a positive net edge above min_edge"""
+        return (result.size > 0) & (result.net_edge > self.min_edge) & (result.net_profit > 0)
+
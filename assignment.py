@@ -0,0 +1,190 @@
+"""
+Assignment Module
+One-to-one matching over a sparse bipartite graph of scored Kalshi/Polymarket candidate edges
+"""
+from typing import List, Dict, Tuple, Hashable, Iterable
+
+import numpy as np
+
+# (score, kalshi node, poly node); nodes are any sortable, hashable ids
+Edge = Tuple[float, Hashable, Hashable]
+
+
+def _edge_order(edge: Edge):
+    # Highest score first; ids break ties so input order never matters
+    score, k_node, p_node = edge
+    return -score, k_node, p_node
+
+
+def greedy_assignment(edges: List[Edge]) -> List[Edge]:
+    """
+    Take edges best-first, skipping any whose endpoint is already matched
+
+    O(E log E). Every chosen edge is the best remaining edge for both of its
+    endpoints, so a mediocre pair can never take a market from a better one.
+
+    Args:
+        edges: (score, kalshi node, poly node) tuples
+
+    Returns:
+        Chosen edges, best first
+    """
+    used_kalshi = set()
+    used_poly = set()
+    chosen = []
+    for edge in sorted(edges, key=_edge_order):
+        _, k_node, p_node = edge
+        if k_node in used_kalshi or p_node in used_poly:
+            continue
+        used_kalshi.add(k_node)
+        used_poly.add(p_node)
+        chosen.append(edge)
+    return chosen
+
+
+def pair_components(pairs: Iterable[Tuple[Hashable, Hashable]]) -> List[List[Tuple[Hashable, Hashable]]]:
+    """
+    Split (kalshi node, poly node) pairs into connected components (union-find)
+
+    Args:
+        pairs: (kalshi node, poly node) tuples
+
+    Returns:
+        Pair lists, one per component
+    """
+    parent: Dict[Tuple[str, Hashable], Tuple[str, Hashable]] = {}
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    pairs = list(pairs)
+    for k_node, p_node in pairs:
+        a, b = ("k", k_node), ("p", p_node)
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    components: Dict[Tuple[str, Hashable], List[Tuple[Hashable, Hashable]]] = {}
+    for pair in pairs:
+        components.setdefault(find(("k", pair[0])), []).append(pair)
+    return list(components.values())
+
+
+def connected_components(edges: List[Edge]) -> List[List[Edge]]:
+    """
+    Split the edge list into connected components
+
+    Args:
+        edges: (score, kalshi node, poly node) tuples
+
+    Returns:
+        Edge lists, one per component
+    """
+    by_pair = {(k_node, p_node): (score, k_node, p_node) for score, k_node, p_node in edges}
+    return [[by_pair[pair] for pair in component] for component in pair_components(by_pair)]
+
+
+def hungarian(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost assignment of every row of a cost matrix to a distinct column
+
+    Shortest augmenting path with potentials, O(n^2 m) for n rows <= m columns;
+    the inner loop over columns is vectorized.
+
+    Args:
+        cost: (n, m) cost matrix
+
+    Returns:
+        (row, column) pairs, one per row if n <= m, one per column otherwise
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.shape[0] > cost.shape[1]:
+        return [(row, col) for col, row in hungarian(cost.T)]
+
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)  # p[j] = 1-based row assigned to column j
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+
+            used_columns = np.nonzero(used)[0]
+            u[p[used_columns]] += delta
+            v[used_columns] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    return [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def optimal_assignment(edges: List[Edge], max_component_size: int = 300) -> List[Edge]:
+    """
+    Maximize the total score per connected component
+
+    Components are solved exactly with the Hungarian method; components with
+    more than max_component_size markets on either side fall back to
+    greedy_assignment so one huge cluster cannot blow up the runtime.
+
+    Args:
+        edges: (score, kalshi node, poly node) tuples
+        max_component_size: Largest side solved exactly
+
+    Returns:
+        Chosen edges, best first
+    """
+    chosen = []
+    for component in connected_components(edges):
+        if len(component) == 1:
+            chosen.extend(component)
+            continue
+
+        k_nodes = sorted({k_node for _, k_node, _ in component})
+        p_nodes = sorted({p_node for _, _, p_node in component})
+        if max(len(k_nodes), len(p_nodes)) > max_component_size:
+            chosen.extend(greedy_assignment(component))
+            continue
+
+        k_pos = {node: i for i, node in enumerate(k_nodes)}
+        p_pos = {node: j for j, node in enumerate(p_nodes)}
+        scores = np.zeros((len(k_nodes), len(p_nodes)))
+        for score, k_node, p_node in component:
+            scores[k_pos[k_node], p_pos[p_node]] = score
+
+        for row, col in hungarian(-scores):
+            if scores[row, col] > 0:
+                chosen.append((float(scores[row, col]), k_nodes[row], p_nodes[col]))
+
+    chosen.sort(key=_edge_order)
+    return chosen
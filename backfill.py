@@ -0,0 +1,282 @@
+"""
+Backfill Module
+Walks the closed and settled history of both venues into partitioned Parquet, resumably and within a request budget
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Callable
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+from kalshi_api import KalshiAPI
+from poll_scheduler import TokenBucket
+from polymarket_api import PolymarketAPI
+
+CHECKPOINT_FILE = "_checkpoint.json"
+
+# Seconds before the first retry of a failed page; doubles on each attempt
+RETRY_BACKOFF = 2.0
+
+# Column types of the extracted markets. Fixed per venue so every page writes the
+# same schema (inferred per page, a missing field's int 0 beside another page's float
+# makes the dataset unreadable); fields not listed here are not written.
+KALSHI_SCHEMA = pa.schema([
+    ("ticker", pa.string()),
+    ("event_ticker", pa.string()),
+    ("series_ticker", pa.string()),
+    ("event_title", pa.string()),
+    ("mve_collection_ticker", pa.string()),
+    ("structure", pa.string()),
+    ("title", pa.string()),
+    ("subtitle", pa.string()),
+    ("category", pa.string()),
+    ("series_title", pa.string()),
+    ("tags", pa.list_(pa.string())),
+    ("settlement_sources", pa.list_(pa.string())),
+    ("status", pa.string()),
+    ("yes_price", pa.float64()),
+    ("no_price", pa.float64()),
+    ("yes_ask", pa.float64()),
+    ("no_ask", pa.float64()),
+    ("volume", pa.float64()),
+    ("open_interest", pa.float64()),
+    ("close_time", pa.string()),
+    ("close_ts", pa.float64()),
+    ("result", pa.string()),
+])
+POLYMARKET_SCHEMA = pa.schema([
+    ("condition_id", pa.string()),
+    ("slug", pa.string()),
+    ("event_slug", pa.string()),
+    ("event_title", pa.string()),
+    ("question", pa.string()),
+    ("description", pa.string()),
+    ("category", pa.string()),
+    ("yes_price", pa.float64()),
+    ("no_price", pa.float64()),
+    ("best_bid", pa.float64()),
+    ("best_ask", pa.float64()),
+    ("clob_token_ids", pa.list_(pa.string())),
+    ("volume", pa.float64()),
+    ("liquidity", pa.float64()),
+    ("end_date", pa.string()),
+    ("close_ts", pa.float64()),
+    ("active", pa.bool_()),
+    ("closed", pa.bool_()),
+    ("icon", pa.string()),
+])
+SCHEMAS = {"kalshi": KALSHI_SCHEMA, "polymarket": POLYMARKET_SCHEMA}
+
+
+class RateLimiter:
+    """Thread-safe blocking token bucket shared by every worker of a venue"""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self._bucket = TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until a request may be made"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._bucket.try_acquire(now):
+                    return
+                delay = self._bucket.next_available(now) - now
+            time.sleep(delay)
+
+
+class Checkpoint:
+    """Progress of every walk, saved atomically after each page is written"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def get(self, walk: str) -> Dict:
+        with self._lock:
+            return dict(self.state.get(walk, {}))
+
+    def update(self, walk: str, **progress):
+        with self._lock:
+            self.state.setdefault(walk, {}).update(progress)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def close_month(market: Dict) -> str:
+    """Partition value of a market: UTC month it closes in, 'unknown' without a close time"""
+    close_ts = market.get("close_ts")
+    if close_ts is None:
+        return "unknown"
+    return datetime.fromtimestamp(close_ts, tz=timezone.utc).strftime("%Y-%m")
+
+
+def write_partitioned(rows: List[Dict], out_dir: str, venue: str, part: str) -> int:
+    """
+    Write extracted markets as venue=<venue>/close_month=<YYYY-MM>/<part>.parquet
+
+    Part names are derived from the page, so a page re-fetched after an
+    interruption overwrites its own files instead of duplicating rows. Every
+    file of a venue has that venue's schema (SCHEMAS).
+
+    Returns:
+        Number of files written
+    """
+    by_month: Dict[str, List[Dict]] = {}
+    for row in rows:
+        by_month.setdefault(close_month(row), []).append(row)
+    for month, month_rows in by_month.items():
+        directory = os.path.join(out_dir, f"venue={venue}", f"close_month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{part}.parquet")
+        pq.write_table(pa.Table.from_pylist(month_rows, schema=SCHEMAS[venue]), path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return len(by_month)
+
+
+def _with_retries(fetch: Callable, limiter: RateLimiter, retries: int = 5):
+    """Call fetch() under the rate limit, backing off exponentially on request errors"""
+    for attempt in range(retries):
+        limiter.wait()
+        try:
+            return fetch()
+        except requests.RequestException as e:
+            if attempt == retries - 1:
+                raise
+            delay = RETRY_BACKOFF * 2 ** attempt
+            print(f"⚠ {e}; retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+
+def backfill_kalshi(api: KalshiAPI, status: str, out_dir: str, checkpoint: Checkpoint,
+                    limiter: RateLimiter, limit: int = 200) -> int:
+    """
+    Walk every Kalshi event with `status` page by page (cursor pagination is sequential)
+
+    Returns:
+        Markets written by this run
+    """
+    walk = f"kalshi:{status}"
+    progress = checkpoint.get(walk)
+    if progress.get("done"):
+        return 0
+    cursor, page, written = progress.get("cursor"), progress.get("pages", 0), 0
+    while True:
+        markets, next_cursor = _with_retries(lambda: api.get_markets_page(status, cursor, limit), limiter)
+        rows = [api.extract_market_info(market) for market in markets]
+        if rows:
+            write_partitioned(rows, out_dir, "kalshi", f"{status}-{page:06d}")
+        page += 1
+        written += len(rows)
+        checkpoint.update(walk, cursor=next_cursor, pages=page,
+                          markets=progress.get("markets", 0) + written, done=next_cursor is None)
+        if next_cursor is None:
+            return written
+        cursor = next_cursor
+
+
+def backfill_polymarket(api: PolymarketAPI, out_dir: str, checkpoint: Checkpoint, limiter: RateLimiter,
+                        workers: int = 4, limit: int = 500) -> int:
+    """
+    Walk every closed Polymarket market, fetching `workers` offset pages concurrently
+
+    The checkpoint only advances past a window once all of its pages are
+    written, so a resumed walk never leaves a hole.
+
+    Returns:
+        Markets written by this run
+    """
+    walk = "polymarket:closed"
+    progress = checkpoint.get(walk)
+    if progress.get("done"):
+        return 0
+    offset, written = progress.get("offset", 0), 0
+
+    def fetch_page(page_offset: int) -> List[Dict]:
+        return _with_retries(lambda: api.get_markets_page(page_offset, limit, closed=True), limiter)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            offsets = [offset + i * limit for i in range(workers)]
+            pages = list(pool.map(fetch_page, offsets))
+            done = False
+            for page_offset, markets in zip(offsets, pages):
+                rows = [api.extract_market_info(market) for market in markets]
+                if rows:
+                    write_partitioned(rows, out_dir, "polymarket", f"offset-{page_offset:09d}")
+                written += len(rows)
+                if len(markets) < limit:
+                    done = True
+                    break
+            offset += workers * limit
+            checkpoint.update(walk, offset=offset, markets=progress.get("markets", 0) + written, done=done)
+            if done:
+                return written
+
+
+def run_backfill(out_dir: str, kalshi_api: Optional[KalshiAPI] = None, poly_api: Optional[PolymarketAPI] = None,
+                 kalshi_statuses=("closed", "settled"), kalshi_rate: float = 5.0, poly_rate: float = 5.0,
+                 workers: int = 4) -> Dict[str, int]:
+    """
+    Backfill both venues concurrently into out_dir, resuming from its checkpoint
+
+    Kalshi statuses are walked in parallel (each walk is sequential); Polymarket
+    pages are fetched `workers` at a time. Each venue has one request budget
+    shared by all of its walks.
+
+    Args:
+        out_dir: Dataset root (read back with pyarrow.parquet.read_table(out_dir + '/venue=kalshi'))
+        kalshi_api: Kalshi client (default KalshiAPI())
+        poly_api: Polymarket client (default PolymarketAPI())
+        kalshi_statuses: Kalshi event statuses to walk
+        kalshi_rate: Kalshi requests per second
+        poly_rate: Polymarket requests per second
+        workers: Concurrent Polymarket page fetches
+
+    Returns:
+        Markets written by this run, per walk
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    kalshi_api = kalshi_api or KalshiAPI()
+    poly_api = poly_api or PolymarketAPI()
+    checkpoint = Checkpoint(os.path.join(out_dir, CHECKPOINT_FILE))
+    kalshi_limiter = RateLimiter(kalshi_rate, burst=len(kalshi_statuses))
+    poly_limiter = RateLimiter(poly_rate, burst=workers)
+
+    with ThreadPoolExecutor(max_workers=len(kalshi_statuses) + 1) as pool:
+        futures = {f"kalshi:{status}": pool.submit(backfill_kalshi, kalshi_api, status, out_dir,
+                                                   checkpoint, kalshi_limiter)
+                   for status in kalshi_statuses}
+        futures["polymarket:closed"] = pool.submit(backfill_polymarket, poly_api, out_dir, checkpoint,
+                                                   poly_limiter, workers)
+        return {walk: future.result() for walk, future in futures.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill closed and settled markets into partitioned Parquet")
+    parser.add_argument("out_dir", nargs="?", default="market_history", help="Dataset directory")
+    parser.add_argument("--kalshi-rate", type=float, default=5.0, help="Kalshi requests per second")
+    parser.add_argument("--poly-rate", type=float, default=5.0, help="Polymarket requests per second")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent Polymarket page fetches")
+    args = parser.parse_args()
+
+    start = time.time()
+    counts = run_backfill(args.out_dir, kalshi_rate=args.kalshi_rate, poly_rate=args.poly_rate, workers=args.workers)
+    for walk, count in counts.items():
+        print(f"✓ {walk}: {count} markets")
+    print(f"✓ Backfill finished in {time.time() - start:.1f}s → {args.out_dir}")
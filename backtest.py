@@ -0,0 +1,309 @@
+"""
+Backtest Module
+Replays recorded prices of matched pairs through a spread entry/exit rule, vectorized over pairs x time
+"""
+import glob
+import os
+from typing import List, Dict, Optional, NamedTuple
+
+import numpy as np
+
+from arbitrage import kalshi_fee, polymarket_fee
+from snapshots import load_snapshot
+from spread_store import SpreadStore, pair_key, TS, KALSHI_PRICE, POLY_PRICE
+
+
+class Panel(NamedTuple):
+    """Aligned YES prices of matched pairs on a common time grid"""
+    ts: np.ndarray              # (T,) sample times, ascending
+    kalshi: np.ndarray          # (T, P) Kalshi YES price (nan before the pair's first sample)
+    poly: np.ndarray            # (T, P) Polymarket YES price
+    pairs: List[str]            # (P,) pair_key(kalshi_id, poly_id)
+    kalshi_result: np.ndarray   # (P,) settled YES payout on Kalshi: 1, 0 or nan if unknown
+    poly_result: np.ndarray     # (P,) settled YES payout on Polymarket
+
+
+class BacktestResult(NamedTuple):
+    """Outcome of one rule over a panel; per-pair arrays have P entries"""
+    pairs: List[str]
+    pnl: np.ndarray             # (P,) dollars after fees
+    fees: np.ndarray            # (P,) dollars of fees paid
+    trades: np.ndarray          # (P,) packages bought or sold (entry, exit or flip legs)
+    settled: np.ndarray         # (P,) position held into a known settlement
+    open_at_end: np.ndarray     # (P,) position still open with no known result (marked to market)
+    equity: np.ndarray          # (T,) cumulative dollars across all pairs
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-nan value down each column (as-of join onto the grid)"""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def _results(markets: Dict[str, Dict], ids: List[str], platform: str) -> np.ndarray:
+    """Settled YES payouts of markets by id (nan when not settled)"""
+    out = np.full(len(ids), np.nan)
+    for i, market_id in enumerate(ids):
+        market = markets.get(market_id)
+        if market is None:
+            continue
+        if platform == "kalshi":
+            result = str(market.get("result", "")).lower()
+            if result in ("yes", "no"):
+                out[i] = 1.0 if result == "yes" else 0.0
+        elif market.get("closed") and market.get("yes_price") in (0.0, 1.0):
+            out[i] = market["yes_price"]
+    return out
+
+
+def panel_from_snapshots(snapshots: List[Dict], matcher=None, threshold: float = 0.5,
+                         results: Optional[Dict[str, Dict[str, Dict]]] = None) -> Panel:
+    """
+    Match the markets seen across snapshots once, then lay their prices on the snapshot grid
+
+    Args:
+        snapshots: load_snapshot() dicts, any order
+        matcher: MarketMatcher (default: a new one)
+        threshold: Similarity threshold for matching
+        results: Optional {'kalshi': {ticker: market}, 'polymarket': {condition_id: market}}
+                 of settled markets (see load_results); snapshot markets are used otherwise
+
+    Returns:
+        Panel with one row per snapshot
+    """
+    if matcher is None:
+        from market_matcher import MarketMatcher
+        matcher = MarketMatcher()
+    snapshots = sorted(snapshots, key=lambda s: s["fetched_at"])
+
+    # Latest version of every market seen, matched once
+    kalshi_latest = {m.get("ticker", ""): m for s in snapshots for m in s["kalshi"]}
+    poly_latest = {m.get("condition_id", ""): m for s in snapshots for m in s["polymarket"]}
+    matches = matcher.find_matches(list(kalshi_latest.values()), list(poly_latest.values()), threshold=threshold)
+    k_ids = [k.get("ticker", "") for k, _, _ in matches]
+    p_ids = [p.get("condition_id", "") for _, p, _ in matches]
+
+    k_col = {ticker: i for i, ticker in enumerate(k_ids)}
+    p_col = {condition_id: i for i, condition_id in enumerate(p_ids)}
+    kalshi = np.full((len(snapshots), len(matches)), np.nan)
+    poly = np.full((len(snapshots), len(matches)), np.nan)
+    for t, snapshot in enumerate(snapshots):
+        for market in snapshot["kalshi"]:
+            col = k_col.get(market.get("ticker", ""))
+            if col is not None:
+                kalshi[t, col] = market.get("yes_price", np.nan)
+        for market in snapshot["polymarket"]:
+            col = p_col.get(market.get("condition_id", ""))
+            if col is not None:
+                poly[t, col] = market.get("yes_price", np.nan)
+
+    results = results or {}
+    return Panel(
+        ts=np.array([s["fetched_at"] for s in snapshots], dtype=np.float64),
+        kalshi=kalshi, poly=poly, pairs=[pair_key(k, p) for k, p in zip(k_ids, p_ids)],
+        kalshi_result=_results({**kalshi_latest, **results.get("kalshi", {})}, k_ids, "kalshi"),
+        poly_result=_results({**poly_latest, **results.get("polymarket", {})}, p_ids, "polymarket"),
+    )
+
+
+def panel_from_spread_store(store: SpreadStore, step: float = 60.0,
+                            results: Optional[Dict[str, Dict[str, Dict]]] = None) -> Panel:
+    """
+    Resample every pair's spread history onto one grid of `step` seconds (as-of join)
+
+    Args:
+        store: SpreadStore with recorded pairs
+        step: Grid spacing in seconds
+        results: Optional settled markets, as in panel_from_snapshots
+    """
+    pairs = sorted(store.slots, key=store.slots.get)
+    histories = [store.history(key) for key in pairs]
+    stamps = [h[:, TS] for h in histories if len(h)]
+    if not stamps:
+        empty = np.zeros((0, len(pairs)))
+        return Panel(np.zeros(0), empty, empty.copy(), pairs, np.full(len(pairs), np.nan), np.full(len(pairs), np.nan))
+    start = min(s[0] for s in stamps)
+    end = max(s[-1] for s in stamps)
+    ts = start + step * np.arange(int((end - start) // step) + 1)
+
+    kalshi = np.full((len(ts), len(pairs)), np.nan)
+    poly = np.full((len(ts), len(pairs)), np.nan)
+    for col, history in enumerate(histories):
+        if not len(history):
+            continue
+        rows = np.searchsorted(history[:, TS], ts, side="right") - 1
+        seen = rows >= 0
+        kalshi[seen, col] = history[rows[seen], KALSHI_PRICE]
+        poly[seen, col] = history[rows[seen], POLY_PRICE]
+
+    results = results or {}
+    k_ids, p_ids = zip(*(key.split("|", 1) for key in pairs)) if pairs else ((), ())
+    return Panel(ts, kalshi, poly, pairs,
+                 _results(results.get("kalshi", {}), list(k_ids), "kalshi"),
+                 _results(results.get("polymarket", {}), list(p_ids), "polymarket"))
+
+
+def load_results(out_dir: str) -> Dict[str, Dict[str, Dict]]:
+    """
+    Settled markets from a backfill dataset (see backfill.py), keyed by id
+
+    Returns:
+        {'kalshi': {ticker: market}, 'polymarket': {condition_id: market}}
+    """
+    import pyarrow.parquet as pq
+
+    results = {"kalshi": {}, "polymarket": {}}
+    for venue, id_field, columns in (("kalshi", "ticker", ["ticker", "result"]),
+                                     ("polymarket", "condition_id", ["condition_id", "yes_price", "closed"])):
+        path = os.path.join(out_dir, f"venue={venue}")
+        if os.path.isdir(path):
+            for row in pq.read_table(path, columns=columns).to_pylist():
+                results[venue][row[id_field]] = row
+    return results
+
+
+class SpreadBacktest:
+    """
+    Hysteresis rule on the cross-venue YES spread s = kalshi - polymarket
+
+    A pair is entered when |s| >= entry_spread by buying the cheap YES and
+    the other venue's NO (one "package", worth 1 - sign(s) * s at any time),
+    and exited when |s| <= exit_spread by selling both legs back. Positions
+    still open at the end are paid out at settlement (which may differ
+    between venues) or marked to market when the result is unknown.
+
+    The position path is built without a per-tick loop: entry points carry
+    the direction, exit points carry 0, everything else is nan, and a
+    forward fill turns that into the held position. P&L is then
+    -position[t-1] * (s[t] - s[t-1]) summed, minus fees on every change.
+    Pairs are processed in column blocks so the working set stays bounded.
+    """
+
+    def __init__(self, entry_spread: float = 0.05, exit_spread: float = 0.01, size: float = 100.0,
+                 kalshi_fee_rate: float = 0.07, poly_fee_rate: float = 0.0, block_cells: int = 4_000_000):
+        """
+        Args:
+            entry_spread: |spread| that opens a position (the app's 5% rule by default)
+            exit_spread: |spread| at or below which the position is closed
+            size: Contracts per leg
+            kalshi_fee_rate: Kalshi fee coefficient (see arbitrage.kalshi_fee)
+            poly_fee_rate: Polymarket fee coefficient (see arbitrage.polymarket_fee)
+            block_cells: Time x pairs cells processed at once
+        """
+        self.entry_spread = entry_spread
+        self.exit_spread = exit_spread
+        self.size = size
+        self.kalshi_fee_rate = kalshi_fee_rate
+        self.poly_fee_rate = poly_fee_rate
+        self.block_cells = block_cells
+
+    def positions(self, spread: np.ndarray) -> np.ndarray:
+        """(T, P) held direction: +1 short the spread, -1 long it, 0 flat"""
+        signal = np.where(np.abs(spread) >= self.entry_spread, np.sign(spread),
+                          np.where(np.abs(spread) <= self.exit_spread, 0.0, np.nan))
+        signal[0] = np.nan_to_num(signal[0])
+        signal[np.isnan(spread)] = 0.0
+        return forward_fill(signal)
+
+    def _block(self, kalshi: np.ndarray, poly: np.ndarray, kalshi_result: np.ndarray, poly_result: np.ndarray):
+        kalshi = forward_fill(kalshi)
+        poly = forward_fill(poly)
+        spread = kalshi - poly
+        position = self.positions(spread)
+
+        # Mark-to-market: a package's value moves by -direction * d(spread)
+        held = position[:-1]
+        moves = np.nan_to_num(-held * np.diff(spread, axis=0))
+
+        # Fees on every change; closing and opening are one package each
+        previous = np.vstack([np.zeros((1, position.shape[1])), held])
+        packages = np.where(position != previous, np.abs(previous) + np.abs(position), 0.0)
+        k_price, p_price = np.nan_to_num(kalshi), np.nan_to_num(poly)
+        package_fee = (kalshi_fee(self.size, k_price, self.kalshi_fee_rate)
+                       + polymarket_fee(self.size, p_price, self.poly_fee_rate))
+        fees = packages * package_fee
+
+        # Open at the end: paid at settlement when both results are known
+        final = position[-1]
+        settle_spread = kalshi_result - poly_result
+        known = ~np.isnan(settle_spread)
+        settlement = np.where(known & (final != 0), -final * (np.nan_to_num(settle_spread) - np.nan_to_num(spread[-1])), 0.0)
+
+        step_pnl = self.size * np.vstack([np.zeros((1, moves.shape[1])), moves]) - fees
+        step_pnl[-1] += self.size * settlement
+        return (step_pnl.sum(axis=0), fees.sum(axis=0), packages.sum(axis=0),
+                known & (final != 0), ~known & (final != 0), step_pnl.sum(axis=1))
+
+    def run(self, panel: Panel) -> BacktestResult:
+        """
+        Simulate the rule on every pair of a panel
+
+        Args:
+            panel: Prices on a common grid (panel_from_snapshots / panel_from_spread_store)
+
+        Returns:
+            BacktestResult
+        """
+        T, P = panel.kalshi.shape
+        width = max(1, min(P, self.block_cells // max(T, 1)))
+        parts = []
+        equity = np.zeros(T)
+        for start in range(0, P, width):
+            cols = slice(start, start + width)
+            *per_pair, step_total = self._block(np.asarray(panel.kalshi[:, cols], dtype=np.float64),
+                                                np.asarray(panel.poly[:, cols], dtype=np.float64),
+                                                panel.kalshi_result[cols], panel.poly_result[cols])
+            parts.append(per_pair)
+            equity += step_total
+        if not parts:
+            empty = np.zeros(0)
+            return BacktestResult(panel.pairs, empty, empty, empty, empty.astype(bool), empty.astype(bool), equity)
+        pnl, fees, trades, settled, open_at_end = (np.concatenate(column) for column in zip(*parts))
+        return BacktestResult(panel.pairs, pnl, fees, trades, settled, open_at_end, np.cumsum(equity))
+
+
+def summarize(result: BacktestResult) -> Dict[str, float]:
+    """Headline numbers of a backtest"""
+    traded = result.trades > 0
+    drawdown = np.maximum.accumulate(np.concatenate([[0.0], result.equity])) - np.concatenate([[0.0], result.equity])
+    return {
+        "pairs": len(result.pairs),
+        "pairs_traded": int(traded.sum()),
+        "net_pnl": float(result.pnl.sum()),
+        "fees": float(result.fees.sum()),
+        "win_rate": float((result.pnl[traded] > 0).mean()) if traded.any() else 0.0,
+        "settled_positions": int(result.settled.sum()),
+        "open_positions": int(result.open_at_end.sum()),
+        "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Backtest the cross-venue spread rule on recorded history")
+    parser.add_argument("source", help="Snapshot directory/glob, or a spread store directory")
+    parser.add_argument("--results", help="Backfill dataset with settled markets (backfill.py)")
+    parser.add_argument("--entry", type=float, default=0.05, help="Entry |spread|")
+    parser.add_argument("--exit", type=float, default=0.01, help="Exit |spread|")
+    parser.add_argument("--size", type=float, default=100.0, help="Contracts per leg")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Matching threshold for snapshots")
+    args = parser.parse_args()
+
+    results = load_results(args.results) if args.results else None
+    start = time.time()
+    if os.path.exists(os.path.join(args.source, "pairs.json")):
+        panel = panel_from_spread_store(SpreadStore(args.source), results=results)
+    else:
+        pattern = os.path.join(args.source, "*.json*") if os.path.isdir(args.source) else args.source
+        panel = panel_from_snapshots([load_snapshot(path) for path in sorted(glob.glob(pattern))],
+                                     threshold=args.threshold, results=results)
+    print(f"✓ Panel: {len(panel.ts)} samples x {len(panel.pairs)} pairs ({time.time() - start:.1f}s)")
+
+    start = time.time()
+    result = SpreadBacktest(args.entry, args.exit, args.size).run(panel)
+    for name, value in summarize(result).items():
+        print(f"  {name}: {value:,.2f}" if isinstance(value, float) else f"  {name}: {value}")
+    print(f"✓ Backtest finished in {time.time() - start:.1f}s")
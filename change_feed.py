@@ -0,0 +1,193 @@
+"""
+Change Feed Module
+Typed change events between consecutive refreshes, as an iterator and an append-only JSON-lines log
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Tuple, Optional, NamedTuple, Iterator
+
+from spread_store import pair_key
+
+# Event types
+MARKET_ADDED = "market_added"
+MARKET_REMOVED = "market_removed"
+PRICE_MOVED = "price_moved"
+PAIR_MATCHED = "pair_matched"
+PAIR_UNMATCHED = "pair_unmatched"
+SPREAD_CROSSED = "spread_crossed"
+
+
+class ChangeEvent(NamedTuple):
+    """One change between two refreshes"""
+    seq: int        # position in the feed, strictly increasing
+    ts: float       # time of the refresh that produced it
+    type: str       # one of the event type constants
+    key: str        # 'kalshi:<ticker>', 'polymarket:<condition_id>' or pair_key(...)
+    data: Dict      # type-specific fields
+
+
+def market_key(platform: str, market: Dict) -> str:
+    """Stable id of an extracted market in the feed"""
+    if platform == "kalshi":
+        return f"kalshi:{market.get('ticker', '')}"
+    return f"polymarket:{market.get('condition_id', '')}"
+
+
+class ChangeFeed:
+    """
+    Diffs consecutive refreshes by market and pair id
+
+    Prices use a dead band: a market emits price_moved once its price is more
+    than price_epsilon away from the last price it reported, so slow drifts
+    are reported too. spread_crossed fires when a pair's |spread| moves across
+    spread_threshold in either direction. The first refresh reports every
+    market and pair as added/matched. A market missing from a refresh is
+    reported as market_removed, not closed: fetches are limited, so it may
+    just have dropped off the page. Once the log passes max_log_bytes it
+    is rotated to '<log_path>.1' (replacing the previous one), so at most
+    two files' worth of events are kept on disk.
+    """
+
+    def __init__(self, price_epsilon: float = 0.01, spread_threshold: float = 0.05,
+                 log_path: Optional[str] = None, keep: int = 10000, max_log_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            price_epsilon: Smallest YES price change (dollars) reported
+            spread_threshold: |Kalshi - Polymarket| YES spread whose crossings are reported
+            log_path: Optional JSON-lines file every event is appended to
+            keep: Events kept in memory for iter_events
+            max_log_bytes: Log size at which it is rotated
+        """
+        self.price_epsilon = price_epsilon
+        self.spread_threshold = spread_threshold
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=keep)
+
+        # Last reported state
+        self._prices: Dict[str, float] = {}
+        self._spreads: Dict[str, float] = {}
+        self.seq = _last_seq(log_path) if log_path else 0
+
+    def _event(self, events: List[ChangeEvent], ts: float, kind: str, key: str, **data):
+        self.seq += 1
+        events.append(ChangeEvent(self.seq, ts, kind, key, data))
+
+    def update(self, kalshi_markets: List[Dict], poly_markets: List[Dict],
+               matches: List[Tuple[Dict, Dict, float]], ts: Optional[float] = None) -> List[ChangeEvent]:
+        """
+        Diff one refresh against the previous one
+
+        Args:
+            kalshi_markets: Current Kalshi markets
+            poly_markets: Current Polymarket markets
+            matches: Current (kalshi_market, poly_market, similarity) matches
+            ts: Time of the refresh (defaults to now)
+
+        Returns:
+            Events of this refresh, in seq order (also appended to the log)
+        """
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            events: List[ChangeEvent] = []
+
+            prices = {market_key("kalshi", m): (m.get("yes_price", 0), m.get("title", "")) for m in kalshi_markets}
+            prices.update(
+                {market_key("polymarket", m): (m.get("yes_price", 0), m.get("question", "")) for m in poly_markets}
+            )
+            for key, (price, title) in prices.items():
+                previous = self._prices.get(key)
+                if previous is None:
+                    self._event(events, ts, MARKET_ADDED, key, price=price, title=title)
+                    self._prices[key] = price
+                elif abs(price - previous) > self.price_epsilon:
+                    self._event(events, ts, PRICE_MOVED, key, price=price, previous=previous)
+                    self._prices[key] = price
+            for key in [key for key in self._prices if key not in prices]:
+                self._event(events, ts, MARKET_REMOVED, key, price=self._prices.pop(key))
+
+            spreads = {}
+            for k_market, p_market, similarity in matches:
+                key = pair_key(k_market.get("ticker", ""), p_market.get("condition_id", ""))
+                spread = k_market.get("yes_price", 0) - p_market.get("yes_price", 0)
+                spreads[key] = spread
+                previous = self._spreads.get(key)
+                if previous is None:
+                    self._event(events, ts, PAIR_MATCHED, key, similarity=similarity, spread=spread)
+                    previous = 0.0
+                above = abs(spread) >= self.spread_threshold
+                if above != (abs(previous) >= self.spread_threshold):
+                    self._event(events, ts, SPREAD_CROSSED, key, spread=spread, previous=previous,
+                                direction="above" if above else "below")
+            for key in [key for key in self._spreads if key not in spreads]:
+                self._event(events, ts, PAIR_UNMATCHED, key, spread=self._spreads[key])
+            self._spreads = spreads
+
+            self._recent.extend(events)
+            if self.log_path and events:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    for event in events:
+                        f.write(json.dumps(event._asdict()) + "\n")
+                    rotate = f.tell() > self.max_log_bytes
+                if rotate:
+                    os.replace(self.log_path, self.log_path + ".1")
+            return events
+
+    def iter_events(self, since: int = 0, types: Optional[set] = None) -> Iterator[ChangeEvent]:
+        """
+        Events after seq `since` still held in memory
+
+        Consumers remember the last seq they handled and pass it back, so each
+        acts on deltas only. Older events are in the log (read_log).
+
+        Args:
+            since: Last seq already handled
+            types: Only these event types (None = all)
+        """
+        with self._lock:
+            recent = list(self._recent)
+        for event in recent:
+            if event.seq > since and (types is None or event.type in types):
+                yield event
+
+
+def _last_seq(path: str) -> int:
+    """seq of the last event in a log (or its rotated predecessor), reading only its tail (0 if none)"""
+    for candidate in (path, path + ".1"):
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 65536))
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        if lines:
+            return json.loads(lines[-1])["seq"]
+    return 0
+
+
+def read_log(path: str, since: int = 0) -> Iterator[ChangeEvent]:
+    """
+    Replay events from a change log, starting with its rotated predecessor if any
+
+    Args:
+        path: JSON-lines file written by ChangeFeed
+        since: Skip events with seq <= since
+
+    Yields:
+        ChangeEvent in log order
+    """
+    for candidate in (path + ".1", path):
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = ChangeEvent(**json.loads(line))
+                if event.seq > since:
+                    yield event
@@ -0,0 +1,34 @@
+"""
+Checks Module
+Pass/fail bookkeeping shared by the script-style tests (run as `python test_<module>.py`)
+"""
+import sys
+
+passed = 0
+failed = 0
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    """
+    Record and print one named check
+
+    Args:
+        name: What is being checked
+        ok: Whether it held
+        detail: Extra context printed after the name (observed values)
+    """
+    global passed, failed
+    if ok:
+        passed += 1
+    else:
+        failed += 1
+    print(f"\n{'✅ PASS' if ok else '❌ FAIL'} {name} {detail}")
+
+
+def exit_with_results():
+    """Print the totals and exit with status 1 if any check failed, so CI sees the failure"""
+    print("\n" + "=" * 80)
+    print(f"RESULTS: {passed} passed, {failed} failed out of {passed + failed} tests")
+    print("=" * 80)
+    if failed:
+        sys.exit(1)
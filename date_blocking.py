@@ -0,0 +1,220 @@
+"""
+Date Blocking Module
+Windows markets by resolution date so only markets closing around the same time are compared
+"""
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Set as AbstractSet
+from datetime import datetime, timezone
+from typing import List, Dict, Tuple, Optional, Iterator
+
+
+def parse_close_time(value) -> Optional[float]:
+    """
+    Unix timestamp of a close/end date as the APIs return it
+
+    Args:
+        value: ISO-8601 string ('2025-12-31T15:00:00Z', '2025-12-31'), a number, or empty
+
+    Returns:
+        Seconds since the epoch (UTC), or None if missing or unparseable
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def close_timestamp(market: Dict) -> Optional[float]:
+    """
+    Resolution timestamp of an extracted market
+
+    Uses 'close_ts' set at extraction, falling back to parsing 'close_time'
+    (Kalshi) or 'end_date' (Polymarket) for markets recorded before it existed.
+    """
+    if "close_ts" in market:
+        return market["close_ts"]
+    return parse_close_time(market.get("close_time") or market.get("end_date"))
+
+
+class CloseDateWindows(AbstractSet):
+    """
+    Pairs kept by CloseDateBlocker, stored as one index range per Kalshi market
+
+    Dated Polymarket markets are sorted by close timestamp once; each dated
+    Kalshi market keeps the [lo, hi) slice of that order within tolerance of
+    its own close. Undated markets on either side pair with everything.
+    Membership is O(1) and nothing is materialized until iterated, so memory
+    stays O(N + M) however wide the tolerance is.
+    """
+
+    def __init__(self, order: List[int], ranges: List[Optional[Tuple[int, int]]], undated_poly: List[int],
+                 n_poly: int):
+        """
+        Args:
+            order: Dated Polymarket indices sorted by close timestamp
+            ranges: Per Kalshi market, (lo, hi) into order, or None if undated
+            undated_poly: Polymarket indices without a close timestamp
+            n_poly: Number of Polymarket markets
+        """
+        self.order = order
+        self.ranges = ranges
+        self.undated_poly = undated_poly
+        self.n_poly = n_poly
+        self._rank = {p_idx: rank for rank, p_idx in enumerate(order)}
+        self._undated = set(undated_poly)
+        self._len = sum(n_poly if r is None else r[1] - r[0] + len(undated_poly) for r in ranges)
+
+    @classmethod
+    def _from_iterable(cls, pairs):
+        # Set operators (&, |, -) return plain sets
+        return set(pairs)
+
+    def __contains__(self, pair) -> bool:
+        k_idx, p_idx = pair
+        if not 0 <= k_idx < len(self.ranges) or not 0 <= p_idx < self.n_poly:
+            return False
+        window = self.ranges[k_idx]
+        if window is None or p_idx in self._undated:
+            return True
+        return window[0] <= self._rank[p_idx] < window[1]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for k_idx, window in enumerate(self.ranges):
+            if window is None:
+                yield from ((k_idx, p_idx) for p_idx in range(self.n_poly))
+                continue
+            yield from ((k_idx, p_idx) for p_idx in self.order[window[0]:window[1]])
+            yield from ((k_idx, p_idx) for p_idx in self.undated_poly)
+
+    def __len__(self) -> int:
+        return self._len
+
+
+class CloseDateBlocker:
+    """
+    Blocking filter on resolution date
+
+    Polymarket markets are sorted by close timestamp; a Kalshi market is only
+    compared with the window of that order that closes within tolerance_days
+    of its own (both edges inclusive). Markets without a date are compared
+    with everything, so missing data never hides a match.
+    """
+
+    # A pair's candidacy depends on its two markets only (see MatcherSession)
+    pairwise_local = True
+
+    def __init__(self, tolerance_days: float = 45.0):
+        """
+        Args:
+            tolerance_days: Largest allowed gap between the two close dates
+        """
+        self.tolerance = tolerance_days * 86400
+        self.last_stats: Dict = {}
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> CloseDateWindows:
+        """
+        Pairs whose close dates are within tolerance (or unknown on either side)
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs, as sorted-window index ranges
+        """
+        start = time.time()
+        kalshi_ts = [close_timestamp(m) for m in kalshi_markets]
+        poly_ts = [close_timestamp(m) for m in poly_markets]
+
+        order = sorted((p_idx for p_idx, ts in enumerate(poly_ts) if ts is not None), key=lambda p_idx: poly_ts[p_idx])
+        undated_poly = [p_idx for p_idx, ts in enumerate(poly_ts) if ts is None]
+        sorted_ts = [poly_ts[p_idx] for p_idx in order]
+
+        ranges = [
+            None if ts is None else (bisect_left(sorted_ts, ts - self.tolerance),
+                                     bisect_right(sorted_ts, ts + self.tolerance))
+            for ts in kalshi_ts
+        ]
+        pairs = CloseDateWindows(order, ranges, undated_poly, len(poly_markets))
+
+        total = len(kalshi_markets) * len(poly_markets)
+        self.last_stats = {
+            "kalshi_undated": sum(ts is None for ts in kalshi_ts),
+            "poly_undated": len(undated_poly),
+            "candidates": len(pairs),
+            "pruned": total - len(pairs),
+            "total_pairs": total,
+            "seconds": time.time() - start,
+        }
+        return pairs
+
+
+def prune_report(
+    kalshi_markets: List[Dict],
+    poly_markets: List[Dict],
+    tolerances_days=(7, 30, 45, 90, 365),
+    threshold: float = 0.5,
+    matcher=None
+) -> List[Dict]:
+    """
+    Pairs pruned by date blocking at several tolerances, and matches lost
+
+    Args:
+        kalshi_markets: Recorded Kalshi markets
+        poly_markets: Recorded Polymarket markets
+        tolerances_days: Tolerances to try
+        threshold: Score at which an exhaustive pair counts as a match
+        matcher: MarketMatcher used for exhaustive scoring (None = skip recall)
+
+    Returns:
+        One dict per tolerance with pruned pairs and recall
+    """
+    true_pairs = None
+    if matcher is not None:
+        true_pairs = {
+            (k_idx, p_idx)
+            for k_idx, k_market in enumerate(kalshi_markets)
+            for p_idx, p_market in enumerate(poly_markets)
+            if matcher.compute_similarity(k_market, p_market) >= threshold
+        }
+
+    print(f"{'days':>6} {'kept':>10} {'pruned':>10} {'pruned %':>9} {'recall':>7} {'seconds':>8}")
+    results = []
+    for days in tolerances_days:
+        blocker = CloseDateBlocker(tolerance_days=days)
+        kept = blocker.candidate_pairs(kalshi_markets, poly_markets)
+        stats = dict(blocker.last_stats, tolerance_days=days)
+        if true_pairs is None:
+            stats["recall"] = None
+        else:
+            stats["recall"] = len(true_pairs & kept) / len(true_pairs) if true_pairs else 1.0
+        results.append(stats)
+        ratio = stats["pruned"] / stats["total_pairs"] if stats["total_pairs"] else 0.0
+        recall = f"{stats['recall']:.1%}" if stats["recall"] is not None else "-"
+        print(f"{days:>6} {stats['candidates']:>10} {stats['pruned']:>10} {ratio:>9.1%} {recall:>7} "
+              f"{stats['seconds']:>8.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from market_matcher import MarketMatcher
+    from snapshots import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Pairs pruned by close-date blocking on a recorded snapshot")
+    parser.add_argument("snapshot", help="Snapshot file written by snapshots.py")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--no-recall", action="store_true", help="Skip exhaustive scoring")
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.snapshot)
+    prune_report(snapshot["kalshi"], snapshot["polymarket"], threshold=args.threshold,
+                 matcher=None if args.no_recall else MarketMatcher())
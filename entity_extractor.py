@@ -0,0 +1,114 @@
+"""
+Entity Extraction Module
+Runs spaCy NER over all market titles once per refresh and stores the entities on each market
+"""
+import time
+from typing import List, Dict
+
+try:
+    import spacy
+except ImportError:  # spaCy is optional; the matcher falls back to capitalization heuristics
+    spacy = None
+
+from semantic_index import title_hash
+
+
+class EntityExtractor:
+    """Batch, multi-process spaCy NER with a per-title cache"""
+
+    LABELS = ("PERSON", "ORG", "GPE", "DATE", "MONEY")
+
+    def __init__(
+        self,
+        model: str = "en_core_web_sm",
+        n_process: int = 1,
+        batch_size: int = 256,
+        nlp=None
+    ):
+        """
+        Args:
+            model: spaCy pipeline with an 'ner' component
+            n_process: Worker processes for nlp.pipe (-1 = all CPUs)
+            batch_size: Titles per nlp.pipe batch
+            nlp: Already-loaded spaCy Language (skips loading `model`)
+        """
+        self.model = model
+        self.n_process = n_process
+        self.batch_size = batch_size
+        self._nlp = nlp
+
+        # title hash -> {label: [entity text, ...]}
+        self._cache: Dict[str, Dict[str, List[str]]] = {}
+        self.last_stats: Dict = {}
+
+    @property
+    def nlp(self):
+        """Lazily load the spaCy pipeline with everything but NER disabled"""
+        if self._nlp is None:
+            if spacy is None:
+                raise ImportError("Entity extraction requires spaCy: pip install spacy")
+            self._nlp = spacy.load(self.model)
+            self._nlp.select_pipes(disable=[
+                name for name in self._nlp.pipe_names if name not in ("tok2vec", "ner", "entity_ruler")
+            ])
+        return self._nlp
+
+    def config_key(self) -> str:
+        """Settings that change scores (folded into MarketMatcher.rules_version)"""
+        return f"ner:{self.model}"
+
+    def extract(self, titles: List[str]) -> List[Dict[str, List[str]]]:
+        """
+        Named entities for each title, running NER only on titles not seen before
+
+        Args:
+            titles: Market titles
+
+        Returns:
+            One {label: [entity text, ...]} dict per title (labels in LABELS only)
+        """
+        hashes = [title_hash(t) for t in titles]
+
+        missing = {}
+        for title, h in zip(titles, hashes):
+            if h not in self._cache and h not in missing:
+                missing[h] = title
+
+        start = time.time()
+        if missing:
+            docs = self.nlp.pipe(list(missing.values()), batch_size=self.batch_size, n_process=self.n_process)
+            for h, doc in zip(missing.keys(), docs):
+                entities: Dict[str, List[str]] = {}
+                for ent in doc.ents:
+                    if ent.label_ in self.LABELS:
+                        entities.setdefault(ent.label_, []).append(ent.text)
+                self._cache[h] = entities
+        elapsed = time.time() - start
+
+        self.last_stats = {
+            "titles": len(titles),
+            "titles_processed": len(missing),
+            "seconds": elapsed,
+            "titles_per_second": len(missing) / elapsed if elapsed > 0 else 0.0,
+        }
+        if missing:
+            print(f"✓ NER: {len(missing)} new titles in {elapsed:.2f}s "
+                  f"({self.last_stats['titles_per_second']:.0f} titles/s, {len(titles) - len(missing)} cached)")
+
+        return [self._cache[h] for h in hashes]
+
+    def annotate(self, markets: List[Dict], title_field: str = "title"):
+        """
+        Store entities on each market under 'entities'
+
+        Args:
+            markets: Market dictionaries (modified in place)
+            title_field: Field holding the title ('title' for Kalshi, 'question' for Polymarket)
+        """
+        titles = [m.get(title_field, "") for m in markets]
+        for market, entities in zip(markets, self.extract(titles)):
+            market["entities"] = entities
+
+    def clear_cache(self):
+        """Drop cached entities (e.g. after switching model)"""
+        self._cache = {}
@@ -0,0 +1,238 @@
+"""
+Event Matcher Module
+Matches Kalshi events to Polymarket events first, then proposes market pairs only within matched events
+"""
+import heapq
+import math
+import time
+from typing import List, Dict, Tuple, Set, Optional
+
+from market_matcher import MarketMatcher
+
+
+class EventMatcher:
+    """
+    Two-level candidate generation: event pairs, then the markets inside them
+
+    Kalshi markets are grouped by event_ticker (falling back to series_ticker),
+    Polymarket markets by event_slug. Each event is described by the union of
+    its title words (event title plus every member title) and the OR of its
+    members' topic masks. Events sharing a topic are scored by IDF-weighted
+    word overlap, and every market of a matched event pair becomes a candidate
+    against every market of the other event, so a 40-strike ladder costs one
+    event comparison instead of 40 market comparisons per Polymarket market.
+    """
+
+    def __init__(
+        self,
+        matcher: Optional[MarketMatcher] = None,
+        top_k_events: int = 3,
+        min_event_similarity: float = 0.2
+    ):
+        """
+        Args:
+            matcher: MarketMatcher whose word filter and topic masks describe events
+            top_k_events: Events kept per event on the other venue (each direction)
+            min_event_similarity: Event pairs below this overlap are dropped
+        """
+        self.matcher = matcher or MarketMatcher()
+        self.top_k_events = top_k_events
+        self.min_event_similarity = min_event_similarity
+        self.last_stats: Dict = {}
+
+    @staticmethod
+    def kalshi_event_key(market: Dict) -> str:
+        """Event a Kalshi market belongs to (event_ticker, then series_ticker, then the market itself)"""
+        return market.get("event_ticker") or market.get("series_ticker") or MarketMatcher.kalshi_id(market)
+
+    @staticmethod
+    def poly_event_key(market: Dict) -> str:
+        """Event a Polymarket market belongs to (event_slug, then the market itself)"""
+        return market.get("event_slug") or MarketMatcher.poly_id(market)
+
+    def group_events(self, markets: List[Dict], venue: str) -> Dict[str, Dict]:
+        """
+        Group markets into events with aggregated features
+
+        Args:
+            markets: Markets from one venue
+            venue: 'kalshi' or 'polymarket'
+
+        Returns:
+            event key -> {'members': [market indices], 'words': set, 'topic_mask': int}
+        """
+        key_fn = self.kalshi_event_key if venue == "kalshi" else self.poly_event_key
+        title_field = "title" if venue == "kalshi" else "question"
+
+        events: Dict[str, Dict] = {}
+        for idx, market in enumerate(markets):
+            event = events.get(key_fn(market))
+            if event is None:
+                event = {"members": [], "words": set(), "topic_mask": 0}
+                events[key_fn(market)] = event
+                event_title = market.get("event_title", "")
+                if event_title:
+                    event["words"] |= self.matcher.title_features(event_title).words
+            event["members"].append(idx)
+
+            title = market.get(title_field, market.get("title", ""))
+            if title:
+                features = self.matcher.title_features(title)
+                event["words"] |= features.words
+                event["topic_mask"] |= features.topic_mask
+        return events
+
+    def match_events(
+        self,
+        kalshi_events: Dict[str, Dict],
+        poly_events: Dict[str, Dict]
+    ) -> Set[Tuple[str, str]]:
+        """
+        Event pairs worth expanding into market pairs
+
+        Args:
+            kalshi_events: Output of group_events for Kalshi
+            poly_events: Output of group_events for Polymarket
+
+        Returns:
+            Set of (kalshi event key, poly event key)
+        """
+        document_frequency: Dict[str, int] = {}
+        for event in list(kalshi_events.values()) + list(poly_events.values()):
+            for word in event["words"]:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        n_events = len(kalshi_events) + len(poly_events)
+        idf = {word: math.log(1 + n_events / df) for word, df in document_frequency.items()}
+
+        def weight(words):
+            return math.sqrt(sum(idf[w] for w in words)) or 1.0
+
+        postings: Dict[str, List[str]] = {}
+        for p_key, event in poly_events.items():
+            for word in event["words"]:
+                postings.setdefault(word, []).append(p_key)
+        poly_weights = {p_key: weight(event["words"]) for p_key, event in poly_events.items()}
+
+        # Cosine of IDF-weighted word sets for every event pair sharing a word
+        scored: List[Tuple[float, str, str]] = []
+        for k_key, event in kalshi_events.items():
+            shared: Dict[str, float] = {}
+            for word in event["words"]:
+                for p_key in postings.get(word, ()):
+                    shared[p_key] = shared.get(p_key, 0.0) + idf[word]
+            k_weight = weight(event["words"])
+            for p_key, overlap in shared.items():
+                # Events spanning several topics only need one in common
+                k_mask, p_mask = event["topic_mask"], poly_events[p_key]["topic_mask"]
+                if k_mask and p_mask and not (k_mask & p_mask):
+                    continue
+                similarity = overlap / (k_weight * poly_weights[p_key])
+                if similarity >= self.min_event_similarity:
+                    scored.append((similarity, k_key, p_key))
+
+        # Top-k in both directions so one side's broad event cannot crowd out the other
+        by_kalshi: Dict[str, List[Tuple[float, str, str]]] = {}
+        by_poly: Dict[str, List[Tuple[float, str, str]]] = {}
+        for entry in scored:
+            by_kalshi.setdefault(entry[1], []).append(entry)
+            by_poly.setdefault(entry[2], []).append(entry)
+
+        pairs = set()
+        for groups in (by_kalshi, by_poly):
+            for entries in groups.values():
+                for _, k_key, p_key in heapq.nlargest(self.top_k_events, entries):
+                    pairs.add((k_key, p_key))
+        return pairs
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Set[Tuple[int, int]]:
+        """
+        Market pairs inside matched event pairs
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs
+        """
+        start = time.time()
+        kalshi_events = self.group_events(kalshi_markets, "kalshi")
+        poly_events = self.group_events(poly_markets, "polymarket")
+        event_pairs = self.match_events(kalshi_events, poly_events)
+
+        candidates = set()
+        for k_key, p_key in event_pairs:
+            for k_idx in kalshi_events[k_key]["members"]:
+                for p_idx in poly_events[p_key]["members"]:
+                    candidates.add((k_idx, p_idx))
+
+        self.last_stats = {
+            "kalshi_events": len(kalshi_events),
+            "poly_events": len(poly_events),
+            "event_pairs": len(event_pairs),
+            "event_comparisons": len(kalshi_events) * len(poly_events),
+            "candidates": len(candidates),
+            "total_pairs": len(kalshi_markets) * len(poly_markets),
+            "seconds": time.time() - start,
+        }
+        return candidates
+
+
+def event_report(
+    kalshi_markets: List[Dict],
+    poly_markets: List[Dict],
+    threshold: float = 0.5,
+    matcher: Optional[MarketMatcher] = None,
+    top_k_events: int = 3
+) -> Dict:
+    """
+    Compare event-level candidates against exhaustive compute_similarity scoring
+
+    Args:
+        kalshi_markets: Recorded Kalshi markets
+        poly_markets: Recorded Polymarket markets
+        threshold: Score at which an exhaustive pair counts as a true match
+        matcher: MarketMatcher used for scoring
+        top_k_events: Events kept per event on the other venue
+
+    Returns:
+        EventMatcher.last_stats plus recall and exhaustive timing
+    """
+    matcher = matcher or MarketMatcher()
+
+    start = time.time()
+    true_pairs = set()
+    for k_idx, k_market in enumerate(kalshi_markets):
+        for p_idx, p_market in enumerate(poly_markets):
+            if matcher.compute_similarity(k_market, p_market) >= threshold:
+                true_pairs.add((k_idx, p_idx))
+    exhaustive_seconds = time.time() - start
+
+    event_matcher = EventMatcher(matcher, top_k_events=top_k_events)
+    candidates = event_matcher.candidate_pairs(kalshi_markets, poly_markets)
+    stats = dict(event_matcher.last_stats)
+    stats["recall"] = len(true_pairs & candidates) / len(true_pairs) if true_pairs else 1.0
+    stats["exhaustive_seconds"] = exhaustive_seconds
+
+    print(f"Exhaustive: {stats['total_pairs']} pairs in {exhaustive_seconds:.2f}s, "
+          f"{len(true_pairs)} pairs >= {threshold}")
+    print(f"Events: {stats['kalshi_events']} Kalshi x {stats['poly_events']} Polymarket "
+          f"-> {stats['event_pairs']} event pairs in {stats['seconds']:.2f}s")
+    print(f"Candidates: {stats['candidates']} market pairs "
+          f"({stats['candidates'] / max(stats['total_pairs'], 1):.2%} of all), recall {stats['recall']:.1%}")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    from snapshots import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Event-level candidate recall vs exhaustive scoring on a snapshot")
+    parser.add_argument("snapshot", help="Snapshot file written by snapshots.py")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--top-k-events", type=int, default=3)
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.snapshot)
+    event_report(snapshot["kalshi"], snapshot["polymarket"],
+                 threshold=args.threshold, top_k_events=args.top_k_events)
@@ -3,15 +3,25 @@ Kalshi API Integration Module
 Handles fetching market data from Kalshi's public API
 """
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import time
 
+from date_blocking import parse_close_time
+from market_structure import classify_kalshi
+
 
 class KalshiAPI:
     """Client for interacting with Kalshi's public API"""
 
-    def __init__(self, base_url: str = "https://api.elections.kalshi.com/trade-api/v2"):
+    def __init__(self, base_url: str = "https://api.elections.kalshi.com/trade-api/v2", reference=None):
+        """
+        Args:
+            base_url: Trade API root
+            reference: Optional ReferenceCache; events fetched are recorded in it and
+                       its series/event metadata is joined onto extracted markets
+        """
         self.base_url = base_url
+        self.reference = reference
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/json',
@@ -45,17 +55,7 @@ class KalshiAPI:
             response.raise_for_status()
             data = response.json()
             events = data.get("events", [])
-
-            # Extract markets from events and add series_ticker for URLs
-            all_markets = []
-            for event in events:
-                series_ticker = event.get('series_ticker')
-                markets = event.get('markets', [])
-
-                # Add series_ticker to each market for URL generation
-                for market in markets:
-                    market['series_ticker'] = series_ticker
-                    all_markets.append(market)
+            all_markets = self._event_markets(events)
 
             print(f"✓ Fetched {len(all_markets)} markets from {len(events)} events")
             return all_markets
@@ -70,6 +70,68 @@ class KalshiAPI:
             print(f"⚠ Unexpected error fetching Kalshi markets: {e}")
             return []
 
+    def _event_markets(self, events: List[Dict]) -> List[Dict]:
+        """Flatten nested event markets (recording the events in the reference cache)"""
+        if self.reference is not None:
+            self.reference.record_events(events)
+
+        all_markets = []
+        for event in events:
+            series_ticker = event.get('series_ticker')
+            markets = event.get('markets', [])
+
+            # Add series_ticker to each market for URL generation, and the
+            # event title for event-level matching
+            for market in markets:
+                market['series_ticker'] = series_ticker
+                market['event_title'] = event.get('title', '')
+                market['event_category'] = event.get('category', '')
+                all_markets.append(market)
+        return all_markets
+
+    def get_markets_page(self, status: str, cursor: Optional[str] = None,
+                         limit: int = 200) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one page of events with nested markets, for walking full history
+
+        Unlike get_markets, errors are raised so callers can retry the page.
+
+        Args:
+            status: Event status ('open', 'closed', 'settled')
+            cursor: Cursor returned by the previous page (None = first page)
+            limit: Events per page (at most 200)
+
+        Returns:
+            (markets, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            requests.RequestException: On HTTP or network errors
+        """
+        params = {"limit": limit, "status": status, "with_nested_markets": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        response = self.session.get(f"{self.base_url}/events", params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        events = data.get("events", [])
+        return self._event_markets(events), (data.get("cursor") or None) if events else None
+
+    def get_series_list(self) -> List[Dict]:
+        """
+        Fetch every series (category, tags, settlement sources) in one request
+
+        Returns:
+            List of series dictionaries, or [] if error
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/series", timeout=30)
+            response.raise_for_status()
+            return response.json().get("series") or []
+
+        except requests.RequestException as e:
+            print(f"⚠ Error fetching Kalshi series: {e}")
+            return []
+
     def get_market_details(self, ticker: str) -> Optional[Dict]:
         """
         Get detailed market info including orderbook
@@ -105,6 +167,25 @@ class KalshiAPI:
             print(f"⚠ Error fetching details for {ticker}: {e}")
             return None
 
+    def get_orderbook(self, ticker: str) -> Optional[Dict]:
+        """
+        Get the orderbook of one market (YES and NO bids)
+
+        Args:
+            ticker: Market ticker symbol
+
+        Returns:
+            Orderbook dictionary ('yes'/'no' cent levels, 'yes_dollars'/'no_dollars'), or None if error
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/markets/{ticker}/orderbook", timeout=10)
+            response.raise_for_status()
+            return response.json().get("orderbook", {})
+
+        except requests.RequestException as e:
+            print(f"⚠ Error fetching orderbook for {ticker}: {e}")
+            return None
+
     def format_market_link(self, market_data: Dict) -> str:
         """
         Generate direct link to Kalshi event page using series_ticker
@@ -115,8 +196,11 @@ class KalshiAPI:
         Returns:
             URL to Kalshi event page
         """
-        # Prefer series_ticker for direct event URLs
-        series_ticker = market_data.get('series_ticker', '').lower()
+        # Prefer series_ticker for direct event URLs (known from the event when the market lacks it)
+        series_ticker = market_data.get('series_ticker', '')
+        if not series_ticker and self.reference is not None:
+            series_ticker = self.reference.market_info(event_ticker=market_data.get('event_ticker', ''))["series_ticker"]
+        series_ticker = series_ticker.lower()
         if series_ticker:
             return f"https://kalshi.com/markets/{series_ticker}"
 
@@ -163,19 +247,39 @@ class KalshiAPI:
         # Calculate no_price
         no_price = 1.0 - yes_price if yes_price > 0 else 0.0
 
+        # Executable top of book (what buying each side costs right now)
+        try:
+            yes_ask = float(market.get("yes_ask_dollars", 0.0) or 0.0)
+            no_ask = float(market.get("no_ask_dollars", 0.0) or 0.0)
+        except (ValueError, TypeError):
+            yes_ask = no_ask = 0.0
+
+        # Series/event metadata (market payloads often have an empty category)
+        reference = {}
+        if self.reference is not None:
+            reference = self.reference.market_info(market.get("series_ticker") or "", market.get("event_ticker", ""))
+
         return {
             "ticker": market.get("ticker", ""),
             "event_ticker": market.get("event_ticker", ""),
-            "series_ticker": market.get("series_ticker", ""),
+            "series_ticker": market.get("series_ticker") or reference.get("series_ticker", ""),
+            "event_title": market.get("event_title", ""),
             "mve_collection_ticker": market.get("mve_collection_ticker", ""),
+            "structure": classify_kalshi(market),
             "title": market.get("title", ""),
             "subtitle": market.get("subtitle", ""),
-            "category": market.get("category", ""),
+            "category": market.get("category") or market.get("event_category") or reference.get("category", ""),
+            "series_title": reference.get("series_title", ""),
+            "tags": reference.get("tags", []),
+            "settlement_sources": reference.get("settlement_sources", []),
             "status": market.get("status", ""),
             "yes_price": yes_price,
             "no_price": no_price,
+            "yes_ask": yes_ask,
+            "no_ask": no_ask,
             "volume": market.get("volume", 0),
             "open_interest": market.get("open_interest", 0),
             "close_time": market.get("close_time", ""),
+            "close_ts": parse_close_time(market.get("close_time")),
             "result": market.get("result", ""),
         }
@@ -0,0 +1,37 @@
+"""
+Market Lists Module
+Fetches both venues' markets for one refresh, shared by the app, the scanner and the poll scheduler
+"""
+from typing import List, Dict, Tuple
+
+from market_structure import split_matchable
+
+
+def fetch_market_lists(kalshi_api, poly_api, kalshi_limit: int = 200,
+                       poly_limit: int = 500) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Fetch and extract both venues' markets, keeping priced, matchable ones
+
+    Args:
+        kalshi_api: KalshiAPI instance
+        poly_api: PolymarketAPI instance
+        kalshi_limit: Kalshi events to fetch (API max 200)
+        poly_limit: Polymarket markets to fetch
+
+    Returns:
+        (kalshi_markets, poly_markets, pruned Kalshi combo markets)
+    """
+    # Series metadata is joined at extraction; reload it in the background once stale
+    if getattr(kalshi_api, "reference", None) is not None:
+        kalshi_api.reference.ensure_fresh(kalshi_api)
+
+    kalshi_markets = [kalshi_api.extract_market_info(m) for m in kalshi_api.get_markets(limit=kalshi_limit)]
+    poly_markets = [poly_api.extract_market_info(m) for m in poly_api.get_markets(limit=poly_limit)]
+
+    # Filter out markets with no price data
+    kalshi_markets = [m for m in kalshi_markets if m.get("yes_price", 0) > 0]
+    poly_markets = [m for m in poly_markets if m.get("yes_price", 0) > 0]
+
+    # Combo/parlay markets can never match a single Polymarket market
+    kalshi_markets, pruned = split_matchable(kalshi_markets)
+    return kalshi_markets, poly_markets, pruned
@@ -2,14 +2,42 @@
 Market Matching Algorithm Module
 Intelligently matches similar markets across Kalshi and Polymarket
 """
+import hashlib
+import heapq
+import inspect
+import json
+import os
 import re
-from typing import List, Dict, Tuple, Set
+import sys
+import time
+from functools import cached_property
+from typing import List, Dict, Tuple, Set, Optional, Iterable, Iterator
+
+import numpy as np
+
+from assignment import greedy_assignment, optimal_assignment, pair_components
+import threshold_parser
+from threshold_parser import ThresholdParser, ThresholdSpec, underlying_overlap, strikes_compatible
 
 
 class MarketMatcher:
     """Matches similar prediction markets across platforms using keyword and semantic analysis"""
 
-    def __init__(self):
+    # Bump when scoring logic changes in a way the source hash can't see
+    RULES_REVISION = 1
+
+    # Hard rejection gates in their default order: a single bitmask AND first,
+    # then cached set comparisons
+    GATES = ("topics", "person", "polarity", "strike", "words")
+
+    # Alphanumeric runs ("49ers") and single non-space characters; one pass, no backtracking
+    _TOKEN_RE = re.compile(r"[A-Za-z0-9]+|[^\sA-Za-z0-9]")
+    # Hyphens inside names ("Saint-Germain") are folded to spaces before tokenizing
+    _NAME_HYPHEN_RE = re.compile(r"(?<=[A-Za-z0-9])-(?=[A-Za-z0-9])")
+
+    DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "matcher_rules.json")
+
+    def __init__(self, rules_path: Optional[str] = None):
         # Specific keywords that identify unique markets
         self.important_keywords = [
             # Politics - People
@@ -40,50 +68,71 @@ class MarketMatcher:
             'california', 'texas', 'florida', 'mars',
         ]
 
-        # Topic keywords - markets must share at least one topic to match
-        # These represent the SUBJECT or ACTION of the market
-        self.topic_keywords = {
-            # Election/Political
-            'presidential_election': ['presidential election', 'president', 'nominee', 'nomination'],
-            'governorship': ['governorship', 'governor'],
-            'impeachment': ['impeach', 'impeachment', 'remove', 'resign', 'resignation'],
-            'pardon': ['pardon', 'pardoned', 'clemency'],
-
-            # Economics/Finance
-            'trade_deficit': ['trade deficit', 'trade balance', 'exports', 'imports'],
-            'budget_deficit': ['budget', 'deficit', 'surplus', 'debt', 'spending', 'fiscal', 'reduce the deficit'],
-            'gdp': ['gdp', 'growth', 'economy', 'economic', 'recession'],
-            'inflation': ['inflation', 'cpi', 'prices', 'deflation'],
-            'wealth': ['trillionaire', 'billionaire', 'millionaire', 'net worth', 'richest', 'wealth'],
-
-            # Immigration
-            'deportation': ['deport', 'deportation', 'deported'],
-            'immigration': ['immigration', 'border', 'visa', 'green card'],
-
-            # Healthcare
-            'healthcare': ['ivf', 'healthcare', 'hospital', 'medical', 'insurance', 'obamacare'],
-
-            # Meetings/Events
-            'meeting': ['meeting', 'meet', 'summit', 'visit', 'conference'],
-
-            # Crypto/Markets
-            'price': ['price', 'reach', 'above', 'below', 'hit', 'trade'],
-
-            # Sports
-            'sports_match': ['vs', 'versus', 'game', 'match', 'play'],
-
-            # Specific Actions
-            'recognize': ['recognize', 'recognition', 'acknowledge'],
-            'buy_acquire': ['buy', 'purchase', 'acquire', 'acquisition', 'take', 'takeover'],
-            'ipo': ['ipo', 'public offering', 'go public'],
-            'product_launch': ['launch', 'release', 'announce', 'unveil', 'product'],
-            'lawsuit': ['lawsuit', 'sue', 'litigation', 'legal action', 'win his lawsuit'],
-            'supreme_court': ['supreme court', 'justice', 'scotus'],
-            'bond_actor': ['james bond', '007', 'bond actor'],
-            'nfl': ['nfl', 'super bowl', 'football'],
-            'nba': ['nba', 'basketball'],
-            'cabinet': ['cabinet'],
+        # Topic keywords, incompatible topic pairs and word lists live in a
+        # versioned rules file; topics are compiled to integer bitmasks
+        self.load_rules(rules_path or self.DEFAULT_RULES_PATH)
+
+        # Optional blocking: objects with candidate_pairs(kalshi_markets, poly_markets)
+        # returning a set of (kalshi_index, poly_index) (filters may return any
+        # collections.abc.Set, e.g. CloseDateWindows). Generators are unioned,
+        # filters are intersected with the result. Empty lists = score every pair.
+        self.candidate_generators = []
+        self.blocking_filters = []
+
+        # Optional SemanticIndex: gated pairs with high embedding cosine score by cosine
+        self.semantic_index = None
+
+        # Optional EntityExtractor: NER entities replace the capitalization heuristic
+        # in the person-name gate (see prepare_markets)
+        self.entity_extractor = None
+        # title -> person-name words of its NER entities, filled once per refresh
+        self._ner_person_names: Dict[str, Set[str]] = {}
+
+        # Rejection cascade: gates run in gate_order, features are computed lazily
+        # per title, and every stage counts pairs evaluated/rejected and time spent
+        self._title_features: Dict[str, TitleFeatures] = {}
+        self._gate_functions = {
+            "topics": self._gate_topics,
+            "person": self._gate_person,
+            "polarity": self._gate_polarity,
+            "strike": self._gate_strike,
+            "words": self._gate_words,
         }
+        self.gate_order = list(self.GATES)
+        self.reset_stage_stats()
+
+        # One-to-one assignment over the scored pair graph: "greedy" (best edge
+        # first) or "optimal" (maximum total score per connected component)
+        self.assignment_method = "greedy"
+
+    @property
+    def rules_version(self) -> str:
+        """
+        Fingerprint of the matching rules, used to invalidate cached scores
+
+        Covers the keyword tables, the rules file, RULES_REVISION and the full source of
+        every module scoring depends on (this one, with TitleFeatures and the gates;
+        threshold_parser, the strike gate; and the module of any subclass), so any change
+        to how compute_similarity scores a pair yields a new version.
+        """
+        cls = type(self)
+        if "_source_hash" not in cls.__dict__:
+            modules = {threshold_parser.__name__: threshold_parser}
+            for klass in cls.__mro__:
+                if klass is not object:
+                    modules.setdefault(klass.__module__, sys.modules.get(klass.__module__))
+            try:
+                source = "".join(inspect.getsource(modules[name]) for name in sorted(modules))
+            except (OSError, TypeError):
+                source = cls.__qualname__
+            cls._source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+        tables = json.dumps([self.RULES_REVISION, self.important_keywords, self.rules], sort_keys=True)
+        if self.semantic_index is not None:
+            tables += self.semantic_index.config_key()
+        if self.entity_extractor is not None:
+            tables += self.entity_extractor.config_key()
+        return hashlib.sha1((cls._source_hash + tables).encode("utf-8")).hexdigest()[:16]
 
     def extract_keywords(self, text: str) -> Set[str]:
         """
@@ -132,30 +181,168 @@ class MarketMatcher:
 
         return keywords
 
-    def extract_topics(self, text: str) -> Set[str]:
+    def extract_words(self, text: str) -> List[str]:
         """
-        Extract topic categories from market title
+        Extract meaningful words from a title (lowercased, no stop words, 3+ chars)
+
+        Args:
+            text: Market title
+
+        Returns:
+            List of words in title order (may contain duplicates)
+        """
+        if not text:
+            return []
+        return [w for w in re.findall(r'\w+', text.lower()) if len(w) > 2 and w not in self.stop_words]
+
+    def load_rules(self, path: str):
+        """
+        Load the rules file and compile it into lookup structures
+
+        Each topic gets one bit; incompatible_masks[i] holds the bits of every
+        topic that may never match topic i.
+
+        Args:
+            path: JSON rules file (see matcher_rules.json)
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            self.rules = json.load(f)
+
+        self.rules_file_version = self.rules.get("version", 0)
+        self.topic_keywords: Dict[str, List[str]] = self.rules["topic_keywords"]
+        self.incompatible_pairs = [tuple(pair) for pair in self.rules["incompatible_pairs"]]
+        self.words_to_skip = set(self.rules["words_to_skip"])
+        self.non_person_words = set(self.rules["non_person_words"])
+        self.stop_words = set(self.rules["stop_words"])
+        self.threshold_parser = ThresholdParser(self.stop_words, self.rules.get("underlying_aliases", {}))
+        self.strike_tolerance = float(self.rules.get("strike_tolerance", 0.0))
+        self.team_aliases: Dict[str, str] = self.rules.get("team_aliases", {})
+        self._team_alias_max_words = max((len(alias.split()) for alias in self.team_aliases), default=1)
+        self._participant_cache: Dict[str, frozenset] = {}
+
+        self.topic_names = list(self.topic_keywords.keys())
+        self.topic_bits = {name: 1 << i for i, name in enumerate(self.topic_names)}
+
+        self.incompatible_masks = [0] * len(self.topic_names)
+        for topic_a, topic_b in self.incompatible_pairs:
+            if topic_a not in self.topic_bits or topic_b not in self.topic_bits:
+                raise ValueError(f"Unknown topic in incompatible pair ({topic_a}, {topic_b}) in {path}")
+            self.incompatible_masks[self.topic_names.index(topic_a)] |= self.topic_bits[topic_b]
+            self.incompatible_masks[self.topic_names.index(topic_b)] |= self.topic_bits[topic_a]
+
+        self._topic_mask_cache: Dict[str, int] = {}
+        self._incompatible_cache: Dict[int, int] = {}
+        self._title_features = {}
+
+    def extract_topic_mask(self, text: str) -> int:
+        """
+        Topic categories of a title as a bitmask (cached per title)
 
         Args:
             text: Market title or description
 
         Returns:
-            Set of topic categories (e.g., 'election', 'budget', 'deportation')
+            Integer with one bit set per topic found (0 = no topics)
         """
         if not text:
-            return set()
+            return 0
+
+        mask = self._topic_mask_cache.get(text)
+        if mask is None:
+            text_lower = text.lower()
+            mask = 0
+            for topic_name, keywords in self.topic_keywords.items():
+                for keyword in keywords:
+                    if keyword in text_lower:
+                        mask |= self.topic_bits[topic_name]
+                        break  # Found this topic, move to next
+            if len(self._topic_mask_cache) > 100000:
+                self._topic_mask_cache = {}
+            self._topic_mask_cache[text] = mask
+        return mask
+
+    def incompatible_mask(self, topic_mask: int) -> int:
+        """
+        Bits of every topic that may not match any topic in topic_mask
 
-        text_lower = text.lower()
-        topics = set()
+        Args:
+            topic_mask: Topic bitmask
 
-        # Check each topic category
-        for topic_name, keywords in self.topic_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    topics.add(topic_name)
-                    break  # Found this topic, move to next
+        Returns:
+            Bitmask of incompatible topics
+        """
+        result = self._incompatible_cache.get(topic_mask)
+        if result is None:
+            result = 0
+            remaining = topic_mask
+            while remaining:
+                low_bit = remaining & -remaining
+                result |= self.incompatible_masks[low_bit.bit_length() - 1]
+                remaining ^= low_bit
+            self._incompatible_cache[topic_mask] = result
+        return result
+
+    def topics_compatible(self, mask1: int, mask2: int) -> bool:
+        """
+        Topic gate on bitmasks: overlapping topics and no incompatible pair
+
+        Args:
+            mask1: Topic bitmask of the Kalshi title
+            mask2: Topic bitmask of the Polymarket title
 
-        return topics
+        Returns:
+            False if both have topics and they don't overlap or clash
+        """
+        if not mask1 or not mask2:
+            return True
+        return bool(mask1 & mask2) and not (self.incompatible_mask(mask1) & mask2)
+
+    def topic_masks(self, markets: List[Dict], title_field: str = "title") -> np.ndarray:
+        """
+        Topic bitmasks for a list of markets
+
+        Args:
+            markets: Market dictionaries
+            title_field: 'title' for Kalshi, 'question' for Polymarket
+
+        Returns:
+            uint64 array with one bitmask per market
+        """
+        if len(self.topic_names) > 64:
+            raise ValueError("Vectorized topic masks support at most 64 topics")
+        return np.array([self.extract_topic_mask(m.get(title_field, "")) for m in markets], dtype=np.uint64)
+
+    def topic_compatibility(self, kalshi_masks: np.ndarray, poly_masks: np.ndarray) -> np.ndarray:
+        """
+        Topic gate for every Kalshi x Polymarket pair at once
+
+        Args:
+            kalshi_masks: uint64 array from topic_masks (length N)
+            poly_masks: uint64 array from topic_masks (length M)
+
+        Returns:
+            (N, M) boolean array, True where the pair passes the topic gate
+        """
+        kalshi_incompatible = np.array([self.incompatible_mask(int(m)) for m in kalshi_masks], dtype=np.uint64)
+        k = kalshi_masks[:, None]
+        p = poly_masks[None, :]
+        either_empty = (k == 0) | (p == 0)
+        overlap = (k & p) != 0
+        clash = (kalshi_incompatible[:, None] & p) != 0
+        return either_empty | (overlap & ~clash)
+
+    def extract_topics(self, text: str) -> Set[str]:
+        """
+        Extract topic categories from market title
+
+        Args:
+            text: Market title or description
+
+        Returns:
+            Set of topic categories (e.g., 'election', 'budget', 'deportation')
+        """
+        mask = self.extract_topic_mask(text)
+        return {name for name, bit in self.topic_bits.items() if mask & bit}
 
     def extract_polarity(self, text: str) -> str:
         """
@@ -199,38 +386,334 @@ class MarketMatcher:
         """
         Extract participant names from sports match titles (e.g., "Team A vs Team B")
 
+        Single left-to-right pass over word tokens (linear in the title length,
+        no backtracking), cached per title. Words are alphanumeric runs with
+        hyphens folded to spaces ("49ers", "Saint-Germain" -> "saint germain");
+        bare numbers break a run like punctuation. Within each run of words,
+        every "vs" / "vs." / "versus" splits off a side ("A vs B vs C" has three);
+        a bare "v" only counts between two capitalized words ("Barry v Seidel").
+        Each side is normalized through the team_aliases table.
+
         Args:
             text: Market title
 
         Returns:
             Set of normalized participant names
         """
+        if not text:
+            return set()
+
+        cached = self._participant_cache.get(text)
+        if cached is not None:
+            return set(cached)
+
         participants = set()
+        run: List[str] = []  # words since the last punctuation
+        separators: List[int] = []  # positions in run of "vs" words that split it
+        previous_end = -1
+
+        def close_run():
+            # A separator as the last word has nothing after it
+            while separators and separators[-1] == len(run) - 1:
+                separators.pop()
+            if separators:
+                bounds = [-1] + separators + [len(run)]
+                names = [" ".join(run[start + 1:end]) for start, end in zip(bounds, bounds[1:])]
+                # Only add if names are meaningful (not common words); short sides count when capitalized ("A vs B")
+                names = [name.lower() for name in names if len(name) > 2 or name[:1].isupper()]
+                if len(names) >= 2:
+                    participants.update(self.normalize_participant(name) for name in names)
+            run.clear()
+            separators.clear()
+
+        for match in self._TOKEN_RE.finditer(self._NAME_HYPHEN_RE.sub(" ", text)):
+            token = match.group()
+            adjacent = match.start() == previous_end
+            previous_end = match.end()
+            at_separator = bool(separators) and separators[-1] == len(run) - 1
+
+            if token.isalnum() and not token.isdigit():
+                if run and adjacent:
+                    # Word glued to punctuation ("vs.Lakers"): start over
+                    close_run()
+                    at_separator = False
+                # A bare "v" only splits two capitalized words ("Barry v Seidel", not "part v of")
+                if at_separator and run[-1] in ("v", "V") and not (token[0].isupper() and run[-2][0].isupper()):
+                    separators.pop()
+                run.append(token)
+                if token.lower() in ("vs", "versus", "v") and len(run) > 1:
+                    separators.append(len(run) - 1)
+            elif token == "." and adjacent and at_separator and run[-1].lower() in ("vs", "v"):
+                # "vs." keeps the run going
+                continue
+            else:
+                close_run()
+
+        close_run()
+
+        if len(self._participant_cache) > 200000:
+            self._participant_cache = {}
+        self._participant_cache[text] = frozenset(participants)
+        return participants
 
-        # Pattern: "A vs B", "A v B", "A vs. B" (case-insensitive)
-        vs_patterns = [
-            # Match multi-word names: "John Smith vs Jane Doe"
-            r'([A-Za-z]+(?:\s+[A-Za-z]+)*)\s+(?:vs?\.?|versus)\s+([A-Za-z]+(?:\s+[A-Za-z]+)*)',
-        ]
+    def normalize_participant(self, name: str) -> str:
+        """
+        Replace known team aliases inside a participant name
 
-        for pattern in vs_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Add both participants, normalized to lowercase and trimmed
-                name1 = match[0].lower().strip()
-                name2 = match[1].lower().strip()
+        Args:
+            name: Lowercased participant name ("los angeles lakers")
 
-                # Only add if names are meaningful (not common words)
-                if len(name1) > 2 and len(name2) > 2:
-                    participants.add(name1)
-                    participants.add(name2)
+        Returns:
+            Name with the longest matching alias phrases replaced ("lakers")
+        """
+        words = name.split()
+        out = []
+        i = 0
+        while i < len(words):
+            for length in range(min(self._team_alias_max_words, len(words) - i), 0, -1):
+                canonical = self.team_aliases.get(" ".join(words[i:i + length]))
+                if canonical is not None:
+                    out.append(canonical)
+                    i += length
+                    break
+            else:
+                out.append(words[i])
+                i += 1
+        return " ".join(out)
+
+    def extract_proper_nouns(self, text: str) -> Set[str]:
+        """
+        Extract capitalized words that are not at the start of the title
 
-        return participants
+        Args:
+            text: Market title
+
+        Returns:
+            Set of lowercased proper nouns (names, places, entities)
+        """
+        words = text.split()
+        proper = set()
+        for i, word in enumerate(words):
+            # Remove punctuation
+            clean_word = re.sub(r'[^\w\s]', '', word)
+            # Skip if first word or in skip list
+            if i > 0 and clean_word and clean_word[0].isupper():
+                lower_word = clean_word.lower()
+                if lower_word not in self.words_to_skip:
+                    proper.add(lower_word)
+        return proper
+
+    def extract_person_names(self, text: str) -> Set[str]:
+        """
+        Extract likely person names (proper nouns minus places, titles, generic terms)
+
+        Args:
+            text: Market title
+
+        Returns:
+            Set of lowercased name words
+        """
+        proper = self.extract_proper_nouns(text)
+        return {word for word in proper if word not in self.non_person_words}
+
+    def person_names(self, title: str, entities: Optional[Dict[str, List[str]]] = None) -> Set[str]:
+        """
+        Person-name words for the person gate
+
+        Args:
+            title: Market title
+            entities: Precomputed NER entities for the title (market['entities']), if any
+
+        Returns:
+            Set of lowercased name words
+        """
+        if entities is None:
+            return self.extract_person_names(title)
+        return {word.lower() for name in entities.get("PERSON", []) for word in re.findall(r'\w+', name)}
+
+    def prepare_markets(self, kalshi_markets: List[Dict], poly_markets: List[Dict]):
+        """
+        Per-refresh feature extraction run once over all titles before pairwise scoring
+
+        Args:
+            kalshi_markets: List of Kalshi markets (annotated in place)
+            poly_markets: List of Polymarket markets (annotated in place)
+        """
+        if self.entity_extractor is not None:
+            # One NER pass over both venues so the stage reports a single throughput figure
+            titles = [m.get("title", "") for m in kalshi_markets]
+            titles += [m.get("question", m.get("title", "")) for m in poly_markets]
+            self._ner_person_names = {}
+            for title, market, entities in zip(titles, kalshi_markets + poly_markets,
+                                               self.entity_extractor.extract(titles)):
+                market["entities"] = entities
+                self._ner_person_names[title] = self.person_names(title, entities)
+
+    def _entity_person_names(self, title: str, entities: Dict[str, List[str]]) -> Set[str]:
+        """person_names() of NER entities, split once per title rather than once per pair"""
+        names = self._ner_person_names.get(title)
+        if names is None:
+            names = self._ner_person_names[title] = self.person_names(title, entities)
+        return names
+
+    @staticmethod
+    def has_proper_noun_overlap(set1: Set[str], set2: Set[str]) -> bool:
+        """
+        Check if proper nouns overlap or if one is substring of another
+        Example: "Trump" should match "Donald Trump"
+        """
+        if not set1 or not set2:
+            return False
+
+        # Check exact overlap
+        if set1 & set2:
+            return True
+
+        # Check if any noun from set1 is in any noun from set2 (fuzzy match)
+        for n1 in set1:
+            for n2 in set2:
+                if n1 in n2 or n2 in n1:
+                    return True
+
+        return False
+
+    def title_features(self, title: str) -> "TitleFeatures":
+        """
+        Cached lazy feature bundle for a title
+
+        Args:
+            title: Market title
+
+        Returns:
+            TitleFeatures (features are computed on first access)
+        """
+        features = self._title_features.get(title)
+        if features is None:
+            if len(self._title_features) > 200000:
+                self._title_features = {}
+            features = TitleFeatures(self, title)
+            self._title_features[title] = features
+        return features
+
+    def _gate_topics(self, features1: "TitleFeatures", features2: "TitleFeatures", entities1, entities2) -> bool:
+        # Markets must share at least one topic and no incompatible pair
+        # (e.g., election vs deportation, trade vs budget deficit)
+        return self.topics_compatible(features1.topic_mask, features2.topic_mask)
+
+    def _gate_polarity(self, features1: "TitleFeatures", features2: "TitleFeatures", entities1, entities2) -> bool:
+        # If same topic, one positive and the other negative are opposite questions
+        topics1, topics2 = features1.topic_mask, features2.topic_mask
+        if not (topics1 & topics2):
+            return True
+        polarity1, polarity2 = features1.polarity, features2.polarity
+        return not ((polarity1 == 'positive' and polarity2 == 'negative') or
+                    (polarity1 == 'negative' and polarity2 == 'positive'))
+
+    def _gate_person(self, features1: "TitleFeatures", features2: "TitleFeatures", entities1, entities2) -> bool:
+        # Check person names specifically, not just any proper nouns
+        person_names1 = (features1.person_names if entities1 is None
+                         else self._entity_person_names(features1.title, entities1))
+        person_names2 = (features2.person_names if entities2 is None
+                         else self._entity_person_names(features2.title, entities2))
+
+        if person_names1 and person_names2:
+            # Different people
+            return self.has_proper_noun_overlap(person_names1, person_names2)
+        # One side names a specific person, the other is generic ("who will...")
+        return not (person_names1 or person_names2)
+
+    def _gate_strike(self, features1: "TitleFeatures", features2: "TitleFeatures", entities1, entities2) -> bool:
+        # Same underlying (BTC vs Bitcoin): strike, comparator, unit and date must line up,
+        # so $100k and $100,000 agree while neighbouring rungs of a ladder do not
+        spec1, spec2 = features1.threshold, features2.threshold
+        if spec1 is None or spec2 is None or underlying_overlap(spec1, spec2) < 0.5:
+            return True
+        return strikes_compatible(spec1, spec2, self.strike_tolerance)
+
+    def _gate_words(self, features1: "TitleFeatures", features2: "TitleFeatures", entities1, entities2) -> bool:
+        # Nothing left to compare once stop words are removed
+        return bool(features1.words) and bool(features2.words)
+
+    def reset_stage_stats(self):
+        """Zero the per-stage counters of the similarity cascade"""
+        self.stage_stats = {
+            name: {"evaluated": 0, "rejected": 0, "seconds": 0.0}
+            for name in list(self.GATES) + ["score"]
+        }
+
+    def optimize_gate_order(self, min_evaluated: int = 1000):
+        """
+        Reorder gates so the cheapest per rejection run first
+
+        Gates are independent pass/fail checks, so the order never changes a
+        score, only how much work is spent before a pair is rejected. Uses the
+        counters gathered so far; gates with too little data keep their place.
+
+        Args:
+            min_evaluated: Evaluations a gate needs before its stats are trusted
+        """
+        def cost_per_rejection(name):
+            stage = self.stage_stats[name]
+            if stage["evaluated"] < min_evaluated:
+                return None
+            if stage["rejected"] == 0:
+                return float("inf")
+            return stage["seconds"] / stage["rejected"]
+
+        ranked = [(cost_per_rejection(name), position, name) for position, name in enumerate(self.gate_order)]
+        if any(rank is None for rank, _, _ in ranked):
+            return
+        self.gate_order = [name for _, _, name in sorted(ranked)]
+
+    def stage_report(self) -> List[Dict]:
+        """
+        Per-stage counters of the similarity cascade, in evaluation order
+
+        Returns:
+            List of dicts with stage, evaluated, rejected, reject_rate, seconds, us_per_pair
+        """
+        report = []
+        for name in self.gate_order + ["score"]:
+            stage = self.stage_stats[name]
+            evaluated = stage["evaluated"]
+            report.append({
+                "stage": name,
+                "evaluated": evaluated,
+                "rejected": stage["rejected"],
+                "reject_rate": stage["rejected"] / evaluated if evaluated else 0.0,
+                "seconds": stage["seconds"],
+                "us_per_pair": stage["seconds"] / evaluated * 1e6 if evaluated else 0.0,
+            })
+        return report
+
+    def passes_gates(self, title1: str, title2: str,
+                     entities1: Optional[Dict] = None, entities2: Optional[Dict] = None) -> bool:
+        """
+        Run the hard rejection checks (topics, polarity, person names, strikes, empty titles)
+
+        Args:
+            title1: Kalshi title
+            title2: Polymarket title
+            entities1: NER entities of the Kalshi market, if extracted
+            entities2: NER entities of the Polymarket market, if extracted
+
+        Returns:
+            False if the pair can never be the same market
+        """
+        features1 = self.title_features(title1)
+        features2 = self.title_features(title2)
+        return all(
+            self._gate_functions[name](features1, features2, entities1, entities2)
+            for name in self.gate_order
+        )
 
     def compute_similarity(self, market1: Dict, market2: Dict) -> float:
         """
         Compute similarity score between two markets (0-1)
 
+        Runs the rejection gates as a cascade in gate_order, computing title
+        features only when a stage first needs them, then scores survivors.
+
         Args:
             market1: First market dictionary (Kalshi)
             market2: Second market dictionary (Polymarket)
@@ -245,159 +728,67 @@ class MarketMatcher:
         if not title1 or not title2:
             return 0.0
 
-        # Normalize titles
-        title1_lower = title1.lower()
-        title2_lower = title2.lower()
-
-        # CRITICAL CHECK #1: Extract topics - markets must share at least one topic
-        topics1 = self.extract_topics(title1)
-        topics2 = self.extract_topics(title2)
-
-        # STRICT: If both have topics but none overlap, they're about different things
-        if topics1 and topics2:
-            if not (topics1 & topics2):
-                # Different topics entirely (e.g., election vs deportation vs budget)
+        features1 = self.title_features(title1)
+        features2 = self.title_features(title2)
+        entities1 = market1.get("entities")
+        entities2 = market2.get("entities")
+
+        stats = self.stage_stats
+        for name in self.gate_order:
+            start = time.perf_counter()
+            passed = self._gate_functions[name](features1, features2, entities1, entities2)
+            stage = stats[name]
+            stage["seconds"] += time.perf_counter() - start
+            stage["evaluated"] += 1
+            if not passed:
+                stage["rejected"] += 1
                 return 0.0
 
-            # EXTRA CHECKS: Certain topics should NOT match with each other
-            incompatible_pairs = [
-                ('trade_deficit', 'budget_deficit'),  # Trade vs budget deficit
-                ('pardon', 'presidential_election'),  # Pardon vs election
-                ('pardon', 'governorship'),  # Pardon vs governorship
-                ('pardon', 'impeachment'),  # Pardon vs impeachment
-                ('ipo', 'product_launch'),  # IPO vs product launch
-                ('nfl', 'nba'),  # Different sports leagues
-                ('supreme_court', 'presidential_election'),  # Court appointment vs election
-                ('governorship', 'presidential_election'),  # State vs federal election
-                ('lawsuit', 'presidential_election'),  # Lawsuit vs election
-                ('cabinet', 'presidential_election'),  # Cabinet appointment vs election
-            ]
-
-            for topic_a, topic_b in incompatible_pairs:
-                if (topic_a in topics1 and topic_b in topics2) or \
-                   (topic_b in topics1 and topic_a in topics2):
-                    return 0.0
-
-        # STRICT: If NO topics found for either market, require very high word similarity
-        # This prevents matching unrelated events with the same person name
-        if not topics1 or not topics2:
-            # Continue to compute similarity but will require higher threshold later
-            pass
-
-        # CRITICAL CHECK #1b: If same topic, check polarity (positive vs negative)
-        if topics1 and topics2 and (topics1 & topics2):
-            polarity1 = self.extract_polarity(title1)
-            polarity2 = self.extract_polarity(title2)
-
-            # If one is positive and other is negative, they're opposite questions
-            if (polarity1 == 'positive' and polarity2 == 'negative') or \
-               (polarity1 == 'negative' and polarity2 == 'positive'):
-                return 0.0
-
-        # CRITICAL CHECK #2: Extract proper nouns (names, places, entities)
-        # Skip sentence-initial words and common words
-        words_to_skip = {'will', 'would', 'could', 'should', 'can', 'may', 'might'}
-
-        # Words that are NOT person names (places, titles, generic terms)
-        non_person_words = {
-            # Titles/Positions
-            'president', 'prime', 'minister', 'senator', 'governor', 'mayor',
-            'secretary', 'director', 'chairman', 'leader', 'chief', 'king', 'queen',
-            # Countries
-            'america', 'usa', 'china', 'russia', 'israel', 'iran', 'ukraine',
-            'taiwan', 'india', 'japan', 'korea', 'france', 'germany', 'italy',
-            'spain', 'brazil', 'mexico', 'canada', 'australia', 'britain', 'england',
-            'netherlands',
-            # Places
-            'california', 'texas', 'florida', 'york', 'washington', 'chicago',
-            'mars', 'earth', 'house', 'senate', 'congress', 'court',
-            # Organizations
-            'democratic', 'republican', 'gop', 'nato', 'olympics',
-            # Other
-            'super', 'bowl', 'world', 'cup', 'final', 'championship',
-            'january', 'february', 'march', 'april', 'may', 'june', 'july',
-            'august', 'september', 'october', 'november', 'december',
-            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'
-        }
-
-        # Extract individual capitalized words (not at sentence start)
-        def extract_proper_nouns(text):
-            words = text.split()
-            proper = set()
-            for i, word in enumerate(words):
-                # Remove punctuation
-                clean_word = re.sub(r'[^\w\s]', '', word)
-                # Skip if first word or in skip list
-                if i > 0 and clean_word and clean_word[0].isupper():
-                    lower_word = clean_word.lower()
-                    if lower_word not in words_to_skip:
-                        proper.add(lower_word)
-            return proper
-
-        # Extract person names specifically (filter out non-person words)
-        def extract_person_names(text):
-            proper = extract_proper_nouns(text)
-            # Filter out places, titles, generic terms
-            person_names = {word for word in proper if word not in non_person_words}
-            return person_names
-
-        proper_nouns1 = extract_proper_nouns(title1)
-        proper_nouns2 = extract_proper_nouns(title2)
-
-        person_names1 = extract_person_names(title1)
-        person_names2 = extract_person_names(title2)
-
-        # Check if proper nouns overlap or if one is substring of another
-        # Example: "Trump" should match "Donald Trump"
-        def has_proper_noun_overlap(set1, set2):
-            if not set1 or not set2:
-                return False
-
-            # Check exact overlap
-            if set1 & set2:
-                return True
-
-            # Check if any noun from set1 is in any noun from set2 (fuzzy match)
-            for n1 in set1:
-                for n2 in set2:
-                    if n1 in n2 or n2 in n1:
-                        return True
-
-            return False
-
-        # CRITICAL: Check person names specifically, not just any proper nouns
-        # If one has person names but they don't overlap, they're different markets
-        if person_names1 and person_names2:
-            if not has_proper_noun_overlap(person_names1, person_names2):
-                # Different people
-                return 0.0
-        elif person_names2 and not person_names1:
-            # Polymarket has specific person, Kalshi is generic "who"
-            return 0.0
-        elif person_names1 and not person_names2:
-            # Kalshi has specific person, Polymarket doesn't
-            return 0.0
-
-        # Extract keywords from both
-        keywords1 = self.extract_keywords(title1)
-        keywords2 = self.extract_keywords(title2)
+        start = time.perf_counter()
+        score = self.lexical_similarity(market1, market2, features1, features2)
+
+        # Semantic mode: cosine can only raise the score of a pair with the same
+        # lexical evidence lexical_similarity demands (2+ shared keywords or proper
+        # nouns), so templated titles never match on averaged vectors alone
+        if self.semantic_index is not None and self.shares_key_terms(features1, features2):
+            cosine = self.semantic_index.pair_similarity(title1, title2)
+            if cosine >= self.semantic_index.min_cosine:
+                score = max(score, cosine)
+
+        stage = stats["score"]
+        stage["seconds"] += time.perf_counter() - start
+        stage["evaluated"] += 1
+        return score
+
+    @staticmethod
+    def shares_key_terms(features1: "TitleFeatures", features2: "TitleFeatures") -> bool:
+        """Whether two titles share at least 2 keywords or 2 capitalized words"""
+        return (len(features1.keywords & features2.keywords) >= 2
+                or len(features1.capitalized_words & features2.capitalized_words) >= 2)
+
+    def lexical_similarity(self, market1: Dict, market2: Dict,
+                           features1: "TitleFeatures", features2: "TitleFeatures") -> float:
+        """
+        Keyword/word-overlap score for a pair that already passed the gates
 
-        # Extract all meaningful words (filter out common stop words)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                      'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'be', 'been',
-                      'will', 'would', 'could', 'should', 'has', 'have', 'had', 'do', 'does',
-                      'did', 'this', 'that', 'these', 'those', 'what', 'which', 'who', 'when',
-                      'where', 'why', 'how', 'their', 'there', 'than', 'then'}
+        Args:
+            market1: Kalshi market
+            market2: Polymarket market
+            features1: title_features() of the Kalshi title
+            features2: title_features() of the Polymarket title
 
-        words1 = set(w for w in re.findall(r'\w+', title1_lower) if len(w) > 2 and w not in stop_words)
-        words2 = set(w for w in re.findall(r'\w+', title2_lower) if len(w) > 2 and w not in stop_words)
+        Returns:
+            Similarity score from 0.0 to 1.0
+        """
+        words1 = features1.words
+        words2 = features2.words
 
         if not words1 or not words2:
             return 0.0
 
         # Extract match participants (for sports: "A vs B")
-        participants1 = self.extract_match_participants(title1)
-        participants2 = self.extract_match_participants(title2)
+        participants1 = features1.participants
+        participants2 = features2.participants
 
         # If both have participants, check if they match
         if participants1 and participants2:
@@ -419,16 +810,17 @@ class MarketMatcher:
                 return 0.95
 
         # Extract keywords from both
+        keywords1 = features1.keywords
+        keywords2 = features2.keywords
         keyword_overlap = len(keywords1 & keywords2)
         keyword_union = len(keywords1 | keywords2)
 
         # CRITICAL: Must have at least 2 specific keywords in common
         # If less than 2 keywords overlap, they're likely different markets
         if keyword_overlap < 2:
-            # Check if they share significant proper nouns
-            # Extract capitalized words (proper nouns)
-            proper_nouns1 = set(w for w in re.findall(r'\b[A-Z][a-z]+', title1))
-            proper_nouns2 = set(w for w in re.findall(r'\b[A-Z][a-z]+', title2))
+            # Check if they share significant proper nouns (capitalized words)
+            proper_nouns1 = features1.capitalized_words
+            proper_nouns2 = features2.capitalized_words
 
             proper_overlap = len(proper_nouns1 & proper_nouns2)
 
@@ -442,6 +834,9 @@ class MarketMatcher:
                 if word_union > 0:
                     return min(0.4, (word_overlap / word_union) * 0.5)
                 return 0.0
+        else:
+            proper_nouns1 = features1.proper_nouns
+            proper_nouns2 = features2.proper_nouns
 
         # Calculate keyword similarity (Jaccard)
         keyword_similarity = keyword_overlap / keyword_union if keyword_union > 0 else 0.0
@@ -456,7 +851,7 @@ class MarketMatcher:
 
         # Boost score if proper nouns match (names, entities)
         proper_boost = 0.0
-        if proper_nouns1 and proper_nouns2 and has_proper_noun_overlap(proper_nouns1, proper_nouns2):
+        if proper_nouns1 and proper_nouns2 and self.has_proper_noun_overlap(proper_nouns1, proper_nouns2):
             proper_boost = 0.3  # Significant boost for matching entities
 
         # Boost score if same category
@@ -469,16 +864,56 @@ class MarketMatcher:
 
         # PENALTY: If no topics found, apply moderate penalty unless score is very high
         # This prevents "Trump does X" from matching "Trump does Y"
-        if not topics1 or not topics2:
+        if not features1.topic_mask or not features2.topic_mask:
             # Without topics, require high match (75%+ word overlap)
             if final_score < 0.75:
                 final_score = final_score * 0.6  # Moderate penalty (was 0.3)
 
         return final_score
 
+    def search_top_k(
+        self,
+        query_market: Dict,
+        markets: Iterable[Dict],
+        k: int = 5,
+        query_venue: str = "kalshi"
+    ) -> List[Tuple[Dict, float]]:
+        """
+        Best k markets on the other venue for one market, keeping a bounded heap
+
+        Args:
+            query_market: Market to look up
+            markets: Markets from the other venue (all of them, or candidates from an index)
+            k: Number of results
+            query_venue: 'kalshi' if query_market is a Kalshi market, 'polymarket' otherwise
+
+        Returns:
+            Up to k (market, similarity_score) tuples with score > 0, best first
+            (earlier markets win ties)
+        """
+        if k <= 0:
+            return []
+
+        heap: List[Tuple[float, int, Dict]] = []
+        for position, market in enumerate(markets):
+            if query_venue == "kalshi":
+                score = self.compute_similarity(query_market, market)
+            else:
+                score = self.compute_similarity(market, query_market)
+            if score <= 0:
+                continue
+            entry = (score, -position, market)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        return [(market, score) for score, _, market in sorted(heap, key=lambda e: e[:2], reverse=True)]
+
     def search_polymarket_for_kalshi(self, kalshi_market: Dict, poly_markets: List[Dict]) -> Tuple[Dict, float]:
         """
         Search for the best Polymarket match for a single Kalshi market
+        (search_top_k with k=1; see MarketSearchIndex for indexed lookups)
 
         Args:
             kalshi_market: Single Kalshi market to search for
@@ -487,82 +922,218 @@ class MarketMatcher:
         Returns:
             Tuple of (best_poly_market, similarity_score) or (None, 0.0)
         """
-        k_title = kalshi_market.get("title", "")
-        if not k_title:
+        if not kalshi_market.get("title", ""):
             return None, 0.0
 
-        best_match = None
-        best_score = 0.0
+        results = self.search_top_k(kalshi_market, poly_markets, k=1)
+        return results[0] if results else (None, 0.0)
 
-        # Score all Polymarket markets
-        for p_market in poly_markets:
-            score = self.compute_similarity(kalshi_market, p_market)
+    @staticmethod
+    def kalshi_id(market: Dict) -> str:
+        """Stable identifier for a Kalshi market (ticker, falling back to title)"""
+        return market.get("ticker") or market.get("title", "")
 
-            if score > best_score:
-                best_score = score
-                best_match = p_market
+    @staticmethod
+    def poly_id(market: Dict) -> str:
+        """Stable identifier for a Polymarket market (condition_id, falling back to slug/question)"""
+        return market.get("condition_id") or market.get("slug") or market.get("question", market.get("title", ""))
 
-        return best_match, best_score
+    @staticmethod
+    def kalshi_signature(market: Dict) -> Tuple[str, str]:
+        """Fields of a Kalshi market that compute_similarity depends on"""
+        return market.get("title", ""), market.get("category", "")
 
-    def find_matches(
+    @staticmethod
+    def poly_signature(market: Dict) -> Tuple[str, str]:
+        """Fields of a Polymarket market that compute_similarity depends on"""
+        return market.get("question", market.get("title", "")), market.get("category", "")
+
+    def enable_semantic_matching(self, semantic_index):
+        """
+        Switch to semantic mode: pairs through the gates and sharing key terms
+        may score by cosine, and embedding neighbours are added to the candidates
+        of any configured generators (without generators every pair is still
+        scored, so semantic mode never loses a lexical match)
+
+        Args:
+            semantic_index: SemanticIndex instance
+        """
+        self.semantic_index = semantic_index
+
+    @property
+    def pairwise_local_blocking(self) -> bool:
+        """
+        Whether every configured blocking stage decides a pair from its two markets alone
+
+        Stages opt in with a truthy `pairwise_local` attribute. Top-k and
+        corpus-wide stages (SemanticIndex, FTSCandidates, EventMatcher,
+        ThresholdMatcher's nearest strikes) do not: a new market can displace
+        the candidates of markets that did not change.
+        """
+        stages = self.candidate_generators + self.blocking_filters
+        if self.candidate_generators and self.semantic_index is not None:
+            stages = stages + [self.semantic_index]
+        return all(getattr(stage, "pairwise_local", False) for stage in stages)
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Optional[Set[Tuple[int, int]]]:
+        """
+        Run the configured blocking stages to get the pairs worth scoring
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs, or None when no blocking
+            is configured (every pair should be scored)
+        """
+        candidates = None
+
+        if self.candidate_generators:
+            candidates = set()
+            for generator in self.candidate_generators:
+                candidates |= generator.candidate_pairs(kalshi_markets, poly_markets)
+            if self.semantic_index is not None and self.semantic_index not in self.candidate_generators:
+                candidates |= self.semantic_index.candidate_pairs(kalshi_markets, poly_markets)
+
+        for blocking_filter in self.blocking_filters:
+            allowed = blocking_filter.candidate_pairs(kalshi_markets, poly_markets)
+            candidates = allowed if candidates is None else candidates & allowed
+
+        return candidates
+
+    def assign_matches(
         self,
         kalshi_markets: List[Dict],
         poly_markets: List[Dict],
+        scores: Dict[Tuple[int, int], float],
         threshold: float = 0.5
     ) -> List[Tuple[Dict, Dict, float]]:
         """
-        Find matching markets by searching Kalshi for each Polymarket market
+        Turn precomputed pair scores into one-to-one matches
 
-        Strategy:
-        1. Use Polymarket as source (has specific, non-duplicate markets)
-        2. For each Polymarket market, search all Kalshi markets
-        3. Find best match based on full title similarity
-        4. Only match if score >= threshold
+        Pairs at or above the threshold form a sparse bipartite graph that is
+        solved as a whole (see assignment.py): 'greedy' takes edges best-first,
+        'optimal' maximizes the total score per connected component. Ties are
+        broken by market id, so the result does not depend on API order.
 
         Args:
-            kalshi_markets: List of Kalshi markets (search pool)
-            poly_markets: List of Polymarket markets (source)
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+            scores: Mapping of (kalshi_index, poly_index) -> similarity score.
+                    Pairs that are missing are treated as 0.0
             threshold: Minimum similarity score to consider a match (0-1)
 
         Returns:
             List of tuples: (kalshi_market, poly_market, similarity_score)
         """
+        edges = [
+            (score, (self.kalshi_id(kalshi_markets[k_idx]), k_idx), (self.poly_id(poly_markets[p_idx]), p_idx))
+            for (k_idx, p_idx), score in scores.items()
+            if score > 0 and score >= threshold
+        ]
+
+        if self.assignment_method == "optimal":
+            chosen = optimal_assignment(edges)
+        else:
+            chosen = greedy_assignment(edges)
+
         matches = []
-        used_kalshi_indices = set()
+        for score, (_, k_idx), (_, p_idx) in chosen:
+            k_market, p_market = kalshi_markets[k_idx], poly_markets[p_idx]
+            matches.append((k_market, p_market, score))
 
-        print(f"🔍 Searching {len(kalshi_markets)} Kalshi markets for {len(poly_markets)} Polymarket markets...")
+            # Log high-quality matches
+            if score >= 0.8:
+                p_title = p_market.get("question", p_market.get("title", ""))[:50]
+                k_title = k_market.get("title", "")[:50]
+                print(f"  ✓ Match {len(matches)}: {p_title}... = {k_title}... (score: {score:.2f})")
+
+        # Sort by similarity score (highest first)
+        matches.sort(key=lambda x: x[2], reverse=True)
+
+        return matches
 
-        for idx, p_market in enumerate(poly_markets):
-            # Search for best Kalshi match
-            best_match = None
-            best_score = 0.0
-            best_index = -1
+    def sort_matches(self, matches: List[Tuple[Dict, Dict, float]]) -> List[Tuple[Dict, Dict, float]]:
+        """
+        Best-first view of matches collected from iter_matches (or any batches)
 
-            for i, k_market in enumerate(kalshi_markets):
-                # Skip if already matched
-                if i in used_kalshi_indices:
-                    continue
+        Ties are broken by market id, so the order does not depend on which
+        component finished first.
+        """
+        return sorted(matches, key=lambda m: (-m[2], self.kalshi_id(m[0]), self.poly_id(m[1])))
 
-                score = self.compute_similarity(k_market, p_market)
+    def iter_matches(
+        self,
+        kalshi_markets: List[Dict],
+        poly_markets: List[Dict],
+        threshold: float = 0.5
+    ) -> Iterator[Tuple[Dict, Dict, float]]:
+        """
+        Yield matches as soon as their assignment is final
 
-                if score > best_score:
-                    best_score = score
-                    best_match = k_market
-                    best_index = i
+        Assignment only couples pairs that share a market, so each connected
+        component of the candidate graph is scored, assigned and yielded on
+        its own, smallest first. Without blocking every pair is a candidate
+        and the whole universe is one component (nothing is yielded until
+        everything is scored). The union of all yields equals find_matches.
 
-            # Add match only if score meets threshold
-            if best_match and best_score >= threshold and best_index >= 0:
-                matches.append((best_match, p_market, best_score))
-                used_kalshi_indices.add(best_index)
+        Args:
+            kalshi_markets: List of Kalshi markets (search pool)
+            poly_markets: List of Polymarket markets (source)
+            threshold: Minimum similarity score to consider a match (0-1)
 
-                # Log high-quality matches
-                if best_score >= 0.8:
-                    p_title = p_market.get("question", p_market.get("title", ""))[:50]
-                    k_title = best_match.get("title", "")[:50]
-                    print(f"  ✓ Match {len(matches)}: {p_title}... = {k_title}... (score: {best_score:.2f})")
+        Yields:
+            Tuples: (kalshi_market, poly_market, similarity_score), in no global order
+        """
+        self.prepare_markets(kalshi_markets, poly_markets)
 
-        # Sort by similarity score (highest first)
-        matches.sort(key=lambda x: x[2], reverse=True)
+        candidates = self.candidate_pairs(kalshi_markets, poly_markets)
+        if candidates is None:
+            components = [
+                ((k_idx, p_idx) for p_idx in range(len(poly_markets)) for k_idx in range(len(kalshi_markets)))
+            ]
+        else:
+            total = len(kalshi_markets) * len(poly_markets)
+            components = sorted(pair_components(candidates), key=len)
+            print(f"  Blocking kept {len(candidates)} of {total} pairs in {len(components)} components")
+
+        for pairs in components:
+            scores = {}
+            for k_idx, p_idx in pairs:
+                score = self.compute_similarity(kalshi_markets[k_idx], poly_markets[p_idx])
+                if score > 0:
+                    scores[(k_idx, p_idx)] = score
+            yield from self.assign_matches(kalshi_markets, poly_markets, scores, threshold)
+
+        self.optimize_gate_order()
+
+    def find_matches(
+        self,
+        kalshi_markets: List[Dict],
+        poly_markets: List[Dict],
+        threshold: float = 0.5
+    ) -> List[Tuple[Dict, Dict, float]]:
+        """
+        Find matching markets by searching Kalshi for each Polymarket market
+
+        Strategy:
+        1. Use Polymarket as source (has specific, non-duplicate markets)
+        2. Score Polymarket/Kalshi pairs (all pairs, or those kept by blocking)
+        3. Keep pairs with score >= threshold
+        4. Assign one-to-one per connected component (iter_matches, assign_matches)
+
+        Args:
+            kalshi_markets: List of Kalshi markets (search pool)
+            poly_markets: List of Polymarket markets (source)
+            threshold: Minimum similarity score to consider a match (0-1)
+
+        Returns:
+            List of tuples: (kalshi_market, poly_market, similarity_score)
+        """
+        print(f"🔍 Searching {len(kalshi_markets)} Kalshi markets for {len(poly_markets)} Polymarket markets...")
+
+        matches = self.sort_matches(self.iter_matches(kalshi_markets, poly_markets, threshold))
 
         print(f"✓ Found {len(matches)} matched markets from {len(poly_markets)} Polymarket markets (threshold: {threshold})")
 
@@ -594,3 +1165,84 @@ class MarketMatcher:
                 filtered.append(market)
 
         return filtered
+
+
+class TitleFeatures:
+    """Per-title features for the similarity cascade, each computed on first use"""
+
+    def __init__(self, matcher: MarketMatcher, title: str):
+        self.matcher = matcher
+        self.title = title
+
+    @cached_property
+    def topic_mask(self) -> int:
+        return self.matcher.extract_topic_mask(self.title)
+
+    @cached_property
+    def polarity(self) -> str:
+        return self.matcher.extract_polarity(self.title)
+
+    @cached_property
+    def proper_nouns(self) -> Set[str]:
+        return self.matcher.extract_proper_nouns(self.title)
+
+    @cached_property
+    def person_names(self) -> Set[str]:
+        return {word for word in self.proper_nouns if word not in self.matcher.non_person_words}
+
+    @cached_property
+    def capitalized_words(self) -> Set[str]:
+        return set(re.findall(r'\b[A-Z][a-z]+', self.title))
+
+    @cached_property
+    def keywords(self) -> Set[str]:
+        return self.matcher.extract_keywords(self.title)
+
+    @cached_property
+    def words(self) -> Set[str]:
+        return set(self.matcher.extract_words(self.title))
+
+    @cached_property
+    def threshold(self) -> Optional[ThresholdSpec]:
+        return self.matcher.threshold_parser.parse(self.title)
+
+    @cached_property
+    def participants(self) -> Set[str]:
+        return self.matcher.extract_match_participants(self.title)
+
+
+class TopicBlocker:
+    """Blocking filter that applies the topic bitmask gate to whole arrays of markets"""
+
+    # A pair's candidacy depends on its two markets only (see MatcherSession)
+    pairwise_local = True
+
+    def __init__(self, matcher: MarketMatcher, block_size: int = 2048):
+        """
+        Args:
+            matcher: MarketMatcher providing the compiled topic rules
+            block_size: Kalshi rows evaluated per vectorized block
+        """
+        self.matcher = matcher
+        self.block_size = block_size
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Set[Tuple[int, int]]:
+        """
+        Pairs that pass the topic overlap/incompatibility gate
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs
+        """
+        kalshi_masks = self.matcher.topic_masks(kalshi_markets, "title")
+        poly_masks = self.matcher.topic_masks(poly_markets, "question")
+
+        pairs = set()
+        for start in range(0, len(kalshi_masks), self.block_size):
+            allowed = self.matcher.topic_compatibility(kalshi_masks[start:start + self.block_size], poly_masks)
+            rows, cols = np.nonzero(allowed)
+            pairs.update(zip((rows + start).tolist(), cols.tolist()))
+        return pairs
@@ -0,0 +1,170 @@
+"""
+Market Search Module
+Inverted title-word index over both venues for fast "find this market on the other venue" lookups
+"""
+import heapq
+import math
+import time
+from typing import List, Dict, Tuple, Set, Optional, Union
+
+from market_matcher import MarketMatcher
+
+
+class MarketSearchIndex:
+    """
+    Word postings per venue with bounded top-k retrieval
+
+    A query only scores markets sharing its rarest title words: postings are
+    merged rarest first into IDF-weighted overlap counts, the best
+    max_candidates survive, and MarketMatcher.search_top_k scores those with
+    the full similarity cascade while keeping a heap of the best k.
+    """
+
+    def __init__(
+        self,
+        matcher: Optional[MarketMatcher] = None,
+        max_candidates: int = 256,
+        common_word_fraction: float = 0.05
+    ):
+        """
+        Args:
+            matcher: MarketMatcher used for word extraction and scoring
+            max_candidates: Markets scored per query (highest word overlap first)
+            common_word_fraction: Words in more than this share of a venue's markets
+                only re-rank candidates found through rarer words
+        """
+        self.matcher = matcher or MarketMatcher()
+        self.max_candidates = max_candidates
+        self.common_word_fraction = common_word_fraction
+
+        self.kalshi_markets: List[Dict] = []
+        self.poly_markets: List[Dict] = []
+        self._kalshi_postings: Dict[str, List[int]] = {}
+        self._poly_postings: Dict[str, List[int]] = {}
+        self._kalshi_words: List[Set[str]] = []
+        self._poly_words: List[Set[str]] = []
+
+        self.last_stats: Dict = {}
+
+    def _index(self, markets: List[Dict], title_field: str) -> Tuple[Dict[str, List[int]], List[Set[str]]]:
+        postings: Dict[str, List[int]] = {}
+        words_per_market = []
+        for idx, market in enumerate(markets):
+            title = market.get(title_field, market.get("title", ""))
+            words = self.matcher.title_features(title).words if title else set()
+            words_per_market.append(words)
+            for word in words:
+                postings.setdefault(word, []).append(idx)
+        return postings, words_per_market
+
+    def build(self, kalshi_markets: List[Dict], poly_markets: List[Dict]):
+        """
+        (Re)index both venues
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+        """
+        start = time.time()
+        self.kalshi_markets = list(kalshi_markets)
+        self.poly_markets = list(poly_markets)
+        self._kalshi_postings, self._kalshi_words = self._index(self.kalshi_markets, "title")
+        self._poly_postings, self._poly_words = self._index(self.poly_markets, "question")
+        self.last_stats = {
+            "kalshi_markets": len(self.kalshi_markets),
+            "poly_markets": len(self.poly_markets),
+            "build_seconds": time.time() - start,
+        }
+
+    def candidates(
+        self,
+        words: Set[str],
+        postings: Dict[str, List[int]],
+        words_per_market: List[Set[str]]
+    ) -> List[int]:
+        """
+        Indices of the markets sharing the most (IDF-weighted) words with a query
+
+        Args:
+            words: Query title words
+            postings: Word -> market indices for the venue being searched
+            words_per_market: Title words of each market in that venue
+
+        Returns:
+            Up to max_candidates indices, best overlap first
+        """
+        n = len(words_per_market)
+        present = sorted((len(postings[w]), w) for w in words if w in postings)
+        if not present:
+            return []
+
+        common_limit = max(1, int(n * self.common_word_fraction))
+        weights: Dict[int, float] = {}
+        for position, (df, word) in enumerate(present):
+            idf = math.log(1 + n / df)
+            if df <= common_limit or position == 0:
+                for idx in postings[word]:
+                    weights[idx] = weights.get(idx, 0.0) + idf
+            else:
+                # Common word: boost markets already found, don't widen the set
+                for idx in weights:
+                    if word in words_per_market[idx]:
+                        weights[idx] += idf
+
+        if len(weights) <= self.max_candidates:
+            return sorted(weights, key=lambda idx: (-weights[idx], idx))
+        return heapq.nsmallest(self.max_candidates, weights, key=lambda idx: (-weights[idx], idx))
+
+    def _search(
+        self,
+        query: Union[str, Dict],
+        k: int,
+        query_venue: str
+    ) -> List[Tuple[Dict, float]]:
+        start = time.perf_counter()
+        if query_venue == "kalshi":
+            query_market = {"title": query} if isinstance(query, str) else query
+            title = query_market.get("title", "")
+            markets, postings, words_per_market = self.poly_markets, self._poly_postings, self._poly_words
+        else:
+            query_market = {"question": query} if isinstance(query, str) else query
+            title = query_market.get("question", query_market.get("title", ""))
+            markets, postings, words_per_market = self.kalshi_markets, self._kalshi_postings, self._kalshi_words
+
+        words = self.matcher.title_features(title).words if title else set()
+        candidate_indices = self.candidates(words, postings, words_per_market)
+        results = self.matcher.search_top_k(
+            query_market, (markets[idx] for idx in candidate_indices), k=k, query_venue=query_venue
+        )
+
+        self.last_stats.update({
+            "candidates": len(candidate_indices),
+            "query_ms": (time.perf_counter() - start) * 1000,
+        })
+        return results
+
+    def search_polymarket(self, query: Union[str, Dict], k: int = 5) -> List[Tuple[Dict, float]]:
+        """
+        Top-k Polymarket markets for a Kalshi market or an ad-hoc title
+
+        Args:
+            query: Kalshi market dict, or a title string
+            k: Number of results
+
+        Returns:
+            Up to k (poly_market, similarity_score) tuples, best first
+        """
+        return self._search(query, k, "kalshi")
+
+    def search_kalshi(self, query: Union[str, Dict], k: int = 5) -> List[Tuple[Dict, float]]:
+        """
+        Top-k Kalshi markets for a Polymarket market or an ad-hoc title
+
+        Args:
+            query: Polymarket market dict, or a title string
+            k: Number of results
+
+        Returns:
+            Up to k (kalshi_market, similarity_score) tuples, best first
+        """
+        return self._search(query, k, "polymarket")
@@ -0,0 +1,275 @@
+"""
+Market Store Module
+Every extracted market from both venues in SQLite, with an FTS5 index for ranked search and candidate lookup
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Tuple, Optional, Set, Iterable
+
+# bm25 weights of the indexed columns: title, subtitle, question, description
+BM25_WEIGHTS = (10.0, 3.0, 10.0, 1.0)
+
+
+def fts_query(text: str, prefix: bool = True, any_term: bool = False) -> str:
+    """
+    FTS5 MATCH expression for free text
+
+    Every word is quoted, so user input can never be read as query syntax.
+
+    Args:
+        text: Search box text or a market title
+        prefix: Let the last word match as a prefix (search-as-you-type)
+        any_term: OR the words instead of requiring all of them
+
+    Returns:
+        Query string ('' when the text has no words)
+    """
+    words = re.findall(r"\w+", text.lower())
+    terms = [f'"{word}"' for word in words]
+    if prefix and terms:
+        terms[-1] += "*"
+    return (" OR " if any_term else " ").join(terms)
+
+
+def _text_fields(venue: str, market: Dict) -> Tuple[str, str, str, str, str]:
+    """(market_id, title, subtitle, question, description) of an extracted market"""
+    if venue == "kalshi":
+        return market.get("ticker", ""), market.get("title", ""), market.get("subtitle", ""), "", \
+            market.get("event_title", "")
+    return market.get("condition_id", ""), market.get("event_title", ""), "", market.get("question", ""), \
+        market.get("description", "")
+
+
+class MarketStore:
+    """
+    SQLite table of markets (one row per venue and id, last seen version) with an
+    external-content FTS5 index kept in sync by triggers
+
+    Re-storing a market only reindexes it when one of its text columns changed,
+    so refreshing prices every minute costs no FTS work.
+    """
+
+    def __init__(self, path: str = "market_store.sqlite3"):
+        """
+        Open (or create) the store
+
+        Args:
+            path: SQLite database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS markets (
+                id INTEGER PRIMARY KEY,
+                venue TEXT NOT NULL,
+                market_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                subtitle TEXT NOT NULL,
+                question TEXT NOT NULL,
+                description TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (venue, market_id)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS markets_fts USING fts5(
+                title, subtitle, question, description,
+                content='markets', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS markets_ai AFTER INSERT ON markets BEGIN
+                INSERT INTO markets_fts(rowid, title, subtitle, question, description)
+                VALUES (new.id, new.title, new.subtitle, new.question, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS markets_ad AFTER DELETE ON markets BEGIN
+                INSERT INTO markets_fts(markets_fts, rowid, title, subtitle, question, description)
+                VALUES ('delete', old.id, old.title, old.subtitle, old.question, old.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS markets_au AFTER UPDATE ON markets
+            WHEN old.title IS NOT new.title OR old.subtitle IS NOT new.subtitle
+              OR old.question IS NOT new.question OR old.description IS NOT new.description
+            BEGIN
+                INSERT INTO markets_fts(markets_fts, rowid, title, subtitle, question, description)
+                VALUES ('delete', old.id, old.title, old.subtitle, old.question, old.description);
+                INSERT INTO markets_fts(rowid, title, subtitle, question, description)
+                VALUES (new.id, new.title, new.subtitle, new.question, new.description);
+            END;
+            CREATE TEMP TABLE IF NOT EXISTS within_ids (
+                venue TEXT NOT NULL,
+                market_id TEXT NOT NULL,
+                PRIMARY KEY (venue, market_id)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+        self._within: Dict[Optional[str], frozenset] = {}
+
+    def upsert(self, kalshi_markets: Iterable[Dict], poly_markets: Iterable[Dict], now: Optional[float] = None) -> int:
+        """
+        Store the latest version of every market
+
+        Args:
+            kalshi_markets: Extracted Kalshi markets
+            poly_markets: Extracted Polymarket markets
+            now: Time the markets were fetched (defaults to now)
+
+        Returns:
+            Number of rows written
+        """
+        now = time.time() if now is None else now
+        rows = []
+        for venue, markets in (("kalshi", kalshi_markets), ("polymarket", poly_markets)):
+            for market in markets:
+                market_id, title, subtitle, question, description = _text_fields(venue, market)
+                if market_id:
+                    rows.append((venue, market_id, title or "", subtitle or "", question or "", description or "",
+                                 json.dumps(market, default=str), now))
+        with self._lock:
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT INTO markets (venue, market_id, title, subtitle, question, description, data, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (venue, market_id) DO UPDATE SET
+                        title = excluded.title, subtitle = excluded.subtitle,
+                        question = excluded.question, description = excluded.description,
+                        data = excluded.data, updated_at = excluded.updated_at
+                """, rows)
+        return len(rows)
+
+    def count(self, venue: Optional[str] = None) -> int:
+        """Number of stored markets (of one venue, or all)"""
+        with self._lock:
+            if venue is None:
+                return self.conn.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM markets WHERE venue = ?", (venue,)).fetchone()[0]
+
+    def _match(self, match: str, venue: Optional[str], limit: int, within: Optional[Iterable[str]],
+               columns: str) -> List[tuple]:
+        """Rows of a MATCH expression, best bm25 first (caller holds the lock)"""
+        sql = f"""
+            SELECT {columns}, bm25(markets_fts, ?, ?, ?, ?) AS rank
+            FROM markets_fts JOIN markets m ON m.id = markets_fts.rowid
+        """
+        params: list = list(BM25_WEIGHTS)
+        if within is not None:
+            # Refilled only when the id set changes (candidate lookups reuse it per market)
+            within = frozenset(within)
+            if self._within.get(venue) != within:
+                self.conn.execute("DELETE FROM within_ids WHERE venue IS ?", (venue,))
+                self.conn.executemany("INSERT INTO within_ids VALUES (?, ?)",
+                                      [(venue, market_id) for market_id in within])
+                self._within[venue] = within
+                self.conn.commit()
+            sql += " JOIN within_ids w ON w.venue = m.venue AND w.market_id = m.market_id"
+        sql += " WHERE markets_fts MATCH ?"
+        params.append(match)
+        if venue is not None:
+            sql += " AND m.venue = ?"
+            params.append(venue)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def search(self, query: str, venue: Optional[str] = None, limit: int = 50,
+               within: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Ranked full-text search over every stored market
+
+        Args:
+            query: Free text (all words must match; the last one as a prefix)
+            venue: 'kalshi', 'polymarket' or None for both
+            limit: Maximum results
+            within: Only these market ids (needs venue), e.g. the markets fetched this run
+
+        Returns:
+            Stored market dicts, best first, with 'venue', 'rank' (bm25, lower is better)
+            and 'last_seen' added
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._match(match, venue, limit, within, "m.venue, m.data, m.updated_at")
+        results = []
+        for row_venue, data, updated_at, rank in rows:
+            market = json.loads(data)
+            market.update(venue=row_venue, rank=rank, last_seen=updated_at)
+            results.append(market)
+        return results
+
+    def candidates(self, title: str, venue: str, limit: int = 10,
+                   within: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Ids of the markets of `venue` whose text best matches a title
+
+        Args:
+            title: Title of a market on the other venue
+            venue: Venue to look in
+            limit: Maximum candidates
+            within: Only these market ids
+
+        Returns:
+            Market ids, best first
+        """
+        match = fts_query(title, prefix=False, any_term=True)
+        if not match:
+            return []
+        with self._lock:
+            return [row[0] for row in self._match(match, venue, limit, within, "m.market_id")]
+
+
+class FTSCandidates:
+    """
+    Candidate generator for MarketMatcher.candidate_generators backed by a MarketStore
+
+    Each market's title is looked up (any word, bm25-ranked, so filler words
+    weigh little) in the other venue's FTS index, restricted to the markets
+    being matched, and the best `k` hits per market in both directions become
+    candidate pairs.
+    """
+
+    def __init__(self, store: MarketStore, k: int = 10):
+        """
+        Args:
+            store: MarketStore (the markets being matched are upserted into it)
+            k: Candidates kept per market and direction
+        """
+        self.store = store
+        self.k = k
+        self.last_stats: Dict = {}
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Set[Tuple[int, int]]:
+        """
+        Pairs whose titles retrieve each other from the FTS index
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs
+        """
+        start = time.time()
+        self.store.upsert(kalshi_markets, poly_markets)
+        kalshi_index = {m.get("ticker", ""): i for i, m in enumerate(kalshi_markets)}
+        poly_index = {m.get("condition_id", ""): i for i, m in enumerate(poly_markets)}
+
+        candidates = set()
+        for k_idx, market in enumerate(kalshi_markets):
+            title = market.get("title", "")
+            for poly_id in self.store.candidates(title, "polymarket", self.k, poly_index):
+                candidates.add((k_idx, poly_index[poly_id]))
+        for p_idx, market in enumerate(poly_markets):
+            title = market.get("question", market.get("title", ""))
+            for ticker in self.store.candidates(title, "kalshi", self.k, kalshi_index):
+                candidates.add((kalshi_index[ticker], p_idx))
+
+        self.last_stats = {
+            "candidates": len(candidates),
+            "total_pairs": len(kalshi_markets) * len(poly_markets),
+            "seconds": time.time() - start,
+        }
+        return candidates
@@ -0,0 +1,136 @@
+"""
+Market Structure Module
+Tags markets that can never match a single market on the other venue (combos/parlays) so they skip matching
+"""
+import re
+import time
+from typing import List, Dict, Tuple
+
+# Structures a single Polymarket market can correspond to
+SINGLE = "single"
+COMBO = "combo"  # Kalshi multivariate event (MVE) market: several legs settled together
+UNTITLED = "untitled"
+MATCHABLE = {SINGLE}
+
+# Kalshi MVE tickers and collections all start with KXMVE
+MVE_PREFIX = "KXMVE"
+
+# Combo titles are comma-joined legs: "yes Chiefs,yes Bills,no Over 45.5 points scored"
+_LEG_RE = re.compile(r"^\s*(?:yes|no)\s+\S", re.IGNORECASE)
+
+
+def count_legs(title: str) -> int:
+    """Number of 'yes X' / 'no X' legs in a comma-joined combo title"""
+    return sum(1 for part in title.split(",") if _LEG_RE.match(part))
+
+
+def classify_kalshi(market: Dict) -> str:
+    """
+    Structure of a Kalshi market (raw API dict or extracted market)
+
+    Args:
+        market: Market dict with 'ticker', 'title' and optionally
+                'mve_collection_ticker' / 'mve_selected_legs'
+
+    Returns:
+        SINGLE, COMBO or UNTITLED
+    """
+    if (market.get("mve_collection_ticker") or market.get("mve_selected_legs")
+            or str(market.get("ticker", "")).upper().startswith(MVE_PREFIX)):
+        return COMBO
+    title = market.get("title", "") or ""
+    if not title.strip():
+        return UNTITLED
+    if count_legs(title) >= 2:
+        return COMBO
+    return SINGLE
+
+
+def market_structure(market: Dict) -> str:
+    """Structure tagged at extraction, classifying markets recorded before the tag existed"""
+    return market.get("structure") or classify_kalshi(market)
+
+
+def split_matchable(markets: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Route structurally unmatchable markets out of the candidate pool
+
+    Args:
+        markets: Extracted Kalshi markets
+
+    Returns:
+        (matchable markets, pruned markets), both in input order
+    """
+    kept, pruned = [], []
+    for market in markets:
+        (kept if market_structure(market) in MATCHABLE else pruned).append(market)
+    return kept, pruned
+
+
+def prune_report(kalshi_markets: List[Dict], poly_markets: List[Dict], threshold: float = 0.5,
+                 matcher=None) -> Dict:
+    """
+    Pool reduction from pruning combo markets, and matching time saved
+
+    The pruned pool is matched first, so the per-title caches it warms only
+    speed up the full run and seconds_saved is a lower bound.
+
+    Args:
+        kalshi_markets: Recorded Kalshi markets
+        poly_markets: Recorded Polymarket markets
+        threshold: Minimum similarity score to consider a match (0-1)
+        matcher: MarketMatcher to time (None = a fresh MarketMatcher)
+
+    Returns:
+        Dict with pool sizes per structure, match counts and seconds for both runs
+    """
+    if matcher is None:
+        from market_matcher import MarketMatcher
+        matcher = MarketMatcher()
+
+    kept, pruned = split_matchable(kalshi_markets)
+    structures: Dict[str, int] = {}
+    for market in kalshi_markets:
+        structure = market_structure(market)
+        structures[structure] = structures.get(structure, 0) + 1
+
+    start = time.time()
+    kept_matches = matcher.find_matches(kept, poly_markets, threshold)
+    kept_seconds = time.time() - start
+
+    start = time.time()
+    full_matches = matcher.find_matches(kalshi_markets, poly_markets, threshold)
+    full_seconds = time.time() - start
+
+    lost = {id(k) for k, _, _ in full_matches} - {id(k) for k in kept}
+    report = {
+        "kalshi_total": len(kalshi_markets),
+        "kalshi_kept": len(kept),
+        "kalshi_pruned": len(pruned),
+        "structures": structures,
+        "matches_full": len(full_matches),
+        "matches_pruned": len(kept_matches),
+        "matches_lost": len(lost),
+        "seconds_full": full_seconds,
+        "seconds_pruned": kept_seconds,
+        "seconds_saved": full_seconds - kept_seconds,
+    }
+
+    ratio = len(pruned) / len(kalshi_markets) if kalshi_markets else 0.0
+    print(f"Kalshi pool: {len(kalshi_markets)} → {len(kept)} ({len(pruned)} pruned, {ratio:.1%}) {structures}")
+    print(f"Matching: {full_seconds:.2f}s → {kept_seconds:.2f}s (saved {report['seconds_saved']:.2f}s), "
+          f"matches {len(full_matches)} → {len(kept_matches)} ({len(lost)} lost to pruning)")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from snapshots import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Pool reduction and time saved by pruning combo markets")
+    parser.add_argument("snapshot", help="Snapshot file written by snapshots.py")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.snapshot)
+    prune_report(snapshot["kalshi"], snapshot["polymarket"], threshold=args.threshold)
@@ -0,0 +1,481 @@
+"""
+Matcher Session Module
+Keeps pairwise similarity scores between refreshes so only churned markets are rescored
+"""
+import threading
+import time
+from typing import List, Dict, Tuple, Optional, Set, Iterator
+
+from assignment import pair_components
+from market_matcher import MarketMatcher
+from score_cache import ScoreCache
+
+
+class MatcherSession:
+    """Stateful wrapper around MarketMatcher that rescores only added, removed or retitled markets"""
+
+    def __init__(self, matcher: Optional[MarketMatcher] = None, score_cache: Optional[ScoreCache] = None):
+        """
+        Args:
+            matcher: MarketMatcher used for scoring and assignment
+            score_cache: Optional persistent cache consulted before scoring a pair
+        """
+        self.matcher = matcher or MarketMatcher()
+        self.score_cache = score_cache
+
+        # Signatures (title, category) seen on the previous refresh, keyed by market id
+        self._kalshi_signatures: Dict[str, Tuple[str, str]] = {}
+        self._poly_signatures: Dict[str, Tuple[str, str]] = {}
+        # prepare_markets() annotations ("entities") carried over to the fresh dicts of unchanged markets
+        self._kalshi_entities: Dict[str, Dict] = {}
+        self._poly_entities: Dict[str, Dict] = {}
+
+        # Sparse score matrix: only non-zero scores are kept, indexed both ways
+        self._rows: Dict[str, Dict[str, float]] = {}  # kalshi id -> {poly id: score}
+        self._cols: Dict[str, Set[str]] = {}  # poly id -> {kalshi ids with a score}
+
+        # Whether the previous refresh used the matcher's blocking (None = no refresh yet)
+        self._blocked: Optional[bool] = None
+        # Rules version the cached scores were computed under
+        self._rules_version: Optional[str] = None
+
+        # Blocked mode: candidate graph indexed both ways, its connected components
+        # and each component's assigned matches as (kalshi id, poly id, score)
+        self._candidates_by_kalshi: Dict[str, Set[str]] = {}
+        self._candidates_by_poly: Dict[str, Set[str]] = {}
+        self._component_of: Dict[Tuple[str, str], int] = {}  # ("k"/"p", id) -> component id
+        self._components: Dict[int, Tuple[List[Tuple[str, str]], List[Tuple[str, str, float]]]] = {}
+        self._next_component = 0
+        # (threshold, assignment method) the cached component matches were assigned with
+        self._assignment_key: Optional[Tuple[float, str]] = None
+
+        self._lock = threading.Lock()
+        self.last_stats: Dict = {}
+
+    def reset(self):
+        """Forget all cached scores (next refresh rescores everything)"""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._kalshi_signatures = {}
+        self._poly_signatures = {}
+        self._kalshi_entities = {}
+        self._poly_entities = {}
+        self._rows = {}
+        self._cols = {}
+        self._candidates_by_kalshi = {}
+        self._candidates_by_poly = {}
+        self._component_of = {}
+        self._components = {}
+        self._assignment_key = None
+
+    def _drop_kalshi(self, k_id: str):
+        for p_id in self._rows.pop(k_id, {}):
+            self._cols.get(p_id, set()).discard(k_id)
+
+    def _drop_poly(self, p_id: str):
+        for k_id in self._cols.pop(p_id, set()):
+            self._rows.get(k_id, {}).pop(p_id, None)
+
+    def _drop_candidates(self, k_ids: Set[str], p_ids: Set[str]) -> Set[Tuple[str, str]]:
+        """Remove candidate pairs of the given markets; returns every node that lost an edge"""
+        touched = set()
+        for k_id in k_ids:
+            touched.add(("k", k_id))
+            for p_id in self._candidates_by_kalshi.pop(k_id, set()):
+                touched.add(("p", p_id))
+                partners = self._candidates_by_poly[p_id]
+                partners.discard(k_id)
+                if not partners:
+                    del self._candidates_by_poly[p_id]
+        for p_id in p_ids:
+            touched.add(("p", p_id))
+            for k_id in self._candidates_by_poly.pop(p_id, set()):
+                touched.add(("k", k_id))
+                partners = self._candidates_by_kalshi[k_id]
+                partners.discard(p_id)
+                if not partners:
+                    del self._candidates_by_kalshi[k_id]
+        return touched
+
+    def _propose_candidates(
+        self,
+        kalshi_ids: List[str],
+        poly_ids: List[str],
+        kalshi_by_id: Dict[str, Dict],
+        poly_by_id: Dict[str, Dict]
+    ) -> List[Tuple[str, str]]:
+        """Run the matcher's blocking on a slice of markets and add the new (kalshi id, poly id) pairs"""
+        if not kalshi_ids or not poly_ids:
+            return []
+        candidates = self.matcher.candidate_pairs([kalshi_by_id[k_id] for k_id in kalshi_ids],
+                                                  [poly_by_id[p_id] for p_id in poly_ids])
+        added = []
+        for k_idx, p_idx in candidates:
+            k_id, p_id = kalshi_ids[k_idx], poly_ids[p_idx]
+            partners = self._candidates_by_kalshi.setdefault(k_id, set())
+            if p_id not in partners:
+                partners.add(p_id)
+                self._candidates_by_poly.setdefault(p_id, set()).add(k_id)
+                added.append((k_id, p_id))
+        return added
+
+    def _reblock(
+        self,
+        kalshi_by_id: Dict[str, Dict],
+        poly_by_id: Dict[str, Dict],
+        touched: Set[Tuple[str, str]]
+    ) -> List[Tuple[str, str]]:
+        """
+        Run the matcher's blocking on every current market and diff the candidate graph
+
+        Pairs that left the candidates are removed, with their scores, and their
+        ends touched; returns the new (kalshi id, poly id) pairs.
+        """
+        kalshi_ids = list(kalshi_by_id)
+        poly_ids = list(poly_by_id)
+        candidates = self.matcher.candidate_pairs([kalshi_by_id[k_id] for k_id in kalshi_ids],
+                                                  [poly_by_id[p_id] for p_id in poly_ids])
+        current = {(kalshi_ids[k_idx], poly_ids[p_idx]) for k_idx, p_idx in candidates}
+
+        for k_id, partners in list(self._candidates_by_kalshi.items()):
+            for p_id in [p_id for p_id in partners if (k_id, p_id) not in current]:
+                partners.discard(p_id)
+                poly_partners = self._candidates_by_poly[p_id]
+                poly_partners.discard(k_id)
+                if not poly_partners:
+                    del self._candidates_by_poly[p_id]
+                self._rows.get(k_id, {}).pop(p_id, None)
+                self._cols.get(p_id, set()).discard(k_id)
+                touched.add(("k", k_id))
+                touched.add(("p", p_id))
+            if not partners:
+                del self._candidates_by_kalshi[k_id]
+
+        added = []
+        for k_id, p_id in current:
+            partners = self._candidates_by_kalshi.setdefault(k_id, set())
+            if p_id not in partners:
+                partners.add(p_id)
+                self._candidates_by_poly.setdefault(p_id, set()).add(k_id)
+                added.append((k_id, p_id))
+        return added
+
+    def _recompute_components(self, touched: Set[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """
+        Rebuild the candidate-graph components containing any touched node
+
+        Components without a touched node keep their id and cached matches.
+        The nodes of the affected components are closed under adjacency (every
+        added or removed edge has both ends touched), so their current edges
+        are exactly the new components. Returns those, smallest first.
+        """
+        region = set()
+        for node in touched:
+            component_id = self._component_of.get(node)
+            if component_id is not None and component_id in self._components:
+                pairs, _ = self._components.pop(component_id)
+                region.update(("k", k_id) for k_id, _ in pairs)
+                region.update(("p", p_id) for _, p_id in pairs)
+        region |= touched
+        for node in region:
+            self._component_of.pop(node, None)
+
+        pairs = {(k_id, p_id) for side, k_id in region if side == "k"
+                 for p_id in self._candidates_by_kalshi.get(k_id, ())}
+        components = sorted(pair_components(pairs), key=len)
+        for component in components:
+            component_id = self._next_component
+            self._next_component += 1
+            self._components[component_id] = (component, [])
+            for k_id, p_id in component:
+                self._component_of[("k", k_id)] = component_id
+                self._component_of[("p", p_id)] = component_id
+        return components
+
+    def _store(self, k_id: str, p_id: str, score: float):
+        if score > 0:
+            self._rows.setdefault(k_id, {})[p_id] = score
+            self._cols.setdefault(p_id, set()).add(k_id)
+
+    def _score_pending(
+        self,
+        pending: List[Tuple[str, str]],
+        kalshi_by_id: Dict[str, Dict],
+        poly_by_id: Dict[str, Dict],
+        kalshi_signatures: Dict[str, Tuple[str, str]],
+        poly_signatures: Dict[str, Tuple[str, str]]
+    ) -> int:
+        """Score (kalshi_id, poly_id) pairs, reusing the persistent cache; returns cache hits"""
+        cached = {}
+        hashes = {}
+        if self.score_cache is not None and pending:
+            for k_id, p_id in pending:
+                hashes[(k_id, p_id)] = ScoreCache.titles_hash(kalshi_signatures[k_id], poly_signatures[p_id])
+            cached = self.score_cache.get_many((k_id, p_id, h) for (k_id, p_id), h in hashes.items())
+
+        computed = []
+        for k_id, p_id in pending:
+            score = cached.get((k_id, p_id))
+            if score is None:
+                score = self.matcher.compute_similarity(kalshi_by_id[k_id], poly_by_id[p_id])
+                computed.append((k_id, p_id, score))
+            self._store(k_id, p_id, score)
+
+        if self.score_cache is not None and computed:
+            self.score_cache.put_many((k_id, p_id, hashes[(k_id, p_id)], score) for k_id, p_id, score in computed)
+
+        return len(cached)
+
+    @staticmethod
+    def _diff(old: Dict[str, Tuple[str, str]], new: Dict[str, Tuple[str, str]]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """Return (added, removed, changed) ids between two signature maps"""
+        added = new.keys() - old.keys()
+        removed = old.keys() - new.keys()
+        changed = {key for key in new.keys() & old.keys() if new[key] != old[key]}
+        return set(added), set(removed), changed
+
+    def _component_scores(
+        self,
+        component: Optional[List[Tuple[str, str]]],
+        kalshi_index: Dict[str, List[int]],
+        poly_index: Dict[str, List[int]]
+    ) -> Dict[Tuple[int, int], float]:
+        """Map cached scores of a component (None = every pair) back onto list indices"""
+        scores = {}
+        if component is None:
+            pairs = ((k_id, p_id, score) for k_id in kalshi_index for p_id, score in self._rows.get(k_id, {}).items())
+        else:
+            pairs = (
+                (k_id, p_id, self._rows[k_id][p_id])
+                for k_id, p_id in component
+                if p_id in self._rows.get(k_id, {})
+            )
+        for k_id, p_id, score in pairs:
+            for k_idx in kalshi_index.get(k_id, []):
+                for p_idx in poly_index.get(p_id, []):
+                    scores[(k_idx, p_idx)] = score
+        return scores
+
+    def refresh(
+        self,
+        kalshi_markets: List[Dict],
+        poly_markets: List[Dict],
+        threshold: float = 0.5
+    ) -> List[Tuple[Dict, Dict, float]]:
+        """
+        Match the current market lists, rescoring only pairs touched by churn
+
+        Markets whose id and (title, category) are unchanged since the previous
+        refresh keep their cached scores; only price fields are read fresh.
+
+        Args:
+            kalshi_markets: Current list of Kalshi markets
+            poly_markets: Current list of Polymarket markets
+            threshold: Minimum similarity score to consider a match (0-1)
+
+        Returns:
+            List of tuples: (kalshi_market, poly_market, similarity_score)
+        """
+        return self.matcher.sort_matches(self.iter_refresh(kalshi_markets, poly_markets, threshold))
+
+    def iter_refresh(
+        self,
+        kalshi_markets: List[Dict],
+        poly_markets: List[Dict],
+        threshold: float = 0.5
+    ) -> Iterator[Tuple[Dict, Dict, float]]:
+        """
+        Streaming refresh: yield matches as soon as their assignment is final
+
+        Pending pairs are scored one connected component of the candidate graph
+        at a time (smallest first), and each component's matches are yielded
+        right after it is assigned. Without blocking there is a single
+        component. With blocking, only components whose candidate pairs changed
+        are reassigned; the matches of the others are yielded first, with fresh
+        market dicts. When every blocking stage is pairwise-local
+        (MarketMatcher.pairwise_local_blocking), only churned markets go through
+        the candidate stages. Top-k and corpus-wide stages are re-run over the
+        whole universe, since a new market can displace the neighbours of an
+        unchanged one; only the pairs that entered or left are then rescored.
+        prepare_markets() only sees churned markets. A new rules version
+        drops every cached score.
+        The session lock is held until the generator is exhausted
+        or closed, and the new signatures are only committed at the end, so an
+        abandoned refresh is simply redone next time.
+
+        Args:
+            kalshi_markets: Current list of Kalshi markets
+            poly_markets: Current list of Polymarket markets
+            threshold: Minimum similarity score to consider a match (0-1)
+
+        Yields:
+            Tuples: (kalshi_market, poly_market, similarity_score), in no global order
+        """
+        with self._lock:
+            start = time.time()
+            matcher = self.matcher
+
+            # One pass per venue: id lookups, list positions and signatures
+            kalshi_by_id: Dict[str, Dict] = {}
+            kalshi_index: Dict[str, List[int]] = {}
+            kalshi_signatures: Dict[str, Tuple[str, str]] = {}
+            for k_idx, market in enumerate(kalshi_markets):
+                k_id = matcher.kalshi_id(market)
+                if k_id not in kalshi_by_id:
+                    kalshi_by_id[k_id] = market
+                    kalshi_index[k_id] = []
+                    kalshi_signatures[k_id] = matcher.kalshi_signature(market)
+                kalshi_index[k_id].append(k_idx)
+            poly_by_id: Dict[str, Dict] = {}
+            poly_index: Dict[str, List[int]] = {}
+            poly_signatures: Dict[str, Tuple[str, str]] = {}
+            for p_idx, market in enumerate(poly_markets):
+                p_id = matcher.poly_id(market)
+                if p_id not in poly_by_id:
+                    poly_by_id[p_id] = market
+                    poly_index[p_id] = []
+                    poly_signatures[p_id] = matcher.poly_signature(market)
+                poly_index[p_id].append(p_idx)
+
+            blocked = bool(matcher.candidate_generators or matcher.blocking_filters)
+            rules_version = matcher.rules_version
+
+            # Switching between blocked and exhaustive scoring, or new rules: start over
+            if blocked != self._blocked or rules_version != self._rules_version:
+                self._clear()
+            self._blocked = blocked
+            self._rules_version = rules_version
+
+            k_added, k_removed, k_changed = self._diff(self._kalshi_signatures, kalshi_signatures)
+            p_added, p_removed, p_changed = self._diff(self._poly_signatures, poly_signatures)
+
+            # Invalidate rows and columns of markets that left or were retitled
+            for k_id in k_removed | k_changed:
+                self._drop_kalshi(k_id)
+                self._kalshi_entities.pop(k_id, None)
+            for p_id in p_removed | p_changed:
+                self._drop_poly(p_id)
+                self._poly_entities.pop(p_id, None)
+
+            dirty_kalshi = k_added | k_changed
+            dirty_poly = p_added | p_changed
+
+            # Feature extraction for churned markets only; unchanged ones get last refresh's annotations
+            matcher.prepare_markets([m for k_id, m in kalshi_by_id.items() if k_id in dirty_kalshi],
+                                    [m for p_id, m in poly_by_id.items() if p_id in dirty_poly])
+            for by_id, dirty, entities in ((kalshi_by_id, dirty_kalshi, self._kalshi_entities),
+                                           (poly_by_id, dirty_poly, self._poly_entities)):
+                for market_id in dirty:
+                    if "entities" in by_id[market_id]:
+                        entities[market_id] = by_id[market_id]["entities"]
+                for market_id, market_entities in entities.items():
+                    if market_id not in dirty and market_id in by_id:
+                        by_id[market_id]["entities"] = market_entities
+
+            reused: List[Tuple[str, str, float]] = []
+            if not blocked:
+                # New/changed rows against every current column, then
+                # unchanged rows against new/changed columns
+                pending = [(k_id, p_id) for k_id in dirty_kalshi for p_id in poly_by_id]
+                pending.extend(
+                    (k_id, p_id) for p_id in dirty_poly for k_id in kalshi_by_id if k_id not in dirty_kalshi
+                )
+                components: List[Optional[List[Tuple[str, str]]]] = [None]
+                pending_by_component = [pending]
+            else:
+                touched = self._drop_candidates(k_removed | dirty_kalshi, p_removed | dirty_poly)
+                if matcher.pairwise_local_blocking:
+                    # Only churned markets go through blocking: their rows against every
+                    # current column, then unchanged rows against their columns. Pairs of
+                    # unchanged markets keep their candidacy.
+                    poly_ids = list(poly_by_id)
+                    pending = self._propose_candidates(
+                        [k_id for k_id in kalshi_by_id if k_id in dirty_kalshi], poly_ids, kalshi_by_id, poly_by_id
+                    )
+                    if dirty_poly:
+                        pending += self._propose_candidates(
+                            [k_id for k_id in kalshi_by_id if k_id not in dirty_kalshi],
+                            [p_id for p_id in poly_ids if p_id in dirty_poly], kalshi_by_id, poly_by_id
+                        )
+                else:
+                    # Top-k / corpus-wide stages: churn can displace the neighbours of
+                    # unchanged markets, so every market is re-blocked
+                    pending = self._reblock(kalshi_by_id, poly_by_id, touched)
+                for k_id, p_id in pending:
+                    touched.add(("k", k_id))
+                    touched.add(("p", p_id))
+
+                # Components of markets listed more than once are reassigned (their
+                # cached matches name one list entry per id)
+                touched.update(("k", k_id) for k_id, idxs in kalshi_index.items() if len(idxs) > 1)
+                touched.update(("p", p_id) for p_id, idxs in poly_index.items() if len(idxs) > 1)
+
+                assignment_key = (threshold, matcher.assignment_method)
+                if assignment_key != self._assignment_key:
+                    touched.update(self._component_of)
+                    touched.update(("k", k_id) for k_id in self._candidates_by_kalshi)
+                self._assignment_key = None  # set again once every component is assigned
+
+                components = self._recompute_components(touched)
+                for _, matches in self._components.values():
+                    reused.extend(matches)
+                position = {pair: i for i, component in enumerate(components) for pair in component}
+                pending_by_component = [[] for _ in components]
+                for pair in pending:
+                    pending_by_component[position[pair]].append(pair)
+
+            cache_hits = 0
+            match_count = 0
+            first_match_seconds = None
+            for k_id, p_id, score in reused:
+                match_count += 1
+                if first_match_seconds is None:
+                    first_match_seconds = time.time() - start
+                yield kalshi_by_id[k_id], poly_by_id[p_id], score
+            for component, component_pending in zip(components, pending_by_component):
+                cache_hits += self._score_pending(
+                    component_pending, kalshi_by_id, poly_by_id, kalshi_signatures, poly_signatures
+                )
+                scores = self._component_scores(component, kalshi_index, poly_index)
+                assigned = []
+                for match in matcher.assign_matches(kalshi_markets, poly_markets, scores, threshold):
+                    assigned.append((matcher.kalshi_id(match[0]), matcher.poly_id(match[1]), match[2]))
+                    match_count += 1
+                    if first_match_seconds is None:
+                        first_match_seconds = time.time() - start
+                    yield match
+                if component is not None:
+                    self._components[self._component_of[("k", component[0][0])]][1].extend(assigned)
+            pairs_scored = len(pending) - cache_hits
+
+            self._kalshi_signatures = kalshi_signatures
+            self._poly_signatures = poly_signatures
+            if blocked:
+                self._assignment_key = assignment_key
+
+            matcher.optimize_gate_order()
+
+            self.last_stats = {
+                "kalshi_added": len(k_added),
+                "kalshi_removed": len(k_removed),
+                "kalshi_changed": len(k_changed),
+                "poly_added": len(p_added),
+                "poly_removed": len(p_removed),
+                "poly_changed": len(p_changed),
+                "pairs_scored": pairs_scored,
+                "components_assigned": len(components),
+                "matches_reused": len(reused),
+                "cache_hits": cache_hits,
+                "cached_scores": sum(len(row) for row in self._rows.values()),
+                "first_match_seconds": first_match_seconds,
+                "seconds": time.time() - start,
+            }
+
+            print(
+                f"✓ Rescored {pairs_scored} pairs ({cache_hits} from score cache) "
+                f"(Kalshi +{len(k_added)}/-{len(k_removed)}/~{len(k_changed)}, "
+                f"Polymarket +{len(p_added)}/-{len(p_removed)}/~{len(p_changed)}) "
+                f"→ {match_count} matches (threshold: {threshold})"
+            )
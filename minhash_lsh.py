@@ -0,0 +1,279 @@
+"""
+MinHash / LSH Candidate Generation Module
+Finds near-duplicate market titles without scoring every Kalshi x Polymarket pair
+"""
+import time
+import zlib
+from typing import List, Dict, Tuple, Set, Optional, Iterable
+
+import numpy as np
+
+from market_matcher import MarketMatcher
+
+
+class MinHashLSH:
+    """
+    MinHash signatures over title word shingles with LSH banding
+
+    Two titles land in the same bucket of at least one band with probability
+    1 - (1 - J^rows)^bands, where J is the Jaccard similarity of their shingle
+    sets. More bands (fewer rows per band) raises recall and candidate count;
+    fewer bands makes the filter stricter and faster.
+    """
+
+    def __init__(
+        self,
+        matcher: Optional[MarketMatcher] = None,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 1,
+        max_bucket_size: Optional[int] = None,
+        seed: int = 1
+    ):
+        """
+        Args:
+            matcher: MarketMatcher whose stop-word filter defines title words
+            num_perm: Number of hash functions in each signature
+            bands: Number of LSH bands (num_perm must be divisible by bands)
+            shingle_size: Words per shingle (1 = word sets)
+            max_bucket_size: Skip buckets holding more markets than this (None = no limit)
+            seed: Seed for the hash function coefficients
+        """
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+        self.matcher = matcher or MarketMatcher()
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_bucket_size = max_bucket_size
+
+        # Multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32, a odd
+        rng = np.random.RandomState(seed)
+        self._a = (rng.randint(0, 2 ** 31, size=num_perm, dtype=np.uint64) << np.uint64(33)) | \
+            (rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = (rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64) << np.uint64(32)) | \
+            rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+        self._signature_cache: Dict[str, Optional[np.ndarray]] = {}
+        self.last_stats: Dict = {}
+
+    @classmethod
+    def for_threshold(cls, target_jaccard: float, num_perm: int = 128, **kwargs) -> "MinHashLSH":
+        """
+        Build an index whose banding S-curve crosses 50% near target_jaccard
+
+        Args:
+            target_jaccard: Jaccard similarity that should be a coin flip
+            num_perm: Number of hash functions in each signature
+            **kwargs: Passed through to the constructor
+
+        Returns:
+            MinHashLSH instance
+        """
+        best_bands, best_error = 1, float("inf")
+        for bands in range(1, num_perm + 1):
+            if num_perm % bands:
+                continue
+            rows = num_perm // bands
+            midpoint = (1 - 0.5 ** (1.0 / bands)) ** (1.0 / rows)
+            error = abs(midpoint - target_jaccard)
+            if error < best_error:
+                best_bands, best_error = bands, error
+        return cls(num_perm=num_perm, bands=best_bands, **kwargs)
+
+    @property
+    def pairwise_local(self) -> bool:
+        """Whether a pair's candidacy depends on its two titles only (bucket caps count the whole universe)"""
+        return not self.max_bucket_size
+
+    @staticmethod
+    def candidate_probability(jaccard: float, bands: int, rows: int) -> float:
+        """Probability that two titles with the given Jaccard share a bucket"""
+        return 1 - (1 - jaccard ** rows) ** bands
+
+    def shingles(self, title: str) -> Set[str]:
+        """
+        Word shingles of a title after the matcher's stop-word filter
+
+        Args:
+            title: Market title
+
+        Returns:
+            Set of space-joined word n-grams
+        """
+        words = self.matcher.extract_words(title)
+        n = self.shingle_size
+        if len(words) < n:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+    def signature(self, title: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a title (cached per title)
+
+        Args:
+            title: Market title
+
+        Returns:
+            uint32 array of length num_perm, or None if the title has no words
+        """
+        if title in self._signature_cache:
+            return self._signature_cache[title]
+
+        shingles = self.shingles(title)
+        if not shingles:
+            signature = None
+        else:
+            values = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+            hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+            signature = hashed.min(axis=0).astype(np.uint32)
+
+        self._signature_cache[title] = signature
+        return signature
+
+    @staticmethod
+    def estimate_jaccard(signature1: np.ndarray, signature2: np.ndarray) -> float:
+        """Estimate Jaccard similarity from two signatures"""
+        return float(np.mean(signature1 == signature2))
+
+    def _band_keys(self, titles: Iterable[str]) -> List[Optional[List[bytes]]]:
+        keys = []
+        for title in titles:
+            signature = self.signature(title)
+            if signature is None:
+                keys.append(None)
+                continue
+            bands = signature.reshape(self.bands, self.rows)
+            keys.append([bands[b].tobytes() for b in range(self.bands)])
+        return keys
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Set[Tuple[int, int]]:
+        """
+        Pairs whose titles collide in at least one LSH band
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs
+        """
+        start = time.time()
+        kalshi_keys = self._band_keys(m.get("title", "") for m in kalshi_markets)
+        poly_keys = self._band_keys(m.get("question", m.get("title", "")) for m in poly_markets)
+
+        candidates = set()
+        skipped = 0
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            for k_idx, keys in enumerate(kalshi_keys):
+                if keys is not None:
+                    buckets.setdefault(keys[band], []).append(k_idx)
+
+            poly_buckets: Dict[bytes, List[int]] = {}
+            for p_idx, keys in enumerate(poly_keys):
+                if keys is not None and keys[band] in buckets:
+                    poly_buckets.setdefault(keys[band], []).append(p_idx)
+
+            for key, p_indices in poly_buckets.items():
+                k_indices = buckets[key]
+                if self.max_bucket_size and len(k_indices) + len(p_indices) > self.max_bucket_size:
+                    skipped += 1
+                    continue
+                candidates.update((k_idx, p_idx) for k_idx in k_indices for p_idx in p_indices)
+
+        # Keep the title cache bounded to the current universe
+        if len(self._signature_cache) > 4 * (len(kalshi_markets) + len(poly_markets)) + 1000:
+            self._signature_cache = {}
+
+        self.last_stats = {
+            "candidates": len(candidates),
+            "total_pairs": len(kalshi_markets) * len(poly_markets),
+            "skipped_buckets": skipped,
+            "seconds": time.time() - start,
+        }
+        return candidates
+
+
+def recall_report(
+    kalshi_markets: List[Dict],
+    poly_markets: List[Dict],
+    configs: Iterable[Tuple[int, int]] = ((64, 2), (32, 4), (16, 8), (8, 16)),
+    threshold: float = 0.5,
+    matcher: Optional[MarketMatcher] = None,
+    shingle_size: int = 1
+) -> List[Dict]:
+    """
+    Compare LSH candidates against exhaustive compute_similarity scoring
+
+    Args:
+        kalshi_markets: Recorded Kalshi markets
+        poly_markets: Recorded Polymarket markets
+        configs: (bands, rows) banding settings to try
+        threshold: Score at which an exhaustive pair counts as a true match
+        matcher: MarketMatcher used for exhaustive scoring
+        shingle_size: Words per shingle
+
+    Returns:
+        One dict per config with recall, candidate ratio and timings
+    """
+    matcher = matcher or MarketMatcher()
+
+    start = time.time()
+    true_pairs = set()
+    for k_idx, k_market in enumerate(kalshi_markets):
+        for p_idx, p_market in enumerate(poly_markets):
+            if matcher.compute_similarity(k_market, p_market) >= threshold:
+                true_pairs.add((k_idx, p_idx))
+    exhaustive_seconds = time.time() - start
+    total_pairs = len(kalshi_markets) * len(poly_markets)
+
+    print(f"Exhaustive: {total_pairs} pairs scored in {exhaustive_seconds:.2f}s, "
+          f"{len(true_pairs)} pairs >= {threshold}")
+    print(f"{'bands':>6} {'rows':>5} {'J@50%':>6} {'candidates':>11} {'ratio':>7} {'recall':>7} {'lsh s':>7} {'score s':>8}")
+
+    results = []
+    for bands, rows in configs:
+        lsh = MinHashLSH(matcher, num_perm=bands * rows, bands=bands, shingle_size=shingle_size)
+        candidates = lsh.candidate_pairs(kalshi_markets, poly_markets)
+        lsh_seconds = lsh.last_stats["seconds"]
+
+        start = time.time()
+        for k_idx, p_idx in candidates:
+            matcher.compute_similarity(kalshi_markets[k_idx], poly_markets[p_idx])
+        score_seconds = time.time() - start
+
+        recall = len(true_pairs & candidates) / len(true_pairs) if true_pairs else 1.0
+        ratio = len(candidates) / total_pairs if total_pairs else 0.0
+        midpoint = (1 - 0.5 ** (1.0 / bands)) ** (1.0 / rows)
+        results.append({
+            "bands": bands,
+            "rows": rows,
+            "midpoint_jaccard": midpoint,
+            "candidates": len(candidates),
+            "candidate_ratio": ratio,
+            "recall": recall,
+            "lsh_seconds": lsh_seconds,
+            "score_seconds": score_seconds,
+        })
+        print(f"{bands:>6} {rows:>5} {midpoint:>6.2f} {len(candidates):>11} {ratio:>7.1%} "
+              f"{recall:>7.1%} {lsh_seconds:>7.2f} {score_seconds:>8.2f}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from snapshots import load_snapshot
+
+    parser = argparse.ArgumentParser(description="LSH recall vs exhaustive scoring on a recorded snapshot")
+    parser.add_argument("snapshot", help="Snapshot file written by snapshots.py")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--shingle-size", type=int, default=1)
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.snapshot)
+    recall_report(snapshot["kalshi"], snapshot["polymarket"],
+                  threshold=args.threshold, shingle_size=args.shingle_size)
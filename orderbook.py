@@ -0,0 +1,338 @@
+"""
+Orderbook Module
+Local binary-market orderbooks on integer price ticks, updated in place from REST snapshots and streaming deltas
+"""
+from typing import List, Dict, Tuple, Optional, Iterable
+
+import numpy as np
+
+YES = "yes"
+NO = "no"
+
+# Price ticks per dollar: Kalshi quotes whole cents, Polymarket down to 0.001
+KALSHI_TICKS = 100
+POLYMARKET_TICKS = 1000
+
+# Sizes are held as integer units of 1/SIZE_SCALE contract, so sums stay exact
+SIZE_SCALE = 100
+
+
+class Fenwick:
+    """Binary indexed tree over integer values: point add, prefix sum and search in O(log n)"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.tree = [0] * (n + 1)
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+
+    def add(self, i: int, delta: int):
+        """values[i] += delta"""
+        i += 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> int:
+        """Sum of values[0:i]"""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def lower_bound(self, target: int) -> int:
+        """Smallest i with sum(values[0:i + 1]) >= target (n if the total is smaller); values must be >= 0"""
+        pos, remaining, step = 0, target, self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] < remaining:
+                pos = nxt
+                remaining -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class BookSide:
+    """
+    Bids of one contract side, indexed by price tick
+
+    Levels live in a dense array ordered best-first (rank = ticks - price),
+    with two Fenwick trees over it: size, and size x price. Best price,
+    depth to a size and the cost of a size are prefix searches, and a level
+    update is a point update, so nothing is ever re-sorted or rebuilt.
+    """
+
+    def __init__(self, ticks: int):
+        self.ticks = ticks
+        self.units = [0] * (ticks + 1)
+        self._size = Fenwick(ticks + 1)
+        self._notional = Fenwick(ticks + 1)
+
+    def _change(self, tick: int, units: int):
+        rank = self.ticks - tick
+        delta = units - self.units[rank]
+        if delta:
+            self.units[rank] = units
+            self._size.add(rank, delta)
+            self._notional.add(rank, delta * tick)
+
+    def set(self, tick: int, size: float):
+        """Replace the size resting at a price"""
+        self._change(tick, max(0, round(size * SIZE_SCALE)))
+
+    def add(self, tick: int, delta: float):
+        """Add (or remove, if negative) size at a price"""
+        self._change(tick, max(0, self.units[self.ticks - tick] + round(delta * SIZE_SCALE)))
+
+    def size_at(self, tick: int) -> float:
+        return self.units[self.ticks - tick] / SIZE_SCALE
+
+    def total(self) -> float:
+        return self._size.prefix(self.ticks + 1) / SIZE_SCALE
+
+    def best(self) -> Optional[int]:
+        """Highest bid tick (None when empty)"""
+        rank = self._size.lower_bound(1)
+        return None if rank > self.ticks else self.ticks - rank
+
+    def sell(self, size: float) -> Tuple[float, int, Optional[int]]:
+        """
+        Hit the bids with `size` contracts, best first
+
+        Returns:
+            (contracts filled, sum of filled contracts x tick, lowest tick reached or None)
+        """
+        target = round(size * SIZE_SCALE)
+        total = self._size.prefix(self.ticks + 1)
+        if target > total:
+            # Book too shallow: everything fills, down to the last non-empty level
+            if not total:
+                return 0.0, 0, None
+            return total / SIZE_SCALE, self._notional.prefix(self.ticks + 1), \
+                self.ticks - self._size.lower_bound(total)
+        rank = self._size.lower_bound(target)
+        tick = self.ticks - rank
+        notional = self._notional.prefix(rank) + (target - self._size.prefix(rank)) * tick
+        return target / SIZE_SCALE, notional, tick
+
+    def levels(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(ticks, sizes) of non-empty levels, best first"""
+        units = np.array(self.units)
+        ranks = np.flatnonzero(units)
+        return self.ticks - ranks, units[ranks] / SIZE_SCALE
+
+    def replace(self, levels: Iterable[Tuple[int, float]]):
+        """Make the side equal to a snapshot, touching only levels that changed"""
+        units = [0] * (self.ticks + 1)
+        for tick, size in levels:
+            if 0 <= tick <= self.ticks:
+                units[self.ticks - tick] += max(0, round(size * SIZE_SCALE))
+        for rank, new in enumerate(units):
+            if new != self.units[rank]:
+                self._change(self.ticks - rank, new)
+
+
+class MarketBook:
+    """
+    Book of one binary market as YES bids and NO bids
+
+    This is Kalshi's native shape; a Polymarket YES-token book maps onto it
+    (a YES ask at p is a NO bid at 1 - p). Buying YES therefore walks the NO
+    bids and vice versa. Prices in the API are dollars; internally they are
+    integer ticks.
+    """
+
+    def __init__(self, ticks: int = KALSHI_TICKS):
+        self.ticks = ticks
+        self.sides = {YES: BookSide(ticks), NO: BookSide(ticks)}
+
+    def _tick(self, price: float) -> int:
+        return int(round(float(price) * self.ticks))
+
+    @staticmethod
+    def _other(side: str) -> str:
+        return NO if side == YES else YES
+
+    # ---- updates ---------------------------------------------------------
+
+    def set_level(self, side: str, price: float, size: float):
+        """Replace the bid size of `side` at `price` (dollars)"""
+        self.sides[side].set(self._tick(price), size)
+
+    def add_level(self, side: str, price: float, delta: float):
+        """Change the bid size of `side` at `price` by `delta`"""
+        self.sides[side].add(self._tick(price), delta)
+
+    def apply_snapshot(self, yes_bids: Iterable[Tuple[float, float]], no_bids: Iterable[Tuple[float, float]]):
+        """Replace both sides with (price, size) bid levels, in place"""
+        self.sides[YES].replace((self._tick(price), float(size)) for price, size in yes_bids)
+        self.sides[NO].replace((self._tick(price), float(size)) for price, size in no_bids)
+
+    def apply_kalshi(self, orderbook: Dict):
+        """
+        Kalshi book: REST /markets/{ticker}/orderbook 'orderbook' object or websocket orderbook_snapshot msg
+
+        Both carry 'yes'/'no' bid levels in cents and/or 'yes_dollars'/'no_dollars'.
+        """
+        def bids(side):
+            levels = orderbook.get(f"{side}_dollars")
+            if levels:
+                return [(float(price), float(size)) for price, size in levels]
+            return [(price / 100, float(size)) for price, size in orderbook.get(side) or []]
+
+        self.apply_snapshot(bids(YES), bids(NO))
+
+    def apply_kalshi_delta(self, msg: Dict):
+        """Kalshi websocket orderbook_delta msg: {'side', 'price' (cents) or 'price_dollars', 'delta'}"""
+        price = float(msg["price_dollars"]) if "price_dollars" in msg else msg["price"] / 100
+        self.add_level(msg["side"], price, float(msg["delta"]))
+
+    def apply_polymarket(self, book: Dict):
+        """Polymarket YES-token book: REST /book response or websocket 'book' event"""
+        def levels(side):
+            return [(float(level["price"]), float(level["size"])) for level in book.get(side) or []]
+
+        self.apply_snapshot(levels("bids"), [(1 - price, size) for price, size in levels("asks")])
+
+    def apply_polymarket_change(self, change: Dict):
+        """One Polymarket price_change entry: {'price', 'size' (new total at the level), 'side': BUY or SELL}"""
+        price, size = float(change["price"]), float(change["size"])
+        if str(change["side"]).upper() == "BUY":
+            self.set_level(YES, price, size)
+        else:
+            self.set_level(NO, 1 - price, size)
+
+    # ---- queries ---------------------------------------------------------
+
+    def best_bid(self, side: str = YES) -> Optional[float]:
+        """Highest bid for `side` in dollars (None when empty)"""
+        tick = self.sides[side].best()
+        return None if tick is None else tick / self.ticks
+
+    def best_ask(self, side: str = YES) -> Optional[float]:
+        """Cheapest price to buy `side` (1 - best bid of the other side)"""
+        tick = self.sides[self._other(side)].best()
+        return None if tick is None else (self.ticks - tick) / self.ticks
+
+    def available(self, side: str = YES) -> float:
+        """Contracts of `side` that can be bought"""
+        return self.sides[self._other(side)].total()
+
+    def depth_price(self, side: str, size: float) -> Optional[float]:
+        """Worst price paid buying `size` contracts of `side` (None if the book holds less)"""
+        filled, _, tick = self.sides[self._other(side)].sell(size)
+        if tick is None or filled < size:
+            return None
+        return (self.ticks - tick) / self.ticks
+
+    def vwap(self, side: str, size: float) -> Optional[float]:
+        """
+        Average price buying up to `size` contracts of `side`
+
+        Returns:
+            VWAP over what the book can fill (None when it is empty)
+        """
+        filled, notional, _ = self.sides[self._other(side)].sell(size)
+        if filled <= 0:
+            return None
+        units = round(filled * SIZE_SCALE)
+        return (self.ticks * units - notional) / units / self.ticks
+
+    def asks(self, side: str = YES) -> Tuple[np.ndarray, np.ndarray]:
+        """Ask ladder of `side`: (prices in dollars ascending, sizes)"""
+        ticks, sizes = self.sides[self._other(side)].levels()
+        return (self.ticks - ticks) / self.ticks, sizes
+
+
+class OrderbookCache:
+    """
+    MarketBooks by Kalshi ticker and Polymarket token id, fed by REST and streaming alike
+
+    REST responses and websocket snapshots replace a book in place; deltas
+    update single levels. Kalshi websocket messages carry a per-subscription
+    seq: on a gap every book of that subscription is marked stale and its
+    deltas are ignored until a fresh snapshot (REST or websocket) arrives.
+    """
+
+    def __init__(self):
+        self.books: Dict[str, MarketBook] = {}
+        self.stale: set = set()
+        self._seq: Dict[int, int] = {}
+        self._sid_tickers: Dict[int, set] = {}
+
+    def get(self, key: str) -> Optional[MarketBook]:
+        """Book of a ticker or token id (None if never seen or stale)"""
+        return None if key in self.stale else self.books.get(key)
+
+    def _book(self, key: str, ticks: int) -> MarketBook:
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = MarketBook(ticks)
+        return book
+
+    def apply_kalshi_rest(self, ticker: str, orderbook: Dict) -> MarketBook:
+        """Apply a KalshiAPI.get_orderbook() response"""
+        book = self._book(ticker, KALSHI_TICKS)
+        book.apply_kalshi(orderbook)
+        self.stale.discard(ticker)
+        return book
+
+    def apply_polymarket_rest(self, token_id: str, book: Dict) -> MarketBook:
+        """Apply a PolymarketAPI.get_orderbook() response"""
+        market_book = self._book(token_id, POLYMARKET_TICKS)
+        market_book.apply_polymarket(book)
+        self.stale.discard(token_id)
+        return market_book
+
+    def on_kalshi_message(self, message: Dict) -> Optional[str]:
+        """
+        Apply a Kalshi websocket message (orderbook_snapshot / orderbook_delta)
+
+        Returns:
+            Ticker whose book changed, or None
+        """
+        kind, msg = message.get("type"), message.get("msg") or {}
+        if kind not in ("orderbook_snapshot", "orderbook_delta"):
+            return None
+        ticker = msg.get("market_ticker", "")
+        sid, seq = message.get("sid"), message.get("seq")
+        if sid is not None:
+            self._sid_tickers.setdefault(sid, set()).add(ticker)
+            last = self._seq.get(sid)
+            if seq is not None:
+                if last is not None and seq != last + 1:
+                    self.stale.update(self._sid_tickers[sid])
+                self._seq[sid] = seq
+
+        if kind == "orderbook_snapshot":
+            self._book(ticker, KALSHI_TICKS).apply_kalshi(msg)
+            self.stale.discard(ticker)
+            return ticker
+        if ticker in self.stale or ticker not in self.books:
+            return None
+        self.books[ticker].apply_kalshi_delta(msg)
+        return ticker
+
+    def on_polymarket_message(self, message: Dict) -> List[str]:
+        """
+        Apply a Polymarket market-channel event ('book' or 'price_change')
+
+        Returns:
+            Token ids whose book changed
+        """
+        kind = message.get("event_type")
+        if kind == "book":
+            self.apply_polymarket_rest(message["asset_id"], message)
+            return [message["asset_id"]]
+        if kind != "price_change":
+            return []
+        changed = []
+        # Older events carry one asset_id with 'changes'; newer ones list 'price_changes' per asset
+        entries = [dict(change, asset_id=message.get("asset_id")) for change in message.get("changes") or []]
+        entries += message.get("price_changes") or []
+        for change in entries:
+            book = self.books.get(change.get("asset_id"))
+            if book is not None:
+                book.apply_polymarket_change(change)
+                changed.append(change["asset_id"])
+        return changed
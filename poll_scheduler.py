@@ -0,0 +1,369 @@
+"""
+Poll Scheduler Module
+Adaptive refresh of matched markets: hot pairs are polled often, dead ones rarely, within a per-venue request budget
+"""
+import heapq
+import math
+import time
+from collections import deque
+from typing import List, Dict, Tuple, Optional, Callable
+
+from date_blocking import close_timestamp
+from orderbook import MarketBook, OrderbookCache, YES
+
+# Target refresh interval per priority tier (seconds), hottest first
+TIER_INTERVALS = (5.0, 15.0, 60.0, 300.0)
+
+# Minimum priority score of tiers 0..2; anything lower lands in the last tier
+TIER_THRESHOLDS = (0.6, 0.35, 0.15)
+
+
+class TokenBucket:
+    """Request budget: `rate` requests per second on average, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: float) -> bool:
+        """Take one token if available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def next_available(self, now: float) -> float:
+        """Earliest time a token will be available"""
+        self._refill(now)
+        return now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+
+
+def priority_score(spread: float, volatility: float, volume: float, hours_to_close: Optional[float]) -> float:
+    """
+    How urgently a market needs fresh prices, in [0, 1]
+
+    Components are normalized to [0, 1] and weighted: a wide cross-venue
+    spread matters most, then recent volatility, then closing soon, then
+    traded volume.
+
+    Args:
+        spread: |Kalshi - Polymarket| YES spread of the pair (dollars)
+        volatility: EWMA of absolute price changes between refreshes (dollars)
+        volume: Traded volume
+        hours_to_close: Hours until resolution (None = unknown)
+    """
+    spread_part = min(abs(spread) / 0.10, 1.0)
+    volatility_part = min(volatility / 0.02, 1.0)
+    volume_part = min(math.log10(1 + max(volume, 0)) / 6, 1.0)
+    close_part = 0.0 if hours_to_close is None else 1.0 / (1.0 + max(hours_to_close, 0) / 24)
+    return 0.4 * spread_part + 0.3 * volatility_part + 0.15 * close_part + 0.15 * volume_part
+
+
+def tier_of(score: float) -> int:
+    """Priority tier of a score (0 = hottest)"""
+    for tier, threshold in enumerate(TIER_THRESHOLDS):
+        if score >= threshold:
+            return tier
+    return len(TIER_THRESHOLDS)
+
+
+class PollScheduler:
+    """
+    Priority queue of (venue, id) refresh jobs driven by a per-venue token bucket
+
+    Each item is due `TIER_INTERVALS[tier]` after its last refresh; the heap
+    is ordered by due time, so the hottest overdue item is refreshed first.
+    When a venue's budget is exhausted its due items wait for the next
+    token instead of bursting. Items are rescored after every refresh, so a
+    pair that goes quiet drifts down the tiers and one that starts moving
+    climbs back.
+
+    Linked pairs (see link) take their spread from the latest prices of both
+    legs; a market in several pairs uses the widest.
+    """
+
+    def __init__(self, fetchers: Dict[str, Callable[[str], Optional[float]]],
+                 budgets: Optional[Dict[str, Tuple[float, float]]] = None,
+                 volatility_alpha: float = 0.3):
+        """
+        Args:
+            fetchers: venue -> function(id) returning the refreshed YES price (None on error)
+            budgets: venue -> (requests per second, burst); default 5/s with a burst of 10
+            volatility_alpha: EWMA weight of the newest absolute price change
+        """
+        self.fetchers = fetchers
+        self.buckets = {venue: TokenBucket(*(budgets or {}).get(venue, (5.0, 10.0))) for venue in fetchers}
+        self.volatility_alpha = volatility_alpha
+        self.items: Dict[Tuple[str, str], Dict] = {}
+        # (kalshi_id, poly_id) -> (kalshi item key, polymarket item key)
+        self.pairs: Dict[Tuple[str, str], Tuple[Tuple[str, str], Tuple[str, str]]] = {}
+        self._heap: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._counter = 0
+        self.intervals = {tier: deque(maxlen=1000) for tier in range(len(TIER_INTERVALS))}
+        self.requests = {venue: 0 for venue in fetchers}
+
+    def _push(self, key: Tuple[str, str], due: float):
+        self._counter += 1
+        item = self.items[key]
+        item["due"] = due
+        item["version"] = self._counter
+        heapq.heappush(self._heap, (due, self._counter, key))
+
+    def _rescore(self, item: Dict, now: float):
+        hours = None if item["close_ts"] is None else (item["close_ts"] - now) / 3600
+        item["score"] = priority_score(item["spread"], item["volatility"], item["volume"], hours)
+        item["tier"] = tier_of(item["score"])
+
+    def _update_spread(self, key: Tuple[str, str]):
+        """Widest spread over the item's linked pairs, from the latest prices of both legs"""
+        item = self.items[key]
+        if item["pairs"]:
+            item["spread"] = max((self.items[self.pairs[pair][0]]["price"] - self.items[self.pairs[pair][1]]["price"]
+                                  for pair in item["pairs"]), key=abs)
+
+    def _reschedule(self, key: Tuple[str, str], now: float):
+        """Rescore an item, moving it in the heap only if its tier changed"""
+        item = self.items[key]
+        old_tier = item.get("tier")
+        self._rescore(item, now)
+        if old_tier is None or item["tier"] != old_tier:
+            self._push(key, item["last"] + TIER_INTERVALS[item["tier"]])
+
+    def track(self, venue: str, item_id: str, price: float, spread: float = 0.0, volume: float = 0.0,
+              close_ts: Optional[float] = None, now: Optional[float] = None):
+        """
+        Add a market to the schedule, or update its spread/volume/close
+
+        Args:
+            venue: Key of `fetchers` ('kalshi' ticker or 'polymarket' token id)
+            item_id: Ticker or token id passed to the fetcher
+            price: Latest YES price
+            spread: Cross-venue spread of the pair it belongs to (ignored once the item is linked)
+            volume: Traded volume
+            close_ts: Resolution timestamp
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        key = (venue, item_id)
+        item = self.items.get(key)
+        if item is None:
+            item = self.items[key] = {"price": price, "volatility": 0.0, "last": now, "pairs": set()}
+        item.update(spread=spread, volume=volume, close_ts=close_ts)
+        self._update_spread(key)
+        self._reschedule(key, now)
+
+    def link(self, kalshi_id: str, poly_id: str, now: Optional[float] = None):
+        """
+        Score two tracked markets by the spread between them, recomputed after every refresh of either
+
+        Args:
+            kalshi_id: Tracked Kalshi ticker
+            poly_id: Tracked Polymarket token id
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        legs = (("kalshi", kalshi_id), ("polymarket", poly_id))
+        if any(leg not in self.items for leg in legs):
+            return
+        self.pairs[(kalshi_id, poly_id)] = legs
+        for leg in legs:
+            self.items[leg]["pairs"].add((kalshi_id, poly_id))
+            self._update_spread(leg)
+            self._reschedule(leg, now)
+
+    def untrack(self, venue: str, item_id: str):
+        """Stop refreshing a market and drop its pairs (its heap entry is dropped lazily)"""
+        item = self.items.pop((venue, item_id), None)
+        if item is None:
+            return
+        for pair in item["pairs"]:
+            for leg in self.pairs.pop(pair):
+                if leg in self.items:
+                    self.items[leg]["pairs"].discard(pair)
+
+    def run_pending(self, now: Optional[float] = None, max_requests: int = 1000) -> int:
+        """
+        Refresh every due item the budgets allow
+
+        Args:
+            now: Current time (defaults to time.time())
+            max_requests: Upper bound on requests in this call
+
+        Returns:
+            Number of refreshes made
+        """
+        now = time.time() if now is None else now
+        done = 0
+        deferred = []
+        while self._heap and done < max_requests:
+            due, version, key = self._heap[0]
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            item = self.items.get(key)
+            if item is None or item["version"] != version:
+                continue  # untracked or rescheduled since
+
+            venue, item_id = key
+            if not self.buckets[venue].try_acquire(now):
+                deferred.append((key, self.buckets[venue].next_available(now)))
+                continue
+
+            price = self.fetchers[venue](item_id)
+            self.requests[venue] += 1
+            done += 1
+            self.intervals[item["tier"]].append(now - item["last"])
+            if price is not None:
+                change = abs(price - item["price"])
+                item["volatility"] += self.volatility_alpha * (change - item["volatility"])
+                item["price"] = price
+            item["last"] = now
+            self._update_spread(key)
+            self._rescore(item, now)
+            self._push(key, now + TIER_INTERVALS[item["tier"]])
+
+            # The other legs of its pairs see the new spread too
+            for pair in item["pairs"]:
+                for leg in self.pairs[pair]:
+                    if leg != key:
+                        self._update_spread(leg)
+                        self._reschedule(leg, now)
+
+        for key, when in deferred:
+            self._push(key, when)
+        return done
+
+    def next_due(self) -> Optional[float]:
+        """Time the earliest job is due (None if nothing is tracked)"""
+        while self._heap:
+            due, version, key = self._heap[0]
+            item = self.items.get(key)
+            if item is not None and item["version"] == version:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def tier_report(self) -> List[Dict]:
+        """
+        Achieved refresh interval per tier against its target
+
+        Returns:
+            One dict per tier: tier, target, items, refreshes, mean, p95 (seconds)
+        """
+        report = []
+        for tier, target in enumerate(TIER_INTERVALS):
+            samples = sorted(self.intervals[tier])
+            report.append({
+                "tier": tier,
+                "target": target,
+                "items": sum(1 for item in self.items.values() if item["tier"] == tier),
+                "refreshes": len(samples),
+                "mean": sum(samples) / len(samples) if samples else None,
+                "p95": samples[int(0.95 * (len(samples) - 1))] if samples else None,
+            })
+        return report
+
+    def run(self, duration: float, report_every: float = 60.0):
+        """
+        Drive refreshes in real time for `duration` seconds, printing the tier report
+
+        Args:
+            duration: Seconds to run
+            report_every: Seconds between reports
+        """
+        end = time.time() + duration
+        next_report = time.time() + report_every
+        while time.time() < end:
+            self.run_pending()
+            now = time.time()
+            if now >= next_report:
+                print_report(self.tier_report(), self.requests)
+                next_report = now + report_every
+            due = self.next_due()
+            time.sleep(max(0.05, min((due or now + 1.0) - now, next_report - now, end - now)))
+
+
+def print_report(report: List[Dict], requests: Dict[str, int]):
+    """Print a tier_report() table"""
+    print(f"{'tier':>4} {'target s':>9} {'items':>6} {'refreshes':>10} {'mean s':>8} {'p95 s':>8}")
+    for row in report:
+        mean = f"{row['mean']:.1f}" if row["mean"] is not None else "-"
+        p95 = f"{row['p95']:.1f}" if row["p95"] is not None else "-"
+        print(f"{row['tier']:>4} {row['target']:>9.0f} {row['items']:>6} {row['refreshes']:>10} {mean:>8} {p95:>8}")
+    print("requests: " + ", ".join(f"{venue} {count}" for venue, count in requests.items()))
+
+
+def _mid(book: MarketBook) -> Optional[float]:
+    """YES mid between the best YES bid and ask"""
+    bid, ask = book.best_bid(YES), book.best_ask(YES)
+    return None if bid is None or ask is None else (bid + ask) / 2
+
+
+def kalshi_price_fetcher(kalshi_api, cache: Optional[OrderbookCache] = None) -> Callable[[str], Optional[float]]:
+    """Fetcher refreshing a Kalshi ticker's book in `cache` from REST"""
+    cache = cache if cache is not None else OrderbookCache()
+
+    def fetch(ticker: str) -> Optional[float]:
+        orderbook = kalshi_api.get_orderbook(ticker)
+        return _mid(cache.apply_kalshi_rest(ticker, orderbook)) if orderbook is not None else None
+    return fetch
+
+
+def polymarket_price_fetcher(poly_api, cache: Optional[OrderbookCache] = None) -> Callable[[str], Optional[float]]:
+    """Fetcher refreshing a Polymarket YES token's book in `cache` from the CLOB"""
+    cache = cache if cache is not None else OrderbookCache()
+
+    def fetch(token_id: str) -> Optional[float]:
+        book = poly_api.get_orderbook(token_id)
+        return _mid(cache.apply_polymarket_rest(token_id, book)) if book is not None else None
+    return fetch
+
+
+def track_matches(scheduler: PollScheduler, matches: List[Tuple[Dict, Dict, float]], now: Optional[float] = None):
+    """Schedule both markets of every matched pair, linked so they are scored by the pair's live spread"""
+    for k_market, p_market, _ in matches:
+        spread = k_market.get("yes_price", 0) - p_market.get("yes_price", 0)
+        ticker = k_market.get("ticker", "")
+        scheduler.track("kalshi", ticker, k_market.get("yes_price", 0), spread,
+                        float(k_market.get("volume", 0) or 0), close_timestamp(k_market), now)
+        tokens = p_market.get("clob_token_ids") or []
+        if tokens:
+            scheduler.track("polymarket", tokens[0], p_market.get("yes_price", 0), spread,
+                            float(p_market.get("volume", 0) or 0), close_timestamp(p_market), now)
+            scheduler.link(ticker, tokens[0], now)
+
+
+if __name__ == "__main__":
+    import argparse
+    from kalshi_api import KalshiAPI
+    from polymarket_api import PolymarketAPI
+    from matcher_session import MatcherSession
+    from market_lists import fetch_market_lists
+
+    parser = argparse.ArgumentParser(description="Adaptive per-market polling of matched pairs")
+    parser.add_argument("--duration", type=float, default=600.0, help="Seconds to run")
+    parser.add_argument("--kalshi-rate", type=float, default=5.0, help="Kalshi requests per second")
+    parser.add_argument("--poly-rate", type=float, default=5.0, help="Polymarket requests per second")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    kalshi_api, poly_api = KalshiAPI(), PolymarketAPI()
+    kalshi_markets, poly_markets, _ = fetch_market_lists(kalshi_api, poly_api)
+    matches = MatcherSession().refresh(kalshi_markets, poly_markets, threshold=args.threshold)
+
+    books = OrderbookCache()
+    scheduler = PollScheduler(
+        {"kalshi": kalshi_price_fetcher(kalshi_api, books), "polymarket": polymarket_price_fetcher(poly_api, books)},
+        budgets={"kalshi": (args.kalshi_rate, 2 * args.kalshi_rate), "polymarket": (args.poly_rate, 2 * args.poly_rate)},
+    )
+    track_matches(scheduler, matches)
+    scheduler.run(args.duration)
+    print_report(scheduler.tier_report(), scheduler.requests)
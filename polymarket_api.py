@@ -2,15 +2,20 @@
 Polymarket API Integration Module
 Handles fetching market data from Polymarket's public API
 """
+import json
 import requests
 from typing import List, Dict, Optional
 
+from date_blocking import parse_close_time
+
 
 class PolymarketAPI:
     """Client for interacting with Polymarket's public API"""
 
-    def __init__(self, base_url: str = "https://gamma-api.polymarket.com"):
+    def __init__(self, base_url: str = "https://gamma-api.polymarket.com",
+                 clob_url: str = "https://clob.polymarket.com"):
         self.base_url = base_url
+        self.clob_url = clob_url
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/json',
@@ -58,6 +63,30 @@ class PolymarketAPI:
             print(f"⚠ Unexpected error fetching Polymarket markets: {e}")
             return []
 
+    def get_markets_page(self, offset: int = 0, limit: int = 500, closed: bool = True) -> List[Dict]:
+        """
+        Fetch one offset page of markets, for walking full history
+
+        Unlike get_markets, errors are raised so callers can retry the page.
+
+        Args:
+            offset: Number of markets to skip
+            limit: Markets per page
+            closed: Closed markets (True) or open ones
+
+        Returns:
+            List of raw market dictionaries (shorter than limit on the last page)
+
+        Raises:
+            requests.RequestException: On HTTP or network errors
+        """
+        params = {"limit": limit, "offset": offset, "closed": str(closed).lower(),
+                  "order": "id", "ascending": "true"}
+        response = self.session.get(f"{self.base_url}/markets", params=params, timeout=30)
+        response.raise_for_status()
+        markets = response.json()
+        return markets.get("data", []) if isinstance(markets, dict) else markets
+
     def get_event_markets(self, slug: str) -> Optional[Dict]:
         """
         Get markets for a specific event
@@ -79,6 +108,27 @@ class PolymarketAPI:
             print(f"⚠ Error fetching event {slug}: {e}")
             return None
 
+    def get_orderbook(self, token_id: str) -> Optional[Dict]:
+        """
+        Get the CLOB orderbook of one outcome token
+
+        Args:
+            token_id: Outcome token id (see 'clob_token_ids' of an extracted market)
+
+        Returns:
+            Book dictionary with 'bids' and 'asks' ([{'price', 'size'}, ...]), or None if error
+        """
+        endpoint = f"{self.clob_url}/book"
+
+        try:
+            response = self.session.get(endpoint, params={"token_id": token_id}, timeout=10)
+            response.raise_for_status()
+            return response.json()
+
+        except requests.RequestException as e:
+            print(f"⚠ Error fetching orderbook for token {token_id}: {e}")
+            return None
+
     def format_event_link(self, market_data: Dict) -> str:
         """
         Generate direct link to Polymarket event page
@@ -124,7 +174,6 @@ class PolymarketAPI:
             try:
                 # If it's a string, parse it as JSON
                 if isinstance(outcome_prices, str):
-                    import json
                     outcome_prices = json.loads(outcome_prices)
 
                 # Now extract first price
@@ -141,9 +190,27 @@ class PolymarketAPI:
 
         # Get event_slug if this market is part of a multi-market event
         event_slug = ""
+        event_title = ""
         events = market.get("events", [])
         if events and len(events) > 0:
             event_slug = events[0].get("slug", "")
+            event_title = events[0].get("title", "")
+
+        # Outcome token ids ([yes, no]) for CLOB orderbooks; JSON-encoded like outcomePrices
+        clob_token_ids = market.get("clobTokenIds", [])
+        try:
+            if isinstance(clob_token_ids, str):
+                clob_token_ids = json.loads(clob_token_ids)
+            clob_token_ids = [str(token) for token in clob_token_ids or []]
+        except (ValueError, TypeError):
+            clob_token_ids = []
+
+        # Top of book (missing on some markets)
+        try:
+            best_bid = float(market.get("bestBid") or 0)
+            best_ask = float(market.get("bestAsk") or 0)
+        except (ValueError, TypeError):
+            best_bid = best_ask = 0.0
 
         # Get volume (handle different field names)
         volume = market.get("volume", market.get("volume24hr", market.get("volumeNum", 0)))
@@ -163,14 +230,19 @@ class PolymarketAPI:
             "condition_id": market.get("conditionId", ""),
             "slug": slug,
             "event_slug": event_slug,
+            "event_title": event_title,
             "question": question,
             "description": market.get("description", ""),
             "category": market.get("category", ""),
             "yes_price": yes_price,
             "no_price": 1 - yes_price if yes_price else 0,
+            "best_bid": best_bid,
+            "best_ask": best_ask,
+            "clob_token_ids": clob_token_ids,
             "volume": volume,
             "liquidity": liquidity,
             "end_date": market.get("endDate", market.get("end_date_iso", "")),
+            "close_ts": parse_close_time(market.get("endDate", market.get("end_date_iso"))),
             "active": market.get("active", True),
             "closed": market.get("closed", False),
             "icon": market.get("icon", market.get("image", "")),
@@ -0,0 +1,204 @@
+"""
+Reference Cache Module
+Kalshi series and event metadata persisted in SQLite with a long TTL, joined onto markets at extraction
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Optional
+
+
+class ReferenceCache:
+    """
+    Slowly changing Kalshi reference data: series (category, tags, settlement
+    sources) loaded in bulk from /series, and events recorded from the /events
+    pages the app fetches anyway
+
+    Everything is mirrored in memory, so joining it onto a market is a dict
+    lookup. Once the series load is older than `ttl` it is refreshed on a
+    background thread while the old data keeps serving.
+    """
+
+    def __init__(self, path: str = "reference_cache.sqlite3", ttl: float = 7 * 86400):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite database file (":memory:" for a throwaway cache)
+            ttl: Seconds before the series list is reloaded
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing: Optional[threading.Thread] = None
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS series (
+                ticker TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                category TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                settlement_sources TEXT NOT NULL,
+                frequency TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                event_ticker TEXT PRIMARY KEY,
+                series_ticker TEXT NOT NULL,
+                title TEXT NOT NULL,
+                sub_title TEXT NOT NULL,
+                category TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+        self.conn.commit()
+
+        self.series: Dict[str, Dict] = {
+            ticker: {"ticker": ticker, "title": title, "category": category, "tags": json.loads(tags),
+                     "settlement_sources": json.loads(sources), "frequency": frequency}
+            for ticker, title, category, tags, sources, frequency, _ in self.conn.execute("SELECT * FROM series")
+        }
+        self.events: Dict[str, Dict] = {
+            event_ticker: {"event_ticker": event_ticker, "series_ticker": series_ticker, "title": title,
+                           "sub_title": sub_title, "category": category}
+            for event_ticker, series_ticker, title, sub_title, category, _ in self.conn.execute("SELECT * FROM events")
+        }
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'series_loaded_at'").fetchone()
+        self.series_loaded_at = row[0] if row else None
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the last bulk series load (inf if never loaded)"""
+        if self.series_loaded_at is None:
+            return float("inf")
+        return (time.time() if now is None else now) - self.series_loaded_at
+
+    def load_series(self, series_list: List[Dict], now: Optional[float] = None) -> int:
+        """
+        Bulk upsert /series payloads
+
+        Args:
+            series_list: Raw series dictionaries
+            now: Load time (defaults to now)
+
+        Returns:
+            Number of series stored
+        """
+        now = time.time() if now is None else now
+        rows = {}
+        for series in series_list:
+            ticker = series.get("ticker", "")
+            if not ticker:
+                continue
+            sources = [source.get("name", "") if isinstance(source, dict) else str(source)
+                       for source in series.get("settlement_sources") or []]
+            rows[ticker] = {"ticker": ticker, "title": series.get("title", "") or "",
+                            "category": series.get("category", "") or "", "tags": list(series.get("tags") or []),
+                            "settlement_sources": sources, "frequency": series.get("frequency", "") or ""}
+
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(r["ticker"], r["title"], r["category"], json.dumps(r["tags"]),
+                      json.dumps(r["settlement_sources"]), r["frequency"], now) for r in rows.values()]
+                )
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('series_loaded_at', ?)", (now,))
+            # Swap in a new dict so readers never see a half-updated one
+            self.series = {**self.series, **rows}
+            self.series_loaded_at = now
+        return len(rows)
+
+    def record_events(self, events: List[Dict], now: Optional[float] = None) -> int:
+        """
+        Upsert event metadata from /events pages already fetched (no extra requests)
+
+        Args:
+            events: Raw event dictionaries
+            now: Time of the fetch (defaults to now)
+
+        Returns:
+            Number of events that were new or changed
+        """
+        now = time.time() if now is None else now
+        changed = {}
+        for event in events:
+            event_ticker = event.get("event_ticker", "")
+            if not event_ticker:
+                continue
+            row = {"event_ticker": event_ticker, "series_ticker": event.get("series_ticker", "") or "",
+                   "title": event.get("title", "") or "", "sub_title": event.get("sub_title", "") or "",
+                   "category": event.get("category", "") or ""}
+            if self.events.get(event_ticker) != row:
+                changed[event_ticker] = row
+        if not changed:
+            return 0
+
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                    [(r["event_ticker"], r["series_ticker"], r["title"], r["sub_title"], r["category"], now)
+                     for r in changed.values()]
+                )
+            self.events = {**self.events, **changed}
+        return len(changed)
+
+    def refresh(self, kalshi_api) -> int:
+        """Reload every series from the API (keeps the old data if the request fails)"""
+        series_list = kalshi_api.get_series_list()
+        if not series_list:
+            return 0
+        count = self.load_series(series_list)
+        print(f"✓ Reference cache: loaded {count} Kalshi series")
+        return count
+
+    def ensure_fresh(self, kalshi_api, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Reload series once they are older than the TTL
+
+        The first load is synchronous (nothing to serve yet); later ones run
+        on one background thread at a time.
+
+        Returns:
+            The background thread started, if any
+        """
+        if self.age() < self.ttl:
+            return None
+        if not self.series or not background:
+            self.refresh(kalshi_api)
+            return None
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return None
+            self._refreshing = threading.Thread(target=self.refresh, args=(kalshi_api,), daemon=True)
+            self._refreshing.start()
+            return self._refreshing
+
+    def market_info(self, series_ticker: str = "", event_ticker: str = "") -> Dict:
+        """
+        Reference fields for a market, joined from its event and series
+
+        Args:
+            series_ticker: Market's series (looked up from the event when empty)
+            event_ticker: Market's event
+
+        Returns:
+            Dict with series_ticker, category, series_title, tags, settlement_sources
+            (empty values when unknown)
+        """
+        event = self.events.get(event_ticker) or {}
+        series_ticker = series_ticker or event.get("series_ticker", "")
+        series = self.series.get(series_ticker) or {}
+        return {
+            "series_ticker": series_ticker,
+            "category": event.get("category") or series.get("category", ""),
+            "series_title": series.get("title", ""),
+            "tags": series.get("tags", []),
+            "settlement_sources": series.get("settlement_sources", []),
+        }
@@ -0,0 +1,361 @@
+"""
+Scanner Module
+Headless fetch -> match -> spread pipeline on a schedule, with de-duplicated spread alerts
+"""
+import json
+import os
+import resource
+import signal
+import socket
+import threading
+import time
+from typing import List, Dict, Optional
+
+import requests
+
+from arbitrage import ArbitrageEngine, YES_KALSHI
+from change_feed import ChangeFeed
+from kalshi_api import KalshiAPI
+from market_lists import fetch_market_lists
+from market_matcher import MarketMatcher
+from matcher_session import MatcherSession
+from polymarket_api import PolymarketAPI
+from spread_store import SpreadStore, pair_key
+
+
+# ---- sinks -------------------------------------------------------------------
+
+class JsonlSink:
+    """Append alerts to a JSON-lines file (reopened per write, rotated to '<path>.1' past max_bytes)"""
+
+    def __init__(self, path: str, max_bytes: int = 16 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def emit(self, alert: Dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert) + "\n")
+            rotate = f.tell() > self.max_bytes
+        if rotate:
+            os.replace(self.path, self.path + ".1")
+
+
+class UnixSocketSink:
+    """Send each alert as one datagram to a local unix socket (dropped if nobody listens)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def emit(self, alert: Dict):
+        self.sock.sendto(json.dumps(alert).encode("utf-8"), self.path)
+
+
+class WebhookSink:
+    """POST each alert as JSON to a (local) webhook"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def emit(self, alert: Dict):
+        self.session.post(self.url, json=alert, timeout=self.timeout).raise_for_status()
+
+
+# ---- alert policy --------------------------------------------------------------
+
+class AlertPolicy:
+    """
+    Hysteresis and de-duplication of spread alerts per pair
+
+    A pair opens an alert once its net edge has stayed at or above open_edge
+    for confirm_scans consecutive scans, and closes it once the edge drops
+    below close_edge (< open_edge), so an edge hovering around one threshold
+    cannot flap. While open, the pair is re-announced only when the edge has
+    grown by at least update_step since the last announcement. After a close
+    the pair cannot reopen for cooldown seconds. State for pairs unseen for
+    forget_after seconds is dropped, so memory follows the live universe.
+    """
+
+    def __init__(self, open_edge: float = 0.02, close_edge: float = 0.01, confirm_scans: int = 2,
+                 update_step: float = 0.02, cooldown: float = 900.0, forget_after: float = 86400.0):
+        """
+        Args:
+            open_edge: Net edge per contract (dollars) that opens an alert
+            close_edge: Net edge below which an open alert closes
+            confirm_scans: Consecutive scans at or above open_edge before opening
+            update_step: Edge growth that re-announces an open alert
+            cooldown: Seconds after a close before the pair may alert again
+            forget_after: Seconds after which state of unseen pairs is dropped
+        """
+        self.open_edge = open_edge
+        self.close_edge = close_edge
+        self.confirm_scans = confirm_scans
+        self.update_step = update_step
+        self.cooldown = cooldown
+        self.forget_after = forget_after
+        self.state: Dict[str, Dict] = {}
+
+    def observe(self, key: str, edge: float, now: float) -> Optional[str]:
+        """
+        Feed one pair's current net edge
+
+        Returns:
+            'open', 'update' or 'close' when an alert should be emitted, else None
+        """
+        state = self.state.setdefault(key, {"active": False, "streak": 0, "announced": 0.0, "closed_at": None})
+        state["seen"] = now
+
+        if state["active"]:
+            if edge < self.close_edge:
+                state.update(active=False, streak=0, closed_at=now)
+                return "close"
+            if edge >= state["announced"] + self.update_step:
+                state["announced"] = edge
+                return "update"
+            return None
+
+        state["streak"] = state["streak"] + 1 if edge >= self.open_edge else 0
+        cooling = state["closed_at"] is not None and now - state["closed_at"] < self.cooldown
+        if state["streak"] >= self.confirm_scans and not cooling:
+            state.update(active=True, announced=edge)
+            return "open"
+        return None
+
+    def vanished(self, seen: set, now: float) -> List[str]:
+        """
+        Close alerts of pairs missing from this scan, break their confirmation
+        streaks and forget stale pairs
+
+        Args:
+            seen: Keys observed this scan
+
+        Returns:
+            Keys whose open alert is closed because the pair disappeared
+        """
+        closed = []
+        for key, state in list(self.state.items()):
+            if key in seen:
+                continue
+            # A missing scan breaks the run of consecutive scans at or above open_edge
+            state["streak"] = 0
+            if state["active"]:
+                state.update(active=False, closed_at=now)
+                closed.append(key)
+            elif now - state["seen"] > self.forget_after:
+                del self.state[key]
+        return closed
+
+
+# ---- scanner -------------------------------------------------------------------
+
+class Scanner:
+    """Long-running fetch -> match -> spread loop that emits alerts to local sinks"""
+
+    def __init__(self, kalshi_api=None, poly_api=None, session: Optional[MatcherSession] = None,
+                 engine: Optional[ArbitrageEngine] = None, policy: Optional[AlertPolicy] = None,
+                 sinks: Optional[List] = None, spread_store: Optional[SpreadStore] = None,
+                 change_feed: Optional[ChangeFeed] = None, interval: float = 60.0, threshold: float = 0.5,
+                 prune_interval: float = 3600.0, score_max_age: float = 7 * 86400):
+        """
+        Args:
+            kalshi_api: KalshiAPI instance
+            poly_api: PolymarketAPI instance
+            session: MatcherSession (scores are kept between scans)
+            engine: ArbitrageEngine pricing each matched pair
+            policy: AlertPolicy applying hysteresis and de-duplication
+            sinks: Objects with emit(alert: dict)
+            spread_store: Optional SpreadStore recording every scan
+            change_feed: Optional ChangeFeed diffing consecutive scans
+            interval: Seconds between scan starts
+            threshold: Minimum similarity score to consider a match (0-1)
+            prune_interval: Seconds between prunes of the session's score cache
+            score_max_age: Age after which unused cached scores are pruned
+        """
+        self.kalshi_api = kalshi_api or KalshiAPI()
+        self.poly_api = poly_api or PolymarketAPI()
+        self.session = session or MatcherSession(MarketMatcher())
+        self.engine = engine or ArbitrageEngine()
+        self.policy = policy or AlertPolicy()
+        self.sinks = sinks or []
+        self.spread_store = spread_store
+        self.change_feed = change_feed
+        self.interval = interval
+        self.threshold = threshold
+        self.prune_interval = prune_interval
+        self.score_max_age = score_max_age
+        self._last_prune = None
+        self._stop = threading.Event()
+        self.scans = 0
+        self.last_stats: Dict = {}
+
+    def stop(self, *_):
+        """Finish the current scan and exit the loop"""
+        self._stop.set()
+
+    def _emit(self, alert: Dict):
+        for sink in self.sinks:
+            try:
+                sink.emit(alert)
+            except Exception as e:
+                print(f"⚠ Alert sink {type(sink).__name__} failed: {e}")
+
+    def _alert(self, kind: str, key: str, now: float, match=None, result=None, i: int = 0) -> Dict:
+        alert = {"type": kind, "pair": key, "ts": now}
+        if match is not None:
+            k_market, p_market, similarity = match
+            alert.update(
+                kalshi_ticker=k_market.get("ticker", ""),
+                poly_condition_id=p_market.get("condition_id", ""),
+                kalshi_title=k_market.get("title", ""),
+                poly_question=p_market.get("question", ""),
+                similarity=round(float(similarity), 4),
+                buy_yes_on="kalshi" if result.direction[i] == YES_KALSHI else "polymarket",
+                net_edge=round(float(result.net_edge[i]), 4),
+                size=float(result.size[i]),
+                depth_known=bool(result.depth_known[i]),
+                net_profit=round(float(result.net_profit[i]), 2),
+                kalshi_yes=k_market.get("yes_price", 0),
+                poly_yes=p_market.get("yes_price", 0),
+            )
+        return alert
+
+    def scan_once(self) -> Dict:
+        """
+        Run one fetch -> match -> spread -> alert pass
+
+        Returns:
+            Stats of the scan
+        """
+        start = time.time()
+        kalshi_markets, poly_markets, pruned = fetch_market_lists(self.kalshi_api, self.poly_api)
+        matches = self.session.refresh(kalshi_markets, poly_markets, threshold=self.threshold)
+        result = self.engine.evaluate_matches(matches)
+        if self.spread_store is not None:
+            self.spread_store.record(matches, ts=start)
+        changes = []
+        if self.change_feed is not None:
+            changes = self.change_feed.update(kalshi_markets, poly_markets, matches, ts=start)
+
+        alerts = 0
+        seen = set()
+        for i, match in enumerate(matches):
+            key = pair_key(match[0].get("ticker", ""), match[1].get("condition_id", ""))
+            seen.add(key)
+            edge = float(result.net_edge[i]) if result.size[i] > 0 else 0.0
+            kind = self.policy.observe(key, edge, start)
+            if kind is not None:
+                self._emit(self._alert(kind, key, start, match, result, i))
+                alerts += 1
+        for key in self.policy.vanished(seen, start):
+            self._emit(self._alert("close", key, start))
+            alerts += 1
+
+        # Scores of markets that left the universe are never looked up again
+        pruned_scores = 0
+        score_cache = self.session.score_cache
+        if score_cache is not None and (self._last_prune is None or start - self._last_prune >= self.prune_interval):
+            pruned_scores = score_cache.prune(self.score_max_age)
+            self._last_prune = start
+
+        self.scans += 1
+        self.last_stats = {
+            "scan": self.scans,
+            "kalshi": len(kalshi_markets),
+            "kalshi_pruned": len(pruned),
+            "polymarket": len(poly_markets),
+            "matches": len(matches),
+            "alerts": alerts,
+            "changes": len(changes),
+            "pruned_scores": pruned_scores,
+            "open_alerts": sum(state["active"] for state in self.policy.state.values()),
+            "tracked_pairs": len(self.policy.state),
+            "seconds": time.time() - start,
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+        return self.last_stats
+
+    def run(self, max_scans: Optional[int] = None):
+        """
+        Scan every `interval` seconds until stopped (SIGINT/SIGTERM) or max_scans
+
+        Scans are scheduled on a fixed grid from the first start, so slow
+        scans do not accumulate drift; a scan that overruns its slot skips
+        ahead to the next one instead of running back to back.
+        """
+        next_start = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                stats = self.scan_once()
+                print(f"✓ Scan {stats['scan']}: {stats['matches']} matches, {stats['changes']} changes, "
+                      f"{stats['alerts']} alerts, "
+                      f"{stats['open_alerts']} open, {stats['seconds']:.1f}s, max RSS {stats['max_rss_mb']:.0f} MB")
+            except Exception as e:
+                print(f"⚠ Scan failed: {e}")
+
+            if max_scans is not None and self.scans >= max_scans:
+                break
+            next_start += self.interval
+            now = time.monotonic()
+            if next_start < now:
+                next_start += ((now - next_start) // self.interval + 1) * self.interval
+            self._stop.wait(next_start - now)
+
+
+if __name__ == "__main__":
+    import argparse
+    from reference_cache import ReferenceCache
+    from score_cache import ScoreCache
+
+    parser = argparse.ArgumentParser(description="Headless Kalshi/Polymarket spread scanner")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between scans")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Minimum match score")
+    parser.add_argument("--jsonl", default="alerts.jsonl", help="JSON-lines alert file ('' = off)")
+    parser.add_argument("--socket", default="", help="Unix datagram socket to send alerts to")
+    parser.add_argument("--webhook", default="", help="URL to POST alerts to")
+    parser.add_argument("--open-edge", type=float, default=0.02, help="Net edge per contract that opens an alert")
+    parser.add_argument("--close-edge", type=float, default=0.01, help="Net edge below which an alert closes")
+    parser.add_argument("--confirm-scans", type=int, default=2)
+    parser.add_argument("--cooldown", type=float, default=900.0, help="Seconds before a closed pair may alert again")
+    parser.add_argument("--target-size", type=float, default=100.0, help="Contracts each opportunity is sized against")
+    parser.add_argument("--spread-store", default=os.environ.get("SPREAD_STORE_DIR", "spread_history"),
+                        help="Spread history directory ('' = off)")
+    parser.add_argument("--change-log", default="changes.jsonl", help="Append-only change log ('' = off)")
+    parser.add_argument("--max-scans", type=int, default=None)
+    parser.add_argument("--threshold-matching", action="store_true",
+                        default=os.environ.get("THRESHOLD_MATCHING", "0") == "1",
+                        help="Pair strike ladders by threshold, other markets by MinHash candidates")
+    args = parser.parse_args()
+
+    sinks = []
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.socket:
+        sinks.append(UnixSocketSink(args.socket))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+
+    matcher = MarketMatcher()
+    if args.threshold_matching:
+        from minhash_lsh import MinHashLSH
+        from threshold_parser import ThresholdMatcher
+        matcher.candidate_generators.append(ThresholdMatcher(matcher, fallback=MinHashLSH(matcher, num_perm=128, bands=64)))
+    scanner = Scanner(
+        kalshi_api=KalshiAPI(reference=ReferenceCache(os.environ.get("REFERENCE_CACHE_PATH", "reference_cache.sqlite3"))),
+        session=MatcherSession(matcher, ScoreCache(os.environ.get("SCORE_CACHE_PATH", "score_cache.sqlite3"),
+                                                   rules_version=matcher.rules_version)),
+        engine=ArbitrageEngine(target_size=args.target_size,
+                               kalshi_fee_rate=float(os.environ.get("KALSHI_FEE_RATE", "0.07")),
+                               poly_fee_rate=float(os.environ.get("POLYMARKET_FEE_RATE", "0.0"))),
+        policy=AlertPolicy(open_edge=args.open_edge, close_edge=args.close_edge,
+                           confirm_scans=args.confirm_scans, cooldown=args.cooldown),
+        sinks=sinks,
+        spread_store=SpreadStore(args.spread_store) if args.spread_store else None,
+        change_feed=ChangeFeed(log_path=args.change_log or None),
+        interval=args.interval,
+        threshold=args.threshold,
+    )
+    signal.signal(signal.SIGINT, scanner.stop)
+    signal.signal(signal.SIGTERM, scanner.stop)
+    scanner.run(max_scans=args.max_scans)
@@ -0,0 +1,164 @@
+"""
+Score Cache Module
+Persists pairwise similarity scores in SQLite so restarts reuse earlier work
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple, Iterable
+
+
+class ScoreCache:
+    """
+    SQLite-backed cache of Kalshi/Polymarket similarity scores
+
+    Scores are kept per rules version, so processes on different matcher
+    versions (an app and a scanner mid-deploy) share one file without wiping
+    each other's scores. Scores of other versions that nobody has read for
+    `other_versions_ttl` are dropped on open.
+    """
+
+    def __init__(self, path: str = "score_cache.sqlite3", rules_version: str = "",
+                 other_versions_ttl: float = 7 * 86400):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite database file (":memory:" for a throwaway cache)
+            rules_version: MarketMatcher.rules_version the scores belong to
+            other_versions_ttl: Seconds after which unused scores of other rule versions are dropped
+        """
+        self.path = path
+        self.rules_version = rules_version
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                kalshi_id TEXT NOT NULL,
+                poly_id TEXT NOT NULL,
+                titles_hash TEXT NOT NULL,
+                rules_version TEXT NOT NULL,
+                score REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kalshi_id, poly_id, rules_version)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS lookup (
+                kalshi_id TEXT NOT NULL,
+                poly_id TEXT NOT NULL,
+                titles_hash TEXT NOT NULL
+            )
+        """)
+
+        # Old rule versions still in use elsewhere are touched on every lookup and survive
+        stale = self.conn.execute(
+            "DELETE FROM scores WHERE rules_version != ? AND updated_at < ?",
+            (rules_version, time.time() - other_versions_ttl)
+        ).rowcount
+        self.conn.commit()
+        if stale:
+            print(f"✓ Score cache: dropped {stale} unused scores from other matcher rules")
+
+    @staticmethod
+    def titles_hash(kalshi_signature: Tuple[str, str], poly_signature: Tuple[str, str]) -> str:
+        """
+        Hash the fields a pair's score depends on
+
+        Args:
+            kalshi_signature: MarketMatcher.kalshi_signature() of the Kalshi market
+            poly_signature: MarketMatcher.poly_signature() of the Polymarket market
+
+        Returns:
+            Short hex digest
+        """
+        joined = "\x1f".join(list(kalshi_signature) + ["\x1e"] + list(poly_signature))
+        return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:16]
+
+    def get_many(self, keys: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str], float]:
+        """
+        Bulk lookup of cached scores
+
+        Args:
+            keys: (kalshi_id, poly_id, titles_hash) triples
+
+        Returns:
+            Mapping of (kalshi_id, poly_id) -> score for every hit
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        with self._lock:
+            self.conn.executemany("INSERT INTO lookup VALUES (?, ?, ?)", keys)
+            rows = self.conn.execute("""
+                SELECT s.kalshi_id, s.poly_id, s.score
+                FROM lookup l
+                JOIN scores s
+                  ON s.kalshi_id = l.kalshi_id
+                 AND s.poly_id = l.poly_id
+                 AND s.titles_hash = l.titles_hash
+                 AND s.rules_version = ?
+            """, (self.rules_version,)).fetchall()
+            # Touch hits so prune() only drops scores nobody has asked for lately
+            self.conn.execute("""
+                UPDATE scores SET updated_at = ?
+                WHERE rules_version = ?
+                  AND (kalshi_id, poly_id) IN (SELECT kalshi_id, poly_id FROM lookup)
+            """, (time.time(), self.rules_version))
+            self.conn.execute("DELETE FROM lookup")
+            self.conn.commit()
+
+        return {(k_id, p_id): score for k_id, p_id, score in rows}
+
+    def put_many(self, rows: Iterable[Tuple[str, str, str, float]]):
+        """
+        Bulk insert or replace scores
+
+        Args:
+            rows: (kalshi_id, poly_id, titles_hash, score) tuples
+        """
+        now = time.time()
+        version = self.rules_version
+        params = [(k_id, p_id, h, version, score, now) for k_id, p_id, h, score in rows]
+        if not params:
+            return
+
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)", params
+                )
+
+    def prune(self, max_age_seconds: float) -> int:
+        """
+        Delete scores that have not been written or looked up recently
+
+        Args:
+            max_age_seconds: Age after which a score is dropped
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock:
+            with self.conn:
+                return self.conn.execute(
+                    "DELETE FROM scores WHERE updated_at < ?", (time.time() - max_age_seconds,)
+                ).rowcount
+
+    def __len__(self) -> int:
+        """Number of scores stored for this rules version"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM scores WHERE rules_version = ?", (self.rules_version,)
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self.conn.close()
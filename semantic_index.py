@@ -0,0 +1,212 @@
+"""
+Semantic Index Module
+Embeds market titles with spaCy and retrieves cross-venue nearest neighbours by cosine similarity
+"""
+import hashlib
+import os
+import time
+from typing import List, Dict, Tuple, Set, Optional, Iterable
+
+import numpy as np
+
+try:
+    import spacy
+except ImportError:  # spaCy is optional; keyword matching works without it
+    spacy = None
+
+
+def title_hash(title: str) -> str:
+    """Stable short hash of a title, used as the vector cache key"""
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticIndex:
+    """Normalized title-vector index per venue with top-k cosine retrieval"""
+
+    def __init__(
+        self,
+        model: str = "en_core_web_md",
+        top_k: int = 5,
+        min_cosine: float = 0.8,
+        batch_size: int = 256,
+        block_size: int = 1024,
+        cache_path: Optional[str] = None,
+        nlp=None
+    ):
+        """
+        Args:
+            model: spaCy pipeline with word vectors (en_core_web_md / _lg)
+            top_k: Neighbours kept per market in each direction
+            min_cosine: Neighbours below this cosine are dropped
+            batch_size: Titles per nlp.pipe batch
+            block_size: Kalshi rows per matrix product (bounds memory on large universes)
+            cache_path: Optional .npz file persisting vectors across restarts
+            nlp: Already-loaded spaCy Language (skips loading `model`)
+        """
+        self.model = model
+        self.top_k = top_k
+        self.min_cosine = min_cosine
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.cache_path = cache_path
+        self._nlp = nlp
+
+        # title hash -> unit-length float32 vector (zero vector if the title has none)
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._unsaved = 0
+        if cache_path and os.path.exists(cache_path):
+            self.load(cache_path)
+
+        self.last_stats: Dict = {}
+
+    @property
+    def nlp(self):
+        """Lazily load the spaCy pipeline with everything but vectors disabled"""
+        if self._nlp is None:
+            if spacy is None:
+                raise ImportError("Semantic matching requires spaCy: pip install spacy")
+            nlp = spacy.load(self.model)
+            # Static word vectors only need the tokenizer (tok2vec kept for models without vectors)
+            nlp.select_pipes(disable=[name for name in nlp.pipe_names if name != "tok2vec"])
+            self._nlp = nlp
+        return self._nlp
+
+    def config_key(self) -> str:
+        """Settings that change scores (folded into MarketMatcher.rules_version)"""
+        return f"semantic:{self.model}:{self.min_cosine}"
+
+    def embed(self, titles: Iterable[str]) -> np.ndarray:
+        """
+        Unit-length vectors for titles, embedding only those not cached yet
+
+        Args:
+            titles: Market titles
+
+        Returns:
+            float32 array of shape (len(titles), dim)
+        """
+        titles = list(titles)
+        hashes = [title_hash(t) for t in titles]
+
+        missing = {}
+        for title, h in zip(titles, hashes):
+            if h not in self._vectors and h not in missing:
+                missing[h] = title
+
+        if missing:
+            start = time.time()
+            docs = self.nlp.pipe(list(missing.values()), batch_size=self.batch_size)
+            for h, doc in zip(missing.keys(), docs):
+                vector = np.asarray(doc.vector, dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                self._vectors[h] = vector / norm if norm > 0 else vector
+            self._unsaved += len(missing)
+            elapsed = time.time() - start
+            print(f"✓ Embedded {len(missing)} titles in {elapsed:.2f}s ({len(missing) / max(elapsed, 1e-9):.0f}/s)")
+
+        if not hashes:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([self._vectors[h] for h in hashes])
+
+    def pair_similarity(self, title1: str, title2: str) -> float:
+        """
+        Cosine similarity of two titles (embedding them if needed)
+
+        Args:
+            title1: First title
+            title2: Second title
+
+        Returns:
+            Cosine similarity (0.0 if either title has no vector)
+        """
+        h1, h2 = title_hash(title1), title_hash(title2)
+        if h1 not in self._vectors or h2 not in self._vectors:
+            self.embed([title1, title2])
+        return float(np.dot(self._vectors[h1], self._vectors[h2]))
+
+    def neighbours(self, query_vectors: np.ndarray, index_vectors: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Top-k cosine neighbours of each query row, one matrix product per block
+
+        Args:
+            query_vectors: (n, dim) unit vectors
+            index_vectors: (m, dim) unit vectors
+            k: Neighbours per query
+
+        Returns:
+            For each query row, (index, cosine) pairs sorted by cosine descending,
+            limited to cosines >= min_cosine
+        """
+        results: List[List[Tuple[int, float]]] = []
+        m = len(index_vectors)
+        if m == 0:
+            return [[] for _ in range(len(query_vectors))]
+        k = min(k, m)
+
+        for start in range(0, len(query_vectors), self.block_size):
+            sims = query_vectors[start:start + self.block_size] @ index_vectors.T
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_sims, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_sims = np.take_along_axis(top_sims, order, axis=1)
+            for row_idx, row_sims in zip(top, top_sims):
+                keep = row_sims >= self.min_cosine
+                results.append(list(zip(row_idx[keep].tolist(), row_sims[keep].tolist())))
+
+        return results
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Set[Tuple[int, int]]:
+        """
+        Pairs where either side is among the other's top-k cosine neighbours
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs
+        """
+        start = time.time()
+        kalshi_vectors = self.embed(m.get("title", "") for m in kalshi_markets)
+        poly_vectors = self.embed(m.get("question", m.get("title", "")) for m in poly_markets)
+
+        candidates = set()
+        if len(kalshi_vectors) and len(poly_vectors):
+            for k_idx, row in enumerate(self.neighbours(kalshi_vectors, poly_vectors, self.top_k)):
+                candidates.update((k_idx, p_idx) for p_idx, _ in row)
+            for p_idx, row in enumerate(self.neighbours(poly_vectors, kalshi_vectors, self.top_k)):
+                candidates.update((k_idx, p_idx) for k_idx, _ in row)
+
+        if self.cache_path and self._unsaved:
+            self.save()
+
+        self.last_stats = {
+            "candidates": len(candidates),
+            "total_pairs": len(kalshi_markets) * len(poly_markets),
+            "seconds": time.time() - start,
+        }
+        return candidates
+
+    def save(self, path: Optional[str] = None):
+        """Persist cached vectors to an .npz file"""
+        path = path or self.cache_path
+        if not path or not self._vectors:
+            return
+        hashes = list(self._vectors.keys())
+        np.savez_compressed(
+            path,
+            model=np.array(self.model),
+            hashes=np.array(hashes),
+            vectors=np.vstack([self._vectors[h] for h in hashes])
+        )
+        self._unsaved = 0
+
+    def load(self, path: str):
+        """Load vectors written by save() (ignored if they came from another model)"""
+        data = np.load(path)
+        if str(data["model"]) != self.model:
+            print(f"⚠ Ignoring vector cache {path}: built with {data['model']}, not {self.model}")
+            return
+        for h, vector in zip(data["hashes"].tolist(), data["vectors"]):
+            self._vectors[h] = vector
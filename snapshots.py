@@ -0,0 +1,94 @@
+"""
+Market Snapshot Module
+Records extracted markets from both platforms to disk and loads them back for offline analysis
+"""
+import gzip
+import json
+import os
+import time
+from typing import List, Dict, Optional
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def save_snapshot(path: str, kalshi_markets: List[Dict], poly_markets: List[Dict],
+                  fetched_at: Optional[float] = None) -> str:
+    """
+    Write one snapshot of extracted markets (gzip-compressed if path ends in .gz)
+
+    Args:
+        path: Output file path
+        kalshi_markets: Extracted Kalshi markets (KalshiAPI.extract_market_info)
+        poly_markets: Extracted Polymarket markets (PolymarketAPI.extract_market_info)
+        fetched_at: Unix timestamp of the fetch (defaults to now)
+
+    Returns:
+        The path written
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    snapshot = {
+        "fetched_at": fetched_at if fetched_at is not None else time.time(),
+        "kalshi": kalshi_markets,
+        "polymarket": poly_markets,
+    }
+    tmp_path = path + ".tmp"
+    with _open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(path: str) -> Dict:
+    """
+    Load a snapshot written by save_snapshot
+
+    Args:
+        path: Snapshot file path
+
+    Returns:
+        Dict with 'fetched_at', 'kalshi' and 'polymarket' market lists
+    """
+    with _open(path, "r") as f:
+        snapshot = json.load(f)
+    snapshot.setdefault("fetched_at", 0.0)
+    snapshot.setdefault("kalshi", [])
+    snapshot.setdefault("polymarket", [])
+    return snapshot
+
+
+def record_snapshot(kalshi_api, poly_api, path: str, kalshi_limit: int = 200, poly_limit: int = 500) -> Dict:
+    """
+    Fetch both platforms once and save the extracted markets
+
+    Args:
+        kalshi_api: KalshiAPI instance
+        poly_api: PolymarketAPI instance
+        path: Output file path
+        kalshi_limit: Number of Kalshi events to fetch
+        poly_limit: Number of Polymarket markets to fetch
+
+    Returns:
+        The snapshot that was written
+    """
+    fetched_at = time.time()
+    kalshi_markets = [kalshi_api.extract_market_info(m) for m in kalshi_api.get_markets(limit=kalshi_limit)]
+    poly_markets = [poly_api.extract_market_info(m) for m in poly_api.get_markets(limit=poly_limit)]
+    save_snapshot(path, kalshi_markets, poly_markets, fetched_at=fetched_at)
+    print(f"✓ Recorded {len(kalshi_markets)} Kalshi and {len(poly_markets)} Polymarket markets to {path}")
+    return {"fetched_at": fetched_at, "kalshi": kalshi_markets, "polymarket": poly_markets}
+
+
+if __name__ == "__main__":
+    import sys
+    from kalshi_api import KalshiAPI
+    from polymarket_api import PolymarketAPI
+
+    output = sys.argv[1] if len(sys.argv) > 1 else time.strftime("snapshots/%Y%m%d-%H%M%S.json.gz")
+    record_snapshot(KalshiAPI(), PolymarketAPI(), output)
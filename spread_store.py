@@ -0,0 +1,358 @@
+"""
+Spread Store Module
+Per-pair price/spread history in fixed-size ring buffers backed by memory-mapped files
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # No advisory file locks (Windows): one writing process per directory
+    fcntl = None
+
+# Columns of one sample
+FIELDS = ("ts", "kalshi_price", "poly_price", "spread", "kalshi_volume", "poly_volume")
+TS, KALSHI_PRICE, POLY_PRICE, SPREAD, KALSHI_VOLUME, POLY_VOLUME = range(len(FIELDS))
+
+
+def pair_key(kalshi_id: str, poly_id: str) -> str:
+    """Key of a matched pair in the store"""
+    return f"{kalshi_id}|{poly_id}"
+
+
+class SpreadStore:
+    """
+    Ring buffer of samples per matched pair, persisted without a database
+
+    Layout on disk (all in one directory):
+    - series.f8: float64 memmap of shape (slots, capacity, len(FIELDS))
+    - cursor.i8: int64 memmap of shape (slots, 2) holding (next write row, sample count)
+    - pairs.json: pair key -> slot
+    - .lock: held (flock) by whichever process is writing
+
+    Appends write one row and bump the cursor (O(1)); once a pair has
+    `capacity` samples the oldest is overwritten. A new pair takes a free
+    slot; when there is none, pairs without a sample for `retention` seconds
+    give theirs up, then the files double (keeping rows in place) up to
+    `max_slots`, and past that the least recently sampled pairs are evicted.
+    Disk and memory are bounded by max_slots x capacity however many pairs
+    come and go.
+
+    Several processes (the app and the scanner) may share a directory: writes
+    take the directory lock and reload pairs.json first, so every process
+    sees the slots the others assigned.
+    """
+
+    def __init__(self, directory: str = "spread_history", capacity: int = 2880, initial_slots: int = 256,
+                 retention: float = 48 * 3600, max_slots: int = 4096):
+        """
+        Open (or create) the store
+
+        Args:
+            directory: Directory holding the memory-mapped files
+            capacity: Samples kept per pair (2880 = 48h at one sample a minute);
+                      fixed once the store exists
+            initial_slots: Pairs the files are sized for before the first growth
+            retention: Seconds without a sample after which a pair's slot may be reused
+            max_slots: Most pairs the files grow to
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(self._path(".lock"), "a+b")
+        self._meta_stamp = None
+        self._meta_dirty = False
+        self.capacity = capacity
+        self.retention = retention
+        self.max_slots = max_slots
+        self.slots: Dict[str, int] = {}
+        self._free: List[int] = []  # unused slots, highest first (pop() takes the lowest)
+        self.n_slots = 0
+
+        with self._locked():
+            if not self._reload_meta():
+                self._open(initial_slots)
+                self._free = list(range(initial_slots - 1, -1, -1))
+                self._save_meta()
+
+    # ---- files -----------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive write access to the directory, across threads and processes"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _reload_meta(self) -> bool:
+        """
+        Pick up slots assigned by other processes (pairs.json is replaced atomically)
+
+        Returns:
+            Whether the directory has a store
+        """
+        try:
+            stat = os.stat(self._path("pairs.json"))
+        except FileNotFoundError:
+            return False
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp != self._meta_stamp:
+            with open(self._path("pairs.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.capacity = meta["capacity"]
+            self.slots = meta["pairs"]
+            if meta["n_slots"] != self.n_slots:
+                self._open(meta["n_slots"])
+            self._free = sorted(set(range(self.n_slots)) - set(self.slots.values()), reverse=True)
+            self._meta_stamp = stamp
+        return True
+
+    @staticmethod
+    def _extend(path: str, size: int):
+        # Sparse extension: untouched pages cost no disk until written
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            with open(path, "ab") as f:
+                f.truncate(size)
+
+    def _open(self, n_slots: int):
+        row_bytes = self.capacity * len(FIELDS) * 8
+        self._extend(self._path("series.f8"), n_slots * row_bytes)
+        self._extend(self._path("cursor.i8"), n_slots * 2 * 8)
+        self.series = np.memmap(self._path("series.f8"), dtype=np.float64, mode="r+",
+                                shape=(n_slots, self.capacity, len(FIELDS)))
+        self.cursor = np.memmap(self._path("cursor.i8"), dtype=np.int64, mode="r+", shape=(n_slots, 2))
+        self.n_slots = n_slots
+
+    def _save_meta(self):
+        self._meta_dirty = False
+        meta = {"capacity": self.capacity, "n_slots": self.n_slots, "pairs": self.slots}
+        tmp_path = self._path("pairs.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path("pairs.json"))
+        stat = os.stat(self._path("pairs.json"))
+        self._meta_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _slot(self, key: str, now: float) -> int:
+        # Caller holds the directory lock, has reloaded pairs.json and saves it
+        # afterwards if _meta_dirty (once per batch rather than once per new pair)
+        slot = self.slots.get(key)
+        if slot is not None:
+            return slot
+        if not self._free:
+            self._reclaim(now - self.retention)
+        if not self._free and self.n_slots < self.max_slots:
+            self.flush()
+            old = self.n_slots
+            self._open(min(max(old * 2, 1), self.max_slots))
+            self._free = list(range(self.n_slots - 1, old - 1, -1))
+        if not self._free:
+            self._reclaim(None)
+        slot = self._free.pop()
+        self.cursor[slot] = (0, 0)
+        self.slots[key] = slot
+        self._meta_dirty = True
+        return slot
+
+    def _reclaim(self, cutoff: Optional[float]):
+        """
+        Free the slots of pairs whose newest sample is older than cutoff
+
+        With cutoff None (the store is full) the least recently sampled
+        sixteenth of the pairs is evicted instead.
+        """
+        if not self.slots:
+            return
+        keys = list(self.slots)
+        used = np.array([self.slots[key] for key in keys])
+        head, count = self.cursor[used, 0], self.cursor[used, 1]
+        newest = np.where(count > 0, self.series[used, (head - 1) % self.capacity, TS], -np.inf)
+        if cutoff is not None:
+            stale = np.nonzero(newest < cutoff)[0]
+        else:
+            stale = np.argsort(newest, kind="stable")[:max(1, len(keys) // 16)]
+        if len(stale) == 0:
+            return
+        for i in stale:
+            del self.slots[keys[i]]
+            self.cursor[used[i]] = (0, 0)
+        self._free = sorted(self._free + used[stale].tolist(), reverse=True)
+        self._meta_dirty = True
+
+    def flush(self):
+        """Write dirty pages to disk"""
+        self.series.flush()
+        self.cursor.flush()
+
+    # ---- writes ----------------------------------------------------------
+
+    def append(self, key: str, ts: float, kalshi_price: float, poly_price: float,
+               kalshi_volume: float = 0.0, poly_volume: float = 0.0):
+        """
+        Append one sample to a pair's ring buffer (O(1))
+
+        Args:
+            key: pair_key(kalshi_id, poly_id)
+            ts: Unix timestamp of the sample
+            kalshi_price: Kalshi YES price
+            poly_price: Polymarket YES price
+            kalshi_volume: Kalshi volume
+            poly_volume: Polymarket volume
+        """
+        with self._locked():
+            self._reload_meta()
+            self._append(key, ts, kalshi_price, poly_price, kalshi_volume, poly_volume)
+            if self._meta_dirty:
+                self._save_meta()
+
+    def _append(self, key: str, ts: float, kalshi_price: float, poly_price: float,
+                kalshi_volume: float, poly_volume: float):
+        # Caller holds the directory lock. A sample older than the pair's newest
+        # (another process recorded the pair in between) is dropped, so rings stay
+        # in time order.
+        slot = self._slot(key, ts)
+        head, count = self.cursor[slot]
+        if count and ts < self.series[slot, (head - 1) % self.capacity, TS]:
+            return
+        self.series[slot, head] = (ts, kalshi_price, poly_price, kalshi_price - poly_price,
+                                   kalshi_volume, poly_volume)
+        self.cursor[slot] = ((head + 1) % self.capacity, min(count + 1, self.capacity))
+
+    def record(self, matches: List[Tuple[Dict, Dict, float]], ts: Optional[float] = None) -> int:
+        """
+        Append the current prices of every matched pair
+
+        Args:
+            matches: (kalshi_market, poly_market, similarity) tuples
+            ts: Timestamp of the fetch (defaults to now)
+
+        Returns:
+            Number of samples appended
+        """
+        ts = time.time() if ts is None else ts
+        with self._locked():
+            self._reload_meta()
+            for k_market, p_market, _ in matches:
+                self._append(
+                    pair_key(k_market.get("ticker", ""), p_market.get("condition_id", "")), ts,
+                    float(k_market.get("yes_price", 0) or 0), float(p_market.get("yes_price", 0) or 0),
+                    float(k_market.get("volume", 0) or 0), float(p_market.get("volume", 0) or 0),
+                )
+            self.flush()
+            if self._meta_dirty:
+                self._save_meta()
+        return len(matches)
+
+    # ---- reads -----------------------------------------------------------
+
+    def history(self, key: str, seconds: Optional[float] = None, now: Optional[float] = None) -> np.ndarray:
+        """
+        Samples of one pair in time order
+
+        Args:
+            key: pair_key(kalshi_id, poly_id)
+            seconds: Only samples from the last `seconds` (None = everything kept)
+            now: Reference time for the window (defaults to now)
+
+        Returns:
+            (n, len(FIELDS)) array, oldest first (a copy)
+        """
+        with self._locked():
+            self._reload_meta()
+            slot = self.slots.get(key)
+            if slot is None:
+                return np.zeros((0, len(FIELDS)))
+            head, count = self.cursor[slot]
+            if count < self.capacity:
+                rows = np.array(self.series[slot, :count])
+            else:
+                rows = np.concatenate([self.series[slot, head:], self.series[slot, :head]])
+        if seconds is not None:
+            cutoff = (time.time() if now is None else now) - seconds
+            rows = rows[np.searchsorted(rows[:, TS], cutoff, side="left"):]
+        return rows
+
+    def _window_lengths(self, n: int, cutoff: float) -> np.ndarray:
+        """Per slot, how many of the newest samples are at or after cutoff (vectorized bisection)"""
+        rows = np.arange(n)
+        head, count = self.cursor[:n, 0], self.cursor[:n, 1]
+        lo, hi = np.zeros(n, dtype=np.int64), count.copy()
+        while np.any(lo < hi):
+            mid = (lo + hi) // 2
+            # Samples are appended in time order, so the k-th newest sample's
+            # timestamp falls as k grows
+            inside = (lo < hi) & (self.series[rows, (head - 1 - mid) % self.capacity, TS] >= cutoff)
+            lo = np.where(inside, mid + 1, lo)
+            hi = np.where(inside | (lo >= hi), hi, mid)
+        return lo
+
+    def window_stats(self, seconds: float, min_abs_spread: float = 0.0,
+                     now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Spread statistics of every pair over the last `seconds`, in one pass
+
+        The window length of every ring is found by a vectorized bisection on
+        timestamps, then only the (pairs x longest window) block of newest
+        samples is gathered; older rows are never read.
+
+        Args:
+            seconds: Window length
+            min_abs_spread: |spread| a sample needs to count towards 'persistence'
+            now: Reference time for the window (defaults to now)
+
+        Returns:
+            pair key -> {count, mean, std, min, max, last, persistence}; pairs
+            without samples in the window are left out
+        """
+        with self._locked():
+            self._reload_meta()
+            if not self.slots:
+                return {}
+            # Freed slots have no samples, so every slot below n_slots can be read
+            n = self.n_slots
+            slots = dict(self.slots)
+            cutoff = (time.time() if now is None else now) - seconds
+            samples = self._window_lengths(n, cutoff)
+            width = max(int(samples.max()), 1)
+
+            # Column j holds the j-th newest sample of each ring
+            back = np.arange(width)[None, :]
+            cols = (self.cursor[:n, 0][:, None] - 1 - back) % self.capacity
+            mask = back < samples[:, None]
+            spread = self.series[np.arange(n)[:, None], cols, SPREAD]
+
+            safe = np.maximum(samples, 1)
+            mean = np.where(mask, spread, 0.0).sum(axis=1) / safe
+            var = np.where(mask, (spread - mean[:, None]) ** 2, 0.0).sum(axis=1) / safe
+            low = np.where(mask, spread, np.inf).min(axis=1)
+            high = np.where(mask, spread, -np.inf).max(axis=1)
+            persistent = (mask & (np.abs(spread) >= min_abs_spread)).sum(axis=1) / safe
+            last = spread[:, 0]
+
+        stats = {}
+        for key, slot in slots.items():
+            if samples[slot]:
+                stats[key] = {
+                    "count": int(samples[slot]),
+                    "mean": float(mean[slot]),
+                    "std": float(np.sqrt(var[slot])),
+                    "min": float(low[slot]),
+                    "max": float(high[slot]),
+                    "last": float(last[slot]),
+                    "persistence": float(persistent[slot]),
+                }
+        return stats
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the streamed match preview: it is redrawn many times per run, so it must not create keyed widgets
+(the final cards of the same pairs register those keys once the run finishes)
+"""
+import ast
+import os
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING STREAMED MATCH PREVIEW")
+print("=" * 80)
+
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), encoding="utf-8") as f:
+    tree = ast.parse(f.read())
+
+functions = {node.name: node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)}
+
+
+def called_names(function):
+    """Names of every function called in a function body (st.button -> 'button')"""
+    names = set()
+    for node in ast.walk(function):
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                names.add(node.func.id)
+            elif isinstance(node.func, ast.Attribute):
+                names.add(node.func.attr)
+    return names
+
+
+def creates_keyed_widgets(name, seen=None):
+    """Whether a function (or any app function it calls) passes key= to a widget"""
+    seen = seen if seen is not None else set()
+    if name in seen or name not in functions:
+        return False
+    seen.add(name)
+    function = functions[name]
+    for node in ast.walk(function):
+        if isinstance(node, ast.Call) and any(keyword.arg == "key" for keyword in node.keywords):
+            return True
+    return any(creates_keyed_widgets(callee, seen) for callee in called_names(function))
+
+
+# Sanity: the final cards do use keyed widgets, so the analysis can see them
+check("final match cards register keyed widgets", creates_keyed_widgets("display_market_comparison"))
+
+check("streamed preview registers no keyed widgets", not creates_keyed_widgets("show_preview"),
+      f"(calls {sorted(called_names(functions['show_preview']) & set(functions))})")
+
+# The preview line formatter is plain Python: run it on its own
+namespace = {}
+exec(compile(ast.Module(body=[functions["preview_line"]], type_ignores=[]), "app.py", "exec"), namespace)
+line = namespace["preview_line"]({"title": "Bitcoin above $100k?", "yes_price": 0.42},
+                                 {"question": "Will Bitcoin be above $100k?", "yes_price": 0.47}, 0.83)
+check("preview line shows score, both titles and prices",
+      all(part in line for part in ("83%", "Bitcoin above $100k?", "Will Bitcoin be above $100k?", "42%", "47%")),
+      f"({line})")
+line = namespace["preview_line"]({}, {}, 0.5)
+check("preview line tolerates missing fields", "N/A" in line and "50%" in line)
+
+exit_with_results()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the fee- and depth-aware arbitrage engine against hand-computed fills
+"""
+import time
+
+import numpy as np
+
+from arbitrage import (ArbitrageEngine, kalshi_fee, kalshi_ladders, polymarket_ladders, quote_ladders,
+                       EMPTY_LADDER, YES_KALSHI, YES_POLYMARKET, LIMIT_TARGET, LIMIT_DEPTH, LIMIT_EDGE)
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING ARBITRAGE ENGINE")
+print("=" * 80)
+
+
+def ladder(*levels):
+    return np.array([p for p, _ in levels]), np.array([float(s) for _, s in levels])
+
+
+check("Kalshi fee rounds up to the cent", float(kalshi_fee(100, 0.50)) == 1.75 and float(kalshi_fee(1, 0.50)) == 0.02)
+
+yes_asks, no_asks = kalshi_ladders({"yes": [[30, 10], [35, 5]], "no": [[60, 20], [58, 40]]})
+check("Kalshi bids become asks on the other side",
+      yes_asks[0].tolist() == [0.40, 0.42] and no_asks[0].tolist() == [0.65, 0.70] and yes_asks[1].tolist() == [20, 40])
+yes_asks, no_asks = polymarket_ladders({"asks": [{"price": "0.52", "size": "100"}], "bids": [{"price": "0.48", "size": "80"}]})
+check("Polymarket NO asks derive from YES bids", no_asks[0].tolist() == [0.52] and no_asks[1].tolist() == [80])
+
+engine = ArbitrageEngine(target_size=100, kalshi_fee_rate=0.07, poly_fee_rate=0.0)
+
+# YES on Kalshi at 0.40 x30 then 0.45 x50; NO on Polymarket at 0.50 x60 then 0.56 x100.
+# 30 @ 0.90 and 30 @ 0.95 clear fees; the next segment (0.45 + 0.56) loses money.
+kalshi = [(ladder((0.40, 30), (0.45, 50)), EMPTY_LADDER)]
+poly = [(EMPTY_LADDER, ladder((0.50, 60), (0.56, 100)))]
+r = engine.evaluate(kalshi, poly)
+check("walks depth until the edge turns negative", r.size[0] == 60 and r.limit[0] == LIMIT_EDGE, f"(size {r.size[0]})")
+check("cost and per-level rounded fees", np.isclose(r.cost[0], 55.5) and np.isclose(r.fees[0], 0.51 + 0.52),
+      f"(cost {r.cost[0]:.2f}, fees {r.fees[0]:.2f})")
+check("net edge and limiting level",
+      np.isclose(r.net_profit[0], 3.47) and (r.yes_level[0], r.no_level[0]) == (1, 0)
+      and (r.yes_limit_price[0], r.no_limit_price[0]) == (0.45, 0.50), f"(net {r.net_profit[0]:.2f})")
+
+# Both directions, target and depth limits, no opportunity
+kalshi = [(EMPTY_LADDER, ladder((0.30, 500))),
+          (ladder((0.30, 40)), EMPTY_LADDER),
+          (ladder((0.55, 100)), ladder((0.47, 100)))]
+poly = [(ladder((0.60, 500)), EMPTY_LADDER),
+        (EMPTY_LADDER, ladder((0.60, 1000))),
+        (ladder((0.56, 100)), ladder((0.46, 100)))]
+r = engine.evaluate(kalshi, poly)
+check("YES on Polymarket / NO on Kalshi capped at target",
+      r.direction[0] == YES_POLYMARKET and r.size[0] == 100 and r.limit[0] == LIMIT_TARGET)
+check("shallow book limits the fill", r.direction[1] == YES_KALSHI and r.size[1] == 40 and r.limit[1] == LIMIT_DEPTH)
+check("fees erase a one-cent gap", r.size[2] == 0 and not engine.opportunities(r)[2])
+
+matches = [({"ticker": "K1", "yes_ask": 0.40, "no_ask": 0.62},
+            {"condition_id": "P1", "best_bid": 0.52, "best_ask": 0.55}, 0.9)]
+r = engine.evaluate_matches(matches)
+check("top-of-book quotes without orderbooks", r.size[0] == 100 and r.direction[0] == YES_KALSHI,
+      f"(edge {r.net_edge[0] * 100:.2f}¢)")
+check("quote-only pairs are flagged as unknown depth", not r.depth_known[0]
+      and engine.evaluate([(ladder((0.40, 10)), ladder((0.40, 10)))], [(ladder((0.40, 10)), ladder((0.40, 10)))]).depth_known[0])
+
+# Markets without a real ask never fall back to mid or last prices
+unquoted = [({"ticker": "K2", "yes_ask": None, "no_ask": None, "yes_price": 0.30, "no_price": 0.30},
+             {"condition_id": "P2", "best_bid": 0.52, "best_ask": 0.55}, 0.9),
+            ({"ticker": "K3", "yes_ask": 0.30, "no_ask": 0.62},
+             {"condition_id": "P3", "best_bid": 0.0, "best_ask": 0.0, "yes_price": 0.30, "no_price": 0.30}, 0.9)]
+r = engine.evaluate_matches(unquoted)
+check("unquoted markets have empty ladders, not mid-price fills",
+      quote_ladders(unquoted[1][1], "polymarket") == (EMPTY_LADDER, EMPTY_LADDER)
+      and not engine.opportunities(r).any() and (r.size == 0).all(), f"(sizes {r.size})")
+
+# Vectorized throughput
+rng = np.random.default_rng(0)
+n, depth = 20000, 20
+sides = []
+for _ in range(4):
+    sides.append([(np.sort(rng.uniform(0.45, 0.65, depth)), rng.integers(1, 50, depth).astype(float)) for _ in range(n)])
+start = time.perf_counter()
+r = engine.evaluate(list(zip(sides[0], sides[1])), list(zip(sides[2], sides[3])))
+elapsed = time.perf_counter() - start
+check(f"{n} pairs x {depth} levels in one pass", elapsed < 10, f"({elapsed:.2f}s, {engine.opportunities(r).sum()} opportunities)")
+
+exit_with_results()
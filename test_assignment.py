@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test global one-to-one assignment of scored market pairs
+"""
+import itertools
+import random
+import time
+
+from assignment import greedy_assignment, optimal_assignment, connected_components, hungarian
+from market_matcher import MarketMatcher
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING GLOBAL ASSIGNMENT")
+print("=" * 80)
+
+
+# An early mediocre pair must not take the Kalshi market from a better later pair
+matcher = MarketMatcher()
+kalshi_markets = [{"ticker": "K0"}, {"ticker": "K1"}]
+poly_markets = [{"condition_id": "P0"}, {"condition_id": "P1"}]
+scores = {(0, 0): 0.6, (0, 1): 0.95, (1, 0): 0.55}
+matches = matcher.assign_matches(kalshi_markets, poly_markets, scores, threshold=0.5)
+pairs = sorted((k["ticker"], p["condition_id"]) for k, p, s in matches)
+check("better later pair keeps its Kalshi market", pairs == [("K0", "P1"), ("K1", "P0")], f"{pairs}")
+
+# Same pairs whatever order the APIs returned the markets in
+rng = random.Random(7)
+kalshi_markets = [{"ticker": f"K{i}"} for i in range(30)]
+poly_markets = [{"condition_id": f"P{j}"} for j in range(30)]
+pair_scores = {
+    (f"K{i}", f"P{j}"): round(rng.choice([0.5, 0.6, 0.7, 0.8, 0.9]), 1)
+    for i in range(30) for j in range(30) if rng.random() < 0.15
+}
+results = set()
+for _ in range(5):
+    rng.shuffle(kalshi_markets)
+    rng.shuffle(poly_markets)
+    k_pos = {m["ticker"]: i for i, m in enumerate(kalshi_markets)}
+    p_pos = {m["condition_id"]: j for j, m in enumerate(poly_markets)}
+    scores = {(k_pos[k], p_pos[p]): s for (k, p), s in pair_scores.items()}
+    matches = matcher.assign_matches(kalshi_markets, poly_markets, scores, threshold=0.5)
+    results.add(tuple(sorted((k["ticker"], p["condition_id"]) for k, p, s in matches)))
+check("assignment is independent of list order", len(results) == 1)
+
+# Hungarian against brute force on small dense matrices
+ok = True
+for trial in range(30):
+    n, m = rng.randint(1, 5), rng.randint(1, 5)
+    cost = [[rng.random() for _ in range(m)] for _ in range(n)]
+    assignment = hungarian(cost)
+    total = sum(cost[r][c] for r, c in assignment)
+    if n <= m:
+        best = min(sum(cost[r][c] for r, c in zip(range(n), cols)) for cols in itertools.permutations(range(m), n))
+    else:
+        best = min(sum(cost[r][c] for r, c in zip(rows, range(m))) for rows in itertools.permutations(range(n), m))
+    if abs(total - best) > 1e-9 or len(assignment) != min(n, m):
+        ok = False
+        break
+check("hungarian matches brute force on random matrices", ok)
+
+edges = [(0.9, "a", "x"), (0.8, "a", "y"), (0.8, "b", "x"), (0.7, "c", "z")]
+check("components split on shared markets", sorted(len(c) for c in connected_components(edges)) == [1, 3])
+optimal = optimal_assignment(edges)
+greedy = greedy_assignment(edges)
+check("optimal total >= greedy total",
+      sum(e[0] for e in optimal) >= sum(e[0] for e in greedy),
+      f"(optimal {sum(e[0] for e in optimal):.1f}, greedy {sum(e[0] for e in greedy):.1f})")
+
+# Large sparse graph: greedy stays near-linear
+edges = [(rng.random(), f"K{rng.randrange(100000)}", f"P{rng.randrange(100000)}") for _ in range(300000)]
+start = time.time()
+chosen = greedy_assignment(edges)
+elapsed = time.time() - start
+check("greedy over 300k edges under 5s", elapsed < 5, f"({elapsed:.2f}s, {len(chosen)} matches)")
+
+exit_with_results()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the historical backfill: partitioned Parquet output, retries and resuming from a checkpoint
+"""
+import os
+import tempfile
+
+import pyarrow.parquet as pq
+import requests
+
+import backfill
+from kalshi_api import KalshiAPI
+from polymarket_api import PolymarketAPI
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING HISTORICAL BACKFILL")
+print("=" * 80)
+
+
+backfill.RETRY_BACKOFF = 0
+
+
+class FakeKalshi(KalshiAPI):
+    """Three pages per status; fails once on page 1 and can be made to crash after a page"""
+
+    def __init__(self, crash_after=None):
+        super().__init__()
+        self.crash_after = crash_after
+        self.calls = 0
+        self.flaked = False
+
+    def get_markets_page(self, status, cursor=None, limit=200):
+        self.calls += 1
+        page = int(cursor or 0)
+        if page == 1 and not self.flaked:
+            self.flaked = True
+            raise requests.ConnectionError("flaky")
+        if self.crash_after is not None and page > self.crash_after:
+            raise KeyboardInterrupt
+        markets = [{"ticker": f"K-{status}-{page}-{i}", "title": f"Market {page} {i}", "status": status,
+                    "result": "yes" if i % 2 else "no", "last_price_dollars": 0.5,
+                    "close_time": f"2024-0{page + 1}-15T00:00:00Z"} for i in range(3)]
+        return markets, (str(page + 1) if page < 2 else None)
+
+
+class FakePolymarket(PolymarketAPI):
+    TOTAL = 23
+
+    def get_markets_page(self, offset=0, limit=500, closed=True):
+        return [{"conditionId": f"0x{n}", "question": f"Question {n}", "outcomePrices": "[\"1\", \"0\"]",
+                 "endDate": "2023-11-01T00:00:00Z", "clobTokenIds": "[\"1\", \"2\"]", "closed": True}
+                for n in range(offset, min(offset + limit, self.TOTAL))]
+
+
+out_dir = tempfile.mkdtemp()
+try:
+    backfill.run_backfill(out_dir, FakeKalshi(crash_after=0), FakePolymarket(), kalshi_rate=1000, workers=2)
+    interrupted = False
+except KeyboardInterrupt:
+    interrupted = True
+state = backfill.Checkpoint(os.path.join(out_dir, backfill.CHECKPOINT_FILE)).state
+check("interrupted run leaves a checkpoint mid-walk",
+      interrupted and state["kalshi:closed"]["pages"] == 1 and not state["kalshi:closed"]["done"], f"{state}")
+
+kalshi = FakeKalshi()
+counts = backfill.run_backfill(out_dir, kalshi, FakePolymarket(), kalshi_rate=1000, workers=2)
+check("resumed run only fetches the missing pages",
+      counts["kalshi:closed"] == 6 and counts["polymarket:closed"] == 0, f"{counts}")
+
+table = pq.read_table(os.path.join(out_dir, "venue=kalshi")).to_pylist()
+tickers = [row["ticker"] for row in table]
+check("every Kalshi market written exactly once", len(tickers) == 18 and len(set(tickers)) == 18, f"({len(tickers)})")
+check("settlement result is kept", {row["result"] for row in table} == {"yes", "no"})
+check("partitioned by close month",
+      sorted(d for d in os.listdir(os.path.join(out_dir, "venue=kalshi"))) ==
+      ["close_month=2024-01", "close_month=2024-02", "close_month=2024-03"])
+
+poly = pq.read_table(os.path.join(out_dir, "venue=polymarket")).to_pylist()
+check("Polymarket walk pages concurrently to the end",
+      sorted(int(row["condition_id"][2:]) for row in poly) == list(range(FakePolymarket.TOTAL)))
+
+kalshi = FakeKalshi()
+counts = backfill.run_backfill(out_dir, kalshi, FakePolymarket())
+check("a finished backfill is a no-op", kalshi.calls == 0 and sum(counts.values()) == 0)
+
+# A page whose markets lack a numeric field extracts it as int 0; the next page has floats
+poly_api = PolymarketAPI()
+mixed_dir = tempfile.mkdtemp()
+backfill.write_partitioned([poly_api.extract_market_info({"conditionId": "0xa", "endDate": "2023-11-01T00:00:00Z"})],
+                           mixed_dir, "polymarket", "offset-000000000")
+backfill.write_partitioned([poly_api.extract_market_info({"conditionId": "0xb", "endDate": "2023-11-02T00:00:00Z",
+                                                          "liquidity": "12.5", "volume": "3.25",
+                                                          "outcomePrices": "[\"0.4\", \"0.6\"]"})],
+                           mixed_dir, "polymarket", "offset-000000500")
+try:
+    mixed = {row["condition_id"]: row for row in pq.read_table(os.path.join(mixed_dir, "venue=polymarket")).to_pylist()}
+    detail = f"({mixed['0xa']['liquidity']}, {mixed['0xb']['liquidity']}, {mixed['0xb']['no_price']})"
+    ok = mixed["0xa"]["liquidity"] == 0.0 and mixed["0xb"]["liquidity"] == 12.5 and mixed["0xb"]["no_price"] == 0.6
+except Exception as e:
+    ok, detail = False, f"({e})"
+check("pages with a missing numeric field read back with the other pages", ok, detail)
+
+exit_with_results()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized spread backtest against a per-tick reference loop
+"""
+import tempfile
+import time
+
+import numpy as np
+
+from arbitrage import kalshi_fee
+from backtest import Panel, SpreadBacktest, panel_from_snapshots, panel_from_spread_store, summarize
+from spread_store import SpreadStore
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING SPREAD BACKTEST")
+print("=" * 80)
+
+
+def reference(kalshi, poly, kalshi_result, poly_result, entry, exit_, size, rate):
+    """Per-tick simulation of one pair, written the obvious way"""
+    position, entry_value, pnl = 0, 0.0, 0.0
+    last_k = last_p = None
+    for k, p in zip(kalshi, poly):
+        k = last_k if np.isnan(k) else k
+        p = last_p if np.isnan(p) else p
+        last_k, last_p = k, p
+        if k is None or p is None:
+            continue
+        s = k - p
+        target = np.sign(s) if abs(s) >= entry else (0 if abs(s) <= exit_ else position)
+        if target != position:
+            fee = float(kalshi_fee(size, k, rate))
+            if position:
+                pnl += size * (1 - position * s - entry_value) - fee
+            if target:
+                entry_value = 1 - target * s
+                pnl -= fee
+            position = target
+    if position and not np.isnan(kalshi_result - poly_result):
+        pnl += size * (1 - position * (kalshi_result - poly_result) - entry_value)
+    elif position:
+        pnl += size * (1 - position * (last_k - last_p) - entry_value)
+    return pnl
+
+
+# 1. Hand-worked pair: enter at 6c, hold through 3c, exit at 0c
+panel = Panel(np.arange(4.0), np.array([[0.50], [0.56], [0.53], [0.50]]), np.full((4, 1), 0.50),
+              ["K|P"], np.array([np.nan]), np.array([np.nan]))
+result = SpreadBacktest(0.05, 0.01, size=1, kalshi_fee_rate=0.0).run(panel)
+check("round trip earns the spread it captured", np.isclose(result.pnl[0], 0.06) and result.trades[0] == 2,
+      f"(pnl {result.pnl[0]:.4f})")
+
+# 2. Held to settlement where the venues disagree
+panel = Panel(np.arange(2.0), np.array([[0.40], [0.40]]), np.array([[0.50], [0.50]]),
+              ["K|P"], np.array([0.0]), np.array([1.0]))
+result = SpreadBacktest(0.05, 0.01, size=1, kalshi_fee_rate=0.0).run(panel)
+check("split settlement loses the whole package", np.isclose(result.pnl[0], -(0.40 + 0.50))
+      and result.settled[0], f"(pnl {result.pnl[0]:.4f})")
+
+# 3. Random panels with gaps: vectorized == reference loop, also across column blocks
+rng = np.random.default_rng(7)
+T, P = 400, 60
+kalshi = np.clip(0.5 + np.cumsum(rng.normal(0, 0.01, (T, P)), axis=0), 0.01, 0.99)
+poly = np.clip(kalshi + rng.normal(0, 0.04, (T, P)), 0.01, 0.99)
+kalshi[rng.random((T, P)) < 0.1] = np.nan
+poly[:rng.integers(0, 50), :5] = np.nan
+k_res = rng.choice([0.0, 1.0, np.nan], P)
+p_res = np.where(rng.random(P) < 0.9, k_res, 1 - k_res)
+panel = Panel(np.arange(T, dtype=float), kalshi, poly, [f"K{i}|P{i}" for i in range(P)], k_res, p_res)
+engine = SpreadBacktest(0.05, 0.01, size=10)
+result = engine.run(panel)
+expected = np.array([reference(kalshi[:, i], poly[:, i], k_res[i], p_res[i], 0.05, 0.01, 10, 0.07) for i in range(P)])
+check("matches the per-tick reference on every pair", np.allclose(result.pnl, expected),
+      f"(max diff {np.abs(result.pnl - expected).max():.2e})")
+blocked = SpreadBacktest(0.05, 0.01, size=10, block_cells=T * 7).run(panel)
+check("column blocks give the same answer", np.allclose(blocked.pnl, result.pnl)
+      and np.allclose(blocked.equity, result.equity))
+check("equity ends at total pnl", np.isclose(result.equity[-1], result.pnl.sum()))
+
+# 4. Replay recorded snapshots through the matcher
+snapshots = []
+for t, (k_price, p_price) in enumerate([(0.40, 0.41), (0.40, 0.48), (0.45, 0.46)]):
+    snapshots.append({"fetched_at": 1000.0 + 60 * t,
+                      "kalshi": [{"ticker": "KXTRUMP", "title": "Will Donald Trump win the 2024 election?",
+                                  "yes_price": k_price, "result": "yes" if t == 2 else ""}],
+                      "polymarket": [{"condition_id": "0xT", "question": "Will Trump win the 2024 election?",
+                                      "yes_price": p_price}]})
+panel = panel_from_snapshots(snapshots[::-1])
+result = SpreadBacktest(0.05, 0.01, size=1, kalshi_fee_rate=0.0).run(panel)
+check("snapshots are matched and replayed in time order",
+      panel.pairs == ["KXTRUMP|0xT"] and np.allclose(panel.kalshi[:, 0], [0.40, 0.40, 0.45])
+      and panel.kalshi_result[0] == 1.0 and np.isclose(result.pnl[0], 0.07), f"({summarize(result)})")
+
+# 5. Spread store history resampled onto a grid
+store = SpreadStore(tempfile.mkdtemp(), capacity=16, initial_slots=2)
+for ts, k, p in [(0, 0.5, 0.5), (90, 0.6, 0.5), (200, 0.5, 0.5)]:
+    store.append("A|B", ts, k, p)
+panel = panel_from_spread_store(store, step=60)
+check("spread store panel is an as-of join", np.allclose(panel.kalshi[:, 0], [0.5, 0.5, 0.6, 0.6]))
+
+# 6. Throughput: a day of minute bars for 2000 pairs
+T, P = 1440, 2000
+kalshi = np.clip(0.5 + np.cumsum(rng.normal(0, 0.005, (T, P)), axis=0), 0.01, 0.99)
+poly = np.clip(kalshi + rng.normal(0, 0.03, (T, P)), 0.01, 0.99)
+panel = Panel(np.arange(T, dtype=float), kalshi, poly, [str(i) for i in range(P)],
+              np.full(P, np.nan), np.full(P, np.nan))
+start = time.time()
+SpreadBacktest().run(panel)
+elapsed = time.time() - start
+check("a day of minute bars for 2000 pairs in under a second", elapsed < 1, f"({elapsed:.2f}s)")
+
+exit_with_results()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test change-data-capture events between consecutive refreshes
+"""
+import os
+import tempfile
+
+from change_feed import (ChangeFeed, read_log, MARKET_ADDED, MARKET_REMOVED, PRICE_MOVED,
+                         PAIR_MATCHED, PAIR_UNMATCHED, SPREAD_CROSSED)
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING CHANGE FEED")
+print("=" * 80)
+
+
+def kalshi(ticker, price):
+    return {"ticker": ticker, "title": f"Kalshi {ticker}", "yes_price": price}
+
+
+def poly(condition_id, price):
+    return {"condition_id": condition_id, "question": f"Polymarket {condition_id}", "yes_price": price}
+
+
+def kinds(events):
+    return sorted((event.type, event.key) for event in events)
+
+
+log_path = os.path.join(tempfile.mkdtemp(), "changes.jsonl")
+feed = ChangeFeed(price_epsilon=0.01, spread_threshold=0.05, log_path=log_path)
+
+k1, p1 = kalshi("K1", 0.50), poly("P1", 0.52)
+first = feed.update([k1], [p1], [(k1, p1, 0.9)], ts=1)
+check("first refresh adds markets and matches pairs",
+      kinds(first) == [(MARKET_ADDED, "kalshi:K1"), (MARKET_ADDED, "polymarket:P1"), (PAIR_MATCHED, "K1|P1")])
+
+k1 = kalshi("K1", 0.505)
+check("moves inside epsilon are silent", feed.update([k1], [p1], [(k1, p1, 0.9)], ts=2) == [])
+
+k1 = kalshi("K1", 0.515)
+events = feed.update([k1], [p1], [(k1, p1, 0.9)], ts=3)
+check("drift past epsilon from the last report is a move",
+      kinds(events) == [(PRICE_MOVED, "kalshi:K1")] and events[0].data["previous"] == 0.50)
+
+k1 = kalshi("K1", 0.60)
+events = feed.update([k1], [p1], [(k1, p1, 0.9)], ts=4)
+check("spread crossing above the threshold",
+      kinds(events) == [(PRICE_MOVED, "kalshi:K1"), (SPREAD_CROSSED, "K1|P1")]
+      and events[-1].data["direction"] == "above")
+
+k2 = kalshi("K2", 0.30)
+events = feed.update([k2], [p1], [], ts=5)
+check("removed market and unmatched pair",
+      kinds(events) == [(MARKET_ADDED, "kalshi:K2"), (MARKET_REMOVED, "kalshi:K1"), (PAIR_UNMATCHED, "K1|P1")])
+
+seqs = [event.seq for event in feed.iter_events()]
+check("seq is strictly increasing", seqs == list(range(1, len(seqs) + 1)))
+check("iterator resumes after a seq", [e.seq for e in feed.iter_events(since=seqs[-3])] == seqs[-2:])
+check("log replays the same events", [e.seq for e in read_log(log_path)] == seqs)
+
+reopened = ChangeFeed(log_path=log_path)
+k3 = kalshi("K3", 0.1)
+events = reopened.update([k3], [], [], ts=6)
+check("reopened log continues the sequence", events[0].seq == seqs[-1] + 1)
+
+# Past max_log_bytes the log rotates to one predecessor; replay and seq span both files
+small_log = os.path.join(tempfile.mkdtemp(), "changes.jsonl")
+rotating = ChangeFeed(log_path=small_log, max_log_bytes=600)
+for ts in range(1, 41):
+    market = kalshi("K1", 0.1 + (ts % 2) * 0.5)
+    rotating.update([market], [], [], ts=ts)
+replayed = [event.seq for event in read_log(small_log)]
+check("log rotates instead of growing",
+      os.path.getsize(small_log) <= 600 + 200 and os.path.getsize(small_log + ".1") <= 600 + 200
+      and replayed == list(range(replayed[0], rotating.seq + 1)) and replayed[0] > 1, f"(replays {len(replayed)} events)")
+os.replace(small_log, small_log + ".1")
+check("a reopened feed continues from the rotated log", ChangeFeed(log_path=small_log).seq == rotating.seq)
+
+exit_with_results()
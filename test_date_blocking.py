@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test close-date blocking: tolerance edges, markets without a close time,
+and that the window ranges behave like the set of pairs they stand for
+"""
+from date_blocking import CloseDateBlocker, CloseDateWindows, parse_close_time
+from market_matcher import MarketMatcher
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING CLOSE-DATE BLOCKING")
+print("=" * 80)
+
+
+DAY = 86400
+base = parse_close_time("2026-06-30T00:00:00Z")
+
+
+def brute_force(kalshi_markets, poly_markets, tolerance_days):
+    """Every pair within tolerance, or undated on either side"""
+    pairs = set()
+    for k_idx, k_market in enumerate(kalshi_markets):
+        for p_idx, p_market in enumerate(poly_markets):
+            k_ts, p_ts = k_market.get("close_ts"), p_market.get("close_ts")
+            if k_ts is None or p_ts is None or abs(k_ts - p_ts) <= tolerance_days * DAY:
+                pairs.add((k_idx, p_idx))
+    return pairs
+
+
+# Kalshi closes at base; Polymarket closes exactly on, just inside and just outside both edges
+kalshi_markets = [{"title": "K dated", "close_ts": base}, {"title": "K undated"}]
+offsets = (-7 * DAY - 1, -7 * DAY, -7 * DAY + 1, 0, 7 * DAY - 1, 7 * DAY, 7 * DAY + 1)
+poly_markets = [{"question": f"P {o}", "close_ts": base + o} for o in offsets] + [{"question": "P undated"}]
+
+blocker = CloseDateBlocker(tolerance_days=7)
+pairs = blocker.candidate_pairs(kalshi_markets, poly_markets)
+kept = sorted(p_idx for k_idx, p_idx in pairs if k_idx == 0)
+check("both tolerance edges are inclusive, one second past is pruned", kept == [1, 2, 3, 4, 5, 7], f"({kept})")
+check("an undated Kalshi market pairs with every Polymarket market",
+      sorted(p_idx for k_idx, p_idx in pairs if k_idx == 1) == list(range(len(poly_markets))))
+check("an undated Polymarket market pairs with every Kalshi market", {(0, 7), (1, 7)} <= set(pairs))
+check("stats count undated markets and pruned pairs",
+      blocker.last_stats["kalshi_undated"] == 1 and blocker.last_stats["poly_undated"] == 1
+      and blocker.last_stats["pruned"] == 2 and blocker.last_stats["candidates"] == 14, f"({blocker.last_stats})")
+
+# Close times as the APIs return them, including missing and unparseable ones
+raw = [{"title": "K iso", "close_time": "2026-06-30T00:00:00Z"}, {"title": "K date only", "close_time": "2026-07-07"},
+       {"title": "K empty", "close_time": ""}, {"title": "K garbage", "close_time": "soon"}]
+poly_raw = [{"question": "P iso", "end_date": "2026-07-07T00:00:00Z"}, {"question": "P none", "end_date": None}]
+raw_pairs = set(CloseDateBlocker(tolerance_days=7).candidate_pairs(raw, poly_raw))
+check("ISO strings are parsed, empty or unparseable dates count as undated",
+      raw_pairs == {(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0), (3, 1)}
+      and (0, 0) not in CloseDateBlocker(tolerance_days=6).candidate_pairs(raw, poly_raw), f"({sorted(raw_pairs)})")
+
+# The window ranges behave like the full set of kept pairs
+kalshi_many = [{"title": f"K{i}", "close_ts": base + (i * 37 % 200) * DAY} for i in range(60)] + [{"title": "K undated"}]
+poly_many = [{"question": f"P{i}", "close_ts": base + (i * 53 % 200) * DAY} for i in range(80)] + [{"question": "P undated"}]
+same = True
+for days in (0, 3, 30, 365):
+    windows = CloseDateBlocker(tolerance_days=days).candidate_pairs(kalshi_many, poly_many)
+    expected = brute_force(kalshi_many, poly_many, days)
+    same &= set(windows) == expected and len(windows) == len(expected)
+    same &= all((pair in windows) == (pair in expected)
+                for pair in [(k, p) for k in range(len(kalshi_many)) for p in range(len(poly_many))])
+check("windows iterate, count and test membership exactly like brute force", same)
+check("out-of-range indices are not members", (len(kalshi_many), 0) not in windows and (0, -1) not in windows)
+
+windows = CloseDateBlocker(tolerance_days=365).candidate_pairs(kalshi_many, poly_many)
+check("wide tolerance is stored as index ranges, not pairs",
+      isinstance(windows, CloseDateWindows) and len(windows.ranges) == len(kalshi_many)
+      and len(windows.order) + len(windows.undated_poly) == len(poly_many) and len(windows) == len(kalshi_many) * len(poly_many))
+check("intersecting with a candidate set gives a plain set",
+      ({(0, 0), (0, 1), (999, 0)} & windows) == {(0, 0), (0, 1)} and isinstance({(0, 0)} & windows, set))
+
+# Blocking inside the matcher keeps every match that closes within tolerance
+titles = ["Will Bitcoin be above $100k on December 31, 2026?", "Will the Fed cut interest rates in March 2026?",
+          "Will Gavin Newsom win the 2028 presidential election?"]
+kalshi_titled = [{"ticker": f"K{i}", "title": t, "close_ts": base + i * DAY} for i, t in enumerate(titles)]
+poly_titled = [{"condition_id": f"P{i}", "question": t, "close_ts": base + i * 30 * DAY} for i, t in enumerate(titles)]
+poly_titled.append({"condition_id": "PU", "question": "Will Gavin Newsom win the 2028 US presidential election?"})
+exhaustive = MarketMatcher().find_matches(kalshi_titled, poly_titled, 0.5)
+blocked = MarketMatcher()
+blocked.blocking_filters.append(CloseDateBlocker(tolerance_days=7))
+with_dates = [(k["ticker"], p["condition_id"]) for k, p, _ in blocked.find_matches(kalshi_titled, poly_titled, 0.5)]
+check("matcher drops only matches closing too far apart",
+      len(exhaustive) == 3 and ("K0", "P0") in with_dates and ("K1", "P1") not in with_dates
+      and ("K2", "P2") not in with_dates and ("K2", "PU") in with_dates, f"({with_dates})")
+
+exit_with_results()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test NER entity extraction with a stub spaCy pipeline: label filtering, the per-title cache,
+and the person gate using entities split once per title
+"""
+import re
+
+from entity_extractor import EntityExtractor
+from market_matcher import MarketMatcher
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING ENTITY EXTRACTOR")
+print("=" * 80)
+
+
+class StubEntity:
+    def __init__(self, text, label):
+        self.text = text
+        self.label_ = label
+
+
+class StubDoc:
+    def __init__(self, ents):
+        self.ents = ents
+
+
+class StubNLP:
+    """Finds entities from a fixed gazetteer (case-insensitive, like a model that ignores casing)"""
+
+    GAZETTEER = {"kevin hassett": "PERSON", "christopher waller": "PERSON", "michelle bowman": "PERSON",
+                 "federal reserve": "ORG", "2026": "DATE", "new york": "GPE", "the beatles": "WORK_OF_ART"}
+
+    def __init__(self):
+        self.processed = 0
+
+    def pipe(self, texts, batch_size=256, n_process=1):
+        for text in texts:
+            self.processed += 1
+            lower = text.lower()
+            yield StubDoc([StubEntity(text[match.start():match.end()], label)
+                           for phrase, label in self.GAZETTEER.items()
+                           for match in re.finditer(re.escape(phrase), lower)])
+
+
+nlp = StubNLP()
+extractor = EntityExtractor(model="stub", nlp=nlp)
+titles = ["Will kevin hassett chair the Federal Reserve in 2026?", "Will The Beatles reunite in New York?",
+          "Will kevin hassett chair the Federal Reserve in 2026?"]
+entities = extractor.extract(titles)
+check("entities are grouped by label, unlisted labels dropped",
+      entities[0] == {"PERSON": ["kevin hassett"], "ORG": ["Federal Reserve"], "DATE": ["2026"]}
+      and entities[1] == {"GPE": ["New York"]}, f"({entities[:2]})")
+check("each distinct title goes through NER once", nlp.processed == 2 and extractor.last_stats["titles_processed"] == 2)
+extractor.extract(titles)
+check("cached titles are not processed again", nlp.processed == 2 and extractor.last_stats["titles_processed"] == 0)
+
+markets = [{"question": title} for title in titles]
+extractor.annotate(markets, title_field="question")
+check("annotate stores entities on each market", markets[1]["entities"] == {"GPE": ["New York"]})
+
+
+class CountingMatcher(MarketMatcher):
+    person_name_calls = 0
+
+    def person_names(self, title, entities=None):
+        if entities is not None:
+            CountingMatcher.person_name_calls += 1
+        return super().person_names(title, entities)
+
+
+people = ("kevin hassett", "christopher waller", "michelle bowman")
+kalshi_markets = [{"ticker": f"K{i}", "title": f"Will the next Fed chair be {name}?"} for i, name in enumerate(people)]
+poly_markets = [{"condition_id": f"P{i}", "question": f"Will the next Fed chair be {name}?"}
+                for i, name in reversed(list(enumerate(people)))]
+
+heuristic = MarketMatcher()
+wrong_person = heuristic.compute_similarity(kalshi_markets[0], poly_markets[0])
+ner = CountingMatcher()
+ner.entity_extractor = EntityExtractor(model="stub", nlp=StubNLP())
+matches = ner.find_matches(kalshi_markets, poly_markets, 0.5)
+check("NER person names reject a lowercase wrong-person pair the heuristic misses",
+      wrong_person > 0.5 and ner.compute_similarity(kalshi_markets[0], poly_markets[0]) == 0.0,
+      f"(heuristic {wrong_person:.2f})")
+check("every title pairs with the same person",
+      sorted((k["ticker"], p["condition_id"]) for k, p, _ in matches) == [("K0", "P0"), ("K1", "P1"), ("K2", "P2")],
+      f"({[(k['ticker'], p['condition_id']) for k, p, _ in matches]})")
+check("entity person names are split once per title, not per pair",
+      CountingMatcher.person_name_calls == len(kalshi_markets) + len(poly_markets),
+      f"({CountingMatcher.person_name_calls} splits for {len(kalshi_markets) * len(poly_markets)} pairs)")
+check("NER model is part of the rules version", ner.rules_version != CountingMatcher().rules_version)
+
+exit_with_results()
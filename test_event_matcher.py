@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test event-level candidate generation: grouping, event pairing, recall and pair reduction
+"""
+from event_matcher import EventMatcher, event_report
+from market_matcher import MarketMatcher
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING EVENT MATCHER")
+print("=" * 80)
+
+
+def kalshi(ticker, title, event_ticker="", series_ticker="", event_title=""):
+    return {"ticker": ticker, "title": title, "event_ticker": event_ticker, "series_ticker": series_ticker,
+            "event_title": event_title}
+
+
+def poly(condition_id, question, event_slug="", event_title=""):
+    return {"condition_id": condition_id, "question": question, "event_slug": event_slug, "event_title": event_title}
+
+
+strikes = (90, 100, 110, 120, 130)
+names = ("Gavin Newsom", "JD Vance", "Kamala Harris", "Ron DeSantis")
+kalshi_markets = (
+    [kalshi(f"KXBTC-{s}", f"Will Bitcoin be above ${s}k on December 31, 2026?", "KXBTC-26DEC31",
+            event_title="Bitcoin price on December 31, 2026") for s in strikes]
+    + [kalshi(f"KXPRES-{n.split()[-1]}", f"Will {n} win the 2028 presidential election?", "KXPRES-28",
+              event_title="2028 presidential election winner") for n in names]
+    + [kalshi("KXNBA-LAL", "Will the Lakers win the 2026 NBA Finals?", "KXNBA-26", event_title="2026 NBA champion"),
+       kalshi("KXNBA-BOS", "Will the Celtics win the 2026 NBA Finals?", "KXNBA-26", event_title="2026 NBA champion"),
+       kalshi("KXMARS-30", "Will SpaceX land humans on Mars before 2030?", series_ticker="KXMARS")]
+)
+poly_markets = (
+    [poly(f"0xbtc{s}", f"Will Bitcoin be above ${s}k on December 31, 2026?", "bitcoin-above-on-december-31-2026",
+          "Bitcoin above ___ on December 31, 2026?") for s in strikes]
+    + [poly(f"0xpres{i}", f"Will {n} win the 2028 US presidential election?", "presidential-election-winner-2028",
+            "Presidential Election Winner 2028") for i, n in enumerate(names)]
+    + [poly("0xnbalal", "Will the Los Angeles Lakers win the 2026 NBA Finals?", "nba-champion-2026", "NBA Champion 2026"),
+       poly("0xnbabos", "Will the Boston Celtics win the 2026 NBA Finals?", "nba-champion-2026", "NBA Champion 2026"),
+       poly("0xfed", "Will the Fed cut interest rates in March 2026?")]
+)
+
+matcher = MarketMatcher()
+event_matcher = EventMatcher(matcher)
+
+kalshi_events = event_matcher.group_events(kalshi_markets, "kalshi")
+poly_events = event_matcher.group_events(poly_markets, "polymarket")
+check("markets are grouped by event (series ticker or the market itself as fallback)",
+      {key: len(event["members"]) for key, event in kalshi_events.items()} ==
+      {"KXBTC-26DEC31": 5, "KXPRES-28": 4, "KXNBA-26": 2, "KXMARS": 1}
+      and len(poly_events) == 4 and poly_events["0xfed"]["members"] == [11],
+      f"({ {key: len(event['members']) for key, event in kalshi_events.items()} })")
+
+event_pairs = event_matcher.match_events(kalshi_events, poly_events)
+check("same events pair up",
+      {("KXBTC-26DEC31", "bitcoin-above-on-december-31-2026"), ("KXPRES-28", "presidential-election-winner-2028"),
+       ("KXNBA-26", "nba-champion-2026")} <= event_pairs, f"({sorted(event_pairs)})")
+
+candidates = event_matcher.candidate_pairs(kalshi_markets, poly_markets)
+kalshi_event = {idx: event_matcher.kalshi_event_key(m) for idx, m in enumerate(kalshi_markets)}
+poly_event = {idx: event_matcher.poly_event_key(m) for idx, m in enumerate(poly_markets)}
+crossed = {(kalshi_event[k], poly_event[p]) for k, p in candidates} - event_pairs
+unrelated = [(k, p) for k, p in candidates
+             if kalshi_event[k].startswith("KXBTC") != poly_event[p].startswith("bitcoin")]
+check("candidates stay inside matched event pairs (no Bitcoin x election pairs)",
+      not crossed and not unrelated, f"({len(unrelated)} unrelated)")
+
+stats = event_report(kalshi_markets, poly_markets, threshold=0.5, matcher=matcher)
+check("every true pair is a candidate", stats["recall"] == 1.0, f"(recall {stats['recall']:.0%})")
+check("far fewer pairs than the full cross product",
+      stats["candidates"] <= stats["total_pairs"] / 3 and stats["event_comparisons"] < stats["total_pairs"],
+      f"({stats['candidates']} of {stats['total_pairs']} pairs, {stats['event_comparisons']} event comparisons)")
+
+blocked = MarketMatcher()
+blocked.candidate_generators.append(EventMatcher(blocked))
+exhaustive = [(k["ticker"], p["condition_id"]) for k, p, _ in matcher.find_matches(kalshi_markets, poly_markets, 0.5)]
+with_events = [(k["ticker"], p["condition_id"]) for k, p, _ in blocked.find_matches(kalshi_markets, poly_markets, 0.5)]
+check("matcher with event candidates finds the same matches",
+      with_events == exhaustive and len(exhaustive) >= 9, f"({len(with_events)} matches)")
+
+exit_with_results()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test top-k market search in both directions
+"""
+import itertools
+import statistics
+import time
+
+from market_matcher import MarketMatcher
+from market_search import MarketSearchIndex
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+
+kalshi_titles = [
+    "Will Donald Trump win the election?",
+    "Will Joe Biden be president?",
+    "Barry vs Seidel tennis match",
+    "Will Trump buy Greenland?",
+    "Will Bitcoin reach $100k by Dec 31, 2025?",
+    "Will the Kansas City Chiefs win the Super Bowl?",
+]
+poly_titles = [
+    "Will Trump win the election?",
+    "Will Biden be president?",
+    "Monique Barry vs Ella Seidel tennis match",
+    "Will Trump buy Greenland in 2025?",
+    "Will Bitcoin reach $100k in 2025?",
+    "Chiefs win the Super Bowl?",
+    "Will Kamala Harris win the 2028 US Presidential Election?",
+]
+kalshi_markets = [{"ticker": f"K{i}", "title": t} for i, t in enumerate(kalshi_titles)]
+poly_markets = [{"condition_id": f"P{i}", "question": t} for i, t in enumerate(poly_titles)]
+
+print("=" * 80)
+print("TESTING TOP-K MARKET SEARCH")
+print("=" * 80)
+
+
+# Heap top-k agrees with a full sort of exhaustive scores
+for k_market in kalshi_markets:
+    exhaustive = sorted(
+        ((p, matcher.compute_similarity(k_market, p)) for p in poly_markets),
+        key=lambda item: item[1], reverse=True
+    )
+    exhaustive = [(p["condition_id"], s) for p, s in exhaustive if s > 0][:3]
+    top = [(p["condition_id"], s) for p, s in matcher.search_top_k(k_market, poly_markets, k=3)]
+    if top != exhaustive:
+        check(f"search_top_k == sorted exhaustive for {k_market['title']}", False, f"{top} vs {exhaustive}")
+        break
+else:
+    check("search_top_k == sorted exhaustive scores", True)
+
+best, score = matcher.search_polymarket_for_kalshi(kalshi_markets[3], poly_markets)
+check("search_polymarket_for_kalshi still returns the single best", best["condition_id"] == "P3", f"({score:.2f})")
+
+index = MarketSearchIndex(matcher)
+index.build(kalshi_markets, poly_markets)
+results = index.search_polymarket(kalshi_markets[2], k=3)
+check("Kalshi -> Polymarket finds the tennis match", results and results[0][0]["condition_id"] == "P2")
+results = index.search_kalshi("Will Bitcoin reach $100k in 2025?", k=3)
+check("ad-hoc title -> Kalshi finds Bitcoin market", results and results[0][0]["ticker"] == "K4")
+check("query with no indexed words returns nothing", index.search_kalshi("Will the", k=3) == [])
+
+# 50k-market index: lookups stay interactive
+people = ["Smith", "Jones", "Garcia", "Miller", "Davis", "Lopez", "Wilson", "Moore", "Taylor", "Clark"]
+first = ["Anna", "Brian", "Carla", "Derek", "Elena", "Frank", "Grace", "Henry", "Irene", "Jason"]
+offices = ["governor", "senate", "mayor", "house", "president"]
+states = ["Texas", "Ohio", "Florida", "Georgia", "Nevada", "Arizona", "Maine", "Iowa", "Utah", "Oregon"]
+years = ["2026", "2028", "2030", "2032", "2034", "2036", "2038", "2040", "2042", "2044"]
+big_poly = [
+    {"condition_id": f"B{i}", "question": f"Will {f} {l} win the {y} {s} {o} race?"}
+    for i, (f, l, o, s, y) in enumerate(itertools.product(first, people, offices, states, years))
+]
+big = MarketSearchIndex(matcher)
+big.build([], big_poly)
+timings = []
+for f, l, s in itertools.islice(itertools.product(first, people, states), 0, 1000, 10):
+    start = time.perf_counter()
+    big.search_polymarket(f"Will {f} {l} win {s} governor in 2030?", k=5)
+    timings.append((time.perf_counter() - start) * 1000)
+median_ms = statistics.median(timings)
+check(f"median lookup on {len(big_poly)} markets under 50ms", median_ms < 50,
+      f"(median {median_ms:.1f}ms, max {max(timings):.1f}ms, build {big.last_stats['build_seconds']:.1f}s)")
+
+exit_with_results()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite FTS5 market store: ranked search, incremental reindexing and matcher candidates
+"""
+import time
+
+from market_matcher import MarketMatcher
+from market_store import MarketStore, FTSCandidates, fts_query
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING MARKET STORE")
+print("=" * 80)
+
+
+def kalshi(ticker, title, price=0.5, subtitle=""):
+    return {"ticker": ticker, "title": title, "subtitle": subtitle, "yes_price": price}
+
+
+def poly(condition_id, question, price=0.5, description=""):
+    return {"condition_id": condition_id, "question": question, "description": description, "yes_price": price}
+
+
+store = MarketStore(":memory:")
+store.upsert([kalshi("KXBTC", "Will Bitcoin reach $100k in 2025?"),
+              kalshi("KXFED", "Will the Fed cut rates in March?"),
+              kalshi("KXSB", "Super Bowl winner", subtitle="Kansas City Chiefs")],
+             [poly("0xBTC", "Bitcoin above $100,000 by December 31?"),
+              poly("0xETH", "Will Ethereum hit $5k?", description="Resolves on the Bitcoin-denominated price too")])
+
+results = store.search("bitcoin")
+check("ranked search hits both venues, title matches before description matches",
+      [m.get("ticker", m.get("condition_id")) for m in results][-1] == "0xETH"
+      and {m["venue"] for m in results[:2]} == {"kalshi", "polymarket"},
+      f"({[m.get('ticker', m.get('condition_id')) for m in results]})")
+check("prefix search as you type and venue filter",
+      [m["ticker"] for m in store.search("chie", venue="kalshi")] == ["KXSB"])
+check("query syntax in user input is inert", fts_query('bitcoin" OR NEAR(') == '"bitcoin" "or" "near"*'
+      and store.search('bitcoin" OR NEAR(') == [])
+
+# Markets from earlier runs stay searchable; prices update without reindexing
+store.upsert([kalshi("KXBTC", "Will Bitcoin reach $100k in 2025?", price=0.61)], [])
+fts_rows = store.conn.execute("SELECT COUNT(*) FROM markets_fts").fetchone()[0]
+check("whole persisted universe is searched with the latest prices",
+      store.search("fed rates")[0]["ticker"] == "KXFED" and store.search("bitcoin 2025")[0]["yes_price"] == 0.61
+      and fts_rows == 5)
+store.upsert([kalshi("KXFED", "Will the Fed hike rates in March?")], [])
+check("retitled markets are reindexed",
+      store.search("hike")[0]["ticker"] == "KXFED" and not store.search("fed cut"))
+check("search can be restricted to the markets fetched this run",
+      [m["ticker"] for m in store.search("will", venue="kalshi", within=["KXBTC"])] == ["KXBTC"])
+
+# Candidate generator: recall of the true pairs with a small candidate set
+matcher = MarketMatcher()
+names = ("Donald Trump", "Gavin Newsom", "JD Vance", "Kamala Harris", "Ron DeSantis", "Alexandria Ocasio-Cortez",
+         "Pete Buttigieg", "Josh Shapiro", "Marco Rubio", "Gretchen Whitmer")
+kalshi_markets = [kalshi(f"K{i}", f"Will {name} win the {year} presidential election?")
+                  for i, (name, year) in enumerate((n, y) for n in names for y in (2028, 2032))]
+poly_markets = [poly(f"P{i}", f"{year} presidential election winner: {name}?")
+                for i, (name, year) in enumerate((n, y) for n in names for y in (2028, 2032))]
+generator = FTSCandidates(MarketStore(":memory:"), k=5)
+candidates = generator.candidate_pairs(kalshi_markets, poly_markets)
+recall = sum((i, i) in candidates for i in range(len(kalshi_markets))) / len(kalshi_markets)
+check("FTS candidates keep every true pair", recall == 1.0,
+      f"({len(candidates)} of {len(kalshi_markets) * len(poly_markets)} pairs)")
+matcher.candidate_generators.append(generator)
+matches = matcher.find_matches(kalshi_markets, poly_markets, threshold=0.5)
+check("matcher with FTS candidates finds the same matches",
+      sorted((k["ticker"], p["condition_id"]) for k, p, _ in matches) ==
+      sorted((k["ticker"], p["condition_id"]) for k, p, _ in MarketMatcher().find_matches(kalshi_markets, poly_markets, 0.5)))
+
+# Throughput: search over a large persisted universe
+big = MarketStore(":memory:")
+words = ["election", "bitcoin", "fed", "rates", "senate", "house", "trump", "super", "bowl", "oscar", "nba", "inflation"]
+big.upsert([kalshi(f"K{i}", f"Will {words[i % 12]} {words[(i * 7) % 12]} market {i} resolve yes?") for i in range(50000)],
+           [poly(f"P{i}", f"{words[(i * 5) % 12]} {words[(i * 3) % 12]} question {i}") for i in range(50000)])
+start = time.time()
+for _ in range(50):
+    big.search("bitcoin infl", limit=20)
+elapsed = (time.time() - start) / 50
+check("ranked search over 100k stored markets", elapsed < 0.5, f"({elapsed * 1000:.1f} ms/query)")
+
+exit_with_results()
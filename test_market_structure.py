@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test combo/parlay classification and pruning of the Kalshi candidate pool
+"""
+from kalshi_api import KalshiAPI
+from market_structure import classify_kalshi, split_matchable, COMBO, SINGLE, UNTITLED
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING MARKET STRUCTURE CLASSIFICATION")
+print("=" * 80)
+
+
+cases = [
+    ({"ticker": "KXMVENFLSINGLEGAME-S2025D896EC3FAD6-7940808A718", "title": "yes Chiefs,yes Bills"}, COMBO),
+    ({"ticker": "KXABC-1", "mve_collection_ticker": "KXMVESPORTSMULTIGAMEEXTENDED", "title": "Chiefs win"}, COMBO),
+    ({"ticker": "KXABC-2", "title": "yes Lakers,no Over 220.5 points scored,yes LeBron James: 25+"}, COMBO),
+    ({"ticker": "KXABC-3", "title": "Will Trump, Vance or Rubio win the 2028 election?"}, SINGLE),
+    ({"ticker": "KXABC-4", "title": "Yes or no: will Bitcoin reach $100k?"}, SINGLE),
+    ({"ticker": "KXABC-5", "title": ""}, UNTITLED),
+]
+for market, expected in cases:
+    got = classify_kalshi(market)
+    check(f"{market['ticker']} is {expected}", got == expected, f"(got {got})")
+
+extracted = KalshiAPI().extract_market_info(cases[0][0])
+check("structure is tagged at extraction", extracted["structure"] == COMBO)
+
+markets = [dict(market, structure=classify_kalshi(market)) for market, _ in cases]
+kept, pruned = split_matchable(markets)
+check("only single markets stay in the pool",
+      [m["ticker"] for m in kept] == ["KXABC-3", "KXABC-4"], f"({len(pruned)} pruned)")
+
+exit_with_results()
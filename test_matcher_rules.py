@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test compiled matcher rules: topic bitmasks vs the original set-based checks
+"""
+import re
+import glob
+
+import numpy as np
+
+from market_matcher import MarketMatcher, TopicBlocker
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+
+# Every title used in the other test scripts
+titles = set()
+for path in glob.glob("test_*.py"):
+    with open(path) as f:
+        titles.update(re.findall(r'"(?:kalshi|poly)":\s*"([^"]+)"', f.read()))
+titles = sorted(titles)
+
+
+def set_based_gate(title1, title2):
+    """Original topic gate: set intersection plus a loop over incompatible pairs"""
+    topics1 = matcher.extract_topics(title1)
+    topics2 = matcher.extract_topics(title2)
+    if topics1 and topics2:
+        if not (topics1 & topics2):
+            return False
+        for topic_a, topic_b in matcher.incompatible_pairs:
+            if (topic_a in topics1 and topic_b in topics2) or (topic_b in topics1 and topic_a in topics2):
+                return False
+    return True
+
+
+print("=" * 80)
+print("TESTING COMPILED MATCHER RULES")
+print("=" * 80)
+
+
+check("rules file loaded", matcher.rules_file_version >= 1 and len(matcher.topic_names) > 0,
+      f"(version {matcher.rules_file_version}, {len(matcher.topic_names)} topics)")
+
+mismatches = [
+    (a, b) for a in titles for b in titles
+    if matcher.topics_compatible(matcher.extract_topic_mask(a), matcher.extract_topic_mask(b)) != set_based_gate(a, b)
+]
+check("bitmask gate == set-based gate", not mismatches, f"({len(titles) ** 2} pairs, {len(mismatches)} mismatches)")
+
+kalshi_markets = [{"title": t} for t in titles]
+poly_markets = [{"question": t} for t in titles]
+allowed = matcher.topic_compatibility(matcher.topic_masks(kalshi_markets, "title"),
+                                      matcher.topic_masks(poly_markets, "question"))
+expected = np.array([[set_based_gate(a, b) for b in titles] for a in titles])
+check("vectorized gate == set-based gate", bool((allowed == expected).all()),
+      f"({int(allowed.sum())} of {allowed.size} pairs pass)")
+
+blocker = TopicBlocker(matcher, block_size=7)
+pairs = blocker.candidate_pairs(kalshi_markets, poly_markets)
+check("TopicBlocker pairs == vectorized gate", pairs == set(zip(*np.nonzero(expected))))
+
+pardon = matcher.extract_topic_mask("Will Hunter Biden receive a presidential pardon?")
+election = matcher.extract_topic_mask("Will Hunter Biden win the 2028 Democratic presidential nomination?")
+check("pardon vs election is incompatible", not matcher.topics_compatible(pardon, election))
+
+exit_with_results()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Test incremental re-matching with MatcherSession
+"""
+from market_matcher import MarketMatcher
+from matcher_session import MatcherSession
+from date_blocking import CloseDateBlocker
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+session = MatcherSession(matcher)
+
+kalshi_markets = [
+    {"ticker": "K1", "title": "Will Donald Trump win the election?", "yes_price": 0.55},
+    {"ticker": "K2", "title": "Will Joe Biden be president?", "yes_price": 0.20},
+    {"ticker": "K3", "title": "Barry vs Seidel tennis match", "yes_price": 0.40},
+    {"ticker": "K4", "title": "Will Trump buy Greenland?", "yes_price": 0.05},
+]
+poly_markets = [
+    {"condition_id": "P1", "question": "Will Trump win the election?", "yes_price": 0.52},
+    {"condition_id": "P2", "question": "Will Biden be president?", "yes_price": 0.22},
+    {"condition_id": "P3", "question": "Monique Barry vs Ella Seidel tennis match", "yes_price": 0.45},
+]
+
+
+def as_ids(matches):
+    return sorted((k["ticker"], p["condition_id"], round(s, 6)) for k, p, s in matches)
+
+
+print("=" * 80)
+print("TESTING INCREMENTAL MATCHER SESSION")
+print("=" * 80)
+
+
+# 1. Cold refresh scores everything and agrees with find_matches
+matches = session.refresh(kalshi_markets, poly_markets, threshold=0.5)
+full = matcher.find_matches(kalshi_markets, poly_markets, threshold=0.5)
+check("cold refresh == find_matches", as_ids(matches) == as_ids(full))
+check("cold refresh scores all pairs", session.last_stats["pairs_scored"] == 12,
+      f"(scored {session.last_stats['pairs_scored']})")
+
+# 2. Price-only refresh rescores nothing but returns fresh prices
+kalshi_markets[0] = dict(kalshi_markets[0], yes_price=0.60)
+matches = session.refresh(kalshi_markets, poly_markets, threshold=0.5)
+check("price-only refresh scores 0 pairs", session.last_stats["pairs_scored"] == 0,
+      f"(scored {session.last_stats['pairs_scored']})")
+fresh = [k["yes_price"] for k, p, s in matches if k["ticker"] == "K1"]
+check("price-only refresh returns current prices", fresh == [0.60], f"({fresh})")
+
+# 3. One added Polymarket market rescores a single column
+poly_markets.append({"condition_id": "P4", "question": "Will Trump buy Greenland in 2025?", "yes_price": 0.04})
+matches = session.refresh(kalshi_markets, poly_markets, threshold=0.5)
+check("added column scores len(kalshi) pairs", session.last_stats["pairs_scored"] == len(kalshi_markets),
+      f"(scored {session.last_stats['pairs_scored']})")
+check("added column == find_matches",
+      as_ids(matches) == as_ids(matcher.find_matches(kalshi_markets, poly_markets, threshold=0.5)))
+
+# 4. Retitled and removed markets
+kalshi_markets[1] = dict(kalshi_markets[1], title="Will Joe Biden resign?")
+del poly_markets[2]
+matches = session.refresh(kalshi_markets, poly_markets, threshold=0.5)
+check("retitled row scores len(poly) pairs", session.last_stats["pairs_scored"] == len(poly_markets),
+      f"(scored {session.last_stats['pairs_scored']})")
+check("churned refresh == find_matches",
+      as_ids(matches) == as_ids(matcher.find_matches(kalshi_markets, poly_markets, threshold=0.5)))
+
+# 5. Streaming: with blocking, each component's matches arrive before the rest is scored
+blocked = MarketMatcher()
+blocked.blocking_filters.append(CloseDateBlocker(tolerance_days=7))
+dated_kalshi = [dict(m, close_ts=i * 86400 * 30) for i, m in enumerate(kalshi_markets)]
+dated_poly = [dict(m, close_ts=i * 86400 * 30) for i, m in enumerate(poly_markets)]
+streaming = MatcherSession(blocked)
+stream = streaming.iter_refresh(dated_kalshi, dated_poly, threshold=0.5)
+first = next(stream)
+scored = blocked.stage_stats["topics"]["evaluated"]
+check("first match streams before scoring finishes", scored < len(dated_kalshi) * len(dated_poly),
+      f"({scored} pairs scored)")
+streamed = [first] + list(stream)
+check("streamed matches == find_matches",
+      as_ids(streamed) == as_ids(blocked.find_matches(dated_kalshi, dated_poly, threshold=0.5)))
+
+abandoned = streaming.iter_refresh(dated_kalshi, dated_poly[:2], threshold=0.5)
+next(abandoned, None)
+abandoned.close()
+check("abandoned stream releases the session",
+      as_ids(streaming.refresh(dated_kalshi, dated_poly[:2], threshold=0.5))
+      == as_ids(blocked.find_matches(dated_kalshi, dated_poly[:2], threshold=0.5)))
+
+# 6. Blocked refreshes only send churned markets through blocking and reuse untouched components
+class CountingBlocker(CloseDateBlocker):
+    """Records how many markets each blocking call sees"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def candidate_pairs(self, kalshi_markets, poly_markets):
+        self.calls.append((len(kalshi_markets), len(poly_markets)))
+        return super().candidate_pairs(kalshi_markets, poly_markets)
+
+
+subjects = ["Donald Trump", "Joe Biden", "Gavin Newsom", "JD Vance", "Kamala Harris", "Ron DeSantis",
+            "Bitcoin", "Ethereum", "the Lakers", "the Celtics", "SpaceX", "the Fed"]
+churn_kalshi = [{"ticker": f"K{i}", "title": f"Will {s} make headlines in 2026?", "close_ts": i * 86400 * 30,
+                 "yes_price": 0.5} for i, s in enumerate(subjects)]
+churn_poly = [{"condition_id": f"P{i}", "question": f"Will {s} make headlines in 2026?", "close_ts": i * 86400 * 30,
+               "yes_price": 0.5} for i, s in enumerate(subjects)]
+counting = CountingBlocker(tolerance_days=7)
+churn_matcher = MarketMatcher()
+churn_matcher.blocking_filters.append(counting)
+churn = MatcherSession(churn_matcher)
+churn.refresh(churn_kalshi, churn_poly, threshold=0.5)
+cold_calls = list(counting.calls)
+
+counting.calls = []
+churn_kalshi[3] = dict(churn_kalshi[3], title="Will JD Vance resign in 2026?")
+churn_poly.append({"condition_id": "PNEW", "question": "Will Bitcoin make headlines in 2026?",
+                   "close_ts": 6 * 86400 * 30, "yes_price": 0.4})
+del churn_poly[10]
+matches = churn.refresh(churn_kalshi, churn_poly, threshold=0.5)
+check("blocking sees only churned rows and columns",
+      cold_calls == [(12, 12)] and counting.calls == [(1, 12), (11, 1)], f"({counting.calls})")
+check("churned blocked refresh == find_matches",
+      as_ids(matches) == as_ids(churn_matcher.find_matches(churn_kalshi, churn_poly, threshold=0.5)),
+      f"({len(matches)} matches)")
+check("untouched components keep their matches",
+      churn.last_stats["matches_reused"] >= 8 and churn.last_stats["components_assigned"] <= 3
+      and churn.last_stats["pairs_scored"] == 2, f"({churn.last_stats})")
+
+counting.calls = []
+matches = churn.refresh(churn_kalshi, churn_poly, threshold=0.9)
+check("a new threshold reassigns every component without re-blocking",
+      counting.calls == [] and churn.last_stats["pairs_scored"] == 0
+      and as_ids(matches) == as_ids(churn_matcher.find_matches(churn_kalshi, churn_poly, threshold=0.9)))
+
+grown = churn_poly + [{"condition_id": "PFED", "question": "Will the Fed make headlines in 2026?",
+                       "close_ts": 11 * 86400 * 30, "yes_price": 0.3}]
+abandoned = churn.iter_refresh(churn_kalshi, grown, threshold=0.9)
+next(abandoned, None)
+abandoned.close()
+check("an abandoned blocked refresh with new markets is redone in full",
+      as_ids(churn.refresh(churn_kalshi, grown, threshold=0.9))
+      == as_ids(churn_matcher.find_matches(churn_kalshi, grown, threshold=0.9)))
+
+# 7. A new rules version drops every cached score
+churn_matcher.important_keywords = churn_matcher.important_keywords + ["headlines"]
+matches = churn.refresh(churn_kalshi, churn_poly, threshold=0.5)
+cold = MatcherSession(churn_matcher)
+cold.refresh(churn_kalshi, churn_poly, threshold=0.5)
+check("rules change rescores everything like a cold session",
+      churn.last_stats["pairs_scored"] == cold.last_stats["pairs_scored"] > 0,
+      f"(scored {churn.last_stats['pairs_scored']})")
+check("rules change refresh == find_matches",
+      as_ids(matches) == as_ids(churn_matcher.find_matches(churn_kalshi, churn_poly, threshold=0.5)))
+
+# 8. Top-k generators are re-run over every market: a new market can displace an unchanged one's neighbour
+class NearestCloseGenerator:
+    """Pairs each Kalshi market with the Polymarket market closing nearest to it (top-1, not pairwise-local)"""
+
+    def candidate_pairs(self, kalshi_markets, poly_markets):
+        pairs = set()
+        for k_idx, market in enumerate(kalshi_markets):
+            gaps = [abs(p["close_ts"] - market["close_ts"]) for p in poly_markets]
+            if gaps:
+                pairs.add((k_idx, gaps.index(min(gaps))))
+        return pairs
+
+
+topk_matcher = MarketMatcher()
+topk_matcher.candidate_generators.append(NearestCloseGenerator())
+topk_kalshi = [dict(m) for m in churn_kalshi]
+topk_poly = [dict(m) for m in churn_poly]
+topk = MatcherSession(topk_matcher)
+topk.refresh(topk_kalshi, topk_poly, threshold=0.5)
+check("top-k generators are not pairwise-local",
+      not topk_matcher.pairwise_local_blocking and churn_matcher.pairwise_local_blocking)
+
+# A closer Polymarket market with a different subject takes Donald Trump's only candidate slot
+topk_poly.append({"condition_id": "PDISPLACE", "question": "Will the Knicks make headlines in 2026?",
+                  "close_ts": 0, "yes_price": 0.5})
+topk_poly[0] = dict(topk_poly[0], close_ts=86400)
+matches = topk.refresh(topk_kalshi, topk_poly, threshold=0.5)
+check("displaced neighbours of unchanged markets are dropped",
+      ("K0", "P0") not in {(k["ticker"], p["condition_id"]) for k, p, _ in matches}
+      and as_ids(matches) == as_ids(topk_matcher.find_matches(topk_kalshi, topk_poly, threshold=0.5)),
+      f"({as_ids(matches)[:3]})")
+check("re-blocking only rescores pairs that entered the candidates", topk.last_stats["pairs_scored"] == 1,
+      f"(scored {topk.last_stats['pairs_scored']})")
+
+# 9. prepare_markets only sees churned markets; unchanged ones keep their annotations
+class CountingExtractor:
+    """Entity extractor stub that records how many titles each pass sees"""
+
+    def __init__(self):
+        self.calls = []
+
+    def config_key(self):
+        return "counting"
+
+    def extract(self, titles):
+        self.calls.append(len(titles))
+        return [{"PERSON": []} for _ in titles]
+
+
+ner_matcher = MarketMatcher()
+ner_matcher.entity_extractor = CountingExtractor()
+ner = MatcherSession(ner_matcher)
+ner_kalshi = [dict(m) for m in churn_kalshi]
+ner_poly = [dict(m) for m in churn_poly]
+ner.refresh(ner_kalshi, ner_poly, threshold=0.5)
+ner_kalshi = [{key: value for key, value in m.items() if key != "entities"} for m in ner_kalshi]
+ner_kalshi[0] = dict(ner_kalshi[0], title="Will Donald Trump resign in 2026?")
+ner.refresh(ner_kalshi, ner_poly, threshold=0.5)
+check("prepare_markets only extracts churned titles",
+      ner_matcher.entity_extractor.calls == [len(churn_kalshi) + len(churn_poly), 1],
+      f"({ner_matcher.entity_extractor.calls})")
+check("unchanged markets keep their entities", all("entities" in m for m in ner_kalshi))
+
+exit_with_results()
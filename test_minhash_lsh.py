@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test MinHash/LSH candidate generation against exhaustive scoring
+"""
+from market_matcher import MarketMatcher
+from minhash_lsh import MinHashLSH, recall_report
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+
+kalshi_titles = [
+    "Will Donald Trump win the election?",
+    "Will Joe Biden be president?",
+    "Barry vs Seidel tennis match",
+    "Will Trump buy Greenland?",
+    "Will Bitcoin reach $100k by Dec 31, 2025?",
+    "Will the Kansas City Chiefs win the Super Bowl?",
+    "Will Kenneth Lee become the next Justice on the Supreme Court?",
+    "Will OpenAI or Anthropic IPO first?",
+]
+poly_titles = [
+    "Will Trump win the election?",
+    "Will Biden be president?",
+    "Monique Barry vs Ella Seidel tennis match",
+    "Will Trump buy Greenland in 2025?",
+    "Will Bitcoin reach $100k in 2025?",
+    "Chiefs win the Super Bowl?",
+    "Will Kamala Harris win the 2028 US Presidential Election?",
+    "Will OpenAI launch a new consumer hardware product by March 31, 2026?",
+]
+kalshi_markets = [{"ticker": f"K{i}", "title": t} for i, t in enumerate(kalshi_titles)]
+poly_markets = [{"condition_id": f"P{i}", "question": t} for i, t in enumerate(poly_titles)]
+
+print("=" * 80)
+print("TESTING MINHASH / LSH CANDIDATES")
+print("=" * 80)
+
+
+lsh = MinHashLSH(matcher, num_perm=128, bands=64)
+same = lsh.signature("Will Trump buy Greenland?")
+check("identical word sets give identical signatures",
+      MinHashLSH.estimate_jaccard(same, lsh.signature("Trump buy Greenland")) == 1.0)
+check("stop-word-only title has no signature", lsh.signature("Will the") is None)
+
+candidates = lsh.candidate_pairs(kalshi_markets, poly_markets)
+check("near duplicates become candidates", {(0, 0), (1, 1), (3, 3)} <= candidates, f"({len(candidates)} of 64 pairs)")
+
+strict = MinHashLSH.for_threshold(0.9, num_perm=128)
+check("for_threshold picks few bands for a strict target", strict.bands < lsh.bands,
+      f"(bands={strict.bands}, rows={strict.rows})")
+
+# Blocked matching agrees with exhaustive matching on this corpus
+exhaustive = matcher.find_matches(kalshi_markets, poly_markets, threshold=0.5)
+blocked_matcher = MarketMatcher()
+blocked_matcher.candidate_generators.append(MinHashLSH(blocked_matcher, num_perm=128, bands=64))
+blocked = blocked_matcher.find_matches(kalshi_markets, poly_markets, threshold=0.5)
+check("blocked matches == exhaustive matches",
+      sorted((k["ticker"], p["condition_id"]) for k, p, s in blocked) ==
+      sorted((k["ticker"], p["condition_id"]) for k, p, s in exhaustive))
+
+print()
+results = recall_report(kalshi_markets, poly_markets, configs=[(64, 2), (16, 8)], matcher=matcher)
+check("looser banding has recall >= stricter banding", results[0]["recall"] >= results[1]["recall"])
+
+exit_with_results()
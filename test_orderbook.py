@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test the array-backed orderbook against brute-force scans of the same levels
+"""
+import random
+import time
+
+from orderbook import MarketBook, OrderbookCache, YES, NO
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING ORDERBOOK")
+print("=" * 80)
+
+
+def brute_buy(bids, size):
+    """(vwap, worst price) buying `size` against {cents: size} bids of the other side, by scanning"""
+    remaining, cost, worst = size, 0.0, None
+    for cents in sorted(bids, reverse=True):
+        take = min(remaining, bids[cents])
+        if take <= 0:
+            continue
+        cost += take * (100 - cents) / 100
+        worst = (100 - cents) / 100
+        remaining -= take
+        if remaining <= 0:
+            break
+    filled = size - remaining
+    return (cost / filled if filled else None), (worst if remaining <= 0 else None)
+
+
+# 1. Kalshi REST book: best prices, depth and VWAP
+book = MarketBook()
+book.apply_kalshi({"yes": [[30, 10], [35, 5]], "no": [[60, 20], [58, 40]]})
+check("best bid/ask on both sides",
+      (book.best_bid(YES), book.best_ask(YES), book.best_bid(NO), book.best_ask(NO)) == (0.35, 0.40, 0.60, 0.65))
+check("depth and VWAP walk the other side's bids",
+      book.depth_price(YES, 30) == 0.42 and abs(book.vwap(YES, 30) - (20 * 0.40 + 10 * 0.42) / 30) < 1e-12
+      and book.depth_price(YES, 61) is None and book.available(YES) == 60)
+
+# 2. Random snapshots, deltas and level sets match a brute-force dict book
+rng = random.Random(3)
+book = MarketBook()
+shadow = {YES: {}, NO: {}}
+mismatches = 0
+for step in range(3000):
+    action = rng.random()
+    if action < 0.05:
+        levels = {side: {rng.randint(1, 99): rng.randint(1, 500) for _ in range(rng.randint(0, 30))}
+                  for side in (YES, NO)}
+        book.apply_kalshi({side: [[c, s] for c, s in levels[side].items()] for side in (YES, NO)})
+        shadow = levels
+    elif action < 0.8:
+        side, cents, delta = rng.choice((YES, NO)), rng.randint(1, 99), rng.randint(-200, 200)
+        book.apply_kalshi_delta({"side": side, "price": cents, "delta": delta})
+        shadow[side][cents] = max(0, shadow[side].get(cents, 0) + delta)
+    else:
+        side, cents, size = rng.choice((YES, NO)), rng.randint(1, 99), rng.randint(0, 300)
+        book.set_level(side, cents / 100, size)
+        shadow[side][cents] = size
+
+    for side in (YES, NO):
+        other = shadow[NO if side == YES else YES]
+        live = [c for c, s in shadow[side].items() if s > 0]
+        size = rng.randint(1, 2000)
+        vwap, worst = brute_buy(other, size)
+        got_vwap = book.vwap(side, size)
+        if (book.best_bid(side) != (max(live) / 100 if live else None)
+                or book.depth_price(side, size) != worst
+                or (vwap is None) != (got_vwap is None)
+                or (vwap is not None and abs(vwap - got_vwap) > 1e-9)):
+            mismatches += 1
+check("3000 random updates agree with a brute-force book", mismatches == 0, f"({mismatches} mismatches)")
+
+# 3. Streaming: websocket snapshot + deltas equal the REST book; seq gaps mark books stale
+cache = OrderbookCache()
+cache.on_kalshi_message({"type": "orderbook_snapshot", "sid": 1, "seq": 1,
+                         "msg": {"market_ticker": "KX", "yes_dollars": [["0.3000", 10]], "no_dollars": [["0.6000", 20]]}})
+cache.on_kalshi_message({"type": "orderbook_delta", "sid": 1, "seq": 2,
+                         "msg": {"market_ticker": "KX", "price": 35, "delta": 5, "side": "yes"}})
+rest = MarketBook()
+rest.apply_kalshi({"yes": [[30, 10], [35, 5]], "no": [[60, 20]]})
+check("websocket and REST paths build the same book",
+      cache.get("KX").asks(YES)[0].tolist() == rest.asks(YES)[0].tolist()
+      and cache.get("KX").asks(NO)[1].tolist() == rest.asks(NO)[1].tolist())
+cache.on_kalshi_message({"type": "orderbook_delta", "sid": 1, "seq": 4,
+                         "msg": {"market_ticker": "KX", "price": 36, "delta": 5, "side": "yes"}})
+stale = cache.get("KX") is None
+cache.apply_kalshi_rest("KX", {"yes": [[30, 10]], "no": []})
+check("seq gap marks the book stale until a fresh snapshot",
+      stale and cache.get("KX") is not None and cache.get("KX").best_bid(YES) == 0.30)
+
+# 4. Polymarket: book event then price changes on both sides
+cache.on_polymarket_message({"event_type": "book", "asset_id": "T1",
+                             "bids": [{"price": "0.48", "size": "100"}], "asks": [{"price": "0.523", "size": "40.5"}]})
+cache.on_polymarket_message({"event_type": "price_change", "asset_id": "T1",
+                             "changes": [{"price": "0.49", "size": "10", "side": "BUY"},
+                                         {"price": "0.523", "size": "0", "side": "SELL"},
+                                         {"price": "0.53", "size": "7", "side": "SELL"}]})
+poly = cache.get("T1")
+check("Polymarket asks map onto NO bids at sub-cent ticks",
+      (poly.best_bid(YES), poly.best_ask(YES), poly.available(YES)) == (0.49, 0.53, 7.0))
+
+# 5. Throughput of in-place deltas
+book = MarketBook()
+book.apply_kalshi({"yes": [[c, 100] for c in range(1, 50)], "no": [[c, 100] for c in range(1, 50)]})
+start = time.time()
+for i in range(100000):
+    book.apply_kalshi_delta({"side": YES if i % 2 else NO, "price": 1 + i % 49, "delta": 1 if i % 3 else -1})
+    book.best_ask(YES)
+elapsed = time.time() - start
+check("100k deltas with a best-price query each", elapsed < 5, f"({100000 / elapsed:,.0f}/s)")
+
+exit_with_results()
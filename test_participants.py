@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test the tokenizer-based sports participant extractor, including adversarial long titles
+"""
+import re
+import time
+
+from market_matcher import MarketMatcher
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+
+# The regex the tokenizer replaced (kept here only to benchmark against)
+LEGACY_PATTERN = r'([A-Za-z]+(?:\s+[A-Za-z]+)*)\s+(?:vs?\.?|versus)\s+([A-Za-z]+(?:\s+[A-Za-z]+)*)'
+
+print("=" * 80)
+print("TESTING SPORTS PARTICIPANT EXTRACTION")
+print("=" * 80)
+
+
+cases = [
+    ("Barry vs Seidel tennis match", {"barry", "seidel tennis match"}),
+    ("Monique Barry vs Ella Seidel tennis match", {"monique barry", "ella seidel tennis match"}),
+    ("Real Madrid vs. Barcelona: Who wins?", {"real madrid", "barcelona"}),
+    ("Texas versus Ohio State", {"texas", "ohio state"}),
+    ("Barry v Seidel", {"barry", "seidel"}),
+    ("Will part v of the series air?", set()),
+    ("Will Trump win the election?", set()),
+    ("San Francisco 49ers vs Dallas Cowboys", {"49ers", "cowboys"}),
+    ("Paris Saint-Germain vs Bayern Munich", {"psg", "bayern"}),
+    ("A vs B vs C", {"a", "b", "c"}),
+    ("Lakers vs Celtics vs Knicks", {"lakers", "celtics", "knicks"}),
+]
+for title, expected in cases:
+    got = matcher.extract_match_participants(title)
+    check(f"participants of '{title}'", got == expected, f"{got}")
+
+check("team aliases are normalized",
+      matcher.extract_match_participants("Los Angeles Lakers vs. Golden State Warriors") == {"lakers", "warriors"})
+score = matcher.compute_similarity({"title": "PSG vs Bayern Munich"}, {"question": "Paris Saint-Germain vs Bayern Munich"})
+check("hyphenated and numbered team names reach their aliases",
+      score >= 0.9 and matcher.compute_similarity({"title": "49ers vs Cowboys"},
+                                                  {"question": "San Francisco 49ers vs Dallas Cowboys"}) >= 0.9,
+      f"(score: {score:.2f})")
+check("cached result is a copy",
+      matcher.extract_match_participants("Lakers vs Warriors") is not matcher.extract_match_participants("Lakers vs Warriors"))
+
+score = matcher.compute_similarity({"title": "Lakers vs Warriors"},
+                                   {"question": "Los Angeles Lakers vs. Golden State Warriors"})
+check("aliased teams match", score >= 0.9, f"(score: {score:.2f})")
+
+# Adversarial titles: long word runs with no separator, or nothing but separators
+print()
+print(f"{'title':<24} {'words':>6} {'tokenizer ms':>13} {'legacy ms':>10}")
+worst_per_word = {}
+for name, unit in [("no separator", "team "), ("bare v", "v "), ("repeated vs", "a vs "), ("vs. chain", "x vs. ")]:
+    for words in (250, 500, 1000, 4000, 16000):
+        title = "Will " + unit * words + "win?"
+        start = time.perf_counter()
+        matcher.extract_match_participants(title)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        legacy = ""
+        if words <= 500:
+            start = time.perf_counter()
+            re.findall(LEGACY_PATTERN, title, re.IGNORECASE)
+            legacy = f"{(time.perf_counter() - start) * 1000:.1f}"
+        print(f"{name:<24} {words:>6} {elapsed:>13.2f} {legacy:>10}")
+        worst_per_word[name] = max(worst_per_word.get(name, 0.0), elapsed / words)
+
+check("latency stays linear in title length (< 0.05 ms per word)",
+      max(worst_per_word.values()) < 0.05,
+      f"(worst {max(worst_per_word.values()) * 1000:.1f} µs/word)")
+
+exit_with_results()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive poll scheduler: tiering, per-venue budget and achieved refresh intervals
+"""
+from poll_scheduler import PollScheduler, TokenBucket, TIER_INTERVALS, priority_score, tier_of, track_matches
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING POLL SCHEDULER")
+print("=" * 80)
+
+
+# 1. Scoring: wide spread / moving / closing soon beats a dead market
+hot = priority_score(spread=0.08, volatility=0.03, volume=50000, hours_to_close=2)
+dead = priority_score(spread=0.0, volatility=0.0, volume=10, hours_to_close=24 * 200)
+check("hot market lands in tier 0, dead one in the last tier",
+      tier_of(hot) == 0 and tier_of(dead) == len(TIER_INTERVALS) - 1, f"({hot:.2f}, {dead:.2f})")
+
+# 2. Token bucket never exceeds rate * time + burst
+bucket = TokenBucket(rate=2.0, burst=4)
+granted = sum(bucket.try_acquire(t * 0.1) for t in range(100))
+check("token bucket honours rate and burst", granted <= 4 + 2.0 * 9.9 + 1, f"({granted} granted in 9.9s)")
+
+# 3. Simulated run: per-venue budget and achieved intervals per tier
+calls = {"kalshi": [], "polymarket": []}
+
+
+def fetcher(venue, hot_price=0.5):
+    def fetch(item_id):
+        calls[venue].append(item_id)
+        # HOT-* markets keep moving (Polymarket ~12c above Kalshi), the rest are flat
+        return hot_price + (0.03 if len(calls[venue]) % 2 else -0.03) if item_id.startswith("HOT") else 0.5
+    return fetch
+
+
+scheduler = PollScheduler({"kalshi": fetcher("kalshi"), "polymarket": fetcher("polymarket", hot_price=0.62)},
+                          budgets={"kalshi": (1.0, 2.0), "polymarket": (1.0, 2.0)})
+matches = []
+for i in range(3):
+    matches.append(({"ticker": f"HOT-{i}", "yes_price": 0.50, "volume": 100000, "close_ts": 3600.0 * 6},
+                    {"clob_token_ids": [f"HOT-T{i}"], "yes_price": 0.58, "volume": 100000}, 0.9))
+for i in range(30):
+    matches.append(({"ticker": f"DEAD-{i}", "yes_price": 0.20, "volume": 5},
+                    {"clob_token_ids": [f"DEAD-T{i}"], "yes_price": 0.20, "volume": 5}, 0.9))
+track_matches(scheduler, matches, now=0.0)
+
+t = 0.0
+while t < 1800:
+    scheduler.run_pending(now=t)
+    t += 0.5
+
+report = {row["tier"]: row for row in scheduler.tier_report()}
+check("each venue stays within its request budget",
+      all(len(c) <= 2 + 1.0 * 1800 for c in calls.values()) and scheduler.requests["kalshi"] == len(calls["kalshi"]),
+      f"({scheduler.requests})")
+check("hot markets are refreshed near the tier-0 target",
+      report[0]["items"] == 6 and report[0]["mean"] is not None and report[0]["mean"] < TIER_INTERVALS[0] * 1.5,
+      f"(mean {report[0]['mean']:.1f}s, target {TIER_INTERVALS[0]:.0f}s)")
+last = len(TIER_INTERVALS) - 1
+check("dead markets are refreshed at the slowest tier",
+      report[last]["items"] == 60 and abs(report[last]["mean"] - TIER_INTERVALS[last]) < 30,
+      f"(mean {report[last]['mean']:.1f}s)")
+hot_calls = sum(1 for item in calls["kalshi"] if item.startswith("HOT"))
+check("budget goes to hot markets", hot_calls > len(calls["kalshi"]) / 2, f"({hot_calls} of {len(calls['kalshi'])})")
+
+# 4. Spreads follow refreshed prices of both legs; a market in several pairs takes the widest
+prices = {"K": 0.50, "P1": 0.60, "P2": 0.52}
+live = PollScheduler({"kalshi": prices.get, "polymarket": prices.get})
+live.track("kalshi", "K", 0.50, now=0.0)
+for token in ("P1", "P2"):
+    live.track("polymarket", token, prices[token], now=0.0)
+    live.link("K", token, now=0.0)
+widest = round(live.items[("kalshi", "K")]["spread"], 6)
+hot_tier = live.items[("kalshi", "K")]["tier"]
+prices["P1"] = 0.50  # the wide pair converges
+t = 0.0
+while t < 1000:
+    live.run_pending(now=t)
+    t += 1.0
+check("spread is recomputed from refreshed prices",
+      widest == -0.10 and round(live.items[("kalshi", "K")]["spread"], 6) == -0.02
+      and round(live.items[("polymarket", "P1")]["spread"], 6) == 0.0
+      and live.items[("kalshi", "K")]["tier"] > hot_tier, f"({widest} -> {live.items[('kalshi', 'K')]['spread']:.2f})")
+live.untrack("polymarket", "P2")
+check("untracking a leg drops its pairs",
+      list(live.pairs) == [("K", "P1")] and live.items[("kalshi", "K")]["pairs"] == {("K", "P1")})
+
+# 5. Tight budget: due items are deferred, not dropped, and untracked ones stop
+tight = PollScheduler({"kalshi": fetcher("kalshi")}, budgets={"kalshi": (0.1, 1.0)})
+for i in range(5):
+    tight.track("kalshi", f"DEAD-X{i}", 0.5, now=0.0)
+tight.untrack("kalshi", "DEAD-X4")
+calls["kalshi"].clear()
+t = 0.0
+while t < 400:
+    tight.run_pending(now=t)
+    t += 1.0
+check("over-budget items are deferred and all get refreshed",
+      sorted(set(calls["kalshi"])) == [f"DEAD-X{i}" for i in range(4)] and len(calls["kalshi"]) <= 1 + 0.1 * 400,
+      f"({len(calls['kalshi'])} calls)")
+
+exit_with_results()
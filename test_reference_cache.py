@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the Kalshi reference cache: bulk load, persistence, TTL refresh and the join at extraction
+"""
+import os
+import tempfile
+import threading
+
+from kalshi_api import KalshiAPI
+from reference_cache import ReferenceCache
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING REFERENCE CACHE")
+print("=" * 80)
+
+
+class FakeKalshi(KalshiAPI):
+    def __init__(self, reference, category="Politics"):
+        super().__init__(reference=reference)
+        self.category = category
+        self.series_calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_series_list(self):
+        self.release.wait()
+        self.series_calls += 1
+        if self.category is None:
+            return []
+        return [{"ticker": "KXPRES", "title": "Presidential election", "category": self.category,
+                 "tags": ["US", "Elections"], "settlement_sources": [{"name": "AP", "url": "https://ap.org"}]}]
+
+    def get_markets(self, category=None, limit=200, status="open"):
+        events = [{"event_ticker": "KXPRES-28", "series_ticker": "KXPRES", "title": "2028 election", "category": "",
+                   "markets": [{"ticker": f"KXPRES-28-{i}", "event_ticker": "KXPRES-28", "title": f"Candidate {i}",
+                                "category": ""} for i in range(1000)]},
+                  {"event_ticker": "KXFED-26", "series_ticker": "KXFED", "title": "Fed", "category": "Economics",
+                   "markets": [{"ticker": "KXFED-26-A", "event_ticker": "KXFED-26", "title": "Cut?"}]}]
+        return self._event_markets(events)
+
+
+path = os.path.join(tempfile.mkdtemp(), "reference.sqlite3")
+cache = ReferenceCache(path, ttl=3600)
+api = FakeKalshi(cache)
+cache.ensure_fresh(api)
+markets = [api.extract_market_info(m) for m in api.get_markets()]
+check("first load is synchronous and fills empty categories",
+      markets[0]["category"] == "Politics" and markets[0]["tags"] == ["US", "Elections"]
+      and markets[0]["settlement_sources"] == ["AP"] and markets[0]["series_title"] == "Presidential election")
+check("event category wins when the event has one", markets[-1]["category"] == "Economics")
+check("one bulk request for 1001 markets", api.series_calls == 1, f"({api.series_calls} series requests)")
+
+# Series ticker recovered from the recorded event for a bare market payload
+bare = api.extract_market_info({"ticker": "KXPRES-28-7", "event_ticker": "KXPRES-28", "title": "Candidate 7"})
+check("bare markets get series and link from the recorded event",
+      bare["series_ticker"] == "KXPRES" and api.format_market_link(bare) == "https://kalshi.com/markets/kxpres")
+
+reopened = ReferenceCache(path, ttl=3600)
+api = FakeKalshi(reopened)
+reopened.ensure_fresh(api)
+check("reopened cache serves from disk inside the TTL",
+      api.series_calls == 0 and reopened.market_info("", "KXPRES-28")["category"] == "Politics")
+
+# Stale: refresh runs in the background while the old data keeps serving
+stale = ReferenceCache(path, ttl=0)
+api = FakeKalshi(stale, category="Elections")
+api.release.clear()
+thread = stale.ensure_fresh(api)
+during = stale.market_info("KXPRES")["category"]
+second = stale.ensure_fresh(api)
+api.release.set()
+thread.join()
+check("stale data serves while one background refresh runs",
+      during == "Politics" and second is None and stale.market_info("KXPRES")["category"] == "Elections")
+
+failing = FakeKalshi(stale, category=None)
+stale.refresh(failing)
+check("a failed refresh keeps the old series", stale.market_info("KXPRES")["category"] == "Elections")
+
+exit_with_results()
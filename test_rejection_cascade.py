@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the similarity rejection cascade: per-stage counters, lazy title features,
+and that reordering the gates never changes a score
+"""
+from market_matcher import MarketMatcher
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING REJECTION CASCADE")
+print("=" * 80)
+
+
+kalshi_markets = [{"ticker": f"K{i}", "title": title} for i, title in enumerate([
+    "Will Donald Trump win the 2028 presidential election?",
+    "Will Bitcoin be above $100k on December 31, 2026?",
+    "Will Bitcoin be above $120k on December 31, 2026?",
+    "Will the Fed cut interest rates in March 2026?",
+    "Will Gavin Newsom win the 2028 presidential election?",
+    "Will Trump be deported?",
+    "Barry vs Seidel tennis match",
+    "Will inflation fall below 2% in 2026?",
+])]
+poly_markets = [{"condition_id": f"P{i}", "question": question} for i, question in enumerate([
+    "Will Trump win the 2028 presidential election?",
+    "Will Bitcoin be above $100k on December 31, 2026?",
+    "Will the Fed not cut interest rates in March 2026?",
+    "Will JD Vance win the 2028 presidential election?",
+    "Monique Barry vs Ella Seidel tennis match",
+    "Will inflation rise above 3% in 2026?",
+    "Who will win the 2028 presidential election?",
+])]
+n_pairs = len(kalshi_markets) * len(poly_markets)
+
+
+def all_scores(matcher):
+    return [round(matcher.compute_similarity(k, p), 9) for k in kalshi_markets for p in poly_markets]
+
+
+def as_ids(matches):
+    return [(k["ticker"], p["condition_id"], round(s, 9)) for k, p, s in matches]
+
+
+# 1. Counters: each stage sees exactly the pairs the previous one let through
+matcher = MarketMatcher()
+scores = all_scores(matcher)
+report = matcher.stage_report()
+chained = True
+expected = n_pairs
+for stage in report:
+    chained &= stage["evaluated"] == expected
+    expected -= stage["rejected"]
+check("each stage evaluates the survivors of the previous one",
+      chained and report[-1]["stage"] == "score" and report[-1]["rejected"] == 0,
+      f"({[(s['stage'], s['evaluated'], s['rejected']) for s in report]})")
+rejected = sum(stage["rejected"] for stage in report)
+check("rejections + scored pairs account for every pair",
+      rejected + report[-1]["evaluated"] == n_pairs and 0 < rejected <= scores.count(0.0),
+      f"({rejected} rejected, {report[-1]['evaluated']} scored)")
+check("every stage records time", all(stage["seconds"] > 0 for stage in report if stage["evaluated"]))
+
+matcher.reset_stage_stats()
+check("reset zeroes the counters", all(stage["evaluated"] == stage["rejected"] == 0 for stage in matcher.stage_report()))
+
+# 2. Lazy features: a pair rejected by the first gate never computes the later ones
+lazy = MarketMatcher()
+lazy.gate_order = ["topics", "person", "polarity", "strike", "words"]
+kalshi, poly = {"title": "Will Bitcoin be above $100k on December 31, 2026?"}, {"question": "Will Trump be deported?"}
+score = lazy.compute_similarity(kalshi, poly)
+computed = set(lazy.title_features(kalshi["title"]).__dict__) | set(lazy.title_features(poly["question"]).__dict__)
+check("features past the rejecting gate are never computed",
+      score == 0.0 and lazy.stage_stats["topics"]["rejected"] == 1 and "topic_mask" in computed
+      and not computed & {"keywords", "words", "threshold", "proper_nouns", "participants"}, f"({sorted(computed)})")
+
+# 3. Reordering gates changes the work done, never the scores
+baseline = MarketMatcher()
+baseline_scores = all_scores(baseline)
+baseline_matches = as_ids(baseline.find_matches(kalshi_markets, poly_markets, 0.5))
+
+reordered = MarketMatcher()
+reordered.gate_order = list(reversed(reordered.GATES))
+reversed_scores = all_scores(reordered)
+reordered.optimize_gate_order(min_evaluated=1)
+optimized_order = list(reordered.gate_order)
+check("optimize_gate_order reorders by cost per rejection",
+      sorted(optimized_order) == sorted(MarketMatcher.GATES) and optimized_order != list(reversed(MarketMatcher.GATES)),
+      f"({optimized_order})")
+check("scores are identical under every gate order",
+      baseline_scores == reversed_scores == all_scores(reordered))
+check("find_matches is identical before and after optimize_gate_order",
+      as_ids(reordered.find_matches(kalshi_markets, poly_markets, 0.5)) == baseline_matches and baseline_matches,
+      f"({len(baseline_matches)} matches)")
+check("stage report follows the optimized order",
+      [s["stage"] for s in reordered.stage_report()] == optimized_order + ["score"])
+
+too_little = MarketMatcher()
+too_little.compute_similarity(kalshi_markets[0], poly_markets[0])
+too_little.optimize_gate_order(min_evaluated=1000)
+check("gates without enough data keep their order", too_little.gate_order == list(MarketMatcher.GATES))
+
+exit_with_results()
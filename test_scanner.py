@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the headless scanner: alert hysteresis, de-duplication and steady memory over many scans
+"""
+import ast
+import json
+import os
+import tempfile
+import tracemalloc
+
+from kalshi_api import KalshiAPI
+from market_matcher import MarketMatcher
+from matcher_session import MatcherSession
+from polymarket_api import PolymarketAPI
+from scanner import AlertPolicy, JsonlSink, Scanner
+from score_cache import ScoreCache
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING HEADLESS SCANNER")
+print("=" * 80)
+
+
+# 1. Hysteresis: confirm, no flapping between the two thresholds, cooldown after close
+policy = AlertPolicy(open_edge=0.03, close_edge=0.01, confirm_scans=2, update_step=0.02, cooldown=100)
+edges = [0.04, 0.02, 0.04, 0.04, 0.025, 0.035, 0.02, 0.07, 0.005, 0.05, 0.05, 0.05]
+events = [policy.observe("K|P", edge, now=t * 10) for t, edge in enumerate(edges)]
+check("opens after two confirming scans only", events[:4] == [None, None, None, "open"], f"{events[:4]}")
+check("no re-alert while the edge hovers", events[4:7] == [None, None, None], f"{events[4:7]}")
+check("re-announces a much larger edge once", events[7] == "update")
+check("closes below close_edge, cooldown blocks reopening", events[8:] == ["close", None, None, None], f"{events[8:]}")
+
+
+policy = AlertPolicy(open_edge=0.03, close_edge=0.01, confirm_scans=2)
+events = [policy.observe("K|P", 0.05, now=0)]
+policy.vanished(set(), now=10)
+events += [policy.observe("K|P", 0.05, now=20), policy.observe("K|P", 0.05, now=30)]
+check("a missing scan breaks the confirmation streak", events == [None, None, "open"], f"{events}")
+
+# 2. Scanner over fake venues: prices move, one pair disappears
+class FakeKalshi(KalshiAPI):
+    def __init__(self):
+        super().__init__()
+        self.tick = 0
+
+    def get_markets(self, limit=200, **kwargs):
+        self.tick += 1
+        ask = 0.40 if self.tick % 50 < 25 else 0.55
+        markets = [{"ticker": "KXTRUMP", "title": "Will Donald Trump win the election?",
+                    "yes_ask_dollars": ask, "no_ask_dollars": 1 - ask + 0.01, "last_price_dollars": ask}]
+        # A churning market: new ticker every scan
+        markets.append({"ticker": f"KXCHURN-{self.tick}", "title": f"Will candidate {self.tick} run?",
+                        "last_price_dollars": 0.2})
+        return markets
+
+
+class FakePolymarket(PolymarketAPI):
+    def get_markets(self, limit=500, **kwargs):
+        return [{"conditionId": "0xTRUMP", "question": "Will Trump win the election?",
+                 "outcomePrices": "[\"0.52\", \"0.48\"]", "bestBid": "0.52", "bestAsk": "0.53"}]
+
+
+path = os.path.join(tempfile.mkdtemp(), "alerts.jsonl")
+scanner = Scanner(FakeKalshi(), FakePolymarket(), sinks=[JsonlSink(path)],
+                  policy=AlertPolicy(open_edge=0.02, close_edge=0.01, confirm_scans=2), interval=0)
+for _ in range(3):
+    scanner.scan_once()
+with open(path) as f:
+    alerts = [json.loads(line) for line in f]
+check("scanner writes one open alert for a persistent edge",
+      [a["type"] for a in alerts] == ["open"] and alerts[0]["buy_yes_on"] == "kalshi",
+      f"({[a['type'] for a in alerts]})")
+
+rotating_path = os.path.join(tempfile.mkdtemp(), "alerts.jsonl")
+sink = JsonlSink(rotating_path, max_bytes=300)
+for i in range(20):
+    sink.emit({"type": "open", "pair": f"K{i}|P{i}", "ts": i})
+check("alert file rotates past max_bytes",
+      os.path.getsize(rotating_path) <= 400 and os.path.exists(rotating_path + ".1"))
+
+# Cached scores nobody looks up any more are pruned on a timer
+cache = ScoreCache(":memory:", rules_version="v1")
+cache.put_many([("KGONE", "PGONE", "h", 0.9)])
+cache.conn.execute("UPDATE scores SET updated_at = 0")
+pruning = Scanner(FakeKalshi(), FakePolymarket(), session=MatcherSession(MarketMatcher(), cache),
+                  interval=0, prune_interval=3600, score_max_age=86400)
+pruning.scan_once()
+first_prune = pruning.last_stats["pruned_scores"]
+cache.put_many([("KOLD", "POLD", "h", 0.9)])
+cache.conn.execute("UPDATE scores SET updated_at = 0 WHERE kalshi_id = 'KOLD'")
+pruning.scan_once()
+check("scanner prunes stale cached scores once per prune interval",
+      first_prune == 1 and pruning.last_stats["pruned_scores"] == 0 and len(cache) > 1,
+      f"({first_prune} pruned, {len(cache)} kept)")
+
+# The app shares the fetch helper without importing the Unix-only scanner
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), encoding="utf-8") as f:
+    app_imports = {node.module for node in ast.walk(ast.parse(f.read())) if isinstance(node, ast.ImportFrom)}
+check("app imports fetch_market_lists from market_lists, not scanner",
+      "market_lists" in app_imports and "scanner" not in app_imports)
+
+# 3. Soak: many scans with churn keep memory flat
+tracemalloc.start()
+for _ in range(200):
+    scanner.scan_once()
+early, _ = tracemalloc.get_traced_memory()
+for _ in range(800):
+    scanner.scan_once()
+late, _ = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+with open(path) as f:
+    kinds = [json.loads(line)["type"] for line in f]
+check("memory stays flat over 800 more scans", late - early < 2 * 1024 * 1024,
+      f"({(late - early) / 1024:.0f} KiB growth, {scanner.last_stats['tracked_pairs']} tracked pairs)")
+check("alerts follow the price cycle without duplicates",
+      all(a != b for a, b in zip(kinds, kinds[1:])), f"({len(kinds)} alerts)")
+
+exit_with_results()
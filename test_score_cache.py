@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the persistent SQLite score cache
+"""
+import inspect
+import os
+import tempfile
+
+import market_matcher
+import threshold_parser
+from market_matcher import MarketMatcher
+from matcher_session import MatcherSession
+from score_cache import ScoreCache
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+
+kalshi_markets = [
+    {"ticker": "K1", "title": "Will Donald Trump win the election?"},
+    {"ticker": "K2", "title": "Will Joe Biden be president?"},
+    {"ticker": "K3", "title": "Will Trump buy Greenland?"},
+]
+poly_markets = [
+    {"condition_id": "P1", "question": "Will Trump win the election?"},
+    {"condition_id": "P2", "question": "Will Biden be president?"},
+]
+
+print("=" * 80)
+print("TESTING PERSISTENT SCORE CACHE")
+print("=" * 80)
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "scores.sqlite3")
+
+    # First process: everything is computed and written
+    cache = ScoreCache(path, rules_version=matcher.rules_version)
+    first = MatcherSession(matcher, score_cache=cache).refresh(kalshi_markets, poly_markets, threshold=0.5)
+    check("cold cache stores every pair", len(cache) == 6, f"({len(cache)} rows)")
+    cache.close()
+
+    # "Restart": a fresh session reuses yesterday's work
+    cache = ScoreCache(path, rules_version=matcher.rules_version)
+    session = MatcherSession(matcher, score_cache=cache)
+    second = session.refresh(kalshi_markets, poly_markets, threshold=0.5)
+    check("warm restart computes 0 pairs", session.last_stats["pairs_scored"] == 0,
+          f"(computed {session.last_stats['pairs_scored']}, hits {session.last_stats['cache_hits']})")
+    check("warm restart gives same matches",
+          [(k["ticker"], p["condition_id"], s) for k, p, s in first] ==
+          [(k["ticker"], p["condition_id"], s) for k, p, s in second])
+    cache.close()
+
+    # Retitled market misses the cache because the titles hash changed
+    cache = ScoreCache(path, rules_version=matcher.rules_version)
+    session = MatcherSession(matcher, score_cache=cache)
+    retitled = [dict(kalshi_markets[0], title="Will Donald Trump win the 2028 election?")] + kalshi_markets[1:]
+    session.refresh(retitled, poly_markets, threshold=0.5)
+    check("retitled market is rescored", session.last_stats["pairs_scored"] == 2,
+          f"(computed {session.last_stats['pairs_scored']})")
+    cache.close()
+
+    # New rules version sees none of the old scores, and does not delete them
+    other = ScoreCache(path, rules_version="some-other-version")
+    check("rules change empties cache", len(other) == 0, f"({len(other)} rows)")
+    session = MatcherSession(matcher, score_cache=other)
+    session.refresh(kalshi_markets, poly_markets, threshold=0.5)
+    check("rules change rescores every pair", session.last_stats["pairs_scored"] == 6,
+          f"(computed {session.last_stats['pairs_scored']})")
+
+    # ...so a process still on the old version keeps its scores
+    cache = ScoreCache(path, rules_version=matcher.rules_version)
+    session = MatcherSession(matcher, score_cache=cache)
+    session.refresh(retitled, poly_markets, threshold=0.5)
+    check("processes on different versions share the file", len(cache) == 6 and len(other) == 6
+          and session.last_stats["cache_hits"] == 6, f"(hits {session.last_stats['cache_hits']})")
+    cache.close()
+    other.close()
+
+    # Versions nobody has read for a while are dropped when the cache opens
+    cache = ScoreCache(path, rules_version=matcher.rules_version, other_versions_ttl=-1)
+    other = ScoreCache(path, rules_version="some-other-version")
+    check("unused scores of other versions expire", len(cache) == 6 and len(other) == 0,
+          f"({len(cache)}, {len(other)} rows)")
+    cache.close()
+    other.close()
+
+# The version covers the whole module of the matcher and of the strike parser, not just the class
+def version_after_editing(module):
+    """rules_version as if `module`'s source had one more line"""
+    real_getsource = inspect.getsource
+    inspect.getsource = lambda obj: real_getsource(obj) + ("\n# edited" if obj is module else "")
+    try:
+        if "_source_hash" in MarketMatcher.__dict__:
+            del MarketMatcher._source_hash
+        return MarketMatcher().rules_version
+    finally:
+        inspect.getsource = real_getsource
+        del MarketMatcher._source_hash
+
+
+versions = {None: matcher.rules_version, "market_matcher": version_after_editing(market_matcher),
+            "threshold_parser": version_after_editing(threshold_parser)}
+check("editing market_matcher or threshold_parser changes rules_version",
+      len(set(versions.values())) == 3 and MarketMatcher().rules_version == matcher.rules_version, f"({versions})")
+
+# Scores nobody has looked up within max_age are pruned; recently read ones survive
+with tempfile.TemporaryDirectory() as tmp:
+    cache = ScoreCache(os.path.join(tmp, "prune.sqlite3"), rules_version="v1")
+    cache.put_many([("K1", "P1", "h", 0.7), ("K2", "P2", "h", 0.8)])
+    with cache.conn:
+        cache.conn.execute("UPDATE scores SET updated_at = 0")
+    cache.get_many([("K1", "P1", "h")])
+    removed = cache.prune(3600)
+    check("prune drops only scores not read recently", removed == 1 and len(cache) == 1 and
+          cache.get_many([("K1", "P1", "h")]) == {("K1", "P1"): 0.7}, f"(removed {removed})")
+    cache.close()
+
+exit_with_results()
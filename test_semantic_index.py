@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the semantic title index with a stub spaCy pipeline: embedding cache, top-k retrieval,
+vector persistence and how cosine may (and may not) raise a matcher score
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from market_matcher import MarketMatcher
+from semantic_index import SemanticIndex
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING SEMANTIC INDEX")
+print("=" * 80)
+
+
+class StubDoc:
+    def __init__(self, vector):
+        self.vector = vector
+
+
+class StubNLP:
+    """Averages a fixed random vector per word, like static word vectors; counts embedded titles"""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.embedded = 0
+
+    def word_vector(self, word):
+        return np.random.default_rng(sum(ord(c) * 31 ** i for i, c in enumerate(word)) % 2 ** 32).normal(size=self.dim)
+
+    def pipe(self, texts, batch_size=256):
+        for text in texts:
+            self.embedded += 1
+            words = text.lower().replace("?", "").split()
+            yield StubDoc(np.mean([self.word_vector(w) for w in words], axis=0) if words else np.zeros(self.dim))
+
+
+nlp = StubNLP()
+index = SemanticIndex(model="stub", top_k=2, min_cosine=0.5, nlp=nlp)
+
+titles = ["Will Bitcoin reach $150k in 2026?", "Will Bitcoin reach $150k by 2026?", "Who wins the Super Bowl?", ""]
+vectors = index.embed(titles + titles[:2])
+check("embeddings are unit length (zero for empty titles)",
+      np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0) and not vectors[3].any())
+check("each distinct title is embedded once", nlp.embedded == 4, f"({nlp.embedded})")
+
+kalshi = [{"title": t} for t in ("Will Bitcoin reach $150k in 2026?", "Who wins the Super Bowl?",
+                                 "Will it rain in Seattle tomorrow?")]
+poly = [{"question": t} for t in ("Who will win the Super Bowl?", "Will Bitcoin reach $150k by 2026?",
+                                  "Next Pope elected in 2026?")]
+pairs = index.candidate_pairs(kalshi, poly)
+check("nearest neighbours become candidate pairs", {(0, 1), (1, 0)} <= pairs and (2, 2) not in pairs, f"({pairs})")
+
+k_vectors = index.embed(m["title"] for m in kalshi)
+p_vectors = index.embed(m["question"] for m in poly)
+small_blocks = SemanticIndex(model="stub", top_k=2, min_cosine=0.5, block_size=1, nlp=nlp)
+blocked, whole = small_blocks.neighbours(k_vectors, p_vectors, 2), index.neighbours(k_vectors, p_vectors, 2)
+check("blocked matrix products give the same neighbours",
+      [[i for i, _ in row] for row in blocked] == [[i for i, _ in row] for row in whole]
+      and all(np.allclose([s for _, s in a], [s for _, s in b]) for a, b in zip(blocked, whole)))
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "vectors.npz")
+    index.save(path)
+    fresh_nlp = StubNLP()
+    reloaded = SemanticIndex(model="stub", cache_path=path, nlp=fresh_nlp)
+    same = np.allclose(reloaded.embed(m["title"] for m in kalshi), k_vectors)
+    other_model = SemanticIndex(model="other", cache_path=path, nlp=StubNLP())
+    check("vectors persist across restarts (and only for the same model)",
+          same and fresh_nlp.embedded == 0 and not other_model._vectors)
+
+
+class FixedCosine(SemanticIndex):
+    """Every pair of titles is a near-duplicate in embedding space"""
+
+    def pair_similarity(self, title1, title2):
+        return 0.95
+
+
+matcher = MarketMatcher()
+semantic = MarketMatcher()
+semantic.enable_semantic_matching(FixedCosine(model="stub", min_cosine=0.8, nlp=StubNLP()))
+
+same_market = ({"title": "Will Taylor Swift and Travis Kelce get engaged in 2026?"},
+               {"question": "Taylor Swift engagement to Travis Kelce announced before July?"})
+lexical, boosted = matcher.compute_similarity(*same_market), semantic.compute_similarity(*same_market)
+check("cosine raises the score of a pair with shared key terms", boosted == 0.95 and lexical < boosted,
+      f"({lexical:.3f} -> {boosted:.3f})")
+
+templated = ({"title": "Will the movie gross over 100M opening weekend?"},
+             {"question": "Will the album sell over 100K first week?"})
+lexical, boosted = matcher.compute_similarity(*templated), semantic.compute_similarity(*templated)
+check("cosine never overrides the shared-keyword protection", boosted == lexical < 0.4,
+      f"({lexical:.3f} vs {boosted:.3f})")
+
+check("semantic settings are part of the rules version", semantic.rules_version != matcher.rules_version)
+
+# Semantic mode adds neighbours to the candidates, it never replaces lexical ones
+lexical_kalshi = [{"ticker": "K1", "title": "Will Gavin Newsom win the 2028 presidential election?"},
+                  {"ticker": "K2", "title": "Will Bitcoin reach $150k in 2026?"}]
+lexical_poly = [{"condition_id": "P1", "question": "Will Gavin Newsom win the 2028 US presidential election?"},
+                {"condition_id": "P2", "question": "Will Bitcoin reach $150k by 2026?"}]
+narrow = MarketMatcher()
+narrow.enable_semantic_matching(SemanticIndex(model="stub", top_k=1, min_cosine=0.999, nlp=StubNLP()))
+as_ids = lambda matches: [(k["ticker"], p["condition_id"]) for k, p, _ in matches]
+plain_matches = as_ids(matcher.find_matches(lexical_kalshi, lexical_poly, 0.5))
+check("a lexical match outside the embedding neighbourhood survives semantic mode",
+      narrow.candidate_pairs(lexical_kalshi, lexical_poly) is None and ("K1", "P1") in plain_matches
+      and as_ids(narrow.find_matches(lexical_kalshi, lexical_poly, 0.5)) == plain_matches, f"({plain_matches})")
+
+
+class OnlyFirstPair:
+    def candidate_pairs(self, kalshi_markets, poly_markets):
+        return {(0, 0)}
+
+
+narrow.candidate_generators.append(OnlyFirstPair())
+wide = SemanticIndex(model="stub", top_k=1, min_cosine=0.5, nlp=StubNLP())
+narrow.enable_semantic_matching(wide)
+check("with generators configured, semantic neighbours are unioned in",
+      narrow.candidate_pairs(lexical_kalshi, lexical_poly) == {(0, 0)} | wide.candidate_pairs(lexical_kalshi, lexical_poly)
+      and (1, 1) in narrow.candidate_pairs(lexical_kalshi, lexical_poly))
+
+exit_with_results()
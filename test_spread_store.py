@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test the memory-mapped spread ring buffers: wraparound, restart and window statistics
+"""
+import multiprocessing
+import shutil
+import tempfile
+
+import numpy as np
+
+from spread_store import SpreadStore, pair_key, SPREAD, TS
+from checks import check, exit_with_results
+
+print("=" * 80)
+print("TESTING SPREAD STORE")
+print("=" * 80)
+
+
+directory = tempfile.mkdtemp()
+try:
+    store = SpreadStore(directory, capacity=100, initial_slots=2)
+    rng = np.random.default_rng(0)
+    for i in range(250):
+        for j in range(5):
+            # Pairs start at different times and skip some fetches
+            if i < 50 * j or rng.random() < 0.3:
+                continue
+            store.append(pair_key(f"K{j}", f"P{j}"), 1000 + i, 0.5 + rng.random() / 10, 0.5)
+
+    rows = store.history("K0|P0")
+    check("ring keeps the newest `capacity` samples in time order",
+          len(rows) == 100 and np.all(np.diff(rows[:, TS]) > 0) and rows[-1, TS] == 1249)
+    check("slots grow past the initial size", store.n_slots >= 5, f"({store.n_slots} slots)")
+    check("spread column is kalshi - poly", np.allclose(rows[:, SPREAD], rows[:, 1] - rows[:, 2]))
+
+    store.flush()
+    reopened = SpreadStore(directory)
+    check("history survives a restart", np.array_equal(reopened.history("K3|P3"), store.history("K3|P3")))
+
+    ok = True
+    for seconds in (5, 30, 120, 1000):
+        stats = reopened.window_stats(seconds, min_abs_spread=0.05, now=1249)
+        for key in reopened.slots:
+            spread = reopened.history(key, seconds, now=1249)[:, SPREAD]
+            if len(spread) == 0:
+                ok &= key not in stats
+                continue
+            row = stats[key]
+            ok &= (row["count"] == len(spread) and np.isclose(row["mean"], spread.mean())
+                   and np.isclose(row["std"], spread.std()) and row["last"] == spread[-1]
+                   and np.isclose(row["persistence"], (np.abs(spread) >= 0.05).mean()))
+    check("window stats agree with per-pair history", ok)
+finally:
+    shutil.rmtree(directory)
+
+
+def write_pairs(directory, venue, n_pairs, n_samples):
+    """One process (app or scanner) recording its own pairs"""
+    store = SpreadStore(directory, capacity=50, initial_slots=2)
+    for i in range(n_samples):
+        for j in range(n_pairs):
+            store.append(pair_key(f"{venue}{j}", f"P{j}"), 1000 + i, 0.5, 0.4 if venue == "A" else 0.3)
+
+
+directory = tempfile.mkdtemp()
+try:
+    # Two stores on one directory, e.g. the app and the scanner running at the same time
+    app_store = SpreadStore(directory, capacity=10, initial_slots=2)
+    scanner_store = SpreadStore(directory)
+    app_store.append("A|1", 1000, 0.5, 0.4)
+    scanner_store.append("B|2", 1000, 0.5, 0.3)
+    for i in range(3):
+        scanner_store.append(f"C|{i}", 1000, 0.5, 0.2)
+    app_store.append("A|1", 1001, 0.5, 0.4)
+    reopened = SpreadStore(directory)
+    check("stores sharing a directory never share a slot",
+          len(set(reopened.slots.values())) == len(reopened.slots) == 5
+          and len(reopened.history("A|1")) == 2 and len(reopened.history("B|2")) == 1
+          and np.allclose(reopened.history("B|2")[:, SPREAD], 0.2), f"({reopened.slots})")
+    check("a store sees pairs and growth from the other",
+          "B|2" in app_store.window_stats(100, now=1001) and app_store.n_slots == scanner_store.n_slots)
+    app_store.append("B|2", 999, 0.5, 0.3)
+    check("a sample older than the pair's newest is dropped", len(app_store.history("B|2")) == 1)
+finally:
+    shutil.rmtree(directory)
+
+directory = tempfile.mkdtemp()
+try:
+    # Two processes appending concurrently, growing the files as they go
+    workers = [multiprocessing.Process(target=write_pairs, args=(directory, venue, 6, 80)) for venue in "AB"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    reopened = SpreadStore(directory)
+    ok = len(reopened.slots) == 12 and len(set(reopened.slots.values())) == 12
+    for key in reopened.slots:
+        rows = reopened.history(key)
+        ok &= (len(rows) == 50 and rows[-1, TS] == 1079 and np.all(np.diff(rows[:, TS]) > 0)
+               and np.allclose(rows[:, SPREAD], 0.1 if key.startswith("A") else 0.2))
+    check("concurrent writer processes keep every pair's samples intact", ok, f"({len(reopened.slots)} pairs)")
+finally:
+    shutil.rmtree(directory)
+
+directory = tempfile.mkdtemp()
+try:
+    # Pairs that stop being sampled give their slots back; the files never outgrow max_slots
+    store = SpreadStore(directory, capacity=4, initial_slots=2, retention=100, max_slots=4)
+    store.append("old|1", 1000, 0.5, 0.4)
+    store.append("old|2", 1000, 0.5, 0.4)
+    store.append("new|1", 1200, 0.6, 0.4)
+    check("pairs unseen for the retention window give up their slots (reused, not grown)",
+          store.n_slots == 2 and set(store.slots) == {"new|1"} and len(store.history("old|1")) == 0
+          and len(store.history("new|1")) == 1
+          and np.allclose(store.history("new|1")[:, SPREAD], 0.2), f"({store.slots})")
+
+    for i in range(20):
+        store.record([({"ticker": f"K{i}", "yes_price": 0.5}, {"condition_id": f"P{i}", "yes_price": 0.4}, 1.0)],
+                     ts=1300 + i)
+    reopened = SpreadStore(directory)
+    check("slots stay bounded by max_slots, newest pairs kept",
+          store.n_slots == 4 and len(store.slots) <= 4 and "K19|P19" in store.slots
+          and reopened.slots == store.slots and len(reopened.history("K19|P19")) == 1, f"({store.slots})")
+
+    saves = []
+    original_save = store._save_meta
+    store._save_meta = lambda: (saves.append(1), original_save())
+    store.record([({"ticker": f"B{i}", "yes_price": 0.5}, {"condition_id": f"Q{i}", "yes_price": 0.4}, 1.0)
+                  for i in range(3)], ts=2000)
+    check("pairs.json is written once per batch of new pairs", len(saves) == 1, f"({len(saves)} writes)")
+finally:
+    shutil.rmtree(directory)
+
+exit_with_results()
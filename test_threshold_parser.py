@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test structured threshold extraction and strike-ladder lookups
+"""
+from market_matcher import MarketMatcher
+from minhash_lsh import MinHashLSH
+from threshold_parser import ThresholdIndex, ThresholdMatcher
+from checks import check, exit_with_results
+
+matcher = MarketMatcher()
+parse = matcher.threshold_parser.parse
+
+print("=" * 80)
+print("TESTING THRESHOLD PARSER")
+print("=" * 80)
+
+
+spec1 = parse("BTC above $100k")
+spec2 = parse("Bitcoin above $100,000 by Dec 31")
+check("$100k and $100,000 parse to the same strike", spec1.threshold == spec2.threshold == 100000, f"{spec1}")
+check("ticker alias maps to the underlying", spec1.underlying == spec2.underlying == {"bitcoin"})
+check("comparator, unit and date are typed",
+      (spec2.comparator, spec2.unit, spec2.month, spec2.day) == (">", "usd", 12, 31))
+check("percent thresholds", parse("Will inflation be above 3% in 2025?")[1:5] == (">", 3.0, None, "pct"))
+check("ranges parse as between", parse("Will Trump deport 500,000-750,000 people?")[1:4] == ("between", 500000, 750000))
+check("years alone are not strikes", parse("Will Trump win the 2028 election?") is None)
+
+# Strike gate: same market at different notations passes, neighbouring rungs do not
+score_same = matcher.compute_similarity({"title": "Will Bitcoin be above $100k on December 31, 2025?"},
+                                        {"question": "Will Bitcoin close above $100,000 on December 31, 2025?"})
+score_rung = matcher.compute_similarity({"title": "Will Bitcoin be above $110k on December 31, 2025?"},
+                                        {"question": "Will Bitcoin close above $100,000 on December 31, 2025?"})
+check("same strike matches", score_same >= 0.5, f"(score: {score_same:.2f})")
+check("neighbouring strike is rejected", score_rung == 0.0, f"(score: {score_rung:.2f})")
+score_flip = matcher.compute_similarity({"title": "Will Bitcoin be below $100k on December 31, 2025?"},
+                                        {"question": "Will Bitcoin close above $100,000 on December 31, 2025?"})
+check("opposite comparator is rejected", score_flip == 0.0, f"(score: {score_flip:.2f})")
+
+# Ladder lookups
+ladder = [{"ticker": f"KXBTC-{s}", "title": f"Will Bitcoin be above ${s}k on Dec 31, 2025?"} for s in range(80, 140, 5)]
+index = ThresholdIndex([parse(m["title"]) for m in ladder])
+exact = index.lookup(parse("Bitcoin above $100,000 on December 31, 2025?"))
+check("exact strike lookup", [ladder[i]["ticker"] for i in exact] == ["KXBTC-100"])
+nearest = index.lookup(parse("Bitcoin above $101,000 on December 31, 2025?"), tolerance=0.02)
+check("nearest strike within tolerance", [ladder[i]["ticker"] for i in nearest] == ["KXBTC-100"])
+check("nothing beyond tolerance", index.lookup(parse("Bitcoin above $102,500 on December 31, 2025?"), tolerance=0.02) == [])
+
+poly = [{"condition_id": "P100", "question": "Bitcoin above $100,000 on December 31, 2025?"},
+        {"condition_id": "P120", "question": "Will BTC be above $120k on Dec 31, 2025?"}]
+candidates = ThresholdMatcher(matcher).candidate_pairs(ladder, poly)
+pairs = sorted((ladder[k]["ticker"], poly[p]["condition_id"]) for k, p in candidates)
+check("ladder proposes one rung per Polymarket strike",
+      pairs == [("KXBTC-100", "P100"), ("KXBTC-120", "P120")], f"{pairs} of {len(ladder) * len(poly)} pairs")
+
+# With a fallback generator the markets without a threshold keep their candidates
+others_kalshi = [{"ticker": "KXPRES-NEWSOM", "title": "Will Gavin Newsom win the 2028 presidential election?"},
+                 {"ticker": "KXFED-MAR", "title": "Will the Fed cut interest rates in March 2026?"}]
+others_poly = [{"condition_id": "PNEWSOM", "question": "Will Gavin Newsom win the 2028 US presidential election?"},
+               {"condition_id": "PFED", "question": "Will the Fed cut interest rates in March 2026?"}]
+kalshi_all, poly_all = ladder + others_kalshi, poly + others_poly
+combined = ThresholdMatcher(matcher, fallback=MinHashLSH(matcher, num_perm=128, bands=64))
+candidates = combined.candidate_pairs(kalshi_all, poly_all)
+blocked = MarketMatcher()
+blocked.candidate_generators.append(ThresholdMatcher(blocked, fallback=MinHashLSH(blocked, num_perm=128, bands=64)))
+as_ids = lambda matches: [(k["ticker"], p["condition_id"], round(s, 9)) for k, p, s in matches]
+exhaustive = as_ids(matcher.find_matches(kalshi_all, poly_all, 0.5))
+check("threshold + fallback candidates find the exhaustive matches",
+      as_ids(blocked.find_matches(kalshi_all, poly_all, 0.5)) == exhaustive and len(exhaustive) == 3,
+      f"({len(exhaustive)} matches)")
+ladder_pairs = [(k, p) for k, p in candidates if k < len(ladder) and p < len(poly)]
+check("ladder rungs still come from the strike index, not the fallback",
+      len(ladder_pairs) == 2 and combined.last_stats["threshold_candidates"] == 2,
+      f"({len(candidates)} of {combined.last_stats['total_pairs']} pairs)")
+
+exit_with_results()
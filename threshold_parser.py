@@ -0,0 +1,374 @@
+"""
+Threshold Parser Module
+Extracts typed strike fields (underlying, comparator, threshold, unit, date) from market titles
+and indexes them in sorted strike lists for exact / nearest-strike lookups
+"""
+import bisect
+import re
+import time
+from typing import List, Dict, Tuple, Set, Optional, NamedTuple, FrozenSet, Iterable
+
+
+class ThresholdSpec(NamedTuple):
+    """Typed fields of a threshold market such as 'Will BTC be above $100k on Dec 31?'"""
+    underlying: FrozenSet[str]      # normalized subject words, e.g. {'bitcoin'}
+    comparator: Optional[str]       # '>', '<', 'between' or None
+    threshold: float                # strike (lower bound for 'between')
+    upper: Optional[float]          # upper bound for 'between'
+    unit: str                       # 'usd', 'pct', 'bps', 'deg' or '' for a plain number
+    year: Optional[int]
+    month: Optional[int]
+    day: Optional[int]
+
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# Longest phrases first so "greater than" wins over "than"
+COMPARATORS = [
+    ("greater than or equal to", ">"), ("less than or equal to", "<"),
+    ("greater than", ">"), ("more than", ">"), ("higher than", ">"), ("at least", ">"),
+    ("less than", "<"), ("lower than", "<"), ("fewer than", "<"), ("at most", "<"),
+    ("or more", ">"), ("or higher", ">"), ("or above", ">"), ("or less", "<"), ("or lower", "<"),
+    ("above", ">"), ("over", ">"), ("exceed", ">"), ("exceeds", ">"), ("reach", ">"), ("reaches", ">"),
+    ("hit", ">"), ("hits", ">"), ("top", ">"), ("tops", ">"),
+    ("below", "<"), ("under", "<"), ("dip", "<"), ("dips", "<"), ("fall", "<"), ("falls", "<"),
+    ("between", "between"),
+]
+SYMBOLS = [(">=", ">"), ("≥", ">"), (">", ">"), ("<=", "<"), ("≤", "<"), ("<", "<")]
+
+MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9, "t": 1e12, "tn": 1e12, "trillion": 1e12,
+}
+
+UNITS = {"%": "pct", "percent": "pct", "pct": "pct", "bps": "bps", "basis points": "bps",
+         "°": "deg", "degrees": "deg", "°f": "deg", "°c": "deg"}
+
+_MONTH_PATTERN = r"(jan|feb|mar|apr|may|jun|jul|aug|sept|sep|oct|nov|dec)[a-z]*\.?"
+_DATE_RE = re.compile(_MONTH_PATTERN + r"\s+(\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(\d{4}))?")
+_MONTH_YEAR_RE = re.compile(_MONTH_PATTERN + r"\s+(\d{4})\b")
+_YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+_NUMBER_RE = re.compile(
+    r"(\$)?\s*(\d+(?:,\d{3})+|\d+(?:\.\d+)?)"
+    r"(?:\s*(k|mn|m|bn|b|tn|t|thousand|million|billion|trillion)\b)?"
+    r"\s*(%|percent\b|pct\b|bps\b|basis points\b|°f|°c|°|degrees\b)?"
+)
+_COMPARATOR_RE = re.compile(
+    r"\b(" + "|".join(re.escape(phrase) for phrase, _ in COMPARATORS) + r")\b|("
+    + "|".join(re.escape(symbol) for symbol, _ in SYMBOLS) + r")"
+)
+_COMPARATOR_CLASS = dict(COMPARATORS + SYMBOLS)
+
+
+class ThresholdParser:
+    """Parses threshold titles into ThresholdSpec (cached per title)"""
+
+    def __init__(self, stop_words: Iterable[str] = (), aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            stop_words: Words dropped from the underlying
+            aliases: Underlying word aliases, e.g. {'btc': 'bitcoin'}
+        """
+        self.stop_words = set(stop_words)
+        self.aliases = dict(aliases or {})
+        self._cache: Dict[str, Optional[ThresholdSpec]] = {}
+
+    def parse_date(self, text_lower: str) -> Tuple[Optional[int], Optional[int], Optional[int], List[Tuple[int, int]]]:
+        """
+        Resolution date mentioned in a title
+
+        Args:
+            text_lower: Lowercased title
+
+        Returns:
+            (year, month, day, spans) where spans are the character ranges used by the date
+        """
+        match = _DATE_RE.search(text_lower)
+        if match:
+            year = int(match.group(3)) if match.group(3) else None
+            if year is None:
+                year_match = _YEAR_RE.search(text_lower)
+                year = int(year_match.group(1)) if year_match else None
+            return year, MONTHS[match.group(1)], int(match.group(2)), [match.span()]
+
+        match = _MONTH_YEAR_RE.search(text_lower)
+        if match:
+            return int(match.group(2)), MONTHS[match.group(1)], None, [match.span()]
+
+        match = _YEAR_RE.search(text_lower)
+        if match:
+            return int(match.group(1)), None, None, [match.span()]
+        return None, None, None, []
+
+    def parse(self, title: str) -> Optional[ThresholdSpec]:
+        """
+        Structured threshold fields of a title
+
+        Args:
+            title: Market title
+
+        Returns:
+            ThresholdSpec, or None if the title has no numeric threshold
+        """
+        if title in self._cache:
+            return self._cache[title]
+
+        spec = self._parse(title)
+        if len(self._cache) > 200000:
+            self._cache = {}
+        self._cache[title] = spec
+        return spec
+
+    def _parse(self, title: str) -> Optional[ThresholdSpec]:
+        if not title:
+            return None
+        text = title.lower()
+
+        year, month, day, date_spans = self.parse_date(text)
+
+        def in_date(position):
+            return any(start <= position < end for start, end in date_spans)
+
+        numbers = []
+        for match in _NUMBER_RE.finditer(text):
+            dollar, digits, multiplier, unit = match.groups()
+            start = match.start(2)
+            if in_date(start):
+                continue
+            # Bare years are dates, not strikes
+            if not (dollar or multiplier or unit) and "," not in digits and _YEAR_RE.fullmatch(digits):
+                continue
+            value = float(digits.replace(",", "")) * MULTIPLIERS.get(multiplier or "", 1.0)
+            unit_name = "usd" if dollar else UNITS.get(unit or "", "")
+            numbers.append((start, match.end(), value, unit_name))
+
+        if not numbers:
+            return None
+
+        comparators = [(m.start(), m.end(), _COMPARATOR_CLASS[m.group(0)]) for m in _COMPARATOR_RE.finditer(text)]
+
+        # Strike = first number after a comparator (or before a trailing "or more"), else the first number
+        comparator = None
+        chosen = 0
+        for c_start, c_end, c_class in comparators:
+            after = [i for i, n in enumerate(numbers) if n[0] >= c_end]
+            before = [i for i, n in enumerate(numbers) if n[1] <= c_start]
+            if text[c_start:c_end].startswith("or ") and before:
+                comparator, chosen = c_class, before[-1]
+                break
+            if after:
+                comparator, chosen = c_class, after[0]
+                break
+
+        _, end, value, unit = numbers[chosen]
+        upper = None
+        # "500,000-750,000" and "90k to 100k" are ranges
+        if comparator is None and chosen + 1 < len(numbers) and \
+                re.fullmatch(r"\s*(-|–|to)\s*\$?", text[end:numbers[chosen + 1][0]]):
+            comparator = "between"
+        if comparator == "between" and chosen + 1 < len(numbers):
+            upper = numbers[chosen + 1][2]
+            unit = unit or numbers[chosen + 1][3]
+
+        underlying = self.underlying(text, numbers, comparators, date_spans)
+        return ThresholdSpec(underlying, comparator, value, upper, unit, year, month, day)
+
+    def underlying(self, text_lower: str, numbers, comparators, date_spans) -> FrozenSet[str]:
+        """Title words left after removing numbers, comparators, dates and stop words"""
+        spans = [(n[0], n[1]) for n in numbers] + [(c[0], c[1]) for c in comparators] + list(date_spans)
+        chars = list(text_lower)
+        for start, end in spans:
+            for i in range(start, min(end, len(chars))):
+                chars[i] = " "
+        words = set()
+        for word in re.findall(r"[a-z][a-z0-9&]*", "".join(chars)):
+            word = self.aliases.get(word, word)
+            if len(word) > 1 and word not in self.stop_words and word not in MONTHS:
+                words.add(word)
+        return frozenset(words)
+
+
+def underlying_overlap(spec1: ThresholdSpec, spec2: ThresholdSpec) -> float:
+    """Jaccard similarity of two underlyings"""
+    union = len(spec1.underlying | spec2.underlying)
+    return len(spec1.underlying & spec2.underlying) / union if union else 0.0
+
+
+def dates_compatible(spec1: ThresholdSpec, spec2: ThresholdSpec) -> bool:
+    """False if both specs name a year, month or day and they differ"""
+    for a, b in ((spec1.year, spec2.year), (spec1.month, spec2.month), (spec1.day, spec2.day)):
+        if a is not None and b is not None and a != b:
+            return False
+    return True
+
+
+def strikes_compatible(spec1: ThresholdSpec, spec2: ThresholdSpec, tolerance: float) -> bool:
+    """
+    Whether two specs on the same underlying can be the same market
+
+    Args:
+        spec1: First spec
+        spec2: Second spec
+        tolerance: Allowed relative strike difference (0 = exact)
+
+    Returns:
+        False for opposite comparators, different units, strikes further apart than
+        tolerance, or conflicting resolution dates
+    """
+    if spec1.comparator and spec2.comparator and spec1.comparator != spec2.comparator:
+        return False
+    if spec1.unit != spec2.unit:
+        return False
+    for a, b in ((spec1.threshold, spec2.threshold), (spec1.upper, spec2.upper)):
+        if a is None or b is None:
+            continue
+        if abs(a - b) > tolerance * max(abs(a), abs(b)):
+            return False
+    return dates_compatible(spec1, spec2)
+
+
+class ThresholdIndex:
+    """Sorted strike lists per (underlying word, comparator, unit) with bisect lookups"""
+
+    def __init__(self, specs: List[Optional[ThresholdSpec]]):
+        """
+        Args:
+            specs: One spec (or None) per market, indexed by list position
+        """
+        self.specs = specs
+        buckets: Dict[Tuple[str, Optional[str], str], List[Tuple[float, int]]] = {}
+        for idx, spec in enumerate(specs):
+            if spec is None:
+                continue
+            for word in spec.underlying:
+                buckets.setdefault((word, spec.comparator, spec.unit), []).append((spec.threshold, idx))
+
+        self._strikes: Dict[Tuple[str, Optional[str], str], List[float]] = {}
+        self._members: Dict[Tuple[str, Optional[str], str], List[int]] = {}
+        for key, entries in buckets.items():
+            entries.sort()
+            self._strikes[key] = [strike for strike, _ in entries]
+            self._members[key] = [idx for _, idx in entries]
+
+    def lookup(self, spec: ThresholdSpec, tolerance: float = 0.0, min_overlap: float = 0.5) -> List[int]:
+        """
+        Markets at the exact strike, or at the nearest strikes within tolerance
+
+        Args:
+            spec: Query spec
+            tolerance: Largest relative strike distance for a nearest-strike match
+            min_overlap: Minimum underlying Jaccard with the query
+
+        Returns:
+            Indices of matching markets (date-compatible, same comparator and unit)
+        """
+        exact: Set[int] = set()
+        nearest: Dict[int, float] = {}
+        for word in spec.underlying:
+            key = (word, spec.comparator, spec.unit)
+            strikes = self._strikes.get(key)
+            if not strikes:
+                continue
+            members = self._members[key]
+
+            lo = bisect.bisect_left(strikes, spec.threshold)
+            hi = bisect.bisect_right(strikes, spec.threshold)
+            if hi > lo:
+                exact.update(members[lo:hi])
+                continue
+
+            # No exact strike under this word: the neighbours on either side
+            for pos in (lo - 1, lo):
+                if 0 <= pos < len(strikes):
+                    distance = abs(strikes[pos] - spec.threshold)
+                    if distance <= tolerance * max(abs(strikes[pos]), abs(spec.threshold)):
+                        nearest[members[pos]] = min(distance, nearest.get(members[pos], distance))
+
+        found = [
+            idx for idx in exact
+            if underlying_overlap(spec, self.specs[idx]) >= min_overlap and dates_compatible(spec, self.specs[idx])
+        ]
+        if found:
+            return found
+
+        candidates = [
+            idx for idx in nearest
+            if underlying_overlap(spec, self.specs[idx]) >= min_overlap and dates_compatible(spec, self.specs[idx])
+        ]
+        if not candidates:
+            return []
+        best = min(nearest[idx] for idx in candidates)
+        return [idx for idx in candidates if nearest[idx] == best]
+
+
+class ThresholdMatcher:
+    """
+    Candidate generator for threshold markets
+
+    Each threshold market is paired with the exact strike (else the nearest
+    strike within the matcher's strike tolerance) on the other venue instead of
+    every rung of the ladder. Markets without a threshold get their candidates
+    from `fallback`, whose pairs are kept unless both sides are thresholds on
+    the same underlying (those are the strike index's to decide).
+    """
+
+    def __init__(self, matcher, min_overlap: float = 0.5, fallback=None):
+        """
+        Args:
+            matcher: MarketMatcher providing the parser and strike tolerance
+            min_overlap: Minimum underlying Jaccard for a lookup hit
+            fallback: Candidate generator covering the other markets (e.g. MinHashLSH);
+                      None = threshold pairs only
+        """
+        self.matcher = matcher
+        self.min_overlap = min_overlap
+        self.fallback = fallback
+        self.last_stats: Dict = {}
+
+    def candidate_pairs(self, kalshi_markets: List[Dict], poly_markets: List[Dict]) -> Set[Tuple[int, int]]:
+        """
+        Exact / nearest-strike pairs in both directions
+
+        Args:
+            kalshi_markets: List of Kalshi markets
+            poly_markets: List of Polymarket markets
+
+        Returns:
+            Set of (kalshi_index, poly_index) pairs
+        """
+        start = time.time()
+        parser = self.matcher.threshold_parser
+        tolerance = self.matcher.strike_tolerance
+        kalshi_specs = [parser.parse(m.get("title", "")) for m in kalshi_markets]
+        poly_specs = [parser.parse(m.get("question", m.get("title", ""))) for m in poly_markets]
+
+        kalshi_index = ThresholdIndex(kalshi_specs)
+        poly_index = ThresholdIndex(poly_specs)
+
+        candidates = set()
+        for k_idx, spec in enumerate(kalshi_specs):
+            if spec is not None:
+                candidates.update((k_idx, p_idx) for p_idx in poly_index.lookup(spec, tolerance, self.min_overlap))
+        for p_idx, spec in enumerate(poly_specs):
+            if spec is not None:
+                candidates.update((k_idx, p_idx) for k_idx in kalshi_index.lookup(spec, tolerance, self.min_overlap))
+        threshold_candidates = len(candidates)
+
+        if self.fallback is not None:
+            for k_idx, p_idx in self.fallback.candidate_pairs(kalshi_markets, poly_markets):
+                k_spec, p_spec = kalshi_specs[k_idx], poly_specs[p_idx]
+                if k_spec is None or p_spec is None or underlying_overlap(k_spec, p_spec) < self.min_overlap:
+                    candidates.add((k_idx, p_idx))
+
+        self.last_stats = {
+            "kalshi_thresholds": sum(spec is not None for spec in kalshi_specs),
+            "poly_thresholds": sum(spec is not None for spec in poly_specs),
+            "threshold_candidates": threshold_candidates,
+            "candidates": len(candidates),
+            "total_pairs": len(kalshi_markets) * len(poly_markets),
+            "seconds": time.time() - start,
+        }
+        return candidates